@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+from orange_cb_recsys.content_analyzer.memory_interfaces.text_interface import IndexInterface, SearchIndex
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+
+"""
+Source and fields used by the benchmark (the items of the MovieLens 100k dataset)
+"""
+ML_100K_ITEMS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets', 'ml-100k',
+                             'items_info.json')
+ML_100K_FIELDS = ['title', 'plot', 'genres', 'year', 'directors', 'cast']
+
+
+def write_index(index: IndexInterface, documents: List[Dict[str, str]], bulk: bool = True,
+                reopen_schema: bool = False) -> List[int]:
+    """
+    Writes the documents passed as argument in a new index
+
+    Args:
+        index (IndexInterface): index where the documents are written (the index in its directory is replaced)
+        documents (List[Dict[str, str]]): documents to write, in the form {field name: field data}
+        bulk (bool): if True, the fields of the documents are declared when the writing starts (bulk writing),
+            otherwise the schema of the index is generated dynamically
+        reopen_schema (bool): if True, the schema of the index is read from disk before adding each field (as the
+            index used to do before keeping the schema in memory), used as reference by the benchmark
+
+    Returns:
+        List[int]: positions of the documents in the index
+    """
+    from whoosh.index import open_dir
+
+    field_names = sorted({field_name for document in documents for field_name in document}) if bulk else None
+    index.init_writing(True, field_names)
+    positions = []
+    for document in documents:
+        index.new_content()
+        for field_name, field_data in document.items():
+            if reopen_schema:
+                open_dir(index.directory).schema.names()
+            index.new_field(field_name, field_data)
+        positions.append(index.serialize_content())
+    index.stop_writing()
+    return index.resolve_positions(positions)
+
+
+def measure_indexing_throughput(documents: List[Dict[str, str]], procs: int = 1, multisegment: bool = False,
+                                bulk: bool = True, reopen_schema: bool = False) -> float:
+    """
+    Measures how many documents per second are written in a SearchIndex (created in a temporary directory)
+
+    EXAMPLE:
+        measure_indexing_throughput(load_benchmark_documents(), procs=4)
+
+    Args:
+        documents (List[Dict[str, str]]): documents to write, in the form {field name: field data}
+        procs (int): number of processes used by the bulk writer
+        multisegment (bool): if True, the segments written by the processes of the bulk writer are not merged
+        bulk (bool): if True, the index is written in bulk, otherwise the schema is generated dynamically
+        reopen_schema (bool): if True, the schema is read from disk before adding each field (see write_index)
+
+    Returns:
+        float: documents written per second
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        index = SearchIndex(os.path.join(directory, 'index'), procs=procs, multisegment=multisegment)
+        start = time.perf_counter()
+        write_index(index, documents, bulk, reopen_schema)
+        return len(documents) / (time.perf_counter() - start)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def load_benchmark_documents(file_path: str = ML_100K_ITEMS, field_list: List[str] = None) -> List[Dict[str, str]]:
+    """
+    Loads the documents used by the benchmark from a JSON source (by default, the items of MovieLens 100k), with the
+    same form of the entries written by the ContentAnalyzer
+
+    Args:
+        file_path (str): path of the JSON source
+        field_list (List[str]): fields of the raw contents to write, if None ML_100K_FIELDS are used
+
+    Returns:
+        List[Dict[str, str]]: documents in the form {field name: field data}
+    """
+    if field_list is None:
+        field_list = ML_100K_FIELDS
+    documents = []
+    for i, raw_content in enumerate(JSONFile(file_path)):
+        document = {'content_id': str(i)}
+        document.update({'{}#0'.format(field_name): str(raw_content.get(field_name, '')) for field_name in field_list})
+        documents.append(document)
+    return documents
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.index_benchmark (from the root of the repository)
+    benchmark_documents = load_benchmark_documents()
+    print('Indexing {} documents with {} fields'.format(len(benchmark_documents), len(benchmark_documents[0])))
+    runs = [('schema read for each field (old)', dict(bulk=False, reopen_schema=True)),
+            ('dynamic schema', dict(bulk=False)),
+            ('bulk', dict(bulk=True))]
+    if os.cpu_count() > 1:
+        runs += [('bulk, {} processes'.format(os.cpu_count()), dict(procs=os.cpu_count())),
+                 ('bulk, {} processes, multisegment'.format(os.cpu_count()),
+                  dict(procs=os.cpu_count(), multisegment=True))]
+    for description, options in runs:
+        print('{:10.1f} documents/s  {}'.format(measure_indexing_throughput(benchmark_documents, **options), description))
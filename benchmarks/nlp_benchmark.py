@@ -0,0 +1,87 @@
+import os
+import time
+from typing import Dict, List
+
+from orange_cb_recsys.content_analyzer.information_processor.nlp import NLTK
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.utils.nltk_resources import ensure_nltk_resource
+
+"""
+Source and field used by the benchmark (the plots of the items of the MovieLens 100k dataset)
+"""
+ML_100K_ITEMS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'datasets', 'ml-100k',
+                             'items_info.json')
+ML_100K_FIELD = 'plot'
+
+"""
+NLTK resources needed by the configurations measured by the benchmark
+"""
+NLTK_RESOURCES = ['tokenizers/punkt', 'corpora/stopwords', 'taggers/averaged_perceptron_tagger', 'corpora/wordnet']
+
+
+def ensure_benchmark_resources():
+    """
+    Checks that the NLTK resources used by the benchmark are installed (downloading the missing ones), so that their
+    download isn't measured together with the processing
+    """
+    for resource_path in NLTK_RESOURCES:
+        ensure_nltk_resource(resource_path)
+
+
+def measure_processing_throughput(texts: List[str], batch: bool = True, **nltk_options) -> float:
+    """
+    Measures how many texts per second are processed by a new NLTK instance, calling process on each text or
+    process_batch on the whole list. A new instance is created for each measure, so that its token cache is empty
+
+    EXAMPLE:
+        measure_processing_throughput(load_benchmark_texts(), batch=False, lemmatization=True)
+
+    Args:
+        texts (List[str]): texts to process
+        batch (bool): if True, the texts are processed with a single call to process_batch, otherwise process is
+            called on each one of them
+        nltk_options: arguments of the NLTK instance (for example stopwords_removal=True)
+
+    Returns:
+        float: texts processed per second
+    """
+    ensure_benchmark_resources()
+    nltk = NLTK(**nltk_options)
+    start = time.perf_counter()
+    if batch:
+        nltk.process_batch(texts)
+    else:
+        for text in texts:
+            nltk.process(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def load_benchmark_texts(file_path: str = ML_100K_ITEMS, field_name: str = ML_100K_FIELD) -> List[str]:
+    """
+    Loads the texts used by the benchmark from a JSON source (by default, the plots of the items of MovieLens 100k).
+    The raw contents without the field are skipped
+
+    Args:
+        file_path (str): path of the JSON source
+        field_name (str): field of the raw contents to process
+
+    Returns:
+        List[str]: texts of the field
+    """
+    return [str(raw_content[field_name]) for raw_content in JSONFile(file_path)
+            if raw_content.get(field_name) not in [None, '']]
+
+
+if __name__ == '__main__':
+    # python -m benchmarks.nlp_benchmark (from the root of the repository)
+    ensure_benchmark_resources()
+    benchmark_texts = load_benchmark_texts()
+    print('Processing {} texts of the field {}'.format(len(benchmark_texts), ML_100K_FIELD))
+    configurations: Dict[str, Dict] = {
+        'stopwords removal, lemmatization': dict(stopwords_removal=True, lemmatization=True),
+        'stopwords removal, stemming': dict(stopwords_removal=True, stemming=True),
+        'lemmatization, no token cache': dict(lemmatization=True, token_cache_size=0)}
+    for description, options in configurations.items():
+        for method, batch in [('process', False), ('process_batch', True)]:
+            print('{:10.1f} texts/s  {:13}  {}'.format(
+                measure_processing_throughput(benchmark_texts, batch, **options), method, description))
@@ -1,17 +1,64 @@
-from . import content_representation
-from .embeddings import embedding_learner
-from . import field_content_production_techniques
-from . import information_processor
-from . import memory_interfaces
-from . import ratings_manager
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
 
-from .content_representation import *
-from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import *
-from .field_content_production_techniques import *
-from .information_processor import *
-from .memory_interfaces import *
-from .ratings_manager import *
-from .config import ExogenousConfig, UserAnalyzerConfig, ItemAnalyzerConfig, FieldConfig
-from .content_analyzer_main import ContentAnalyzer
-from .exogenous_properties_retrieval import DBPediaMappingTechnique, PropertiesFromDataset, BabelPyEntityLinking
-from .raw_information_source import CSVFile, JSONFile, DATFile, SQLDatabase
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'Content': '.content_representation',
+    'GensimDoc2Vec': '.embeddings',
+    'GensimFastText': '.embeddings',
+    'GensimLatentSemanticAnalysis': '.embeddings',
+    'GensimRandomIndexing': '.embeddings',
+    'GensimWord2Vec': '.embeddings',
+    'Centroid': '.field_content_production_techniques',
+    'Sum': '.field_content_production_techniques',
+    'WordEmbeddingTechnique': '.field_content_production_techniques',
+    'SentenceEmbeddingTechnique': '.field_content_production_techniques',
+    'DocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'FromWordsSentenceEmbeddingTechnique': '.field_content_production_techniques',
+    'FromSentencesDocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'FromWordsDocumentEmbeddingTechnique': '.field_content_production_techniques',
+    'WhooshTfIdf': '.field_content_production_techniques',
+    'SkLearnTfIdf': '.field_content_production_techniques',
+    'StreamingTfIdf': '.field_content_production_techniques',
+    'OriginalData': '.field_content_production_techniques',
+    'DefaultTechnique': '.field_content_production_techniques',
+    'PyWSDSynsetDocumentFrequency': '.field_content_production_techniques',
+    'NLTK': '.information_processor',
+    'KeywordIndex': '.memory_interfaces',
+    'SearchIndex': '.memory_interfaces',
+    'NumberNormalizer': '.ratings_manager',
+    'RatingsImporter': '.ratings_manager',
+    'TextBlobSentimentAnalysis': '.ratings_manager',
+    'ExogenousConfig': '.config',
+    'UserAnalyzerConfig': '.config',
+    'ItemAnalyzerConfig': '.config',
+    'FieldConfig': '.config',
+    'ContentAnalyzer': '.content_analyzer_main',
+    'DBPediaMappingTechnique': '.exogenous_properties_retrieval',
+    'PropertiesFromDataset': '.exogenous_properties_retrieval',
+    'BabelPyEntityLinking': '.exogenous_properties_retrieval',
+    'CSVFile': '.raw_information_source',
+    'JSONFile': '.raw_information_source',
+    'DATFile': '.raw_information_source',
+    'SQLDatabase': '.raw_information_source'
+}, {
+    'combining_technique': '.field_content_production_techniques.embedding_technique.combining_technique',
+    'content': '.content_representation.content',
+    'doc2vec': '.embeddings.embedding_learner.doc2vec',
+    'embedding_learner': '.embeddings.embedding_learner.embedding_learner',
+    'embedding_matrix': '.content_representation.embedding_matrix',
+    'embedding_technique': '.field_content_production_techniques.embedding_technique.embedding_technique',
+    'fasttext': '.embeddings.embedding_learner.fasttext',
+    'features_matrix': '.content_representation.features_matrix',
+    'features_vocabulary': '.content_representation.features_vocabulary',
+    'field_content_production_technique': '.field_content_production_techniques.field_content_production_technique',
+    'latent_semantic_analysis': '.embeddings.embedding_learner.latent_semantic_analysis',
+    'nlp': '.information_processor.nlp',
+    'random_indexing': '.embeddings.embedding_learner.random_indexing',
+    'rating_processor': '.ratings_manager.rating_processor',
+    'ratings_importer': '.ratings_manager.ratings_importer',
+    'representation_container': '.content_representation.representation_container',
+    'sentiment_analysis': '.ratings_manager.sentiment_analysis',
+    'synset_document_frequency': '.field_content_production_techniques.synset_document_frequency',
+    'text_interface': '.memory_interfaces.text_interface',
+    'tf_idf': '.field_content_production_techniques.tf_idf',
+    'word2vec': '.embeddings.embedding_learner.word2vec'
+})
@@ -1,14 +1,19 @@
 import abc
 import re
 from abc import ABC
-from typing import List, Dict, Union, Iterator
+from typing import List, Dict, Union, Iterator, TYPE_CHECKING
 
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
     FieldContentProductionTechnique, DefaultTechnique
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
-from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import ExogenousPropertiesRetrieval
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
+from orange_cb_recsys.content_analyzer.preprocessing_pool import PreprocessingPool
+from orange_cb_recsys.content_analyzer.representation_cache import RepresentationCache
+
+if TYPE_CHECKING:
+    # only imported for the type annotations, so that SPARQLWrapper and babelpy aren't imported with the config
+    from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import ExogenousPropertiesRetrieval
 
 
 class FieldConfig:
@@ -171,7 +176,7 @@ class ExogenousConfig:
             has non unique ids)
     """
 
-    def __init__(self, exogenous_technique: ExogenousPropertiesRetrieval, id: str = None):
+    def __init__(self, exogenous_technique: 'ExogenousPropertiesRetrieval', id: str = None):
         if id is not None:
             self._check_custom_id(id)
 
@@ -220,6 +225,44 @@ class ContentAnalyzerConfig(ABC):
             configurations on
         exogenous_representation_list: list of techniques that are used to retrieve exogenous properties that represent
             the contents
+        export_json (bool): if True, the produced contents will also be exported in a 'contents.json' file
+        content_archive (bool): if True, the contents will be serialized in a packed archive (a small number of segment
+            files and an index) instead of being serialized each one in its own '.xz' file
+        field_projection (bool): if True, the representations of each content are serialized separately in the
+            packed archive, so that the contents can be loaded lazily (only the representations actually used by a
+            recommender will be deserialized). It is only considered if content_archive is True
+        n_jobs (int): number of processes used to produce the field representations (each field config is processed
+            by a different process) and to serialize the contents. If -1, all the cpus will be used. Keep in mind that
+            when n_jobs is not 1, the source and the field configs are copied in the worker processes, so they must
+            be picklable (an SQLDatabase source, for example, is not)
+        chunk_size (int): if defined, the source is processed in chunks of chunk_size contents and the contents of each
+            chunk are serialized (and stored in the memory interfaces) as soon as they are created, so that only the
+            contents of one chunk are kept in memory. The techniques that need the entire collection
+            (CollectionBasedTechnique) are fitted on the whole source before the first chunk is processed.
+            If None, the whole source is processed at once
+        embedding_matrix (bool): if True, the 1-dimensional embeddings produced for each field representation are
+            stored in a single '.npy' matrix (one for each field and representation) in the output directory, and the
+            contents only keep a reference to their row (MatrixEmbeddingField). The matrices can be loaded memory
+            mapped with the load_embedding_matrix function
+        features_matrix (bool): if True, the SparseFeaturesBagField representations produced for each field
+            representation (for example by SkLearnTfIdf with sparse_features=True) are also stored in a single sparse
+            '.npz' matrix (one for each field and representation) in the output directory, whose columns are the terms
+            of their vocabulary. The matrices can be loaded with the load_features_matrix function, so that the whole
+            catalog doesn't have to be rebuilt from the features bags of the single contents
+        incremental (bool): if True, the content analyzer saves in the output directory a fingerprint of each raw
+            content (computed on the values of the fields used by the config) and a fingerprint of the config itself.
+            When the content analyzer is run again with the same config, only the new and changed contents are
+            produced (and replaced in the output directory and in the memory interfaces), while the contents that are
+            not in the source anymore are deleted. All the contents are produced again if the config changed or if
+            the collection changed and one of the techniques requires a refit on the entire collection (for example
+            a tf-idf technique)
+        representation_cache (RepresentationCache): if defined, the representations produced by the techniques are
+            stored in the cache and reused, even by different runs or different configs, every time the same raw
+            value of a field is processed by an equal technique with equal preprocessors. The techniques which need
+            the entire collection (CollectionBasedTechnique) don't use the cache
+        preprocessing_pool (PreprocessingPool): if defined, the raw data of the fields is processed by the
+            preprocessors of the field configs in parallel, using the worker processes of the pool. The order of the
+            contents (and the produced representations) doesn't change. The pool is closed at the end of the run
     """
 
     def __init__(self, source: RawInformationSource,
@@ -228,7 +271,16 @@ class ContentAnalyzerConfig(ABC):
                  field_dict: Dict[str, List[FieldConfig]] = None,
                  exogenous_representation_list:
                  Union[ExogenousConfig, List[ExogenousConfig]] = None,
-                 export_json: bool = False):
+                 export_json: bool = False,
+                 content_archive: bool = False,
+                 field_projection: bool = False,
+                 n_jobs: int = 1,
+                 chunk_size: int = None,
+                 embedding_matrix: bool = False,
+                 features_matrix: bool = False,
+                 incremental: bool = False,
+                 representation_cache: RepresentationCache = None,
+                 preprocessing_pool: PreprocessingPool = None):
         if field_dict is None:
             field_dict = {}
         if exogenous_representation_list is None:
@@ -238,8 +290,17 @@ class ContentAnalyzerConfig(ABC):
         self.__id: List[str] = id
         self.__output_directory: str = output_directory
         self.__field_dict: Dict[str, List[FieldConfig]] = field_dict
-        self.__exogenous_representation_list: List[ExogenousPropertiesRetrieval] = exogenous_representation_list
+        self.__exogenous_representation_list: List['ExogenousPropertiesRetrieval'] = exogenous_representation_list
         self.__export_json: bool = export_json
+        self.__content_archive: bool = content_archive
+        self.__field_projection: bool = field_projection
+        self.__n_jobs: int = n_jobs
+        self.__chunk_size: int = chunk_size
+        self.__embedding_matrix: bool = embedding_matrix
+        self.__features_matrix: bool = features_matrix
+        self.__incremental: bool = incremental
+        self.__representation_cache: RepresentationCache = representation_cache
+        self.__preprocessing_pool: PreprocessingPool = preprocessing_pool
 
         if not isinstance(self.__exogenous_representation_list, list):
             self.__exogenous_representation_list = [self.__exogenous_representation_list]
@@ -279,6 +340,42 @@ class ContentAnalyzerConfig(ABC):
     def export_json(self) -> bool:
         return self.__export_json
 
+    @property
+    def content_archive(self) -> bool:
+        return self.__content_archive
+
+    @property
+    def field_projection(self) -> bool:
+        return self.__field_projection
+
+    @property
+    def n_jobs(self) -> int:
+        return self.__n_jobs
+
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def embedding_matrix(self) -> bool:
+        return self.__embedding_matrix
+
+    @property
+    def features_matrix(self) -> bool:
+        return self.__features_matrix
+
+    @property
+    def incremental(self) -> bool:
+        return self.__incremental
+
+    @property
+    def representation_cache(self) -> RepresentationCache:
+        return self.__representation_cache
+
+    @property
+    def preprocessing_pool(self) -> PreprocessingPool:
+        return self.__preprocessing_pool
+
     def get_configs_list(self, field_name: str) -> Iterator[FieldConfig]:
         """
         Getter the list of the field configs specified for the input field
@@ -4,17 +4,72 @@ import re
 import lzma
 import os
 import shutil
-from typing import List, Dict
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from typing import List, Dict, Iterator, Tuple, Optional
+
+import numpy as np
 
 from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig
-from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField, ContentEncoder
+from orange_cb_recsys.content_analyzer.content_archive import ContentArchiveWriter, encode_content
+from orange_cb_recsys.content_analyzer.content_fingerprints import ConfigFingerprint, content_fingerprint, \
+    load_fingerprints, save_fingerprints, object_fingerprint
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField, ContentEncoder, \
+    FieldRepresentation, SparseFeaturesBagField, EmbeddingField, MatrixEmbeddingField
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import EmbeddingMatrixWriter
+from orange_cb_recsys.content_analyzer.content_representation.features_matrix import FeaturesMatrixWriter
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.field_content_production_technique import \
+    CollectionBasedTechnique
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
+from orange_cb_recsys.content_analyzer.preprocessing_pool import SharedPreprocessing
+from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource, ColumnarSource, \
+    split_in_chunks
 from orange_cb_recsys.utils.const import logger
 from orange_cb_recsys.utils.id_merger import id_merger
 from orange_cb_recsys.utils.const import progbar
 
 
+def get_max_workers(n_jobs: int) -> int:
+    """
+    Converts the n_jobs parameter of the ContentAnalyzerConfig in the number of processes to use (-1 means that all
+    the cpus will be used)
+    """
+    return os.cpu_count() if n_jobs == -1 else n_jobs
+
+
+def serialize_content(content: Content, output_directory: str):
+    """
+    Serializes a specific content in its own lzma compressed file in the output directory passed as argument
+    Args:
+        content (Content): content instance that will be serialized
+        output_directory (str): directory where the content will be serialized
+    """
+    file_name = re.sub(r'[^\w\s]', '', content.content_id)
+    path = os.path.join(output_directory, file_name + '.xz')
+    with lzma.open(path, 'wb') as f:
+        pickle.dump(content, f)
+
+
+def referenced_fields(config: ContentAnalyzerConfig) -> Optional[List[str]]:
+    """
+    Returns the fields of the raw contents referenced by the config passed as argument: the fields that compose the
+    id, the fields in the field dict and the fields needed by the exogenous techniques. None is returned if an
+    exogenous technique may need all the fields of the raw contents
+    """
+    field_list = config.id + config.get_field_name_list()
+    for ex_config in config.exogenous_representation_list:
+        required_fields = ex_config.exogenous_technique.get_required_fields()
+        if required_fields is None:
+            return None
+        field_list.extend(required_fields)
+
+    # duplicates are removed keeping the order
+    return list(dict.fromkeys(field_list))
+
+
 class ContentAnalyzer:
     """
     Class to whom the control of the content analysis phase is delegated. It uses the data stored in the configuration
@@ -36,7 +91,9 @@ class ContentAnalyzer:
         """
         Processes the creation of the contents and serializes the contents. This method starts the content production
         process and initializes everything that will be used to create said contents, their fields and their
-        representations
+        representations. If a chunk size is defined in the config, the contents of each chunk are serialized as soon
+        as they are created. If the config is incremental, only the contents that are new or changed since the last
+        run are produced (see the ContentAnalyzerConfig)
         """
         # before starting the process, the content analyzer manin checks that there are no duplicate id cases
         # both in the field dictionary and in the exogenous representation list
@@ -48,35 +105,335 @@ class ContentAnalyzer:
         except ValueError as e:
             raise e
 
-        # creates the directory where the data will be serialized and overwrites it if it already exists
-        output_path = self.__config.output_directory
-        if os.path.exists(output_path):
-            shutil.rmtree(output_path)
-        os.mkdir(output_path)
-
         contents_producer = ContentsProducer.get_instance()
         contents_producer.set_config(self.__config)
-        created_contents = contents_producer.create_contents()
 
-        if self.__config.export_json:
-            json_path = os.path.join(self.__config.output_directory, 'contents.json')
-            with open(json_path, "w") as data:
-                json.dump(created_contents, data, cls=ContentEncoder, indent=4)
+        # in an incremental run only the new and changed contents are produced (source is None if all the contents
+        # of the source must be produced)
+        source = None
+        fingerprints = None
+        changed_ids = []
+        removed_ids = []
+        if self.__config.incremental:
+            # the config is described before the techniques are fitted, since the run changes their attributes
+            config_fingerprint = ConfigFingerprint(self.__config)
+            source, fingerprints, changed_ids, removed_ids = self.__plan_incremental_run(config_fingerprint)
+            if source is not None and len(source) == 0 and len(removed_ids) == 0:
+                logger.info("No content was added, changed or removed since the last run")
+                return
 
-        for content in progbar(created_contents, prefix="Serializing contents: "):
-            self.__serialize_content(content)
+        output_path = self.__config.output_directory
+        if source is None:
+            # creates the directory where the data will be serialized and overwrites it if it already exists
+            if os.path.exists(output_path):
+                shutil.rmtree(output_path)
+            os.mkdir(output_path)
+        else:
+            self.__remove_stale_contents(changed_ids, removed_ids, fingerprints['index_positions'])
+
+        # the contents are serialized one chunk at a time (if the chunk size is not defined in the config, there will
+        # be a single chunk containing all the contents), so the archive writer, the process pool and the json file
+        # are kept open for the whole process
+        with ExitStack() as stack:
+            # the same pool is used both to produce and to serialize the contents, so that at most n_jobs processes
+            # are running
+            map_function = map
+            executor = None
+            if self.__config.n_jobs != 1:
+                executor = stack.enter_context(ProcessPoolExecutor(get_max_workers(self.__config.n_jobs)))
+                map_function = executor.map
+
+            archive_writer = None
+            if self.__config.content_archive:
+                archive_writer = stack.enter_context(
+                    ContentArchiveWriter(output_path, field_projection=self.__config.field_projection))
+                for content_id in removed_ids:
+                    archive_writer.remove(content_id)
+
+            embedding_writer = None
+            if self.__config.embedding_matrix:
+                embedding_writer = stack.enter_context(EmbeddingMatrixWriter(output_path))
+                for content_id in changed_ids + removed_ids:
+                    embedding_writer.remove(content_id)
+
+            features_writer = None
+            if self.__config.features_matrix:
+                features_writer = stack.enter_context(FeaturesMatrixWriter(output_path))
+                for content_id in changed_ids + removed_ids:
+                    features_writer.remove(content_id)
+
+            json_file = None
+            n_exported = 0
+            if self.__config.export_json:
+                json_path = os.path.join(self.__config.output_directory, 'contents.json')
+                # in an incremental run the contents already exported that didn't change are kept
+                kept_contents = []
+                if source is not None and os.path.isfile(json_path):
+                    stale_ids = set(changed_ids + removed_ids)
+                    with open(json_path) as old_json_file:
+                        kept_contents = [content for content in json.load(old_json_file)
+                                         if content['content_id'] not in stale_ids]
+
+                json_file = stack.enter_context(open(json_path, "w"))
+                json_file.write("[")
+                self.__export_json(json_file, kept_contents, n_exported)
+                n_exported += len(kept_contents)
+
+            for contents_chunk in contents_producer.create_contents_chunks(source, executor):
+                if json_file is not None:
+                    self.__export_json(json_file, contents_chunk, n_exported)
+                    n_exported += len(contents_chunk)
+
+                if fingerprints is not None:
+                    self.__store_index_positions(contents_chunk, fingerprints['index_positions'])
+
+                self.__save_vocabularies(contents_chunk)
+                if features_writer is not None:
+                    self.__store_features_bags(contents_chunk, features_writer)
+                if embedding_writer is not None:
+                    self.__store_embeddings(contents_chunk, embedding_writer)
+                self.__serialize_contents(contents_chunk, map_function, archive_writer)
+
+            if json_file is not None:
+                json_file.write("\n]" if n_exported != 0 else "]")
+
+        if fingerprints is not None:
+            # the fingerprint of the config is computed again since an embedding model trained and saved by the run
+            # is now described by its files
+            fingerprints['config'] = config_fingerprint.compute()
+            save_fingerprints(output_path, fingerprints)
+
+    def __plan_incremental_run(self, config_fingerprint: ConfigFingerprint) \
+            -> Tuple[Optional[ColumnarSource], Dict, List[str], List[str]]:
+        """
+        Compares the raw contents in the source with the fingerprints saved in the output directory by the last run,
+        in order to find the contents that must be produced. All the contents must be produced if there are no
+        fingerprints (first run), if the config changed or if the collection changed and one of the techniques
+        requires a refit on the entire collection. The source is read only once and only the raw contents that must be
+        produced are kept in memory
+
+        Args:
+            config_fingerprint (ConfigFingerprint): fingerprint of the config, taken before the run
 
-    def __serialize_content(self, content: Content):
+        Returns:
+            source (ColumnarSource): buffer containing the raw contents that are new or changed, None if all the
+                contents of the source must be produced
+            fingerprints (dict): fingerprints that will be saved at the end of the run (see load_fingerprints)
+            changed_ids (List[str]): ids of the contents already stored that changed
+            removed_ids (List[str]): ids of the contents already stored that are not in the source anymore
+        """
+        field_list = referenced_fields(self.__config)
+        old_fingerprints = load_fingerprints(self.__config.output_directory)
+        fingerprints = {'config': config_fingerprint.compute(), 'contents': {}, 'index_positions': {}}
+        contents_fingerprints = fingerprints['contents']
+
+        if old_fingerprints is None or old_fingerprints['config'] != fingerprints['config']:
+            if old_fingerprints is not None:
+                logger.info("The config changed since the last run, all the contents will be produced")
+            for raw_content in self.__config.source:
+                contents_fingerprints[id_merger(raw_content, self.__config.id)] = \
+                    content_fingerprint(raw_content, field_list)
+            return None, fingerprints, [], []
+
+        old_contents_fingerprints = old_fingerprints['contents']
+        changed_ids = []
+
+        def changed_raw_contents() -> Iterator[Dict[str, str]]:
+            for raw_content in self.__config.source:
+                content_id = id_merger(raw_content, self.__config.id)
+                fingerprint = content_fingerprint(raw_content, field_list)
+                contents_fingerprints[content_id] = fingerprint
+
+                old_fingerprint = old_contents_fingerprints.get(content_id)
+                if old_fingerprint != fingerprint:
+                    if old_fingerprint is not None:
+                        changed_ids.append(content_id)
+                    yield raw_content
+
+        source = ColumnarSource(changed_raw_contents(), field_list, self.__config.source.encoding)
+        removed_ids = [content_id for content_id in old_contents_fingerprints
+                       if content_id not in contents_fingerprints]
+        logger.info("New contents: %d, changed contents: %d, removed contents: %d",
+                    len(source) - len(changed_ids), len(changed_ids), len(removed_ids))
+
+        if len(source) != 0 or len(removed_ids) != 0:
+            refit_techniques = [str(field_config.content_technique)
+                                for field_name in self.__config.get_field_name_list()
+                                for field_config in self.__config.get_configs_list(field_name)
+                                if field_config.content_technique.requires_refit()]
+            if len(refit_techniques) != 0:
+                logger.warning("The collection changed and the techniques %s require a refit on the entire "
+                               "collection, all the contents will be produced", refit_techniques)
+                return None, fingerprints, [], []
+
+        fingerprints['index_positions'] = old_fingerprints['index_positions']
+        return source, fingerprints, changed_ids, removed_ids
+
+    def __remove_stale_contents(self, changed_ids: List[str], removed_ids: List[str],
+                                index_positions: Dict[str, Dict[str, int]]):
+        """
+        Removes from the output directory the serialized files of the contents that are not in the source anymore
+        (the files of the changed contents will be overwritten) and deletes from the memory interfaces the entries of
+        both the changed and the removed contents. The contents in the packed archive and in the embedding matrices
+        are removed by their writers
+
+        Args:
+            changed_ids (List[str]): ids of the contents already stored that changed
+            removed_ids (List[str]): ids of the contents already stored that are not in the source anymore
+            index_positions (dict): positions of the contents in each memory interface, in the form
+                {memory interface directory: {content_id: position}}
+        """
+        if not self.__config.content_archive:
+            for content_id in removed_ids:
+                path = os.path.join(self.__config.output_directory, re.sub(r'[^\w\s]', '', content_id) + '.xz')
+                if os.path.isfile(path):
+                    os.remove(path)
+
+        memory_interfaces = {}
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                memory_interface = field_config.memory_interface
+                if memory_interface is not None and memory_interface.directory not in memory_interfaces:
+                    memory_interfaces[memory_interface.directory] = memory_interface
+
+        for directory, memory_interface in memory_interfaces.items():
+            positions = index_positions.get(directory, {})
+            memory_interface.init_writing(False)
+            for content_id in changed_ids + removed_ids:
+                position = positions.pop(content_id, None)
+                if position is not None:
+                    memory_interface.delete_content(position)
+            memory_interface.stop_writing()
+
+    @staticmethod
+    def __store_index_positions(contents: List[Content], index_positions: Dict[str, Dict[str, int]]):
         """
-        This method serializes a specific content in the output directory defined by the content analyzer config
+        Stores the positions of the contents passed as argument in the memory interfaces referenced by their
+        IndexField representations, so that the next incremental run can delete them if they change
+
+        Args:
+            contents (List[Content]): content instances that will be serialized
+            index_positions (dict): positions of the contents in each memory interface, in the form
+                {memory interface directory: {content_id: position}}
+        """
+        for content in contents:
+            for field_name in content.field_dict:
+                for representation in content.get_field(field_name).get_representations():
+                    if isinstance(representation, IndexField):
+                        positions = index_positions.setdefault(representation.index.directory, {})
+                        positions[content.content_id] = representation.index_id
+
+    def __save_vocabularies(self, contents: List[Content]):
+        """
+        Saves in the output directory the vocabularies shared by the SparseFeaturesBagField representations of the
+        contents passed as argument which haven't been saved yet, so that the serialized contents will only refer to
+        them instead of repeating their terms
+
         Args:
-            content (Content): content instance that will be serialized
+            contents (List[Content]): content instances that will be serialized
         """
+        for content in contents:
+            for field_name in content.field_dict:
+                for representation in content.get_field(field_name).get_representations():
+                    if isinstance(representation, SparseFeaturesBagField) and not representation.vocabulary.saved:
+                        representation.vocabulary.save(self.__config.output_directory)
 
-        file_name = re.sub(r'[^\w\s]', '', content.content_id)
-        path = os.path.join(self.__config.output_directory, file_name + '.xz')
-        with lzma.open(path, 'wb') as f:
-            pickle.dump(content, f)
+    @staticmethod
+    def __store_features_bags(contents: List[Content], features_writer: FeaturesMatrixWriter):
+        """
+        Writes the SparseFeaturesBagField representations of the contents passed as argument in the features matrices.
+        The representations are kept in the contents
+
+        Args:
+            contents (List[Content]): content instances that will be serialized
+            features_writer (FeaturesMatrixWriter): writer of the features matrices
+        """
+        for content in contents:
+            for field_name in content.field_dict:
+                for row in content.get_field(field_name):
+                    representation = row['representation']
+                    if isinstance(representation, SparseFeaturesBagField):
+                        external_id = row['external_id'] if isinstance(row['external_id'], str) else None
+                        features_writer.add(content.content_id, field_name, row['internal_id'], external_id,
+                                            representation)
+
+    @staticmethod
+    def __store_embeddings(contents: List[Content], embedding_writer: EmbeddingMatrixWriter):
+        """
+        Writes the 1-dimensional EmbeddingField representations of the contents passed as argument in the embedding
+        matrices and replaces them with MatrixEmbeddingField representations, which only refer to their row
+
+        Args:
+            contents (List[Content]): content instances that will be serialized
+            embedding_writer (EmbeddingMatrixWriter): writer of the embedding matrices
+        """
+        for content in contents:
+            for field_name in content.field_dict:
+                field_container = content.get_field(field_name)
+                representations = []
+                replaced = False
+                for row in field_container:
+                    representation = row['representation']
+                    if type(representation) is EmbeddingField and np.ndim(representation.value) == 1:
+                        external_id = row['external_id'] if isinstance(row['external_id'], str) else None
+                        matrix_file, matrix_row = embedding_writer.add(content.content_id, field_name,
+                                                                       row['internal_id'], external_id,
+                                                                       representation.value)
+                        representation = MatrixEmbeddingField(matrix_file, matrix_row)
+                        replaced = True
+                    representations.append(representation)
+
+                if replaced:
+                    content.append_field(field_name,
+                                         RepresentationContainer(representations,
+                                                                 field_container.get_external_index()))
+
+    @staticmethod
+    def __export_json(json_file, contents: List[Content], n_exported: int):
+        """
+        Appends the contents passed as argument to the list in the json file, the output is the same that would be
+        obtained by dumping the list of all the contents with an indentation of 4
+
+        Args:
+            json_file: file object of the 'contents.json' file
+            contents (List[Content]): content instances that will be exported
+            n_exported (int): number of contents already exported in the file
+        """
+        for content in contents:
+            separator = ",\n" if n_exported != 0 else "\n"
+            json_file.write(separator + textwrap.indent(json.dumps(content, cls=ContentEncoder, indent=4), " " * 4))
+            n_exported += 1
+
+    def __serialize_contents(self, contents: List[Content], map_function, archive_writer: ContentArchiveWriter = None):
+        """
+        This method serializes the contents in the output directory defined by the content analyzer config, either in
+        the packed archive of the archive writer passed as argument or each one in its own file.
+        The encoding of the contents (pickling and compression) is done using the map_function passed as argument, which
+        can be the builtin map or the map of a process pool executor. In both cases the contents are serialized in
+        the same order, so that the output is the same regardless of the number of processes used
+
+        Args:
+            contents (List[Content]): content instances that will be serialized
+            map_function (Callable): function with the same behaviour of the builtin map, used to encode the contents
+            archive_writer (ContentArchiveWriter): writer of the packed archive, None if each content is serialized in
+                its own file
+        """
+        if map_function is not map:
+            chunksize = max(1, len(contents) // (get_max_workers(self.__config.n_jobs) * 4))
+            map_function = partial(map_function, chunksize=chunksize)
+
+        output_path = self.__config.output_directory
+        if archive_writer is not None:
+            encoder = partial(encode_content,
+                              compress=archive_writer.compress, field_projection=archive_writer.field_projection)
+            encoded_contents = map_function(encoder, contents)
+            for content, encoded in progbar(zip(contents, encoded_contents),
+                                            prefix="Serializing contents: ", max_value=len(contents)):
+                archive_writer.write_encoded(content.content_id, *encoded)
+        else:
+            serialized = map_function(partial(serialize_content, output_directory=output_path), contents)
+            for _ in progbar(serialized, prefix="Serializing contents: ", max_value=len(contents)):
+                pass
 
     def __check_field_dict(self):
         """
@@ -139,6 +496,11 @@ class ContentsProducer:
         # if a memory interface has an already defined directory, the memory interface associated to said directory
         # will be considered instead
         self.__memory_interfaces: Dict[InformationInterface] = {}
+        # processed data shared by the field configs of the same field with equal preprocessors, None if no
+        # preprocessor list is shared
+        self.__shared_preprocessing: Optional[SharedPreprocessing] = None
+        # pairs (field name, preprocessor list fingerprint) shared by more than one field config
+        self.__shared_pairs = set()
         # Virtually private constructor.
         if ContentsProducer.__instance is not None:
             raise Exception("This class is a singleton!")
@@ -153,33 +515,275 @@ class ContentsProducer:
         Returns:
             contents_list (List[Content]): list of contents created by the method
         """
+        # will store the contents and is the variable that will be returned by the method
+        contents_list = []
+        for contents_chunk in self.create_contents_chunks():
+            contents_list.extend(contents_chunk)
+
+        return contents_list
+
+    def create_contents_chunks(self, source: RawInformationSource = None,
+                               executor: ProcessPoolExecutor = None) -> Iterator[List[Content]]:
+        """
+        Creates the contents based on the information defined in the Content Analyzer's config, yielding them one chunk
+        at a time. If the chunk_size in the config is None, the whole source is processed at once (so a single chunk
+        is yielded), otherwise the source is processed in chunks of chunk_size contents and only the data of the chunk
+        being processed is kept in memory. In this case the techniques that need the entire collection
+        (CollectionBasedTechnique) are fitted on the whole source before the first chunk is processed, and the
+        representations for the contents in each chunk are then produced by the transform method of said techniques.
+
+        The contents of each chunk are stored (and committed) in the memory interfaces, if any is defined, before the
+        chunk is yielded.
+
+        If a source is passed, only its raw contents are produced instead of the ones in the source of the config
+        (this is used by the incremental runs of the ContentAnalyzer): in this case the contents are added to the
+        memory interfaces, without deleting the contents they already store
+
+        Args:
+            source (RawInformationSource): raw contents to produce, if None the source of the config is used
+            executor (ProcessPoolExecutor): pool used to process the field configs when n_jobs is not 1 (the
+                ContentAnalyzer passes the pool it also uses to serialize the contents). If None, a pool is created
+                and shut down by this method
+
+        Returns:
+            Iterator[List[Content]]: iterator over the lists of contents created for each chunk of the source
+        """
         if self.__config is None:
             raise Exception("You must set a config with set_config()")
 
-        # will store the contents and is the variable that will be returned by the method
+        append = source is not None
+        if source is None:
+            source = self.__config.source
+
+        chunk_size = self.__config.chunk_size
+        own_executor = None
+        if self.__config.n_jobs == 1:
+            executor = None
+        elif executor is None:
+            own_executor = executor = ProcessPoolExecutor(get_max_workers(self.__config.n_jobs))
+
+        try:
+            index_fields = self.__init_memory_interfaces()
+            self.__set_technique_options()
+
+            # the source is read only once (or once for each chunk) in a buffer which keeps only the fields
+            # used by the config, and the buffer is passed to every technique
+            field_list = referenced_fields(self.__config)
+            if chunk_size is None:
+                logger.info("Reading the source")
+                chunks = [ColumnarSource(source, field_list, source.encoding)]
+            else:
+                self.__fit_collection_techniques(source)
+                chunks = split_in_chunks(source, chunk_size, field_list)
+
+            # position of the first content of the chunk in the entire source
+            first_position = 0
+            for chunk in chunks:
+                contents_chunk = self.__create_contents_chunk(chunk, first_position, index_fields, executor,
+                                                              delete_old=not append and first_position == 0)
+                if self.__shared_preprocessing is not None:
+                    self.__shared_preprocessing.clear()
+                first_position += len(contents_chunk)
+                yield contents_chunk
+
+            if chunk_size is not None:
+                for technique in self.__collection_techniques():
+                    technique.delete_fitted()
+
+            representation_cache = self.__config.representation_cache
+            if self.__shared_preprocessing is not None and executor is None:
+                logger.info("Preprocessing results shared between field configs: %d", self.__shared_preprocessing.hits)
+            if representation_cache is not None and executor is None:
+                # when the fields are processed by other processes, the cache is used (and counted) by them
+                logger.info("Representation cache hits: %d, misses: %d", representation_cache.hits,
+                            representation_cache.misses)
+        finally:
+            if own_executor is not None:
+                own_executor.shutdown()
+            if self.__config.preprocessing_pool is not None:
+                self.__config.preprocessing_pool.close()
+            self.__memory_interfaces.clear()
+            self.__shared_preprocessing = None
+
+    def __init_memory_interfaces(self) -> Dict[Tuple[str, int], Tuple[InformationInterface, str]]:
+        """
+        Collects the memory interfaces defined in the field configs. Only one memory interface is used for
+        each directory: if a memory interface has an already defined directory, the memory interface associated to said
+        directory will be considered instead
+
+        Returns:
+            index_fields (dict): dictionary in the form {(field_name, repr_number): (memory_interface, index_field_name)}
+                for each field config that has a memory interface, where index_field_name is the name of the field in
+                the memory interface where the representations produced by the field config will be stored
+        """
+        index_fields = {}
+        for field_name in self.__config.get_field_name_list():
+            for repr_number, field_config in enumerate(self.__config.get_configs_list(field_name)):
+                if field_config.memory_interface is not None:
+                    memory_interface = field_config.memory_interface
+                    # if the index for the directory in the config hasn't been defined yet in the contents producer,
+                    # the index associated to the field config that is being processed is added to the
+                    # contents producer's memory interfaces list, and will be used for the future field configs with
+                    # an assigned memory interface that has the same directory.
+                    # This means that only the index defined in the first FieldConfig that has one will actually be used
+                    if memory_interface not in self.__memory_interfaces.values():
+                        self.__memory_interfaces[memory_interface.directory] = memory_interface
+                    else:
+                        memory_interface = self.__memory_interfaces[memory_interface.directory]
+
+                    if field_config.id is not None:
+                        index_field_name = "{}#{}#{}".format(field_name, str(repr_number), field_config.id)
+                    else:
+                        index_field_name = "{}#{}".format(field_name, str(repr_number))
+
+                    index_fields[(field_name, repr_number)] = (memory_interface, index_field_name)
+
+        return index_fields
+
+    def __set_technique_options(self):
+        """
+        Assigns the representation cache and the preprocessing pool of the config (if defined) to the techniques of
+        all the field configs. If some field configs of the same field have equal preprocessor lists, a
+        SharedPreprocessing is also assigned to the techniques, so that the data of the field is processed only once
+        """
+        seen_keys = set()
+        self.__shared_pairs = set()
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if len(field_config.preprocessing) != 0:
+                    key = (field_name, object_fingerprint(field_config.preprocessing))
+                    if key in seen_keys:
+                        self.__shared_pairs.add(key)
+                    seen_keys.add(key)
+
+        shared_keys = {}
+        for _, preprocessing_key in self.__shared_pairs:
+            shared_keys[preprocessing_key] = shared_keys.get(preprocessing_key, 0) + 1
+        self.__shared_preprocessing = SharedPreprocessing(shared_keys) if len(shared_keys) != 0 else None
+
+        representation_cache = self.__config.representation_cache
+        preprocessing_pool = self.__config.preprocessing_pool
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if representation_cache is not None:
+                    field_config.content_technique.representation_cache = representation_cache
+                if preprocessing_pool is not None:
+                    field_config.content_technique.preprocessing_pool = preprocessing_pool
+                field_config.content_technique.shared_preprocessing = self.__shared_preprocessing
+
+    def __share_preprocessing(self, chunk: RawInformationSource):
+        """
+        Processes the data of the fields of the chunk with the shared preprocessor lists in the main process, so that
+        the results are copied in the processes of the pool together with the techniques
+        """
+        shared_pairs = set(self.__shared_pairs)
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if len(field_config.preprocessing) == 0:
+                    continue
+                key = (field_name, object_fingerprint(field_config.preprocessing))
+                if key in shared_pairs:
+                    field_config.content_technique.process_data_list(
+                        [raw_content[field_name] for raw_content in chunk], field_config.preprocessing)
+                    shared_pairs.remove(key)
+
+    def __collection_techniques(self) -> Iterator[CollectionBasedTechnique]:
+        """
+        Iterates over the techniques of the field configs that need the entire collection
+        """
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if isinstance(field_config.content_technique, CollectionBasedTechnique):
+                    yield field_config.content_technique
+
+    def __fit_collection_techniques(self, source: RawInformationSource):
+        """
+        First pass of the chunked content production: fits the techniques that need the entire collection on the whole
+        source passed as argument. This is always done in the main process, since the fitted state must be kept by the
+        techniques in order to transform the chunks
+        """
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                if isinstance(field_config.content_technique, CollectionBasedTechnique):
+                    logger.info("Fitting technique %s on field: %s", field_config.content_technique, field_name)
+                    field_config.content_technique.fit(field_name, field_config.preprocessing, source)
+
+        if self.__shared_preprocessing is not None:
+            self.__shared_preprocessing.clear()
+
+    def __create_contents_chunk(self, chunk: RawInformationSource, first_position: int,
+                                index_fields: Dict[Tuple[str, int], Tuple[InformationInterface, str]],
+                                executor: ProcessPoolExecutor = None, delete_old: bool = False) -> List[Content]:
+        """
+        Creates the contents for the raw contents in the chunk passed as argument and stores them in the memory
+        interfaces
+
+        Args:
+            chunk (RawInformationSource): buffer containing the raw contents in the chunk (it contains the entire
+                source if the contents are not produced in chunks)
+            first_position (int): position of the first content of the chunk in the entire source
+            index_fields (dict): dictionary returned by the __init_memory_interfaces method
+            executor (ProcessPoolExecutor): pool used to process the field configs, None if they are processed
+                sequentially
+            delete_old (bool): if True, the data already stored in the memory interfaces is deleted before storing
+                the contents of the chunk
+
+        Returns:
+            contents_list (List[Content]): list of contents created for the chunk
+        """
         contents_list = []
 
         # two lists are instantiated, one for the configuration names (given by the user) and one for the exogenous
-        # properties representations. These lists will maintain the data for the content creation. This is done
-        # because otherwise it would be necessary to append directly to the content. But in the Content class
-        # the representations are kept as dataframes and appending to dataframes is computationally heavy
+        # properties representations. The properties are computed for the whole chunk at once, and each content then
+        # receives all its exogenous representations with a single append
         exo_config_names = []
         exo_properties = []
 
         for ex_config in self.__config.exogenous_representation_list:
-            lod_properties = ex_config.exogenous_technique.get_properties(self.__config.source)
+            lod_properties = ex_config.exogenous_technique.get_properties(chunk)
             exo_config_names.append(ex_config.id)
             exo_properties.append(lod_properties)
 
+        content_ids = [id_merger(raw_content, self.__config.id) for raw_content in chunk]
+
         # this dictionary will store any representation list that will be kept in one of the the index
         # the elements will be in the form:
         #   { memory_interface: {'Plot_0': [FieldRepr for content1, FieldRepr for content2, ...]}}
         # the 0 after the Plot field name is used to define the representation number associated with the Plot field
         # since it's possible to store multiple Plot fields in the index
-        index_representations_dict = {}
+        index_representations_dict = {memory_interface: {} for memory_interface in self.__memory_interfaces.values()}
+        technique_results = self.__produce_technique_results(chunk, first_position, executor)
+        for field_name in self.__config.get_field_name_list():
+            for repr_number in range(len(technique_results[field_name])):
+                if (field_name, repr_number) in index_fields:
+                    memory_interface, index_field_name = index_fields[(field_name, repr_number)]
+                    index_representations_dict[memory_interface][index_field_name] = \
+                        technique_results[field_name][repr_number]
+
+        # the data to be indexed is serialized inside of the memory interfaces before the contents are created, since
+        # the contents will refer to the position of their entry in each memory interface
+        # for each content, a new entry in each index will be created
+        # the entry will be in the following form: {"content_id": id, "Plot_0": "...", "Plot_1": "...", ...}
+        # the indexes are created when the first chunk is stored and the data is committed after each chunk, so that
+        # the IndexFields of the contents already produced can be read. All the fields of the entries are declared
+        # when the writing starts, so that the memory interfaces can store the chunk in bulk
+        index_positions = {}
+        for memory_interface in self.__memory_interfaces.values():
+            index_field_names = list(index_representations_dict[memory_interface].keys())
+            memory_interface.init_writing(delete_old, ["content_id"] + index_field_names)
+            positions = []
+            for i in range(0, len(content_ids)):
+                memory_interface.new_content()
+                memory_interface.new_field("content_id", content_ids[i])
+                for field_name in index_field_names:
+                    memory_interface.new_field(
+                        field_name, str(index_representations_dict[memory_interface][field_name][i].value))
+                positions.append(memory_interface.serialize_content())
+            memory_interface.stop_writing()
+            index_positions[memory_interface] = memory_interface.resolve_positions(positions)
+
         field_representations_dict = {}
         for field_name in self.__config.get_field_name_list():
-            logger.info("Processing field: %s", field_name)
             # stores the field representation for the field name
             results = []
             # stores the field config ids for the field name
@@ -190,36 +794,16 @@ class ContentsProducer:
                 # technique_result is a list of field representation produced by the content technique
                 # each field repr in the list will refer to a content
                 # technique_result[0] -> contents_list[0]
-                technique_result = field_config.content_technique.produce_content(
-                    field_name, field_config.preprocessing, self.__config.source)
-
-                if field_config.memory_interface is not None:
-                    memory_interface = field_config.memory_interface
-                    # if the index for the directory in the config hasn't been defined yet in the contents producer,
-                    # the index associated to the field config that is being processed is added to the
-                    # contents producer's memory interfaces list, and will be used for the future field configs with
-                    # an assigned memory interface that has the same directory.
-                    # This means that only the index defined in the first FieldConfig that has one will actually be used
-                    if memory_interface not in self.__memory_interfaces.values():
-                        self.__memory_interfaces[memory_interface.directory] = memory_interface
-                        index_representations_dict[memory_interface] = {}
-                    else:
-                        memory_interface = self.__memory_interfaces[memory_interface.directory]
+                technique_result = technique_results[field_name][repr_number]
 
-                    if field_config.id is not None:
-                        index_field_name = "{}#{}#{}".format(field_name, str(repr_number), field_config.id)
-                    else:
-                        index_field_name = "{}#{}".format(field_name, str(repr_number))
-
-                    index_representations_dict[memory_interface][index_field_name] = technique_result
-                    result = []
+                if (field_name, repr_number) in index_fields:
+                    memory_interface, index_field_name = index_fields[(field_name, repr_number)]
 
-                    # in order to refer to the representation that will be stored in the index, an IndexField repr will
+                    # in order to refer to the representation that is stored in the index, an IndexField repr will
                     # be added to each content (and it will contain all the necessary information to retrieve the data
                     # from the index)
-                    for i in range(0, len(list(self.__config.source))):
-                        result.append(
-                            IndexField(index_field_name, i, memory_interface))
+                    result = [IndexField(index_field_name, position, memory_interface)
+                              for position in index_positions[memory_interface]]
                 else:
                     result = technique_result
 
@@ -228,9 +812,7 @@ class ContentsProducer:
             field_representations_dict[field_name] = {'results': results, 'ids': field_config_ids}
 
         # each representation is added to the corresponding content
-        for i, raw_content in enumerate(self.__config.source):
-            # construct id from the list of the fields that compound id
-            content_id = id_merger(raw_content, self.__config.id)
+        for i, content_id in enumerate(content_ids):
             content = Content(content_id)
 
             # retrieves the exogenous representations associated with the content
@@ -249,24 +831,59 @@ class ContentsProducer:
 
             contents_list.append(content)
 
-        # after the contents creation process, the data to be indexed will be serialized inside of the memory interfaces
-        # for each created content, a new entry in each index will be created
-        # the entry will be in the following form: {"content_id": id, "Plot_0": "...", "Plot_1": "...", ...}
-        if len(self.__memory_interfaces) != 0:
-            for memory_interface in self.__memory_interfaces.values():
-                memory_interface.init_writing(True)
-                for i in range(0, len(contents_list)):
-                    memory_interface.new_content()
-                    memory_interface.new_field("content_id", contents_list[i].content_id)
-                    for field_name in index_representations_dict[memory_interface].keys():
-                        memory_interface.new_field(
-                            field_name, str(index_representations_dict[memory_interface][field_name][i].value))
-                    memory_interface.serialize_content()
-                memory_interface.stop_writing()
-            self.__memory_interfaces.clear()
-
         return contents_list
 
+    def __produce_technique_results(self, chunk: RawInformationSource, first_position: int,
+                                    executor: ProcessPoolExecutor = None) -> Dict[str, List[List[FieldRepresentation]]]:
+        """
+        Produces the field representations for each field config defined in the Content Analyzer's config, for the
+        contents in the chunk passed as argument. If the contents are produced in chunks, the representations of the
+        techniques that need the entire collection are produced by their transform method (since they have already
+        been fitted on the whole source), otherwise by their produce_content method.
+        If an executor is passed, the field configs are independent from each other so each one of them is
+        processed by a different process of the pool, otherwise they are processed one after the other
+
+        Args:
+            chunk (RawInformationSource): source containing the raw contents in the chunk
+            first_position (int): position of the first content of the chunk in the entire source
+            executor (ProcessPoolExecutor): pool used to process the field configs, None if they are processed
+                sequentially
+
+        Returns:
+            technique_results (dict): dictionary in the form {field_name: [technique_result for each field config]},
+                where each technique_result is the list of representations produced by the technique of the field
+                config (one for each content)
+        """
+        if executor is not None and self.__shared_preprocessing is not None:
+            self.__share_preprocessing(chunk)
+
+        tasks = []
+        for field_name in self.__config.get_field_name_list():
+            for field_config in self.__config.get_configs_list(field_name):
+                technique = field_config.content_technique
+                if self.__config.chunk_size is not None and isinstance(technique, CollectionBasedTechnique):
+                    tasks.append((field_name, technique.transform,
+                                  (field_name, field_config.preprocessing, chunk, first_position)))
+                else:
+                    tasks.append((field_name, technique.produce_content,
+                                  (field_name, field_config.preprocessing, chunk)))
+
+        if executor is None:
+            results = []
+            for field_name, function, args in tasks:
+                logger.info("Processing field: %s", field_name)
+                results.append(function(*args))
+        else:
+            logger.info("Processing fields: %s", self.__config.get_field_name_list())
+            futures = [executor.submit(function, *args) for _, function, args in tasks]
+            results = [future.result() for future in futures]
+
+        technique_results = {field_name: [] for field_name in self.__config.get_field_name_list()}
+        for (field_name, _, _), result in zip(tasks, results):
+            technique_results[field_name].append(result)
+
+        return technique_results
+
     def __str__(self):
         return "ContentsProducer"
 
@@ -0,0 +1,544 @@
+import lzma
+import os
+import pickle
+import re
+import sys
+import threading
+from typing import Dict, List, Tuple, Union
+
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, FieldRepresentation, \
+    ExogenousPropertiesRepresentation
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import register_embedding_directory
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import \
+    register_vocabulary_directory
+from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
+from orange_cb_recsys.utils.const import logger, progbar
+
+ARCHIVE_INDEX_FILE = 'contents_archive_index.xz'
+ARCHIVE_SEGMENT_FILE = 'contents_archive_{}.seg'
+
+
+def encode_content(content: Content, compress: bool, field_projection: bool) -> Tuple[List[bytes], int]:
+    """
+    Encodes a content in the bytes that will be written in a packed archive. If field_projection is False, the content
+    is pickled as a whole. Otherwise every representation is encoded on its own, followed by a header which stores the
+    position of each one of them relative to the start of the content's bytes
+
+    Args:
+        content (Content): content to encode
+        compress (bool): if True, each encoded object is compressed using lzma
+        field_projection (bool): if True, the representations of the content are encoded separately
+
+    Returns:
+        blobs (List[bytes]): encoded bytes of the content (in the order they must be written)
+        header_position (int): position of the header relative to the start of the content's bytes (the index of the
+            archive refers to the header)
+    """
+    def encode(obj: object) -> bytes:
+        data = pickle.dumps(obj)
+        if compress:
+            data = lzma.compress(data)
+        return data
+
+    if not field_projection:
+        return [encode(content)], 0
+
+    blobs = []
+    fields = {}
+    position = 0
+    for field_name, field_container in content.field_dict.items():
+        fields[field_name] = []
+        for row in field_container:
+            blob = encode(row['representation'])
+            external_id = row['external_id'] if isinstance(row['external_id'], str) else None
+            fields[field_name].append((row['internal_id'], external_id, position, len(blob)))
+            blobs.append(blob)
+            position += len(blob)
+
+    exo_blob = encode(content.exogenous_rep_container)
+    blobs.append(exo_blob)
+    header = {'content_id': content.content_id, 'fields': fields, 'exogenous': (position, len(exo_blob))}
+    position += len(exo_blob)
+
+    blobs.append(encode(header))
+
+    return blobs, position
+
+
+class ContentArchiveWriter:
+    """
+    Class that serializes contents in a packed archive instead of writing one lzma compressed file for each content.
+    The archive is made of a small number of append-only segment files and of an index, persisted in the same
+    directory, that maps each content to the position of its serialized bytes:
+
+        { content_name: (segment_number, offset, length), ... }
+
+    The content name is the content id without any punctuation (the same name the content would have if it was
+    serialized in its own '.xz' file). Each content is pickled and (optionally) compressed on its own, so that loading
+    a single content only needs a positioned read and the decompression of its bytes.
+
+    A new segment is started once the current one exceeds segment_size bytes. If the directory already contains an
+    archive, the writer opens it in append mode: contents already in the archive are overwritten by appending the new
+    version and updating the index (the old bytes are simply not referenced anymore)
+
+    If field_projection is True, the content is not pickled as a whole: each field representation and the exogenous
+    representations container are serialized separately, followed by a small header that stores their positions in
+    the segment. In this case the index refers to the header of the content, and the ContentArchiveReader will return
+    a LazyContent which deserializes a representation only when it is accessed (so a recommender that only uses one
+    representation of a field doesn't pay for loading all the others)
+
+    The index is persisted once the writing phase is over, so close() must always be called (the writer can also be
+    used as a context manager)
+
+    Args:
+        directory (str): directory where the archive is (or will be) stored
+        segment_size (int): max size (in bytes) of a single segment file
+        compress (bool): if True, each serialized content is compressed using lzma. The value is only considered when
+            creating a new archive, an existing archive keeps the compression it was created with
+        field_projection (bool): if True, the field representations of each content are serialized separately so that
+            they can be loaded lazily. As for compress, the value is only considered when creating a new archive
+    """
+
+    def __init__(self, directory: str, segment_size: int = 2 ** 30, compress: bool = True,
+                 field_projection: bool = False):
+        self.__directory = directory
+        self.__segment_size = segment_size
+        self.__index: Dict[str, Tuple[int, int, int]] = {}
+        self.__compress = compress
+        self.__field_projection = field_projection
+        self.__segment_number = 0
+
+        if ContentArchiveReader.is_archive(directory):
+            archive_info = ContentArchiveReader.load_index(directory)
+            self.__compress = archive_info['compress']
+            self.__field_projection = archive_info['field_projection']
+            self.__index = archive_info['index']
+            self.__segment_number = max([position[0] for position in self.__index.values()], default=0)
+
+        self.__segment = open(self.__segment_path(self.__segment_number), 'ab')
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def __segment_path(self, segment_number: int) -> str:
+        return os.path.join(self.__directory, ARCHIVE_SEGMENT_FILE.format(segment_number))
+
+    @property
+    def compress(self) -> bool:
+        return self.__compress
+
+    @property
+    def field_projection(self) -> bool:
+        return self.__field_projection
+
+    def write(self, content: Content):
+        """
+        Appends the content passed as argument to the current segment and stores its position in the index
+
+        Args:
+            content (Content): content that will be serialized in the archive
+        """
+        blobs, header_position = encode_content(content, self.__compress, self.__field_projection)
+        self.write_encoded(content.content_id, blobs, header_position)
+
+    def write_encoded(self, content_id: str, blobs: List[bytes], header_position: int):
+        """
+        Appends a content already encoded with the encode_content() function to the current segment and stores its
+        position in the index. This is useful when the contents are encoded in parallel (by different processes), since
+        the writing of the encoded bytes must be sequential
+
+        Args:
+            content_id (str): id of the encoded content
+            blobs (List[bytes]): encoded bytes of the content
+            header_position (int): position of the header of the content, relative to the start of its bytes
+        """
+        content_name = re.sub(r'[^\w\s]', '', content_id)
+        data_length = sum(len(blob) for blob in blobs)
+
+        offset = self.__segment.tell()
+        if offset != 0 and offset + data_length > self.__segment_size:
+            self.__segment.close()
+            self.__segment_number += 1
+            self.__segment = open(self.__segment_path(self.__segment_number), 'ab')
+            offset = self.__segment.tell()
+
+        for blob in blobs:
+            self.__segment.write(blob)
+        self.__index[content_name] = (self.__segment_number, offset + header_position, data_length - header_position)
+
+    def remove(self, content_id: str):
+        """
+        Removes the content with the given id from the index. The serialized bytes of the content are not removed
+        from the segment, but they won't be reachable anymore
+
+        Args:
+            content_id (str): id of the content to remove from the archive
+        """
+        self.__index.pop(re.sub(r'[^\w\s]', '', content_id), None)
+
+    def close(self):
+        """
+        Closes the current segment and persists the index. The index is first written in a temporary file which
+        then replaces the old one, so that a reader never finds a partially written index
+        """
+        self.__segment.close()
+
+        index_path = os.path.join(self.__directory, ARCHIVE_INDEX_FILE)
+        tmp_path = index_path + '.tmp'
+        with lzma.open(tmp_path, 'wb') as f:
+            pickle.dump({'compress': self.__compress, 'field_projection': self.__field_projection,
+                         'index': self.__index}, f)
+        os.replace(tmp_path, index_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __str__(self):
+        return "ContentArchiveWriter"
+
+    def __repr__(self):
+        return "< ContentArchiveWriter: directory = " + self.__directory + " >"
+
+
+class LazyContent(Content):
+    """
+    Content loaded from a packed archive written with field projection. Only the header of the content (which stores
+    the position of each representation in the archive) is deserialized when the content is loaded: a field
+    representation is deserialized the first time it is accessed with get_field_representation() and the others are
+    never read. So, for example, a recommender that extracts only the 'tfidf' representation of the 'Plot' field will
+    only pay for the deserialization of that representation.
+
+    Any method that needs the whole content (for example the field_dict property or the methods that modify the
+    content) deserializes all of its representations first, so a LazyContent behaves exactly like the Content
+    originally serialized. When pickled, a LazyContent is saved as a regular Content.
+
+    Args:
+        header (dict): header of the content, containing the content id, the positions of the field representations
+            (under the 'fields' key) and the position of the exogenous representations (under the 'exogenous' key)
+        reader (ContentArchiveReader): reader of the archive where the content is stored
+        segment_number (int): number of the segment where the content is stored
+        content_offset (int): position of the first byte of the content in the segment, the positions in the header are
+            relative to this one
+    """
+
+    def __init__(self, header: Dict, reader: 'ContentArchiveReader', segment_number: int, content_offset: int):
+        super().__init__(header['content_id'])
+        self.__header = header
+        self.__reader = reader
+        self.__segment_number = segment_number
+        self.__content_offset = content_offset
+        # fields whose representations have all been loaded in the field dict of the content
+        self.__loaded_fields = set()
+        # representations loaded singularly, in the form {(field_name, position in the field): representation}
+        self.__representations = {}
+        self.__exogenous_loaded = False
+
+    def __read(self, position: int, length: int) -> object:
+        return self.__reader.read(self.__segment_number, self.__content_offset + position, length)
+
+    def __load_representation(self, field_name: str, position: int) -> FieldRepresentation:
+        if (field_name, position) not in self.__representations:
+            _, _, relative_offset, length = self.__header['fields'][field_name][position]
+            self.__representations[(field_name, position)] = self.__read(relative_offset, length)
+        return self.__representations[(field_name, position)]
+
+    def __load_field(self, field_name: str):
+        if field_name not in self.__loaded_fields and field_name in self.__header['fields']:
+            rows = self.__header['fields'][field_name]
+            representations = [self.__load_representation(field_name, position) for position in range(len(rows))]
+            external_ids = [row[1] for row in rows]
+            super().append_field(field_name, RepresentationContainer(representations, external_ids))
+            self.__loaded_fields.add(field_name)
+
+    def __load_exogenous(self):
+        if not self.__exogenous_loaded:
+            exogenous_rep_container = self.__read(*self.__header['exogenous'])
+            for row in exogenous_rep_container:
+                external_id = row['external_id'] if isinstance(row['external_id'], str) else None
+                super().append_exogenous_representation(row['representation'], external_id)
+            self.__exogenous_loaded = True
+
+    def __load_all(self):
+        for field_name in self.__header['fields']:
+            self.__load_field(field_name)
+        self.__load_exogenous()
+
+    @property
+    def field_dict(self):
+        self.__load_all()
+        return super().field_dict
+
+    @property
+    def exogenous_rep_container(self):
+        self.__load_exogenous()
+        return super().exogenous_rep_container
+
+    def get_field(self, field_name: str) -> RepresentationContainer:
+        self.__load_field(field_name)
+        return super().get_field(field_name)
+
+    def get_field_representation(self, field_name: str, representation_id: Union[int, str]) -> FieldRepresentation:
+        """
+        Getter for the FieldRepresentation instance of a specific field representation name. If the field hasn't been
+        loaded entirely, only the requested representation is deserialized from the archive
+
+        Args:
+            field_name (str): field_name from which the specific representation will be extracted
+            representation_id (Union[int, str]): id of the specific representation (either the internal or external id)
+
+        Returns:
+            FieldRepresentation: instance of the representation for the name passed as argument
+        """
+        if field_name in self.__loaded_fields or field_name not in self.__header['fields']:
+            return super().get_field_representation(field_name, representation_id)
+
+        rows = self.__header['fields'][field_name]
+        if isinstance(representation_id, str):
+            positions = [position for position, row in enumerate(rows) if row[1] == representation_id]
+            if len(positions) == 0:
+                raise KeyError(representation_id)
+            position = positions[0]
+        else:
+            # same behaviour as the RepresentationContainer, where integer ids are positional
+            position = range(len(rows))[representation_id]
+
+        return self.__load_representation(field_name, position)
+
+    def append_field(self, field_name: str, field: RepresentationContainer):
+        self.__load_all()
+        super().append_field(field_name, field)
+
+    def remove_field(self, field_name: str):
+        self.__load_all()
+        super().remove_field(field_name)
+
+    def append_field_representation(self, field_name: str,
+                                    representation: Union[List[FieldRepresentation], FieldRepresentation],
+                                    representation_id: Union[List[str], str] = None):
+        self.__load_all()
+        super().append_field_representation(field_name, representation, representation_id)
+
+    def remove_field_representation(self, field_name: str, representation_id: Union[int, str]):
+        self.__load_all()
+        super().remove_field_representation(field_name, representation_id)
+
+    def append_exogenous_representation(self, exogenous_properties: Union[List[ExogenousPropertiesRepresentation],
+                                                                          ExogenousPropertiesRepresentation],
+                                        exo_name: Union[List[str], str] = None):
+        self.__load_exogenous()
+        super().append_exogenous_representation(exogenous_properties, exo_name)
+
+    def get_exogenous_representation(self, exo_name: Union[int, str]) -> ExogenousPropertiesRepresentation:
+        self.__load_exogenous()
+        return super().get_exogenous_representation(exo_name)
+
+    def remove_exogenous_representation(self, exo_name: Union[str, int]):
+        self.__load_exogenous()
+        super().remove_exogenous_representation(exo_name)
+
+    def __reduce__(self):
+        return Content, (self.content_id, self.field_dict, self.exogenous_rep_container)
+
+    def __str__(self):
+        self.__load_all()
+        return super().__str__()
+
+    def __eq__(self, other):
+        self.__load_all()
+        if isinstance(other, LazyContent):
+            other.__load_all()
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return super().__hash__()
+
+
+class ContentArchiveReader:
+    """
+    Class that reads the contents serialized in a packed archive by the ContentArchiveWriter.
+    The index of the archive is loaded once when the reader is created, each segment file is opened once (the first
+    time one of its contents is requested) and every content is then retrieved with a positioned read (os.pread, which
+    doesn't move the position of the file, so the reader can be shared by many threads).
+
+    If the archive was written with field projection, the contents returned are LazyContent instances
+
+    Args:
+        directory (str): directory where the archive is stored
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = directory
+        # the representations of the contents may refer to the vocabularies and matrices saved in the same directory
+        register_vocabulary_directory(directory)
+        register_embedding_directory(directory)
+        archive_info = self.load_index(directory)
+        self.__compress = archive_info['compress']
+        self.__field_projection = archive_info['field_projection']
+        self.__index = archive_info['index']
+        self.__segments = {}
+        # guards the opening of the segments (and their reads where os.pread isn't available)
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def is_archive(directory: str) -> bool:
+        """
+        Checks if the directory passed as argument contains a packed archive
+
+        Args:
+            directory (str): directory to check
+        """
+        return os.path.isfile(os.path.join(directory, ARCHIVE_INDEX_FILE))
+
+    @staticmethod
+    def load_index(directory: str) -> Dict:
+        """
+        Loads the index of the archive stored in the directory passed as argument
+
+        Args:
+            directory (str): directory where the archive is stored
+
+        Returns:
+            archive_info (dict): dictionary containing the index of the archive in the form
+                {content_name: (segment_number, offset, length)} (under the 'index' key) and the options the archive
+                was created with (under the 'compress' and 'field_projection' keys)
+        """
+        with lzma.open(os.path.join(directory, ARCHIVE_INDEX_FILE), 'rb') as f:
+            archive_info = pickle.load(f)
+        archive_info.setdefault('field_projection', False)
+        return archive_info
+
+    @property
+    def field_projection(self) -> bool:
+        return self.__field_projection
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def content_names(self) -> List[str]:
+        """
+        Returns the names of all the contents stored in the archive
+        """
+        return list(self.__index.keys())
+
+    def load(self, content_id: str) -> Union[Content, None]:
+        """
+        Loads the content with the given id from the archive. If the content is not in the archive, None is returned
+
+        Args:
+            content_id (str): id of the content to load
+        """
+        try:
+            segment_number, offset, length = self.__index[re.sub(r'[^\w\s]', '', content_id)]
+        except KeyError:
+            return None
+
+        loaded = self.read(segment_number, offset, length)
+
+        if self.__field_projection:
+            # the loaded object is the header of the content, the positions it contains are relative to the start of
+            # the content's bytes, which is right before the exogenous representations (the last blob before the
+            # header)
+            exo_position, exo_length = loaded['exogenous']
+            loaded = LazyContent(loaded, self, segment_number, offset - (exo_position + exo_length))
+
+        return loaded
+
+    def read(self, segment_number: int, offset: int, length: int) -> object:
+        """
+        Reads and deserializes the object stored in the given segment, at the given offset
+
+        Args:
+            segment_number (int): number of the segment where the object is stored
+            offset (int): position of the first byte of the object in the segment
+            length (int): number of bytes of the serialized object
+        """
+        segment = self.__segments.get(segment_number)
+        if segment is None:
+            with self.__lock:
+                segment = self.__segments.get(segment_number)
+                if segment is None:
+                    segment = open(os.path.join(self.__directory, ARCHIVE_SEGMENT_FILE.format(segment_number)), 'rb')
+                    self.__segments[segment_number] = segment
+
+        if hasattr(os, 'pread'):
+            data = os.pread(segment.fileno(), length, offset)
+        else:
+            with self.__lock:
+                segment.seek(offset)
+                data = segment.read(length)
+        if self.__compress:
+            data = lzma.decompress(data)
+
+        return pickle.loads(data)
+
+    def close(self):
+        """
+        Closes every segment file opened by the reader
+        """
+        with self.__lock:
+            for segment in self.__segments.values():
+                segment.close()
+            self.__segments.clear()
+
+    def __contains__(self, content_id: str):
+        return re.sub(r'[^\w\s]', '', content_id) in self.__index
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __str__(self):
+        return "ContentArchiveReader"
+
+    def __repr__(self):
+        return "< ContentArchiveReader: directory = " + self.__directory + " >"
+
+
+def migrate_to_archive(directory: str, delete_old: bool = True) -> int:
+    """
+    Converts a directory where each content is serialized in its own '.xz' file (the output of a ContentAnalyzer
+    that doesn't use the packed archive) into a packed archive stored in the same directory.
+    Any '.xz' file that doesn't contain a Content is ignored and left untouched
+
+    Args:
+        directory (str): directory containing the serialized contents
+        delete_old (bool): if True, the '.xz' files of the migrated contents are deleted once the archive is written
+
+    Returns:
+        number of contents migrated in the archive
+    """
+    file_names = [file_name for file_name in os.listdir(directory)
+                  if file_name.endswith('.xz') and file_name != ARCHIVE_INDEX_FILE]
+
+    migrated_files = []
+    with ContentArchiveWriter(directory) as writer:
+        for file_name in progbar(file_names, prefix="Migrating contents: "):
+            file_path = os.path.join(directory, file_name)
+            with lzma.open(file_path, 'rb') as f:
+                content = pickle.load(f)
+
+            if isinstance(content, Content):
+                writer.write(content)
+                migrated_files.append(file_path)
+
+    if delete_old:
+        for file_path in migrated_files:
+            os.remove(file_path)
+
+    logger.info("Migrated %d contents in the archive stored in %s", len(migrated_files), directory)
+
+    return len(migrated_files)
+
+
+if __name__ == '__main__':
+    migrate_to_archive(sys.argv[1])
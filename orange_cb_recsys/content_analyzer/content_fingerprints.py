@@ -0,0 +1,263 @@
+import hashlib
+import inspect
+import json
+import lzma
+import os
+import pickle
+import re
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    # only imported for the type annotations, since the config module indirectly imports this one
+    from orange_cb_recsys.content_analyzer.config import ContentAnalyzerConfig
+
+FINGERPRINTS_FILE = 'contents_fingerprints.xz'
+
+
+# marks the position of an object described by its fingerprint_description method in a deferred description
+_DEFERRED_MARK = '\x00{}\x00'
+_DEFERRED_PATTERN = re.compile('\x00(\\d+)\x00')
+
+
+def _describe(obj: object, visited: set, deferred: list = None) -> str:
+    """
+    Returns a deterministic textual description of the object passed as argument, used to compute the fingerprint of
+    a config. The objects of the framework classes (techniques, preprocessors, ...) and of their subclasses are
+    described by their class and by the values of the parameters of their constructor (see _constructor_attributes),
+    so the fitted and temporary state that the techniques keep in their attributes while producing the contents is not
+    considered. The objects of other libraries are only described by their class, since they are state derived from
+    the parameters of the framework objects (the embedding sources describe their model by the files it was loaded
+    from, see EmbeddingSource).
+    The objects whose attributes are not all relevant (for example a memory interface, whose attributes change while
+    writing) define a fingerprint_description method which returns their description, or None if they must not be
+    considered at all (for example a cache).
+
+    If the deferred list is passed, the objects which define a fingerprint_description method are appended to it and
+    only a mark of their position is put in the description (see ConfigFingerprint)
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        return repr(obj)
+    if isinstance(obj, (list, tuple)):
+        return '[' + ', '.join(_describe(element, visited, deferred) for element in obj) + ']'
+    if isinstance(obj, (set, frozenset)):
+        return '{' + ', '.join(sorted(_describe(element, visited, deferred) for element in obj)) + '}'
+    if isinstance(obj, dict):
+        return '{' + ', '.join(sorted(_describe(key, visited, deferred) + ': ' + _describe(value, visited, deferred)
+                                      for key, value in obj.items())) + '}'
+    if isinstance(obj, type) or callable(obj) and hasattr(obj, '__qualname__'):
+        return '{}.{}'.format(getattr(obj, '__module__', ''), obj.__qualname__)
+
+    class_name = '{}.{}'.format(type(obj).__module__, type(obj).__qualname__)
+    if isinstance(obj, np.ndarray):
+        return '{}({}, {})'.format(class_name, obj.shape, hashlib.sha1(np.ascontiguousarray(obj).tobytes()).hexdigest())
+    if hasattr(obj, 'fingerprint_description'):
+        if deferred is None:
+            return obj.fingerprint_description()
+        deferred.append(obj)
+        return _DEFERRED_MARK.format(len(deferred) - 1)
+    # the subclasses of the framework classes defined by the user (for example a custom preprocessor) are described
+    # by their attributes too
+    is_framework_object = any(cls.__module__.startswith('orange_cb_recsys') for cls in type(obj).__mro__)
+    if not is_framework_object or id(obj) in visited:
+        return class_name
+
+    visited.add(id(obj))
+    attributes = dict(getattr(obj, '__dict__', {}))
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, '__slots__', ()):
+            # the names of the private slots are mangled
+            attribute = '_{}{}'.format(cls.__name__.lstrip('_'), slot) if slot.startswith('__') else slot
+            if hasattr(obj, attribute):
+                attributes[attribute] = getattr(obj, attribute)
+    constructor_attributes = _constructor_attributes(obj, attributes)
+    if constructor_attributes is not None:
+        attributes = constructor_attributes
+    attributes = {name: value for name, value in attributes.items() if not _is_excluded(value)}
+    return '{}({})'.format(class_name, _describe(attributes, visited, deferred))
+
+
+def _constructor_attributes(obj: object, attributes: Dict[str, object]) -> Optional[Dict[str, object]]:
+    """
+    Returns the values of the parameters of the constructor of the object passed as argument, in the form
+    {parameter name: value}, taken from the attributes of the object where they are stored (the private attribute of
+    one of its classes with the name of the parameter, or the attribute with the name of the parameter, with or
+    without a leading underscore).
+    Returns None if the constructor takes a variable number of arguments or if one of the parameters isn't stored in
+    an attribute with its name, in which case the object is described by all its attributes
+
+    Args:
+        obj (object): object whose constructor parameters will be returned
+        attributes (Dict[str, object]): attributes of the object, in the form {attribute name: value}
+    """
+    try:
+        parameters = list(inspect.signature(type(obj).__init__).parameters.values())[1:]
+    except (TypeError, ValueError):
+        return None
+
+    constructor_attributes = {}
+    for parameter in parameters:
+        if parameter.kind in [inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD]:
+            return None
+        candidates = ['_{}__{}'.format(cls.__name__.lstrip('_'), parameter.name) for cls in type(obj).__mro__]
+        candidates += ['_' + parameter.name, parameter.name]
+        attribute = next((candidate for candidate in candidates if candidate in attributes), None)
+        if attribute is None:
+            return None
+        constructor_attributes[parameter.name] = attributes[attribute]
+    return constructor_attributes
+
+
+def _is_excluded(obj: object) -> bool:
+    """
+    Returns True if the object must not be considered in the description of the object it belongs to
+    """
+    return not isinstance(obj, type) and hasattr(obj, 'fingerprint_description') \
+        and obj.fingerprint_description() is None
+
+
+def object_description(obj: object) -> str:
+    """
+    Returns the deterministic textual description of an object of the framework on which its fingerprint is computed
+    (it can be used by the fingerprint_description methods to describe the attributes of an object)
+
+    Args:
+        obj (object): object to describe
+    """
+    return _describe(obj, set())
+
+
+def object_fingerprint(obj: object) -> str:
+    """
+    Computes the fingerprint of an object of the framework (for example a technique or a list of preprocessors), so
+    that two objects with the same parameters have the same fingerprint
+
+    Args:
+        obj (object): object whose fingerprint will be computed
+
+    Returns:
+        fingerprint (str): sha1 hex digest of the description of the object
+    """
+    return hashlib.sha1(object_description(obj).encode('utf-8')).hexdigest()
+
+
+def _config_parts(config: 'ContentAnalyzerConfig') -> list:
+    """
+    Returns the parts of the config that determine the produced contents: the fields composing the id, the field
+    configs (techniques, preprocessors, memory interfaces and ids), the exogenous configs and the options that change
+    the format of the output. The source, the output directory and the options that only change how the contents are
+    produced (n_jobs, chunk_size) are not considered
+    """
+    return [
+        config.id,
+        [(field_name, list(config.get_configs_list(field_name))) for field_name in config.get_field_name_list()],
+        config.exogenous_representation_list,
+        config.export_json, config.content_archive, config.field_projection, config.embedding_matrix,
+        config.features_matrix
+    ]
+
+
+class ConfigFingerprint:
+    """
+    Fingerprint of a config, whose description is taken when the object is created, so before the techniques are
+    fitted by a run of the content analyzer. Only the objects which describe themselves with a fingerprint_description
+    method are described again each time the fingerprint is computed: in this way an embedding model trained and
+    saved by the run is considered (the embedding sources describe their model by its files), while the state that
+    the run leaves in the techniques isn't.
+
+    EXAMPLE:
+        fingerprint = ConfigFingerprint(config)
+        ContentAnalyzer(config).fit()
+        fingerprint.compute()
+
+    Args:
+        config (ContentAnalyzerConfig): config of the content analyzer
+    """
+
+    def __init__(self, config: 'ContentAnalyzerConfig'):
+        self.__deferred = []
+        self.__description = _describe(_config_parts(config), set(), self.__deferred)
+
+    def compute(self) -> str:
+        """
+        Computes the fingerprint of the config, describing again the objects which define a fingerprint_description
+        method
+
+        Returns:
+            fingerprint (str): sha1 hex digest of the description of the config
+        """
+        descriptions = [obj.fingerprint_description() for obj in self.__deferred]
+        description = _DEFERRED_PATTERN.sub(lambda match: descriptions[int(match.group(1))], self.__description)
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+
+def config_fingerprint(config: 'ContentAnalyzerConfig') -> str:
+    """
+    Computes the fingerprint of the parts of the config that determine the produced contents: the fields composing
+    the id, the field configs (techniques, preprocessors, memory interfaces and ids), the exogenous configs and the
+    options that change the format of the output. The source, the output directory and the options that only change
+    how the contents are produced (n_jobs, chunk_size) are not considered
+
+    Args:
+        config (ContentAnalyzerConfig): config of the content analyzer
+
+    Returns:
+        fingerprint (str): sha1 hex digest of the description of the config
+    """
+    return ConfigFingerprint(config).compute()
+
+
+def content_fingerprint(raw_content: Dict[str, str], field_list: List[str] = None) -> str:
+    """
+    Computes the fingerprint of a raw content, considering only the values of the fields in the field list passed
+    as argument (the fields used by the config)
+
+    Args:
+        raw_content (Dict[str, str]): raw content read from the source
+        field_list (List[str]): fields considered, if None all the fields of the raw content are considered
+
+    Returns:
+        fingerprint (str): sha1 hex digest of the values of the fields
+    """
+    if field_list is None:
+        field_list = sorted(raw_content.keys())
+    values = [[field, raw_content[field]] for field in field_list if field in raw_content]
+    return hashlib.sha1(json.dumps(values, default=str).encode('utf-8')).hexdigest()
+
+
+def load_fingerprints(directory: str) -> Union[Dict, None]:
+    """
+    Loads the fingerprints saved in the directory passed as argument by the last incremental run of the content
+    analyzer. They are stored in a dictionary in the form:
+
+        {'config': config fingerprint,
+         'contents': {content_id: content fingerprint, ...},
+         'index_positions': {memory interface directory: {content_id: position in the memory interface, ...}, ...}}
+
+    Args:
+        directory (str): output directory of the content analyzer
+
+    Returns:
+        fingerprints (dict): the dictionary described above, None if the directory doesn't contain the fingerprints
+    """
+    path = os.path.join(directory, FINGERPRINTS_FILE)
+    if not os.path.isfile(path):
+        return None
+    with lzma.open(path, 'rb') as fingerprints_file:
+        return pickle.load(fingerprints_file)
+
+
+def save_fingerprints(directory: str, fingerprints: Dict):
+    """
+    Saves the fingerprints passed as argument (in the form described in load_fingerprints) in the directory passed as
+    argument. The fingerprints are first written in a temporary file which then replaces the old one
+
+    Args:
+        directory (str): output directory of the content analyzer
+        fingerprints (dict): fingerprints to save
+    """
+    path = os.path.join(directory, FINGERPRINTS_FILE)
+    with lzma.open(path + '.tmp', 'wb') as fingerprints_file:
+        pickle.dump(fingerprints, fingerprints_file)
+    os.replace(path + '.tmp', path)
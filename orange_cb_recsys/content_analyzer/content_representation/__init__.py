@@ -1 +1,5 @@
-from .content import Content
\ No newline at end of file
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'Content': '.content'
+})
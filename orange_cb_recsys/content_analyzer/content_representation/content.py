@@ -3,6 +3,8 @@ from typing import Dict, Union, List
 import numpy as np
 import json
 
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import get_embedding_matrix
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import FeaturesVocabulary
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import InformationInterface
 
@@ -11,11 +13,24 @@ class FieldRepresentation(ABC):
     """
     Abstract class that generalizes the concept of "field representation",
     a field representation is a semantic way to represent a field of an item.
+
+    The field representations use __slots__, since there is one for each field of each content
     """
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
+    def __setstate__(self, state):
+        # the default state of an object with __slots__ is the tuple (None, slots dict), while the representations
+        # pickled before the classes used __slots__ have their attributes in a dict
+        if isinstance(state, tuple):
+            dict_state, slots_state = state
+            state = dict(dict_state or {}, **(slots_state or {}))
+        for attribute, value in state.items():
+            object.__setattr__(self, attribute, value)
+
     @abstractmethod
     def __str__(self):
         raise NotImplementedError
@@ -39,6 +54,8 @@ class FeaturesBagField(FieldRepresentation):
         features (dict<str, object>): the dictionary where features are stored
     """
 
+    __slots__ = ('__features',)
+
     def __init__(self, features: Dict[str, object] = None):
         super().__init__()
         if features is None:
@@ -56,10 +73,74 @@ class FeaturesBagField(FieldRepresentation):
         return self.__features
 
     def __str__(self):
-        return str(self.__features)
+        return str(self.value)
 
     def __eq__(self, other):
-        return self.__features == other.__features
+        return self.value == other.value
+
+
+class SparseFeaturesBagField(FeaturesBagField):
+    """
+    Compact version of the FeaturesBagField, where the features are stored as two arrays (the int32 indices of the
+    features in a vocabulary shared by all the contents and their float32 values) instead of a dictionary, so that the
+    terms are not repeated in every content. The vocabulary is saved only once in the output directory of the content
+    analyzer.
+
+    The value property still returns the features as a dictionary <feature, value> (created when requested), so the
+    field can be used in place of a FeaturesBagField
+
+    Args:
+        indices (np.ndarray): indices of the features in the vocabulary
+        values (np.ndarray): values of the features (values[i] is the value of the feature indices[i])
+        vocabulary (FeaturesVocabulary): vocabulary shared by the features bags of all the contents
+    """
+
+    __slots__ = ('__indices', '__values', '__vocabulary')
+
+    def __init__(self, indices: np.ndarray, values: np.ndarray, vocabulary: FeaturesVocabulary):
+        # the features dict of the FeaturesBagField is not used, so its constructor is skipped
+        FieldRepresentation.__init__(self)
+        if len(indices) != len(values):
+            raise ValueError("Indices and values must have the same length")
+
+        self.__indices: np.ndarray = np.asarray(indices, dtype=np.int32)
+        self.__values: np.ndarray = np.asarray(values, dtype=np.float32)
+        self.__vocabulary: FeaturesVocabulary = vocabulary
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self.__indices
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.__values
+
+    @property
+    def vocabulary(self) -> FeaturesVocabulary:
+        return self.__vocabulary
+
+    @property
+    def value(self) -> Dict[str, float]:
+        """
+        Get the features dict, created from the indices and the values using the vocabulary
+
+        Returns:
+            features (dict<str, float>): the features dict
+        """
+        terms = self.__vocabulary.terms
+        return {terms[index]: value for index, value in zip(self.__indices.tolist(), self.__values.tolist())}
+
+    def __getstate__(self):
+        # the arrays are pickled as raw bytes, which is much more compact than pickling the numpy arrays
+        return self.__indices.tobytes(), self.__values.tobytes(), self.__vocabulary
+
+    def __setstate__(self, state):
+        indices, values, self.__vocabulary = state
+        self.__indices = np.frombuffer(indices, dtype=np.int32)
+        self.__values = np.frombuffer(values, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.__indices)
 
 
 class SimpleField(FieldRepresentation):
@@ -70,6 +151,8 @@ class SimpleField(FieldRepresentation):
         value (str): string representing the value of the field
     """
 
+    __slots__ = ('__value',)
+
     def __init__(self, value: object = None):
         super().__init__()
         self.__value: object = value
@@ -103,6 +186,8 @@ class EmbeddingField(FieldRepresentation):
             it can be of different shapes according to the granularity of the technique
     """
 
+    __slots__ = ('__embedding_array',)
+
     def __init__(self, embedding_array: np.ndarray):
         super().__init__()
         self.__embedding_array: np.ndarray = embedding_array
@@ -112,10 +197,43 @@ class EmbeddingField(FieldRepresentation):
         return self.__embedding_array
 
     def __str__(self):
-        return str(self.__embedding_array)
+        return str(self.value)
 
     def __eq__(self, other):
-        return self.__embedding_array == other.__embedding_array
+        return self.value == other.value
+
+
+class MatrixEmbeddingField(EmbeddingField):
+    """
+    Class for embedding representations stored as a row of an embedding matrix shared by all the contents (one matrix
+    for each field and representation, see the EmbeddingMatrixWriter). The representation only keeps the name of the
+    file of the matrix and the row of the content, the matrix is memory mapped when the value is requested for the
+    first time
+
+    Args:
+        matrix_file (str): name of the file where the embedding matrix is stored
+        row (int): row of the content in the embedding matrix
+    """
+
+    __slots__ = ('__matrix_file', '__row')
+
+    def __init__(self, matrix_file: str, row: int):
+        # the array of the EmbeddingField is not used, so its constructor is skipped
+        FieldRepresentation.__init__(self)
+        self.__matrix_file: str = matrix_file
+        self.__row: int = row
+
+    @property
+    def matrix_file(self) -> str:
+        return self.__matrix_file
+
+    @property
+    def row(self) -> int:
+        return self.__row
+
+    @property
+    def value(self) -> np.ndarray:
+        return get_embedding_matrix(self.__matrix_file)[self.__row]
 
 
 class IndexField(FieldRepresentation):
@@ -130,22 +248,64 @@ class IndexField(FieldRepresentation):
         index (InformationInterface): index from which the data will be retrieved
     """
 
+    __slots__ = ('__field_name', '__index_id', '__index')
+
     def __init__(self, field_name: str, index_id: int, index: InformationInterface):
         super().__init__()
         self.__field_name = field_name
         self.__index_id = index_id
         self.__index = index
 
+    @property
+    def field_name(self) -> str:
+        return self.__field_name
+
+    @property
+    def index_id(self) -> int:
+        return self.__index_id
+
+    @property
+    def index(self) -> InformationInterface:
+        return self.__index
+
     @property
     def value(self) -> str:
         return self.__index.get_field(self.__field_name, self.__index_id)
 
+    @staticmethod
+    def values(index_fields: List['IndexField']) -> list:
+        """
+        Retrieves the values of many IndexFields at once: the IndexFields referring to the same index are read together
+        (see the get_fields method of the InformationInterface), instead of reading the index for each of them as the
+        value property does
+
+        EXAMPLE:
+            IndexField.values([content.get_field_representation('Plot', 0) for content in contents])
+
+        Args:
+            index_fields (List[IndexField]): IndexFields whose values will be retrieved
+
+        Returns:
+            list: value of each IndexField, in the same order as the IndexFields passed as argument
+        """
+        positions_by_index = {}
+        for i, index_field in enumerate(index_fields):
+            positions_by_index.setdefault(index_field.index, []).append(i)
+
+        values = [None] * len(index_fields)
+        for index, positions in positions_by_index.items():
+            index_values = index.get_fields([(index_fields[i].field_name, index_fields[i].index_id)
+                                             for i in positions])
+            for i, value in zip(positions, index_values):
+                values[i] = value
+        return values
+
     def __str__(self):
         return str(self.value)
 
     def __eq__(self, other):
         return self.__field_name == other.__field_name \
-               and self.__index_id == other.__content_id \
+               and self.__index_id == other.__index_id \
                and self.__index == other.__index
 
 
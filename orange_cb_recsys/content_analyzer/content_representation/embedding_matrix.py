@@ -0,0 +1,289 @@
+import lzma
+import os
+import pickle
+import uuid
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+EMBEDDING_MATRIX_FILE = 'embedding_matrix_{}.npy'
+EMBEDDING_MATRIX_INDEX_FILE = 'embedding_matrices_index.xz'
+
+# directories where the embedding matrices are searched
+_matrix_directories: List[str] = []
+# embedding matrices already loaded (memory mapped), in the form {matrix file name: matrix}. The matrices are kept
+# until they are released with release_embedding_matrices
+_matrices: Dict[str, np.ndarray] = {}
+
+
+def register_embedding_directory(directory: str):
+    """
+    Registers the directory passed as argument (usually the output directory of the content analyzer) as one of the
+    directories where the embedding matrices referred by the MatrixEmbeddingField representations are searched
+
+    Args:
+        directory (str): directory where the embedding matrices were stored
+    """
+    if directory not in _matrix_directories and os.path.isdir(directory):
+        _matrix_directories.append(directory)
+
+
+def is_embedding_matrix_file(file_name: str) -> bool:
+    """
+    Returns True if the file name passed as argument is the name of a stored embedding matrix
+    """
+    return file_name.startswith(EMBEDDING_MATRIX_FILE.split('{')[0])
+
+
+def get_embedding_matrix(matrix_file: str) -> np.ndarray:
+    """
+    Returns the embedding matrix stored in the file passed as argument, which is searched in the registered
+    directories. The matrix is memory mapped in read only mode and loaded only once
+
+    Args:
+        matrix_file (str): name of the file where the embedding matrix is stored
+    """
+    matrix = _matrices.get(matrix_file)
+    if matrix is None:
+        for directory in _matrix_directories:
+            path = os.path.join(directory, matrix_file)
+            if os.path.isfile(path):
+                matrix = np.load(path, mmap_mode='r')
+                _matrices[matrix_file] = matrix
+                break
+        else:
+            raise KeyError("The embedding matrix {} was not found, register the directory where it was stored with "
+                           "register_embedding_directory".format(matrix_file))
+    return matrix
+
+
+def release_embedding_matrices(directory: str = None):
+    """
+    Releases the memory maps of the embedding matrices loaded so far, so that their pages and file descriptors are
+    freed once the arrays returned by load_embedding_matrix (and the rows sliced from them) are not used anymore.
+    The matrices are memory mapped again the next time they are needed
+
+    Args:
+        directory (str): if not None, only the matrices stored in this directory are released
+    """
+    if directory is None:
+        _matrices.clear()
+        return
+
+    directory = os.path.abspath(directory)
+    for matrix_file, matrix in list(_matrices.items()):
+        if os.path.dirname(os.path.abspath(matrix.filename)) == directory:
+            del _matrices[matrix_file]
+
+
+def load_embedding_matrix(directory: str, field_name: str,
+                          representation_id: Union[int, str]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Loads the embedding matrix of a specific representation of a field of the contents serialized in the directory
+    passed as argument. The matrix is memory mapped in read only mode, so the rows of the candidate items can be
+    sliced without loading (or copying) the entire matrix
+
+    EXAMPLE:
+        matrix, rows = load_embedding_matrix('movies_dir', 'Plot', 0)
+        candidates_matrix = matrix[[rows[item_id] for item_id in candidate_items]]
+
+    Args:
+        directory (str): output directory of the content analyzer
+        field_name (str): name of the field
+        representation_id (Union[int, str]): internal or external id of the representation
+
+    Returns:
+        matrix (np.ndarray): memory mapped matrix where each row is the embedding of a content
+        rows (Dict[str, int]): dictionary which maps the id of each content to its row in the matrix
+    """
+    with lzma.open(os.path.join(directory, EMBEDDING_MATRIX_INDEX_FILE), 'rb') as index_file:
+        matrices_index = pickle.load(index_file)
+
+    for entry in matrices_index:
+        if entry['field_name'] == field_name and representation_id in [entry['internal_id'], entry['external_id']]:
+            register_embedding_directory(directory)
+            return get_embedding_matrix(entry['file']), entry['rows']
+
+    raise KeyError("No embedding matrix was stored for the representation {} of the field {}".format(
+        representation_id, field_name))
+
+
+class EmbeddingMatrixWriter:
+    """
+    Class that writes the 1-dimensional embeddings of the contents in one contiguous matrix for each (field,
+    representation) couple, which is saved as a '.npy' file in the output directory. An index
+    ('embedding_matrices_index.xz') maps each couple to the file of its matrix and to the row of each content.
+
+    The rows are appended to a temporary file while the contents are produced (so that the matrix is never kept in
+    memory) and the '.npy' matrices are created by the close method.
+
+    If the directory already contains embedding matrices, the writer opens them in append mode: the rows of the
+    contents that are not written again keep their position, so their references (the MatrixEmbeddingField
+    representations of the serialized contents) remain valid. The rows of the contents written again or removed are
+    not referenced anymore by the index, and they are reused by the embeddings written later (the new embeddings of
+    the same contents or the ones of new contents), which are appended after the existing rows only when there are no
+    free rows left. In this way the matrix never has more rows than the largest number of contents stored at once,
+    however many incremental runs update it
+
+    Args:
+        directory (str): directory where the matrices will be stored
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = directory
+        # entries of the index in the form {(field_name, internal_id): entry}
+        self.__entries: Dict[Tuple[str, int], Dict] = {}
+        self.__raw_files = {}
+
+        index_path = os.path.join(directory, EMBEDDING_MATRIX_INDEX_FILE)
+        if os.path.isfile(index_path):
+            with lzma.open(index_path, 'rb') as index_file:
+                matrices_index = pickle.load(index_file)
+
+            for entry in matrices_index:
+                matrix = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+                # the rows not referenced by the index are free (the smallest ones are used first)
+                free_rows = sorted(set(range(matrix.shape[0])).difference(entry['rows'].values()), reverse=True)
+                self.__entries[(entry['field_name'], entry['internal_id'])] = \
+                    dict(entry, shape=matrix.shape[1:], dtype=matrix.dtype, stored_rows=matrix.shape[0],
+                         n_rows=matrix.shape[0], free_rows=free_rows, reused_rows=set(), targets=[])
+                del matrix
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def add(self, content_id: str, field_name: str, internal_id: int, external_id: Union[str, None],
+            embedding: np.ndarray) -> Tuple[str, int]:
+        """
+        Adds the embedding passed as argument to the matrix of the representation of the field, in one of its free
+        rows or after the last one
+
+        Args:
+            content_id (str): id of the content the embedding refers to
+            field_name (str): name of the field
+            internal_id (int): internal id of the representation
+            external_id (Union[str, None]): external id of the representation, None if it wasn't defined
+            embedding (np.ndarray): 1-dimensional embedding of the content
+
+        Returns:
+            matrix_file (str): name of the file where the matrix will be stored
+            row (int): row of the embedding in the matrix
+        """
+        key = (field_name, internal_id)
+        entry = self.__entries.get(key)
+        if entry is None:
+            entry = {'field_name': field_name, 'internal_id': internal_id, 'external_id': external_id,
+                     'file': EMBEDDING_MATRIX_FILE.format(uuid.uuid4().hex),
+                     'shape': embedding.shape, 'dtype': embedding.dtype, 'rows': {},
+                     'stored_rows': 0, 'n_rows': 0, 'free_rows': [], 'reused_rows': set(), 'targets': []}
+            self.__entries[key] = entry
+        elif embedding.shape != entry['shape']:
+            raise ValueError("All the embeddings of the representation {} of the field {} must have the same shape "
+                             "to be stored in a matrix".format(internal_id, field_name))
+
+        if key not in self.__raw_files:
+            self.__raw_files[key] = open(os.path.join(self.__directory, entry['file'] + '.tmp'), 'wb')
+
+        old_row = entry['rows'].get(content_id)
+        if old_row is not None:
+            self.__free_row(entry, old_row)
+        if len(entry['free_rows']) != 0:
+            row = entry['free_rows'].pop()
+            entry['reused_rows'].add(row)
+        else:
+            row = entry['n_rows']
+            entry['n_rows'] += 1
+        entry['rows'][content_id] = row
+        entry['targets'].append(row)
+        self.__raw_files[key].write(np.ascontiguousarray(embedding, dtype=entry['dtype']).tobytes())
+
+        return entry['file'], row
+
+    @staticmethod
+    def __free_row(entry: Dict, row: int):
+        """
+        Marks a row of the matrix of the entry passed as argument as free. Only the rows already stored can be reused,
+        and each of them at most once for each writing, so that every row is written only once by close
+        """
+        if row < entry['stored_rows'] and row not in entry['reused_rows']:
+            entry['free_rows'].append(row)
+
+    def remove(self, content_id: str):
+        """
+        Removes the content with the given id from the index of every matrix. The rows of the content are not
+        removed from the matrices, but they won't be referenced anymore and they will be reused by the embeddings
+        added later
+
+        Args:
+            content_id (str): id of the content to remove
+        """
+        for entry in self.__entries.values():
+            row = entry['rows'].pop(content_id, None)
+            if row is not None:
+                self.__free_row(entry, row)
+
+    def close(self):
+        """
+        Creates the '.npy' matrices from the temporary files (writing the new rows in the free rows of the existing
+        matrices or after them) and saves the index
+        """
+        index = []
+        for key, entry in self.__entries.items():
+            raw_file = self.__raw_files.pop(key, None)
+            if raw_file is not None:
+                raw_file.close()
+                self.__write_matrix(entry, raw_file.name)
+
+            index.append({'field_name': entry['field_name'], 'internal_id': entry['internal_id'],
+                          'external_id': entry['external_id'], 'file': entry['file'], 'rows': entry['rows']})
+
+        if len(index) != 0:
+            index_path = os.path.join(self.__directory, EMBEDDING_MATRIX_INDEX_FILE)
+            with lzma.open(index_path + '.tmp', 'wb') as index_file:
+                pickle.dump(index, index_file)
+            os.replace(index_path + '.tmp', index_path)
+            register_embedding_directory(self.__directory)
+
+        self.__entries = {}
+
+    def __write_matrix(self, entry: Dict, raw_path: str):
+        """
+        Writes the '.npy' matrix of the entry passed as argument, made of the rows already stored in the matrix (if
+        any) where the rows in the temporary file are written in the positions assigned by add
+        """
+        matrix_path = os.path.join(self.__directory, entry['file'])
+        stored_rows = entry['stored_rows']
+        shape = (entry['n_rows'],) + entry['shape']
+        targets = np.array(entry['targets'], dtype=np.int64)
+
+        raw_matrix = np.memmap(raw_path, dtype=entry['dtype'], mode='r', shape=(len(targets),) + shape[1:])
+        # the new matrix is written in another file which then replaces the old one
+        matrix = open_memmap(matrix_path + '.new', mode='w+', dtype=entry['dtype'], shape=shape)
+        # the rows are copied in blocks so that the matrix is never entirely loaded in memory
+        block_size = 65536
+        if stored_rows != 0:
+            stored_matrix = np.load(matrix_path, mmap_mode='r')
+            for start in range(0, stored_rows, block_size):
+                end = min(start + block_size, stored_rows)
+                matrix[start:end] = stored_matrix[start:end]
+            del stored_matrix
+        for start in range(0, raw_matrix.shape[0], block_size):
+            matrix[targets[start:start + block_size]] = raw_matrix[start:start + block_size]
+        matrix.flush()
+        del raw_matrix, matrix
+        os.remove(raw_path)
+        os.replace(matrix_path + '.new', matrix_path)
+
+        # a matrix with the same name may have been loaded before it was written again
+        _matrices.pop(entry['file'], None)
+        entry['stored_rows'] = shape[0]
+        entry['reused_rows'] = set()
+        entry['targets'] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
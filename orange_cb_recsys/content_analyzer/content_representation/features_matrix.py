@@ -0,0 +1,229 @@
+import lzma
+import os
+import pickle
+import uuid
+from typing import Dict, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from orange_cb_recsys.content_analyzer.content_representation.content import SparseFeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import FeaturesVocabulary, \
+    register_vocabulary_directory
+
+FEATURES_MATRIX_FILE = 'features_matrix_{}.npz'
+FEATURES_MATRIX_INDEX_FILE = 'features_matrices_index.xz'
+
+
+def is_features_matrix_file(file_name: str) -> bool:
+    """
+    Returns True if the file name passed as argument is the name of a stored features matrix
+    """
+    return file_name.startswith(FEATURES_MATRIX_FILE.split('{')[0])
+
+
+def load_features_matrix(directory: str, field_name: str, representation_id: Union[int, str]) \
+        -> Tuple[sparse.csr_matrix, Dict[str, int], FeaturesVocabulary]:
+    """
+    Loads the sparse features matrix of a specific representation of a field of the contents serialized in the
+    directory passed as argument (for example the tf-idf matrix of the catalog), along with the vocabulary of its
+    columns. The rows of the candidate items can be sliced from the matrix directly, without building it again from
+    the features bags of the single contents
+
+    EXAMPLE:
+        matrix, rows, vocabulary = load_features_matrix('movies_dir', 'Plot', 0)
+        candidates_matrix = matrix[[rows[item_id] for item_id in candidate_items]]
+
+    Args:
+        directory (str): output directory of the content analyzer
+        field_name (str): name of the field
+        representation_id (Union[int, str]): internal or external id of the representation
+
+    Returns:
+        matrix (sparse.csr_matrix): matrix where each row is the features bag of a content and each column a term of
+            the vocabulary
+        rows (Dict[str, int]): dictionary which maps the id of each content to its row in the matrix
+        vocabulary (FeaturesVocabulary): vocabulary of the terms of the columns
+    """
+    with lzma.open(os.path.join(directory, FEATURES_MATRIX_INDEX_FILE), 'rb') as index_file:
+        matrices_index = pickle.load(index_file)
+
+    for entry in matrices_index:
+        if entry['field_name'] == field_name and representation_id in [entry['internal_id'], entry['external_id']]:
+            register_vocabulary_directory(directory)
+            matrix = sparse.load_npz(os.path.join(directory, entry['file'])).tocsr()
+            return matrix, entry['rows'], FeaturesVocabulary.from_id(entry['vocabulary_id'])
+
+    raise KeyError("No features matrix was stored for the representation {} of the field {}".format(
+        representation_id, field_name))
+
+
+class FeaturesMatrixWriter:
+    """
+    Class that writes the SparseFeaturesBagField representations of the contents (for example the ones produced by
+    SkLearnTfIdf with sparse_features=True) in one sparse CSR matrix for each (field, representation) couple, which
+    is saved as a '.npz' file in the output directory. The columns of the matrix are the terms of the vocabulary
+    shared by the features bags, which is saved in the output directory too. An index ('features_matrices_index.xz')
+    maps each couple to the file of its matrix, to its vocabulary and to the row of each content.
+
+    Unlike the embedding matrices, the features bags are also kept in the contents: the matrix is an additional
+    artifact of the whole catalog, which can be loaded at once by the recommenders with the load_features_matrix
+    function.
+
+    The indices and the values of the rows are appended to temporary files while the contents are produced (so that
+    the matrix is never kept in memory) and the '.npz' matrices are created by the close method.
+
+    If the directory already contains features matrices, the rows of new contents are appended after the existing
+    ones, as long as they use the same vocabulary (otherwise the technique has been fitted again, so the old matrix is
+    replaced). When a matrix is written again, the rows of the contents written again or removed are dropped and the
+    remaining rows are renumbered in the index: the rows are only referenced by the index, since the features bags
+    are kept in the contents
+
+    Args:
+        directory (str): directory where the matrices will be stored
+    """
+
+    def __init__(self, directory: str):
+        self.__directory = directory
+        # entries of the index in the form {(field_name, internal_id): entry}
+        self.__entries: Dict[Tuple[str, int], Dict] = {}
+        self.__raw_files = {}
+
+        index_path = os.path.join(directory, FEATURES_MATRIX_INDEX_FILE)
+        if os.path.isfile(index_path):
+            with lzma.open(index_path, 'rb') as index_file:
+                matrices_index = pickle.load(index_file)
+
+            for entry in matrices_index:
+                self.__entries[(entry['field_name'], entry['internal_id'])] = \
+                    dict(entry, stored=True, row_lengths=[], removed=False)
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    def add(self, content_id: str, field_name: str, internal_id: int, external_id: Union[str, None],
+            representation: SparseFeaturesBagField):
+        """
+        Appends the features bag passed as argument to the matrix of the representation of the field. The row of the
+        content is stored in the index when the matrix is written (see load_features_matrix)
+
+        Args:
+            content_id (str): id of the content the features bag refers to
+            field_name (str): name of the field
+            internal_id (int): internal id of the representation
+            external_id (Union[str, None]): external id of the representation, None if it wasn't defined
+            representation (SparseFeaturesBagField): features bag of the content
+        """
+        key = (field_name, internal_id)
+        entry = self.__entries.get(key)
+        if entry is None or entry['vocabulary_id'] != representation.vocabulary.id:
+            if entry is not None and len(entry['row_lengths']) != 0:
+                raise ValueError("All the features bags of the representation {} of the field {} must share the same "
+                                 "vocabulary to be stored in a matrix".format(internal_id, field_name))
+            # a different vocabulary for a stored matrix means that the technique was fitted again
+            entry = {'field_name': field_name, 'internal_id': internal_id, 'external_id': external_id,
+                     'file': FEATURES_MATRIX_FILE.format(uuid.uuid4().hex),
+                     'vocabulary_id': representation.vocabulary.id, 'rows': {}, 'stored': False,
+                     'row_lengths': [], 'n_rows': 0, 'removed': False}
+            old_entry = self.__entries.get(key)
+            if old_entry is not None:
+                entry['replaced_file'] = old_entry['file']
+            self.__entries[key] = entry
+
+        if key not in self.__raw_files:
+            path = os.path.join(self.__directory, entry['file'])
+            self.__raw_files[key] = (open(path + '.indices.tmp', 'wb'), open(path + '.values.tmp', 'wb'))
+
+        entry['rows'][content_id] = entry['n_rows']
+        entry['n_rows'] += 1
+        entry['row_lengths'].append(len(representation.indices))
+        indices_file, values_file = self.__raw_files[key]
+        indices_file.write(np.ascontiguousarray(representation.indices, dtype=np.int32).tobytes())
+        values_file.write(np.ascontiguousarray(representation.values, dtype=np.float32).tobytes())
+
+    def remove(self, content_id: str):
+        """
+        Removes the content with the given id from the index of every matrix. The rows of the content are dropped
+        from the matrices when they are written again by close
+
+        Args:
+            content_id (str): id of the content to remove
+        """
+        for entry in self.__entries.values():
+            if entry['rows'].pop(content_id, None) is not None:
+                entry['removed'] = True
+
+    def close(self):
+        """
+        Creates the '.npz' matrices from the temporary files (appending the new rows to the existing matrices and
+        dropping the rows not referenced anymore) and saves the index
+        """
+        index = []
+        for key, entry in self.__entries.items():
+            raw_files = self.__raw_files.pop(key, None)
+            if raw_files is not None:
+                for raw_file in raw_files:
+                    raw_file.close()
+                self.__write_matrix(entry, raw_files[0].name, raw_files[1].name)
+            elif entry['removed']:
+                self.__write_matrix(entry)
+
+            index.append({'field_name': entry['field_name'], 'internal_id': entry['internal_id'],
+                          'external_id': entry['external_id'], 'file': entry['file'],
+                          'vocabulary_id': entry['vocabulary_id'], 'rows': entry['rows'], 'n_rows': entry['n_rows']})
+
+        if len(index) != 0:
+            index_path = os.path.join(self.__directory, FEATURES_MATRIX_INDEX_FILE)
+            with lzma.open(index_path + '.tmp', 'wb') as index_file:
+                pickle.dump(index, index_file)
+            os.replace(index_path + '.tmp', index_path)
+
+        self.__entries = {}
+
+    def __write_matrix(self, entry: Dict, indices_path: str = None, values_path: str = None):
+        """
+        Writes the '.npz' matrix of the entry passed as argument, made of the rows already stored in the matrix (if
+        any) followed by the rows in the temporary files (if any). Only the rows referenced by the index are kept, in
+        the same order, and the index of the entry is updated with their new positions
+        """
+        matrix_path = os.path.join(self.__directory, entry['file'])
+        n_columns = len(FeaturesVocabulary.from_id(entry['vocabulary_id']))
+
+        blocks = []
+        if entry['stored']:
+            blocks.append(sparse.load_npz(matrix_path).tocsr())
+        if indices_path is not None:
+            indptr = np.zeros(len(entry['row_lengths']) + 1, dtype=np.int64)
+            np.cumsum(entry['row_lengths'], out=indptr[1:])
+            indices = np.fromfile(indices_path, dtype=np.int32)
+            values = np.fromfile(values_path, dtype=np.float32)
+            blocks.append(sparse.csr_matrix((values, indices, indptr), shape=(len(entry['row_lengths']), n_columns)))
+        matrix = sparse.vstack(blocks, format='csr') if len(blocks) > 1 else blocks[0]
+
+        # the rows of the contents written again or removed are dropped
+        content_ids = sorted(entry['rows'], key=entry['rows'].get)
+        if len(content_ids) != matrix.shape[0]:
+            matrix = matrix[[entry['rows'][content_id] for content_id in content_ids]]
+            entry['rows'] = {content_id: row for row, content_id in enumerate(content_ids)}
+
+        # the new matrix is written in another file which then replaces the old one
+        sparse.save_npz(matrix_path + '.new.npz', matrix, compressed=False)
+        if indices_path is not None:
+            os.remove(indices_path)
+            os.remove(values_path)
+        os.replace(matrix_path + '.new.npz', matrix_path)
+
+        replaced_file = entry.pop('replaced_file', None)
+        if replaced_file is not None and os.path.isfile(os.path.join(self.__directory, replaced_file)):
+            os.remove(os.path.join(self.__directory, replaced_file))
+        entry['stored'] = True
+        entry['row_lengths'] = []
+        entry['n_rows'] = matrix.shape[0]
+        entry['removed'] = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
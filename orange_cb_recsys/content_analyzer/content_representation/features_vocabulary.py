@@ -0,0 +1,176 @@
+import lzma
+import os
+import pickle
+import re
+import uuid
+import weakref
+from typing import List, Dict, Iterable
+
+VOCABULARY_FILE = 'features_vocabulary_{}.xz'
+
+# vocabularies known by the process, in the form {vocabulary id: vocabulary}. The vocabularies are held weakly: the
+# features bags referring to a vocabulary keep it alive, so it is released once none of them is in use anymore
+_vocabularies: Dict[str, 'FeaturesVocabulary'] = weakref.WeakValueDictionary()
+# files of the vocabularies saved in the directories already registered, in the form {vocabulary id: path}
+_vocabulary_paths: Dict[str, str] = {}
+_registered_directories = set()
+
+
+def register_vocabulary_directory(directory: str):
+    """
+    Registers the vocabularies saved in the directory passed as argument (usually the output directory of the content
+    analyzer), so that the features bags of the contents serialized in said directory can retrieve their terms.
+    The vocabularies are not loaded: each one of them is loaded the first time one of its terms is needed
+
+    Args:
+        directory (str): directory where the vocabularies were saved
+    """
+    if directory in _registered_directories or not os.path.isdir(directory):
+        return
+
+    _scan_directory(directory)
+    _registered_directories.add(directory)
+
+
+def _scan_directory(directory: str):
+    """
+    Stores the paths of the vocabularies saved in the directory passed as argument
+    """
+    file_pattern = re.compile(VOCABULARY_FILE.format(r'(\w+)').replace('.', r'\.'))
+    for file_name in os.listdir(directory):
+        match = file_pattern.fullmatch(file_name)
+        if match is not None:
+            _vocabulary_paths[match.group(1)] = os.path.join(directory, file_name)
+
+
+def is_vocabulary_file(file_name: str) -> bool:
+    """
+    Returns True if the file name passed as argument is the name of a saved vocabulary
+    """
+    return file_name.startswith(VOCABULARY_FILE.split('{')[0])
+
+
+class FeaturesVocabulary:
+    """
+    Class that represents a vocabulary of terms shared by the features bags of all the contents for a specific
+    field representation (for example, the terms of a tf-idf representation). Each term is identified by its
+    position in the vocabulary, so the features bags only need to store the positions of their terms.
+
+    The vocabulary is saved only once in the output directory of the content analyzer (using the save method). Once
+    saved, a vocabulary is pickled as a reference (its id), so that the serialized contents don't repeat its terms.
+    Before being saved (for example when the representations are sent from a worker process to the main one) the
+    vocabulary is pickled along with its terms
+
+    Args:
+        terms (Iterable[str]): terms of the vocabulary, the position of each term will be its index
+    """
+
+    __slots__ = ('__id', '__terms', '__term_index', '__saved', '__weakref__')
+
+    def __init__(self, terms: Iterable[str] = None):
+        self.__id: str = uuid.uuid4().hex
+        self.__terms: List[str] = list(terms) if terms is not None else []
+        self.__term_index: Dict[str, int] = None
+        self.__saved: bool = False
+        _vocabularies[self.__id] = self
+
+    @staticmethod
+    def from_id(vocabulary_id: str, terms: List[str] = None) -> 'FeaturesVocabulary':
+        """
+        Returns the vocabulary with the id passed as argument. If the process doesn't know the vocabulary yet, it is
+        created using the terms passed as argument or, if they are not passed, the terms will be loaded from the saved
+        vocabulary the first time they are needed
+
+        Args:
+            vocabulary_id (str): id of the vocabulary
+            terms (List[str]): terms of the vocabulary, None if the vocabulary has been saved
+        """
+        vocabulary = _vocabularies.get(vocabulary_id)
+        if vocabulary is None:
+            vocabulary = FeaturesVocabulary.__new__(FeaturesVocabulary)
+            vocabulary.__id = vocabulary_id
+            vocabulary.__terms = terms
+            vocabulary.__term_index = None
+            # the vocabulary may have been saved by this process and released afterwards
+            vocabulary.__saved = terms is None or vocabulary_id in _vocabulary_paths
+            _vocabularies[vocabulary_id] = vocabulary
+        return vocabulary
+
+    @property
+    def id(self) -> str:
+        return self.__id
+
+    @property
+    def saved(self) -> bool:
+        return self.__saved
+
+    @property
+    def terms(self) -> List[str]:
+        if self.__terms is None:
+            path = _vocabulary_paths.get(self.__id)
+            if path is None:
+                # the vocabulary may have been saved after its directory was registered
+                for directory in _registered_directories:
+                    if os.path.isdir(directory):
+                        _scan_directory(directory)
+                path = _vocabulary_paths.get(self.__id)
+            if path is None:
+                raise KeyError("The vocabulary {} was not found, register the directory where it was saved with "
+                               "register_vocabulary_directory".format(self.__id))
+            with lzma.open(path, 'rb') as vocabulary_file:
+                self.__terms = pickle.load(vocabulary_file)
+        return self.__terms
+
+    def get_term(self, index: int) -> str:
+        return self.terms[index]
+
+    def get_index(self, term: str) -> int:
+        """
+        Returns the index of the term passed as argument, the term is added to the vocabulary if it's not in it yet
+        (the vocabulary can't be extended once it has been saved)
+        """
+        if self.__term_index is None:
+            self.__term_index = {term: index for index, term in enumerate(self.terms)}
+
+        index = self.__term_index.get(term)
+        if index is None:
+            if self.__saved:
+                raise ValueError("The vocabulary {} has already been saved and can't be extended".format(self.__id))
+            index = len(self.__terms)
+            self.__terms.append(term)
+            self.__term_index[term] = index
+        return index
+
+    def save(self, directory: str):
+        """
+        Saves the vocabulary in the directory passed as argument (in a file named 'features_vocabulary_{id}.xz'). From
+        now on the vocabulary will be pickled as a reference
+
+        Args:
+            directory (str): directory where the vocabulary will be saved
+        """
+        path = os.path.join(directory, VOCABULARY_FILE.format(self.__id))
+        with lzma.open(path, 'wb') as vocabulary_file:
+            pickle.dump(self.terms, vocabulary_file)
+        _vocabulary_paths[self.__id] = path
+        self.__saved = True
+
+    def __reduce__(self):
+        if self.__saved:
+            return FeaturesVocabulary.from_id, (self.__id,)
+        return FeaturesVocabulary.from_id, (self.__id, self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __eq__(self, other):
+        return isinstance(other, FeaturesVocabulary) and self.__id == other.__id
+
+    def __hash__(self):
+        return hash(self.__id)
+
+    def __str__(self):
+        return "FeaturesVocabulary"
+
+    def __repr__(self):
+        return "< FeaturesVocabulary: id = {}; saved = {} >".format(self.__id, self.__saved)
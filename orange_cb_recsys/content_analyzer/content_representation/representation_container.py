@@ -1,4 +1,4 @@
-import pandas as pd
+import numpy as np
 from typing import List, Any, Union, Iterator, Dict
 
 
@@ -6,8 +6,9 @@ class RepresentationContainer:
     """
     Class that stores a generic representation. This is used in the project for storing the representations and
     ids for both the field and exogenous representations of the contents. In order to store the data, the class handles
-    a dataframe with 1 column ('representation') and 2 indexes ('internal_id' and 'external_id').
-    The dataframe is in the following form
+    three parallel lists (one for the 'internal_id', one for the 'external_id' and one for the 'representation') and a
+    dictionary that maps each external id to its position, so that the representations can be retrieved in constant
+    time. The data can be seen as a table in the following form
 
                                             representation
                     internal_id external_id
@@ -16,10 +17,10 @@ class RepresentationContainer:
                     2           'test2'     FieldRepresentation instance
 
 
-    The index 'internal_id' is used to store the id automatically assigned by the framework to the representation.
+    The 'internal_id' is used to store the id automatically assigned by the framework to the representation.
     This default id is an integer and the column will always be in the form: [0, 1, 2, 3, ...]
 
-    The index 'external_id' is used to store the optional id that the user can assign to the representation.
+    The 'external_id' is used to store the optional id that the user can assign to the representation.
     If the user didn't define an external_id for the representation it will be set to NaN and it will be
     accessible using the internal_id only.
     The 'external_id' is a string and the column will always be in the form: ['test', NaN, 'test2', 'test3', ...]
@@ -33,6 +34,10 @@ class RepresentationContainer:
     By using an index value either integer (referring to 'internal_id') or string (referring to 'external_id') it's
     possible to access the corresponding representation
 
+    The class uses __slots__ and is pickled as a tuple of lists, so that a container for each field of each content
+    is cheap both in memory and in the serialized contents (containers pickled by the previous dataframe based
+    implementation can still be loaded)
+
     Args:
         external_id_list (Union[List[Union[str, None]], Union[str, None]]): list containing the user defined ids for the
             representations, the None value is used for representations the user didn't assign an id to. It's also
@@ -44,6 +49,8 @@ class RepresentationContainer:
     internal_id_list is not required as an argument because it will be automatically created by the class
     """
 
+    __slots__ = ('__internal_id_list', '__external_id_list', '__representation_list', '__external_positions')
+
     def __init__(self, representation_list: Union[List[Any], Any] = None,
                  external_id_list: Union[List[Union[str, None]], Union[str, None]] = None):
         if external_id_list is None:
@@ -59,36 +66,46 @@ class RepresentationContainer:
         if len(representation_list) != len(external_id_list):
             raise ValueError("Representation and external_id lists must have the same length")
 
-        self.__dataframe = pd.DataFrame({'external_id': external_id_list, 'representation': representation_list})
-        self.__dataframe['internal_id'] = self.__dataframe.index
-        self.__dataframe.set_index(['internal_id', 'external_id'], inplace=True)
+        self.__set_data(list(range(len(representation_list))), external_id_list, representation_list)
+
+    def __set_data(self, internal_id_list: List[int], external_id_list: List[Union[str, None]],
+                   representation_list: List[Any]):
+        """
+        Sets the lists of the container and builds the dictionary which maps each external id to its position.
+        Missing external ids are stored as None
+        """
+        self.__internal_id_list = list(internal_id_list)
+        self.__external_id_list = [external_id if isinstance(external_id, str) else None
+                                   for external_id in external_id_list]
+        self.__representation_list = list(representation_list)
+        self.__external_positions = {external_id: position
+                                     for position, external_id in enumerate(self.__external_id_list)
+                                     if external_id is not None}
 
     def get_internal_index(self) -> List[int]:
         """
         Returns a list containing the values in the 'internal_id' index
         """
-        return list(self.__dataframe.index.get_level_values('internal_id'))
+        return list(self.__internal_id_list)
 
     def get_external_index(self) -> List[Union[str, None]]:
         """
         Returns a list containing the values in the 'external_id' index
         """
-        return list(self.__dataframe.index.get_level_values('external_id'))
+        return [external_id if external_id is not None else np.nan for external_id in self.__external_id_list]
 
     def get_representations(self) -> List[Any]:
         """
         Returns a list containing the values in the 'representations' column
         """
-        return list(self.__dataframe['representation'])
+        return list(self.__representation_list)
 
     def append(self, representation: Union[List[Any], Any],
                external_id: Union[List[Union[str, None]], Union[str, None]]):
         """
         Method used to append a list of representations (or a single representation) and their list of
-        external_ids (or a single external_id) to the main dataframe. In order to do so, a new dataframe is created
-        for the arguments passed by the user and it will be appended to the original dataframe. The logic behind the
-        creation of the dataframe is the same as the constructor, with only one difference: the internal_id index is
-        generated from the original dataframe one (so that the internal_ids are consecutive).
+        external_ids (or a single external_id) to the container. The internal_ids of the new representations are
+        generated from the last internal id in the container (so that the internal_ids are consecutive).
 
         Args:
             external_id (Union[List[Union[str, None]], Union[str, None]]): list containing the user defined ids for the
@@ -106,23 +123,28 @@ class RepresentationContainer:
         if len(representation) != len(external_id):
             raise ValueError("Representation and external_id lists must have the same length")
 
-        if len(self.get_internal_index()) == 0:
+        if len(self.__internal_id_list) == 0:
             next_internal_id = 0
         else:
-            next_internal_id = self.__dataframe.index.get_level_values('internal_id')[-1] + 1
-        new_dataframe = pd.DataFrame({'external_id': external_id, 'representation': representation})
-        new_dataframe['internal_id'] = list(range(next_internal_id, len(representation) + next_internal_id))
-        new_dataframe.set_index(['internal_id', 'external_id'], inplace=True)
-
-        self.__dataframe = self.__dataframe.append(new_dataframe)
+            next_internal_id = self.__internal_id_list[-1] + 1
+
+        for new_representation, new_external_id in zip(representation, external_id):
+            if isinstance(new_external_id, str):
+                self.__external_positions.setdefault(new_external_id, len(self.__representation_list))
+            else:
+                new_external_id = None
+            self.__internal_id_list.append(next_internal_id)
+            self.__external_id_list.append(new_external_id)
+            self.__representation_list.append(new_representation)
+            next_internal_id += 1
 
     def pop(self, id: Union[str, int]):
         """
-        Remove a specific row from the dataframe identified by the external or internal id passed as an argument.
+        Remove a specific row from the container identified by the external or internal id passed as an argument.
         The representation corresponding to the selected row is also returned (in case it's needed).
 
         Args:
-            id(Union[str, int]): used to access the row to remove from the dataframe. If it is an integer, it means
+            id(Union[str, int]): used to access the row to remove from the container. If it is an integer, it means
                 it refers to the internal_id index, if it is a string, it means that it refers to the external_id index
 
         Returns:
@@ -130,38 +152,69 @@ class RepresentationContainer:
         """
         removed_representation = self[id]
         if isinstance(id, int):
-            self.__dataframe = self.__dataframe.drop(id, level=0)
-        elif isinstance(id, str):
-            self.__dataframe = self.__dataframe.drop(id, level=1)
+            position = self.__internal_id_list.index(id)
+        else:
+            position = self.__external_positions[id]
+
+        del self.__internal_id_list[position]
+        del self.__external_id_list[position]
+        del self.__representation_list[position]
+        self.__set_data(self.__internal_id_list, self.__external_id_list, self.__representation_list)
+
         return removed_representation
 
     def __getitem__(self, item: Union[str, int]):
         """
         Access a specific representation using an index value. The index value can be either string or integer,
-        if it is an integer, it means that it is referring to the 'internal_id' index, otherwise if it is a string,
-        it means that it is referring to the 'external_id' index.
+        if it is an integer, it means that it is referring to the 'internal_id' index (it is used as position),
+        otherwise if it is a string, it means that it is referring to the 'external_id' index.
 
         Args:
             item (Union[str, int]): value used to refer to a specific representation by accessing the index columns
         """
         if isinstance(item, int):
-            return self.__dataframe.iloc[item]['representation']
+            return self.__representation_list[item]
         elif isinstance(item, str):
-            return self.__dataframe.loc(axis=0)[pd.IndexSlice[:, item]]['representation'].item()
+            return self.__representation_list[self.__external_positions[item]]
 
     def __iter__(self) -> Iterator[Dict]:
         for internal_index, external_index, representation in \
-                zip(self.get_internal_index(), self.get_external_index(), self.get_representations()):
+                zip(self.__internal_id_list, self.get_external_index(), self.__representation_list):
             yield {'internal_id': internal_index, 'external_id': external_index, 'representation': representation}
 
     def __len__(self):
-        return len(self.get_internal_index())
+        return len(self.__internal_id_list)
+
+    def __getstate__(self):
+        return self.__internal_id_list, self.__external_id_list, self.__representation_list
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # container pickled by the dataframe based implementation
+            dataframe = state['_RepresentationContainer__dataframe']
+            state = (dataframe.index.get_level_values('internal_id'),
+                     dataframe.index.get_level_values('external_id'),
+                     dataframe['representation'])
+        self.__set_data(*state)
 
     def __eq__(self, other):
-        return self.__dataframe.equals(other.__dataframe)
+        if not isinstance(other, RepresentationContainer):
+            return False
+
+        if self.__internal_id_list != other.__internal_id_list or self.__external_id_list != other.__external_id_list:
+            return False
+
+        # the comparison of some representations (for example the EmbeddingField) is element-wise
+        return all(np.all(representation == other_representation) for representation, other_representation
+                   in zip(self.__representation_list, other.__representation_list))
 
     def __str__(self):
-        return str(self.__dataframe)
+        import pandas as pd
+
+        dataframe = pd.DataFrame({'internal_id': self.__internal_id_list,
+                                  'external_id': self.get_external_index(),
+                                  'representation': self.__representation_list})
+        return str(dataframe.set_index(['internal_id', 'external_id']))
 
     def __repr__(self):
         return str(self)
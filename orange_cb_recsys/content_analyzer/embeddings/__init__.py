@@ -1,5 +1,23 @@
-from . import embedding_learner
-from . import embedding_loader
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
 
-from .embedding_learner import *
-from .embedding_loader import *
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'GensimDoc2Vec': '.embedding_learner',
+    'GensimFastText': '.embedding_learner',
+    'GensimLatentSemanticAnalysis': '.embedding_learner',
+    'GensimRandomIndexing': '.embedding_learner',
+    'GensimWord2Vec': '.embedding_learner',
+    'Gensim': '.embedding_loader',
+    'Sbert': '.embedding_loader',
+    'Wikipedia2VecLoader': '.embedding_loader',
+    'EmbeddingModelRegistry': '.model_registry',
+    'embedding_model_registry': '.model_registry'
+}, {
+    'doc2vec': '.embedding_learner.doc2vec',
+    'fasttext': '.embedding_learner.fasttext',
+    'gensim': '.embedding_loader.gensim',
+    'latent_semantic_analysis': '.embedding_learner.latent_semantic_analysis',
+    'random_indexing': '.embedding_learner.random_indexing',
+    'sbert': '.embedding_loader.sbert',
+    'wiki2vec_loader': '.embedding_loader.wiki2vec_loader',
+    'word2vec': '.embedding_learner.word2vec'
+})
@@ -1,5 +1,9 @@
-from .doc2vec import GensimDoc2Vec
-from .fasttext import GensimFastText
-from .latent_semantic_analysis import GensimLatentSemanticAnalysis
-from .random_indexing import GensimRandomIndexing
-from .word2vec import GensimWord2Vec
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'GensimDoc2Vec': '.doc2vec',
+    'GensimFastText': '.fasttext',
+    'GensimLatentSemanticAnalysis': '.latent_semantic_analysis',
+    'GensimRandomIndexing': '.random_indexing',
+    'GensimWord2Vec': '.word2vec'
+})
@@ -1,8 +1,7 @@
-from typing import List
-
 from gensim.models.doc2vec import Doc2Vec, TaggedDocument
 
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.embedding_learner import GensimWordEmbeddingLearner
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus, MappedCorpus
 
 
 class GensimDoc2Vec(GensimWordEmbeddingLearner):
@@ -11,12 +10,16 @@ class GensimDoc2Vec(GensimWordEmbeddingLearner):
     Implementation of Doc2Vec using the Gensim library.
     """
 
-    def __init__(self, reference: str = None, auto_save: bool = True, **kwargs):
-        super().__init__(reference, auto_save, ".model", **kwargs)
+    def __init__(self, reference: str = None, auto_save: bool = True, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, ".model", corpus_cache, **kwargs)
 
-    def fit_model(self, corpus: List):
-        tagged_data = [TaggedDocument(doc, [i]) for i, doc in enumerate(corpus)]
-        self.model = Doc2Vec(tagged_data, **self.additional_parameters)
+    def fit_model(self, corpus: StreamingCorpus):
+        if corpus.cache_path is not None:
+            # when reading the cache, Doc2Vec tags each document with its line number
+            self.model = Doc2Vec(corpus_file=corpus.build_cache(), **self.additional_parameters)
+        else:
+            tagged_data = MappedCorpus(corpus, lambda i, doc: TaggedDocument(doc, [i]))
+            self.model = Doc2Vec(tagged_data, **self.additional_parameters)
 
     def load_model(self):
         return Doc2Vec.load(self.reference)
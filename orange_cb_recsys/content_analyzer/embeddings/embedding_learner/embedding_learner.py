@@ -1,14 +1,20 @@
+import os
+import weakref
 from abc import abstractmethod
 from typing import List, Union
 
 import numpy as np
 
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus
 from orange_cb_recsys.content_analyzer.embeddings.embedding_source import \
-    EmbeddingSource
+    EmbeddingSource, keyed_vectors_embedding_batch, vocabulary_embedding_batch
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
 from orange_cb_recsys.utils.check_tokenization import check_tokenized, tokenize_in_sentences, check_not_tokenized
-from orange_cb_recsys.utils.const import logger
+
+# projection matrices of the models of the GensimProjectionsWordEmbeddingLearners, computed once for each model (which
+# may be shared by many learners, see the embedding_model_registry)
+_projection_matrices = weakref.WeakKeyDictionary()
 
 
 class EmbeddingLearner(EmbeddingSource):
@@ -52,10 +58,17 @@ class EmbeddingLearner(EmbeddingSource):
             done so that the user can define a file path with or without the extension (so for example, both
             "somedir/model_file" and "somedir/model_file.model" are acceptable)
 
+        corpus_cache (str): path of the file where the processed training documents are cached in the line-sentence
+            format (see StreamingCorpus), so that the source is processed only once. The Gensim models which can
+            read their training data from a file (Word2Vec, FastText, Doc2Vec) are trained directly from the cache,
+            which allows them to use all their worker threads (for example passing "workers=8"). If None, the
+            documents are processed once as well, but they are only kept in a temporary file during the training.
+            The cache is only valid for the same source, fields and preprocessors, it must be deleted if they change
+
         kwargs: arguments that you would pass to any of the models if using them from their original library (for
             example, you can pass "workers=4, min_count=1" to the FastText model)
     """
-    def __init__(self, file_path: str, auto_save: bool, extension: str, **kwargs):
+    def __init__(self, file_path: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
         # adds the extension related to the learner if the user didn't pass it
         if file_path is not None and not file_path.endswith(extension):
             file_path += extension
@@ -63,12 +76,17 @@ class EmbeddingLearner(EmbeddingSource):
         super().__init__(file_path)
 
         self.__auto_save = auto_save
+        self.__corpus_cache = corpus_cache
         self.__additional_parameters = kwargs
 
     @property
     def additional_parameters(self):
         return self.__additional_parameters
 
+    @property
+    def corpus_cache(self) -> str:
+        return self.__corpus_cache
+
     @abstractmethod
     def load_model(self):
         raise NotImplementedError
@@ -92,22 +110,42 @@ class EmbeddingLearner(EmbeddingSource):
         if not isinstance(preprocessor_list, list):
             preprocessor_list = [preprocessor_list]
 
-        self.fit_model(self.extract_corpus(source, field_list, preprocessor_list))
+        with self.streaming_corpus(source, field_list, preprocessor_list) as corpus:
+            self.fit_model(corpus)
 
         if self.__auto_save and self.reference is not None:
             self.save()
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         """
         This method creates the model, in different ways according to the various implementations.
         The model isn't then returned, but gets stored in the 'model' instance attribute.
 
         Args:
-            corpus (List): data extracted and processed from the raw source which will be used to train the model
+            corpus (StreamingCorpus): restartable iterable over the data extracted and processed from the raw source
+                which will be used to train the model
         """
         raise NotImplementedError
 
+    def streaming_corpus(self, source: RawInformationSource, field_list: List[str],
+                         preprocessor_list: List[InformationProcessor]) -> StreamingCorpus:
+        """
+        Creates the corpus used to train the model, which extracts the data from the source and processes it during
+        the first pass (the following ones read it from the corpus cache of the learner or from a temporary file),
+        without keeping it in memory
+
+        Args:
+            source (RawInformationSource): raw data on which the fitting process will be done
+            field_list (List[str]): list of fields to consider from the raw data
+            preprocessor_list (List[InformationProcessor]): list of information processors that will be used to
+                process the raw data in the fields defined in field list
+
+        Returns:
+            corpus (StreamingCorpus): restartable iterable over the processed data
+        """
+        return StreamingCorpus(source, field_list, preprocessor_list, self.process_data_granularity, self.__corpus_cache)
+
     def extract_corpus(self, source: RawInformationSource, field_list: List[str],
                        preprocessor_list: List[InformationProcessor]) -> list:
         """
@@ -123,18 +161,8 @@ class EmbeddingLearner(EmbeddingSource):
         Returns:
             corpus (list): List of processed data
         """
-        corpus = []
-        # iter the source
-        for i, doc in enumerate(source):
-            logger.info("Document %d", i)
-            doc_data = ""
-            for field_name in field_list:
-                # apply preprocessing and save the data in the list
-                doc_data += " " + doc[field_name].lower()
-            for preprocessor in preprocessor_list:
-                doc_data = preprocessor.process(doc_data)
-            corpus.append(self.process_data_granularity(doc_data))
-        return corpus
+        return list(StreamingCorpus(source, field_list, preprocessor_list, self.process_data_granularity,
+                                    temporary_file=False))
 
     @abstractmethod
     def process_data_granularity(self, doc_data: str) -> Union[List[str], str]:
@@ -163,8 +191,8 @@ class WordEmbeddingLearner(EmbeddingLearner):
     granularity, meaning that the model expects a list of words as training data
     """
 
-    def __init__(self, reference: str, auto_save: bool, extension: str, **kwargs):
-        super().__init__(reference, auto_save, extension, **kwargs)
+    def __init__(self, reference: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, extension, corpus_cache, **kwargs)
 
     def process_data_granularity(self, doc_data: str) -> List[str]:
         return check_tokenized(doc_data)
@@ -174,7 +202,7 @@ class WordEmbeddingLearner(EmbeddingLearner):
         raise NotImplementedError
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         raise NotImplementedError
 
     @abstractmethod
@@ -199,21 +227,55 @@ class GensimWordEmbeddingLearner(WordEmbeddingLearner):
     Class that contains the generic behavior of the Gensim models
     """
 
-    def __init__(self, reference: str, auto_save: bool, extension: str, **kwargs):
-        super().__init__(reference, auto_save, extension, **kwargs)
+    def __init__(self, reference: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, extension, corpus_cache, **kwargs)
 
     def get_vector_size(self) -> int:
         return self.model.vector_size
 
+    @staticmethod
+    def training_data(corpus: StreamingCorpus, corpus_argument: str = 'sentences') -> dict:
+        """
+        Returns the argument used to pass the training data to the Gensim model: if the corpus is cached, the model
+        reads it directly from the cache (corpus_file argument, which allows to use all the worker threads),
+        otherwise the model iterates over the corpus
+
+        Args:
+            corpus (StreamingCorpus): corpus used to train the model
+            corpus_argument (str): name of the argument of the model used to pass an iterable corpus
+
+        Returns:
+            dict: the argument to pass to the model, in the form {argument name: training data}
+        """
+        if corpus.cache_path is not None:
+            return {'corpus_file': corpus.build_cache()}
+        return {corpus_argument: corpus}
+
     def get_embedding(self, word: str) -> np.ndarray:
         return self.model[word]
 
+    def get_embedding_batch(self, word_list: List[str]) -> np.ndarray:
+        from gensim.models import KeyedVectors
+        from gensim.models.fasttext import FastTextKeyedVectors
+
+        # the model is either the KeyedVectors or a full model (Doc2Vec, FastText) storing them in the wv attribute
+        keyed_vectors = self.model if isinstance(self.model, KeyedVectors) else self.model.wv
+        if isinstance(keyed_vectors, FastTextKeyedVectors):
+            # the FastText vectors can be computed for the words out of the vocabulary too
+            oov_embedding = keyed_vectors.get_vector
+        elif keyed_vectors is not self.model:
+            # the Doc2Vec model also returns the vectors of the documents whose tag is equal to the word
+            oov_embedding = self.get_embedding
+        else:
+            oov_embedding = None
+        return keyed_vectors_embedding_batch(keyed_vectors, word_list, oov_embedding)
+
     @abstractmethod
     def load_model(self):
         raise NotImplementedError
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         raise NotImplementedError
 
     @abstractmethod
@@ -228,32 +290,88 @@ class GensimWordEmbeddingLearner(WordEmbeddingLearner):
 class GensimProjectionsWordEmbeddingLearner(WordEmbeddingLearner):
     """
     Class that contains the generic behavior of the Gensim models using projections
+
+    Once the model is fitted, the vector of a word is a fixed row of the projection of the vocabulary, so the
+    projection matrix (with a row for each word of the vocabulary and a column for each topic) is computed once for
+    each model and the vectors are retrieved from it. The matrix is saved next to the model (in the reference path
+    with the PROJECTION_MATRIX_EXTENSION) and loaded with it if it's up to date
     """
 
-    def __init__(self, reference: str, auto_save: bool, extension: str, **kwargs):
-        super().__init__(reference, auto_save, extension, **kwargs)
+    PROJECTION_MATRIX_EXTENSION = '.projection_matrix.npy'
+
+    def __init__(self, reference: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, extension, corpus_cache, **kwargs)
 
     def get_vector_size(self) -> int:
         return self.model.num_topics
 
+    @property
+    def projection_matrix(self) -> np.ndarray:
+        """
+        Matrix of the vectors of the words of the vocabulary (the row of a word is the one of its id in the
+        dictionary of the model), computed the first time it's requested for the model
+        """
+        projection_matrix = _projection_matrices.get(self.model)
+        if projection_matrix is None:
+            projection_matrix = self.__load_projection_matrix()
+            if projection_matrix is None:
+                projection_matrix = self.compute_projection_matrix()
+            _projection_matrices[self.model] = projection_matrix
+        return projection_matrix
+
+    def compute_projection_matrix(self) -> np.ndarray:
+        """
+        Computes the projection matrix of the model, transforming the bow of each word of the vocabulary (where the
+        value for the word is 1)
+
+        Returns:
+            projection_matrix (np.ndarray): float32 matrix with a row for each word of the vocabulary
+        """
+        from gensim.matutils import corpus2dense
+
+        word_bows = [[(word_id, 1)] for word_id in range(len(self.model.id2word))]
+        return corpus2dense(self.model[word_bows], num_terms=self.get_vector_size(),
+                            num_docs=len(word_bows), dtype=np.float32).T
+
+    def __projection_matrix_path(self) -> str:
+        return self.reference + self.PROJECTION_MATRIX_EXTENSION
+
+    def __load_projection_matrix(self) -> Union[np.ndarray, None]:
+        """
+        Loads the projection matrix saved next to the model, if it has been saved after the model
+        """
+        if self.reference is None or not os.path.isfile(self.reference):
+            return None
+        path = self.__projection_matrix_path()
+        if not os.path.isfile(path) or os.path.getmtime(path) < os.path.getmtime(self.reference):
+            return None
+        projection_matrix = np.load(path)
+        if projection_matrix.shape != (len(self.model.id2word), self.get_vector_size()):
+            return None
+        return projection_matrix
+
+    def save(self):
+        super().save()
+        np.save(self.__projection_matrix_path(), self.projection_matrix)
+
     def get_embedding(self, word: str) -> np.ndarray:
-        # the word is converted to the id stored in the model and a bow for the word is created (where the value for
-        # the word will be 1). The embedding vector is then created from the bow
-        # if the word is not found in the trained model, a key error exception is thrown, which means that the
-        # embedding vector will be [0. 0. ... 0.]
-        word = self.model.id2word.doc2idx([word])[0]
-        if word == -1:
+        # the word is converted to the id stored in the model and its vector is the corresponding row of the
+        # projection matrix. If the word is not found in the trained model, a key error exception is thrown, which
+        # means that the embedding vector will be [0. 0. ... 0.]
+        word_id = self.model.id2word.token2id.get(word, -1)
+        if word_id == -1:
             raise KeyError
-        else:
-            word = [(word, 1)]
-            return np.array([value[1] for value in self.model[word]], dtype=np.float64)
+        return self.projection_matrix[word_id]
+
+    def get_embedding_batch(self, word_list: List[str]) -> np.ndarray:
+        return vocabulary_embedding_batch(self.model.id2word.token2id, self.projection_matrix, word_list)
 
     @abstractmethod
     def load_model(self):
         raise NotImplementedError
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         raise NotImplementedError
 
     @abstractmethod
@@ -271,8 +389,8 @@ class SentenceEmbeddingLearner(EmbeddingLearner):
     'sentence' granularity, meaning that the model expects a list of sentences as training data
     """
 
-    def __init__(self, reference: str, auto_save: bool, extension: str, **kwargs):
-        super().__init__(reference, auto_save, extension, **kwargs)
+    def __init__(self, reference: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, extension, corpus_cache, **kwargs)
 
     def process_data_granularity(self, doc_data: str) -> List[str]:
         return tokenize_in_sentences(doc_data)
@@ -282,7 +400,7 @@ class SentenceEmbeddingLearner(EmbeddingLearner):
         raise NotImplementedError
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         raise NotImplementedError
 
     @abstractmethod
@@ -308,8 +426,8 @@ class DocumentEmbeddingLearner(EmbeddingLearner):
     'document' granularity, meaning that the model expects a list of documents as training data
     """
 
-    def __init__(self, reference: str, auto_save: bool, extension: str, **kwargs):
-        super().__init__(reference, auto_save, extension, **kwargs)
+    def __init__(self, reference: str, auto_save: bool, extension: str, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, extension, corpus_cache, **kwargs)
 
     def process_data_granularity(self, doc_data: str) -> str:
         return check_not_tokenized(doc_data)
@@ -319,7 +437,7 @@ class DocumentEmbeddingLearner(EmbeddingLearner):
         raise NotImplementedError
 
     @abstractmethod
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         raise NotImplementedError
 
     @abstractmethod
@@ -1,7 +1,7 @@
-from typing import List
 from gensim.models.fasttext import FastText, save_facebook_model, load_facebook_vectors
 
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.embedding_learner import GensimWordEmbeddingLearner
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus
 
 
 class GensimFastText(GensimWordEmbeddingLearner):
@@ -10,11 +10,11 @@ class GensimFastText(GensimWordEmbeddingLearner):
     Implementation of FastText using the Gensim library.
     """
 
-    def __init__(self, reference: str = None, auto_save: bool = True, **kwargs):
-        super().__init__(reference, auto_save, ".bin", **kwargs)
+    def __init__(self, reference: str = None, auto_save: bool = True, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, ".bin", corpus_cache, **kwargs)
 
-    def fit_model(self, corpus: List):
-        self.model = FastText(sentences=corpus, **self.additional_parameters)
+    def fit_model(self, corpus: StreamingCorpus):
+        self.model = FastText(**self.training_data(corpus), **self.additional_parameters)
 
     def load_model(self):
         return load_facebook_vectors(self.reference)
@@ -1,9 +1,9 @@
-from typing import List
-
+import numpy as np
 from gensim.corpora import Dictionary
 from gensim.models import LsiModel
 
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.embedding_learner import GensimProjectionsWordEmbeddingLearner
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus, MappedCorpus
 
 
 class GensimLatentSemanticAnalysis(GensimProjectionsWordEmbeddingLearner):
@@ -12,16 +12,16 @@ class GensimLatentSemanticAnalysis(GensimProjectionsWordEmbeddingLearner):
     Class that implements latent semantic analysis using Gensim
     """
 
-    def __init__(self, reference: str = None, auto_save: bool = True,  **kwargs):
-        super().__init__(reference, auto_save, ".model", **kwargs)
+    def __init__(self, reference: str = None, auto_save: bool = True, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, ".model", corpus_cache, **kwargs)
 
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         """
         This method creates the model, using Gensim Latent Semantic Analysis.
         The model isn't then returned, but gets stored in the 'model' class attribute.
         """
         dictionary = Dictionary(corpus)
-        word_docs_matrix = [dictionary.doc2bow(doc) for doc in corpus]
+        word_docs_matrix = MappedCorpus(corpus, lambda i, doc: dictionary.doc2bow(doc))
         self.model = LsiModel(word_docs_matrix, id2word=dictionary, **self.additional_parameters)
 
     def load_model(self):
@@ -30,6 +30,15 @@ class GensimLatentSemanticAnalysis(GensimProjectionsWordEmbeddingLearner):
     def get_vector_size(self) -> int:
         return len(self.model.get_topics())
 
+    def compute_projection_matrix(self) -> np.ndarray:
+        """
+        The projection of the bow of a word is the row of the left singular vectors of the word (the values which
+        are almost zero are discarded by the model when transforming a bow, so they are set to zero)
+        """
+        projection_matrix = np.array(self.model.projection.u[:, :self.get_vector_size()], dtype=np.float32)
+        projection_matrix[np.abs(projection_matrix) < 1e-9] = 0
+        return projection_matrix
+
     def __str__(self):
         return "GensimLatentSemanticAnalysis"
 
@@ -1,9 +1,9 @@
-from typing import List
-
+import numpy as np
 from gensim.models import RpModel
 from gensim.corpora import Dictionary
 
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.embedding_learner import GensimProjectionsWordEmbeddingLearner
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus
 
 
 class GensimRandomIndexing(GensimProjectionsWordEmbeddingLearner):
@@ -12,10 +12,10 @@ class GensimRandomIndexing(GensimProjectionsWordEmbeddingLearner):
     Class that implements the random indexing using Gensim
     """
 
-    def __init__(self, reference: str = None, auto_save: bool = True, **kwargs):
-        super().__init__(reference, auto_save, ".model", **kwargs)
+    def __init__(self, reference: str = None, auto_save: bool = True, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, ".model", corpus_cache, **kwargs)
 
-    def fit_model(self, corpus: List):
+    def fit_model(self, corpus: StreamingCorpus):
         """
         This method creates the model, using Gensim Random Projection.
         The model isn't then returned, but gets stored in the 'model' class attribute.
@@ -26,6 +26,17 @@ class GensimRandomIndexing(GensimProjectionsWordEmbeddingLearner):
     def load_model(self):
         return RpModel.load(self.reference)
 
+    def compute_projection_matrix(self) -> np.ndarray:
+        """
+        The projection of the bow of a word is the column of the random projection of the word, scaled by the square
+        root of the number of topics (the values which are almost zero are discarded by the model when transforming a
+        bow, so they are set to zero)
+        """
+        projection_matrix = np.array(self.model.projection.T, dtype=np.float32)
+        projection_matrix /= np.float32(np.sqrt(self.model.num_topics))
+        projection_matrix[np.isclose(projection_matrix, 0.0) | ~np.isfinite(projection_matrix)] = 0
+        return projection_matrix
+
     def __str__(self):
         return "GensimRandomProjections"
 
@@ -0,0 +1,250 @@
+import os
+import pickle
+import tempfile
+import uuid
+import weakref
+from typing import List, Callable, Iterator, Union
+
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+from orange_cb_recsys.content_analyzer.preprocessing_pool import apply_preprocessors
+from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
+from orange_cb_recsys.utils.const import logger
+
+
+class StreamingCorpus:
+    """
+    Restartable iterable over the documents extracted from a raw source to train an embedding learner: the whole
+    corpus is never kept in memory, so it can be used by the models which make many passes over it (for example the
+    vocabulary pass and the epochs of Word2Vec). The documents are processed in chunks, so that the preprocessors can
+    process many data together (see the process_batch method of the InformationProcessor).
+
+    The source is read and processed only once: during the first complete pass over the corpus the processed
+    documents are pickled in a temporary file, which is read by the following passes (and removed by the close
+    method, or when the corpus is garbage collected). If temporary_file is False, the documents are read from the
+    source and processed again at each pass.
+
+    Optionally, the processed documents can be cached in a file in the line-sentence format (a line for each document,
+    with its tokens separated by a space), so that the source is read and processed only once: the cache is written
+    during the first complete pass over the corpus (it replaces the previous one only when the pass is completed) and
+    read in the following ones. Keep in mind that a cache is only valid for the same source, fields and preprocessors,
+    so it must be deleted if they change. The cache is also used by the Gensim models which can read their training
+    data from a file (using all their worker threads, see the corpus_file parameter of Word2Vec).
+    Since the line-sentence format only allows tokenized documents, the cache can only be used if the granularity
+    function returns a list of tokens for each document (the whitespaces in the tokens are considered as separators)
+
+    EXAMPLE:
+        corpus = StreamingCorpus(JSONFile(file_path), ['Plot', 'Genre'], [NLTK()], check_tokenized, 'plot.cor')
+        Word2Vec(sentences=corpus, workers=4)
+
+    Args:
+        source (RawInformationSource): raw data from which the documents are extracted
+        field_list (List[str]): fields of the raw data whose values (joined together) form a document
+        preprocessor_list (List[InformationProcessor]): preprocessors applied to each document, in order
+        granularity_function (Callable): function applied to each processed document to fit the granularity of the
+            learner (for example, check_tokenized for the learners with word granularity)
+        cache_path (str): path of the line-sentence file where the processed documents are cached, if None the
+            documents are only kept in the temporary file of the corpus
+        chunk_size (int): number of documents processed together
+        temporary_file (bool): if True and there's no cache path, the processed documents are stored in a temporary
+            file during the first pass, otherwise they are processed again at each pass (useful if the corpus is
+            iterated only once)
+    """
+
+    def __init__(self, source: RawInformationSource, field_list: List[str],
+                 preprocessor_list: List[InformationProcessor], granularity_function: Callable,
+                 cache_path: str = None, chunk_size: int = 1000, temporary_file: bool = True):
+        self.__source = source
+        self.__field_list = field_list
+        self.__preprocessor_list = preprocessor_list
+        self.__granularity_function = granularity_function
+        self.__cache_path = cache_path
+        self.__chunk_size = chunk_size
+        self.__temporary_file = temporary_file
+        # path of the temporary file, set once a pass over the source has been completed
+        self.__temporary_path = None
+        self.__finalizer = None
+
+    @property
+    def source(self) -> RawInformationSource:
+        return self.__source
+
+    @property
+    def field_list(self) -> List[str]:
+        return self.__field_list
+
+    @property
+    def preprocessor_list(self) -> List[InformationProcessor]:
+        return self.__preprocessor_list
+
+    @property
+    def cache_path(self) -> str:
+        return self.__cache_path
+
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def is_cached(self) -> bool:
+        """
+        True if the processed documents have already been cached
+        """
+        return self.__cache_path is not None and os.path.isfile(self.__cache_path)
+
+    def __iter__(self) -> Iterator[Union[List[str], str]]:
+        if self.__cache_path is None:
+            if not self.__temporary_file:
+                return self.__iter_source()
+            if self.__temporary_path is not None:
+                return self.__iter_temporary_file()
+            return self.__iter_source_writing_temporary_file()
+        if self.is_cached:
+            return self.__iter_cache()
+        return self.__iter_source_writing_cache()
+
+    def close(self):
+        """
+        Removes the temporary file of the processed documents, if any (the following passes will process the source
+        again)
+        """
+        if self.__finalizer is not None:
+            self.__finalizer()
+        self.__finalizer = None
+        self.__temporary_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def build_cache(self) -> str:
+        """
+        Processes all the documents and writes them in the cache, if they have not been cached yet
+
+        Returns:
+            cache_path (str): path of the cache
+        """
+        if self.__cache_path is None:
+            raise ValueError("The corpus has no cache path")
+        if not self.is_cached:
+            for _ in self.__iter_source_writing_cache():
+                pass
+        return self.__cache_path
+
+    def __iter_source(self) -> Iterator[Union[List[str], str]]:
+        """
+        Reads the documents from the source and processes them, a chunk at a time
+        """
+        for processed_chunk in self.__iter_source_chunks():
+            yield from processed_chunk
+
+    def __iter_source_chunks(self) -> Iterator[List[Union[List[str], str]]]:
+        """
+        Reads the documents from the source and processes them, yielding the processed documents of each chunk
+        """
+        n_documents = 0
+        raw_data_chunk = []
+        for raw_content in self.__source:
+            # the values of the fields of the content are joined together in a single document
+            raw_data_chunk.append(''.join(" " + raw_content[field_name].lower() for field_name in self.__field_list))
+            if len(raw_data_chunk) == self.__chunk_size:
+                yield self.__process_chunk(raw_data_chunk)
+                n_documents += len(raw_data_chunk)
+                raw_data_chunk = []
+        if len(raw_data_chunk) != 0:
+            yield self.__process_chunk(raw_data_chunk)
+            n_documents += len(raw_data_chunk)
+        logger.info("Extracted %d documents from the source", n_documents)
+
+    def __process_chunk(self, raw_data_chunk: List[str]) -> List[Union[List[str], str]]:
+        return [self.__granularity_function(doc_data)
+                for doc_data in apply_preprocessors(raw_data_chunk, self.__preprocessor_list)]
+
+    def __iter_source_writing_cache(self) -> Iterator[List[str]]:
+        """
+        Reads the documents from the source and processes them, writing them in the cache. The documents are written in
+        a temporary file which replaces the cache only if the pass over the source is completed
+        """
+        directory = os.path.dirname(self.__cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(self.__cache_path, uuid.uuid4().hex)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8', newline='\n') as cache_file:
+                for document in self.__iter_source():
+                    if not isinstance(document, list):
+                        raise ValueError("Only the tokenized documents can be cached in the line-sentence format")
+                    tokens = ' '.join(document).split()
+                    cache_file.write(' '.join(tokens) + '\n')
+                    # the document is yielded as it will be read from the cache, so that all the passes are equal
+                    yield tokens
+            os.replace(tmp_path, self.__cache_path)
+        finally:
+            if os.path.isfile(tmp_path):
+                os.remove(tmp_path)
+
+    def __iter_source_writing_temporary_file(self) -> Iterator[Union[List[str], str]]:
+        """
+        Reads the documents from the source and processes them, pickling the processed documents of each chunk in a
+        temporary file. The file is used by the following passes only if this pass over the source is completed
+        """
+        file_descriptor, tmp_path = tempfile.mkstemp(suffix='.corpus.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as tmp_file:
+                for processed_chunk in self.__iter_source_chunks():
+                    pickle.dump(processed_chunk, tmp_file, protocol=pickle.HIGHEST_PROTOCOL)
+                    yield from processed_chunk
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        # another complete pass may have been running at the same time
+        self.close()
+        self.__temporary_path = tmp_path
+        self.__finalizer = weakref.finalize(self, _remove_file, tmp_path)
+
+    def __iter_temporary_file(self) -> Iterator[Union[List[str], str]]:
+        with open(self.__temporary_path, 'rb') as tmp_file:
+            while True:
+                try:
+                    processed_chunk = pickle.load(tmp_file)
+                except EOFError:
+                    break
+                yield from processed_chunk
+
+    def __iter_cache(self) -> Iterator[List[str]]:
+        with open(self.__cache_path, 'r', encoding='utf-8', newline='\n') as cache_file:
+            for line in cache_file:
+                yield line.split()
+
+    def __str__(self):
+        return "StreamingCorpus"
+
+    def __repr__(self):
+        return "< StreamingCorpus: source = {}; field_list = {}; preprocessor_list = {}; cache_path = {} >".format(
+            self.__source, self.__field_list, self.__preprocessor_list, self.__cache_path)
+
+
+def _remove_file(path: str):
+    if os.path.isfile(path):
+        os.remove(path)
+
+
+class MappedCorpus:
+    """
+    Restartable iterable which applies a function to each document of a corpus (for example to convert the documents
+    in bag of words), without keeping the converted documents in memory
+
+    Args:
+        corpus (StreamingCorpus): restartable iterable over the documents
+        map_function (Callable): function applied to the position of each document in the corpus and to the document
+    """
+
+    def __init__(self, corpus: StreamingCorpus, map_function: Callable[[int, object], object]):
+        self.__corpus = corpus
+        self.__map_function = map_function
+
+    def __iter__(self) -> Iterator:
+        for i, document in enumerate(self.__corpus):
+            yield self.__map_function(i, document)
@@ -1,8 +1,7 @@
-from typing import List
-
 from gensim.models import Word2Vec, KeyedVectors
 
 from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.embedding_learner import GensimWordEmbeddingLearner
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus
 
 
 class GensimWord2Vec(GensimWordEmbeddingLearner):
@@ -11,11 +10,11 @@ class GensimWord2Vec(GensimWordEmbeddingLearner):
     Implementation of Word2Vec using the Gensim library
     """
 
-    def __init__(self, reference: str = None, auto_save: bool = True, **kwargs):
-        super().__init__(reference, auto_save, ".bin", **kwargs)
+    def __init__(self, reference: str = None, auto_save: bool = True, corpus_cache: str = None, **kwargs):
+        super().__init__(reference, auto_save, ".bin", corpus_cache, **kwargs)
 
-    def fit_model(self, corpus: List):
-        self.model = Word2Vec(sentences=corpus, **self.additional_parameters).wv
+    def fit_model(self, corpus: StreamingCorpus):
+        self.model = Word2Vec(**self.training_data(corpus), **self.additional_parameters).wv
 
     def load_model(self):
         return KeyedVectors.load_word2vec_format(self.reference, binary=True)
@@ -1,3 +1,7 @@
-from .gensim import Gensim
-from .sbert import Sbert
-from .wiki2vec_loader import Wikipedia2VecLoader
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'Gensim': '.gensim',
+    'Sbert': '.sbert',
+    'Wikipedia2VecLoader': '.wiki2vec_loader'
+})
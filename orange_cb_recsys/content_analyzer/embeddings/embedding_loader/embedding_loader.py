@@ -13,6 +13,19 @@ class EmbeddingLoader(EmbeddingSource):
     def __init__(self, reference: str):
         super().__init__(reference)
 
+    @classmethod
+    def accepts_reference(cls, reference: str) -> bool:
+        """
+        Checks, without loading the model, if the reference passed as argument may refer to a model that the loader
+        can load. It's used to find the loader of a model given only its reference, so that only the loaders that
+        may load the model try to load it (see EmbeddingTechnique.from_str_to_embedding_source).
+        By default every reference is accepted
+
+        Args:
+            reference (str): reference of the model (for example its name or its path)
+        """
+        return True
+
     @abstractmethod
     def load_model(self):
         raise NotImplementedError
@@ -1,6 +1,11 @@
+import os
+from typing import List
+
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loader import WordEmbeddingLoader
+from orange_cb_recsys.content_analyzer.embeddings.embedding_source import keyed_vectors_embedding_batch
 
 import gensim.downloader as downloader
+from gensim.models.fasttext import FastTextKeyedVectors
 import numpy as np
 
 
@@ -15,12 +20,27 @@ class Gensim(WordEmbeddingLoader):
     def __init__(self, model_name: str = 'glove-twitter-25'):
         super().__init__(model_name)
 
+    @classmethod
+    def accepts_reference(cls, reference: str) -> bool:
+        # only the names of the models of the gensim downloader are accepted
+        if os.path.exists(reference):
+            return False
+        try:
+            return reference in downloader.info()['models']
+        except OSError:
+            return False
+
     def get_vector_size(self) -> int:
         return self.model.vector_size
 
     def get_embedding(self, word: str) -> np.ndarray:
         return self.model[word]
 
+    def get_embedding_batch(self, word_list: List[str]) -> np.ndarray:
+        # the FastText vectors can be computed for the words out of the vocabulary too
+        oov_embedding = self.model.get_vector if isinstance(self.model, FastTextKeyedVectors) else None
+        return keyed_vectors_embedding_batch(self.model, word_list, oov_embedding)
+
     def load_model(self):
         # if the reference isn't in the possible models, FileNotFoundError is raised
         if self.reference in downloader.info()['models']:
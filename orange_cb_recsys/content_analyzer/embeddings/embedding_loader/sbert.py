@@ -1,20 +1,46 @@
+import os
+import re
+from typing import List
+
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loader import SentenceEmbeddingLoader
 
 from sentence_transformers import SentenceTransformer
 import numpy as np
 
+# extensions of the files of the models loaded by the other embedding sources, a reference with one of these extensions
+# is a path and not the name of a sbert model
+MODEL_FILE_EXTENSIONS = {'.bin', '.kv', '.model', '.txt', '.vec', '.gz', '.zip', '.pkl', '.npy'}
+
 
 class Sbert(SentenceEmbeddingLoader):
     """
-    This class loads the embeddings using the SentenceTransformer (from sbert).
+    This class loads the embeddings using the SentenceTransformer (from sbert). The sentences of many texts are
+    encoded together in batches of batch_size sentences (see EmbeddingSource.load_batch)
 
     Args:
         model_name_or_file_path (str): name of the embeddings model to download or path where the model is stored
             locally
+        batch_size (int): number of sentences encoded together by the model
     """
 
-    def __init__(self, model_name_or_file_path: str = 'paraphrase-distilroberta-base-v1'):
+    def __init__(self, model_name_or_file_path: str = 'paraphrase-distilroberta-base-v1', batch_size: int = 256):
         super().__init__(model_name_or_file_path)
+        self.__batch_size = batch_size
+
+    @property
+    def batch_size(self) -> int:
+        return self.__batch_size
+
+    @classmethod
+    def accepts_reference(cls, reference: str) -> bool:
+        # the model is either stored in a local directory or downloaded given its name. The references which don't
+        # exist are only accepted if they look like the name of a model ('model-name' or 'organization/model-name'),
+        # so that a wrong path of a local model file doesn't start the download of a model
+        if os.path.isdir(reference):
+            return True
+        if os.path.exists(reference) or os.path.splitext(reference)[1].lower() in MODEL_FILE_EXTENSIONS:
+            return False
+        return re.fullmatch(r'[\w\-]+(\.[\w\-]+)*(/[\w\-]+(\.[\w\-]+)*)?', reference) is not None
 
     def load_model(self):
         try:
@@ -28,6 +54,9 @@ class Sbert(SentenceEmbeddingLoader):
     def get_embedding(self, sentence: str) -> np.ndarray:
         return self.model.encode(sentence, show_progress_bar=False)
 
+    def get_embedding_batch(self, sentence_list: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(sentence_list, batch_size=self.__batch_size, show_progress_bar=False))
+
     def __str__(self):
         return "Sbert"
 
@@ -1,3 +1,5 @@
+import os
+
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loader import WordEmbeddingLoader
 import numpy as np
 from wikipedia2vec import Wikipedia2Vec
@@ -17,6 +19,11 @@ class Wikipedia2VecLoader(WordEmbeddingLoader):
     def __init__(self, path: str):
         super().__init__(path)
 
+    @classmethod
+    def accepts_reference(cls, reference: str) -> bool:
+        # the model is stored in a local binary file
+        return os.path.isfile(reference)
+
     def load_model(self):
         try:
             return Wikipedia2Vec.load(self.reference)
@@ -1,7 +1,10 @@
-from typing import List
+from typing import List, Callable, Dict
 from abc import ABC, abstractmethod
 import numpy as np
 
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_description
+from orange_cb_recsys.content_analyzer.embeddings.model_registry import embedding_model_registry, model_files_state
+
 
 class EmbeddingSource(ABC):
     """
@@ -15,7 +18,8 @@ class EmbeddingSource(ABC):
     the second is used for models stored locally that can be trained. Because of this, there
     shouldn't be any need for any other classes
 
-    model: embeddings model loaded from source
+    model: embeddings model loaded from source. The model is loaded through the embedding_model_registry, so the
+    sources of the process with the same class and reference share the same model, which is loaded only once
 
     Args:
         reference (str): where to find the model, could be the model name to download or the path where the model is
@@ -25,7 +29,8 @@ class EmbeddingSource(ABC):
     def __init__(self, reference: str):
         self.__reference = reference
         try:
-            self.__model = self.load_model() if self.__reference is not None else None
+            self.__model = embedding_model_registry.get_model(type(self), self.__reference, self.load_model) \
+                if self.__reference is not None else None
         except FileNotFoundError:
             self.__model = None
 
@@ -41,6 +46,38 @@ class EmbeddingSource(ABC):
     def model(self, model):
         self.__model = model
 
+    def __getstate__(self):
+        # the model of the registry isn't copied with the source, it's retrieved from the registry of the process
+        # where the source is copied (see __setstate__)
+        state = self.__dict__.copy()
+        if self.__model is not None and embedding_model_registry.contains_model(self.__model):
+            state['_EmbeddingSource__model'] = None
+            state['_EmbeddingSource__registry_model'] = True
+        return state
+
+    def __setstate__(self, state):
+        registry_model = state.pop('_EmbeddingSource__registry_model', False)
+        self.__dict__.update(state)
+        if registry_model:
+            self.__model = embedding_model_registry.get_model(type(self), self.__reference, self.load_model)
+
+    def fingerprint_description(self) -> str:
+        """
+        Describes the source in the fingerprint of a config or of a technique (see the content_fingerprints module).
+        Besides the parameters of the source, the model is described by the size and the last modification time of
+        the files stored at the reference, so that the fingerprint changes when the model is retrained or replaced
+        at the same reference. A model trained in memory (and not saved at the reference) can't be identified
+        outside of the process, so it's described by its identity
+        """
+        model_state = model_files_state(self.__reference)
+        if model_state is None and self.__model is not None and \
+                not embedding_model_registry.contains_model(self.__model):
+            model_state = 'in-memory model {}'.format(id(self.__model))
+
+        attributes = {name: value for name, value in self.__dict__.items() if name != '_EmbeddingSource__model'}
+        attributes['model'] = model_state
+        return '{}.{}({})'.format(type(self).__module__, type(self).__qualname__, object_description(attributes))
+
     def load(self, text: List[str]) -> np.ndarray:
         """
         Function that extracts from the embeddings model the vectors of the data contained in text. If the model can't
@@ -57,14 +94,7 @@ class EmbeddingSource(ABC):
                 be the number of words or sentences), embedding_matrix will be N-dimensional.
         """
         if len(text) > 0:
-            embedding_matrix = np.ndarray(shape=(len(text), self.get_vector_size()))
-
-            for i, data in enumerate(text):
-                data = data.lower()
-                try:
-                    embedding_matrix[i, :] = self.get_embedding(data)
-                except KeyError:
-                    embedding_matrix[i, :] = np.zeros(self.get_vector_size())
+            embedding_matrix = self.get_embedding_batch([data.lower() for data in text])
         else:
             # If the text is empty (eg. "") then the embedding matrix is a matrix
             # with 1 row filled with zeros
@@ -72,6 +102,62 @@ class EmbeddingSource(ABC):
 
         return embedding_matrix
 
+    def load_batch(self, text_list: List[List[str]]) -> List[np.ndarray]:
+        """
+        Function that extracts the embedding matrices of many texts together, with the same result of calling load
+        on each one of them. The data of all the texts is gathered and deduplicated, so that the vector of each
+        distinct data is extracted from the model only once and with a single call to get_embedding_batch (for
+        example, the sentences of all the texts are encoded in batches by the Sbert model). The vectors are then
+        scattered back to the matrix of each text
+
+        Args:
+            text_list (List[List[str]]): texts from which the embedding vectors will be extracted, each one in the
+                form accepted by the load method
+
+        Returns:
+            embedding_matrix_list (List[np.ndarray]): embedding matrix of each text, in the same order of the texts
+        """
+        # position of each distinct data in the list passed to get_embedding_batch
+        data_positions = {}
+        text_positions_list = [[data_positions.setdefault(data.lower(), len(data_positions)) for data in text]
+                               for text in text_list]
+
+        if len(data_positions) != 0:
+            embeddings = self.get_embedding_batch(list(data_positions.keys()))
+
+        embedding_matrix_list = []
+        for text_positions in text_positions_list:
+            if len(text_positions) > 0:
+                embedding_matrix_list.append(embeddings[text_positions])
+            else:
+                # If the text is empty the embedding matrix is a matrix with 1 row filled with zeros
+                embedding_matrix_list.append(np.zeros(shape=(1, self.get_vector_size())))
+
+        return embedding_matrix_list
+
+    def get_embedding_batch(self, data_list: List[str]) -> np.ndarray:
+        """
+        Method to return the embedding vectors of all the data passed as argument, in a matrix where each row is the
+        vector of the corresponding data (a row filled with 0 if the model can't return a vector for the data).
+        By default get_embedding is called for each data, the sources whose model can return many vectors at once
+        should override this method
+
+        Args:
+            data_list (List[str]): data (already lower cased) whose embedding vectors will be returned
+
+        Returns:
+            embedding_matrix (np.ndarray): matrix with a row for each data
+        """
+        embedding_matrix = np.ndarray(shape=(len(data_list), self.get_vector_size()))
+
+        for i, data in enumerate(data_list):
+            try:
+                embedding_matrix[i, :] = self.get_embedding(data)
+            except KeyError:
+                embedding_matrix[i, :] = np.zeros(self.get_vector_size())
+
+        return embedding_matrix
+
     @abstractmethod
     def load_model(self):
         """
@@ -98,3 +184,56 @@ class EmbeddingSource(ABC):
 
     def __repr__(self):
         raise NotImplementedError
+
+
+def vocabulary_embedding_batch(key_to_index: Dict[str, int], vectors: np.ndarray, word_list: List[str],
+                               oov_embedding: Callable[[str], np.ndarray] = None) -> np.ndarray:
+    """
+    Returns the embedding vectors of the words passed as argument, given the matrix of the vectors of the words in
+    the vocabulary: the words are mapped to their index in the vocabulary and all the vectors are gathered at once in
+    a float32 matrix, whose rows are filled with 0 for the words out of the vocabulary
+
+    Args:
+        key_to_index (Dict[str, int]): index of each word of the vocabulary in the matrix of the vectors
+        vectors (np.ndarray): matrix of the vectors, with a row for each word of the vocabulary
+        word_list (List[str]): words whose embedding vectors will be returned
+        oov_embedding (Callable): function called to compute the vectors of the words out of the vocabulary (for
+            example for the FastText vectors, which are computed from the n-grams of the words). It should raise
+            KeyError if the vector of the word can't be computed. If None, the vectors of those words are filled
+            with 0
+
+    Returns:
+        embedding_matrix (np.ndarray): matrix with a row for each word
+    """
+    indices = np.fromiter((key_to_index.get(word, -1) for word in word_list), dtype=np.int64, count=len(word_list))
+    in_vocabulary = indices != -1
+
+    embedding_matrix = np.zeros(shape=(len(word_list), vectors.shape[1]), dtype=np.float32)
+    embedding_matrix[in_vocabulary] = vectors[indices[in_vocabulary]]
+
+    if oov_embedding is not None:
+        for i in np.flatnonzero(~in_vocabulary):
+            try:
+                embedding_matrix[i] = oov_embedding(word_list[i])
+            except KeyError:
+                pass
+
+    return embedding_matrix
+
+
+def keyed_vectors_embedding_batch(keyed_vectors, word_list: List[str],
+                                  oov_embedding: Callable[[str], np.ndarray] = None) -> np.ndarray:
+    """
+    Returns the embedding vectors of the words passed as argument stored in the gensim KeyedVectors passed as
+    argument (see vocabulary_embedding_batch)
+
+    Args:
+        keyed_vectors (KeyedVectors): gensim KeyedVectors storing the vectors
+        word_list (List[str]): words whose embedding vectors will be returned
+        oov_embedding (Callable): function called to compute the vectors of the words out of the vocabulary, if None
+            the vectors of those words are filled with 0
+
+    Returns:
+        embedding_matrix (np.ndarray): matrix with a row for each word
+    """
+    return vocabulary_embedding_batch(keyed_vectors.key_to_index, keyed_vectors.vectors, word_list, oov_embedding)
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import sys
+import threading
+import uuid
+import weakref
+from typing import Callable, Dict, Optional, Tuple, Type
+
+MMAP_MODEL_EXTENSION = '.kv'
+
+
+def _is_keyed_vectors(model: object) -> bool:
+    # gensim is only imported by the sources which use it, so if it's not imported the model can't be a KeyedVectors
+    if 'gensim' not in sys.modules:
+        return False
+    from gensim.models import KeyedVectors
+    return isinstance(model, KeyedVectors)
+
+
+def model_files_state(reference: str) -> Optional[Tuple[int, int]]:
+    """
+    Returns the last modification time (in nanoseconds) and the size of the model stored locally at the reference
+    passed as argument (for a model stored in a directory, the latest modification time and the total size of its
+    files), so that a model retrained or replaced at the same reference can be told apart from the previous one.
+    Returns None if the reference isn't a local file or directory (for example the name of a model to download)
+
+    Args:
+        reference (str): reference of the model
+    """
+    if not isinstance(reference, str):
+        return None
+    if os.path.isfile(reference):
+        stat = os.stat(reference)
+        return stat.st_mtime_ns, stat.st_size
+    if os.path.isdir(reference):
+        modification_time, size = os.stat(reference).st_mtime_ns, 0
+        for directory, _, file_names in os.walk(reference):
+            for file_name in file_names:
+                stat = os.stat(os.path.join(directory, file_name))
+                modification_time = max(modification_time, stat.st_mtime_ns)
+                size += stat.st_size
+        return modification_time, size
+    return None
+
+
+class EmbeddingModelRegistry:
+    """
+    Process-wide registry of the models loaded by the embedding sources, so that each model is loaded at most once
+    in a process even if it's used by many sources (for example by the techniques of different field configs). The
+    models are identified by the class of the source which loads them and by their reference (and, for the models
+    stored in a local file, by the last modification time of the file, so that a model is loaded again if it
+    changes).
+
+    The registry holds the models weakly: a model is released as soon as no embedding source uses it anymore (and it's
+    loaded again by the next source that needs it). The models which can't be referenced weakly are kept until they
+    are released with the release method (or with clear)
+
+    If the mmap directory is set, the gensim KeyedVectors are stored in the directory in the gensim native format
+    the first time they are loaded, and are then always opened from there with mmap='r': the vectors are not copied in
+    the memory of the process, so all the processes which use the same model (for example the worker processes of the
+    ContentAnalyzer) share a single physical copy of them. The embedding sources which use a model of the registry
+    don't copy it when they are sent to another process, the model is retrieved from the registry of that process
+
+    EXAMPLE:
+        embedding_model_registry.mmap_directory = 'models_dir'
+        WordEmbeddingTechnique(Gensim('glove-twitter-25'))
+
+    Args:
+        mmap_directory (str): directory where the KeyedVectors are stored in order to be memory-mapped, if None the
+            models are loaded in the memory of the process
+    """
+
+    def __init__(self, mmap_directory: str = None):
+        self.__mmap_directory = mmap_directory
+        self.__models: Dict[Tuple, object] = weakref.WeakValueDictionary()
+        # models which can't be referenced weakly
+        self.__strong_models: Dict[Tuple, object] = {}
+        self.__lock = threading.RLock()
+
+    @property
+    def mmap_directory(self) -> str:
+        return self.__mmap_directory
+
+    @mmap_directory.setter
+    def mmap_directory(self, mmap_directory: str):
+        self.__mmap_directory = mmap_directory
+
+    @staticmethod
+    def model_key(source_class: Type, reference: str) -> Tuple:
+        """
+        Returns the key which identifies the model loaded by the source class from the reference passed as argument
+        """
+        modification_time = os.path.getmtime(reference) \
+            if isinstance(reference, str) and os.path.isfile(reference) else None
+        return '{}.{}'.format(source_class.__module__, source_class.__qualname__), reference, modification_time
+
+    def get_model(self, source_class: Type, reference: str, load_function: Callable[[], object]) -> object:
+        """
+        Returns the model loaded by the source class from the reference passed as argument, which is loaded with the
+        load function only if it isn't already in the registry. If the load function raises an exception (for
+        example FileNotFoundError if the reference isn't valid), nothing is stored in the registry
+
+        Args:
+            source_class (Type): class of the embedding source which loads the model
+            reference (str): reference of the model (for example its name or its path)
+            load_function (Callable): function which loads the model
+
+        Returns:
+            the loaded model
+        """
+        key = self.model_key(source_class, reference)
+        with self.__lock:
+            model = self.__models.get(key, self.__strong_models.get(key))
+            if model is None:
+                model = self.__load(key, load_function)
+                try:
+                    self.__models[key] = model
+                except TypeError:
+                    self.__strong_models[key] = model
+            return model
+
+    def __mmap_path(self, key: Tuple) -> str:
+        file_name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + MMAP_MODEL_EXTENSION
+        return os.path.join(self.__mmap_directory, file_name)
+
+    def __load(self, key: Tuple, load_function: Callable[[], object]) -> object:
+        """
+        Loads the model, opening it from the mmap directory if it has already been stored there
+        """
+        if self.__mmap_directory is None:
+            return load_function()
+
+        mmap_path = self.__mmap_path(key)
+        if os.path.isfile(mmap_path):
+            from gensim.models import KeyedVectors
+            return KeyedVectors.load(mmap_path, mmap='r')
+
+        model = load_function()
+        if not _is_keyed_vectors(model):
+            return model
+
+        os.makedirs(self.__mmap_directory, exist_ok=True)
+        # the model is saved with a temporary name, the arrays saved in separate files are renamed before the main
+        # file, so that other processes never open a partially written model
+        tmp_path = '{}.{}.tmp'.format(mmap_path, uuid.uuid4().hex)
+        # all the arrays are saved in separate files (even the small ones), so that all of them can be memory-mapped
+        model.save(tmp_path, sep_limit=0)
+        for file_name in os.listdir(self.__mmap_directory):
+            tmp_file_path = os.path.join(self.__mmap_directory, file_name)
+            if file_name.startswith(os.path.basename(tmp_path) + '.'):
+                os.replace(tmp_file_path, mmap_path + tmp_file_path[len(tmp_path):])
+        os.replace(tmp_path, mmap_path)
+
+        from gensim.models import KeyedVectors
+        return KeyedVectors.load(mmap_path, mmap='r')
+
+    def contains_model(self, model: object) -> bool:
+        """
+        Returns True if the model passed as argument is stored in the registry
+        """
+        with self.__lock:
+            return any(registry_model is model
+                       for registry_model in list(self.__models.values()) + list(self.__strong_models.values()))
+
+    def release(self, source_class: Type, reference: str):
+        """
+        Removes from the registry the models loaded by the source class from the reference passed as argument (every
+        version of the model, if it was stored in a local file which changed). The memory of a model is freed once the
+        sources which use it are deleted too (the files in the mmap directory are kept)
+
+        Args:
+            source_class (Type): class of the embedding source which loaded the model
+            reference (str): reference of the model (for example its name or its path)
+        """
+        class_name = self.model_key(source_class, reference)[0]
+        with self.__lock:
+            for models in [self.__models, self.__strong_models]:
+                for key in [key for key in list(models.keys()) if key[:2] == (class_name, reference)]:
+                    models.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all the models from the registry (the files in the mmap directory are kept)
+        """
+        with self.__lock:
+            self.__models.clear()
+            self.__strong_models.clear()
+
+    def __len__(self):
+        return len(self.__models) + len(self.__strong_models)
+
+    def __str__(self):
+        return "EmbeddingModelRegistry"
+
+    def __repr__(self):
+        return "< EmbeddingModelRegistry: mmap_directory = {}; models = {} >".format(
+            self.__mmap_directory, [key[:2] for key in list(self.__models.keys()) + list(self.__strong_models)])
+
+
+"""
+Registry used by all the embedding sources of the process
+"""
+embedding_model_registry = EmbeddingModelRegistry()
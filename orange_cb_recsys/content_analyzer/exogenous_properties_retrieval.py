@@ -2,15 +2,13 @@ from abc import ABC, abstractmethod
 
 import pandas as pd
 import numpy as np
-from typing import List
-from SPARQLWrapper import SPARQLWrapper, JSON, POST, POSTDIRECTLY
+from typing import List, Optional
 
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
 
 from orange_cb_recsys.content_analyzer.content_representation.content import PropertiesDict, \
     ExogenousPropertiesRepresentation, EntitiesProp
 from orange_cb_recsys.utils.const import logger, progbar
-from babelpy.babelfy import BabelfyClient
 from orange_cb_recsys.utils.check_tokenization import check_not_tokenized
 
 
@@ -48,6 +46,17 @@ class ExogenousPropertiesRetrieval(ABC):
     def mode(self, mode):
         self.__mode = self.__check_mode(mode)
 
+    def get_required_fields(self) -> Optional[List[str]]:
+        """
+        Returns the fields of the raw contents that the technique needs in order to retrieve the properties, so that
+        the content analyzer can keep in memory only the fields that are actually used.
+        None means that the technique may need all the fields of the raw contents
+
+        Returns:
+            List of the names of the fields used by the technique or None
+        """
+        return None
+
     @abstractmethod
     def get_properties(self, raw_source: RawInformationSource) -> List[ExogenousPropertiesRepresentation]:
         raise NotImplementedError
@@ -58,6 +67,9 @@ class PropertiesFromDataset(ExogenousPropertiesRetrieval):
         super().__init__(mode)
         self.__field_name_list: List[str] = field_name_list
 
+    def get_required_fields(self) -> Optional[List[str]]:
+        return self.__field_name_list
+
     def get_properties(self, raw_source: RawInformationSource) -> List[PropertiesDict]:
 
         logger.info("Extracting exogenous properties from local dataset")
@@ -101,6 +113,8 @@ class DBPediaMappingTechnique(ExogenousPropertiesRetrieval):
         self.__label_field = label_field
         self.__prop_as_uri = prop_as_uri
 
+        from SPARQLWrapper import SPARQLWrapper, JSON, POST, POSTDIRECTLY
+
         self.__sparql = SPARQLWrapper("http://factforge.net/repositories/ff-news")
         self.__sparql.setMethod(POST)
         self.__sparql.setRequestMethod(POSTDIRECTLY)
@@ -120,6 +134,12 @@ class DBPediaMappingTechnique(ExogenousPropertiesRetrieval):
     def prop_as_uri(self):
         return self.__prop_as_uri
 
+    def get_required_fields(self) -> Optional[List[str]]:
+        # the 'original_retrieved' and 'all' modes also keep the original fields of the raw contents
+        if self.mode in ['only_retrieved_evaluated', 'all_retrieved']:
+            return [self.__label_field]
+        return None
+
     # INITIAL IDEA ON HOW TO USE ADDITIONAL FILTERS TO RETIREVE CONTENTS
     # def __get_uris_all_contents_with_additional(self, raw_source: RawInformationSource):
     # prefixes = "PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> "
@@ -572,8 +592,13 @@ class BabelPyEntityLinking(EntityLinking):
         super().__init__("all_retrieved")
         self.__field_to_link = field_to_link
         self.__api_key = api_key
+        from babelpy.babelfy import BabelfyClient
+
         self.__babel_client = BabelfyClient(self.__api_key, {"lang": lang})
 
+    def get_required_fields(self) -> Optional[List[str]]:
+        return [self.__field_to_link]
+
     def get_properties(self, raw_source: RawInformationSource) -> List[EntitiesProp]:
         """
         Produces a list of EntitiesProp objects for every raw content in the raw source where .
@@ -1,6 +1,20 @@
-from . import embedding_technique
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
 
-from .embedding_technique import *
-from .tf_idf import WhooshTfIdf, SkLearnTfIdf
-from .field_content_production_technique import OriginalData, DefaultTechnique
-from .synset_document_frequency import PyWSDSynsetDocumentFrequency
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'Centroid': '.embedding_technique',
+    'Sum': '.embedding_technique',
+    'WordEmbeddingTechnique': '.embedding_technique',
+    'SentenceEmbeddingTechnique': '.embedding_technique',
+    'DocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsSentenceEmbeddingTechnique': '.embedding_technique',
+    'FromSentencesDocumentEmbeddingTechnique': '.embedding_technique',
+    'FromWordsDocumentEmbeddingTechnique': '.embedding_technique',
+    'WhooshTfIdf': '.tf_idf',
+    'SkLearnTfIdf': '.tf_idf',
+    'StreamingTfIdf': '.tf_idf',
+    'OriginalData': '.field_content_production_technique',
+    'DefaultTechnique': '.field_content_production_technique',
+    'PyWSDSynsetDocumentFrequency': '.synset_document_frequency'
+}, {
+    'combining_technique': '.embedding_technique.combining_technique'
+})
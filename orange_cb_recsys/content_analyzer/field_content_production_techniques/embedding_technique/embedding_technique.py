@@ -17,6 +17,7 @@ from orange_cb_recsys.content_analyzer.raw_information_source import RawInformat
 from orange_cb_recsys.utils.check_tokenization import check_tokenized, tokenize_in_sentences, check_not_tokenized
 from orange_cb_recsys.utils.class_utils import get_all_implemented_subclasses
 from orange_cb_recsys.utils.const import logger
+from orange_cb_recsys.utils.lazy_import import import_lazy_attributes
 
 
 class EmbeddingTechnique(SingleContentTechnique):
@@ -47,7 +48,9 @@ class EmbeddingTechnique(SingleContentTechnique):
         Method used to convert a string (which represents a model name) to a corresponding Embedding Source that can
         use the defined model
         Given the loader class (which is a class inheriting from EmbeddingSourceLoader), the method checks each
-        implemented class inheriting from loader_class and returns the one that is able to load the model
+        implemented class inheriting from loader_class and returns the one that is able to load the model. Only the
+        loaders which accept the reference (see EmbeddingLoader.accepts_reference) try to load the model, and the
+        model is loaded through the embedding_model_registry, so it's loaded only once in the process
 
         The method raises FileNotFoundError if no embedding loader is able to load the model
 
@@ -62,19 +65,30 @@ class EmbeddingTechnique(SingleContentTechnique):
         Returns:
             embedding_source (EmbeddingSource): embedding source which can load the model
         """
+        # the loaders are imported lazily by their package, so they are imported before searching the implementations
+        import_lazy_attributes('orange_cb_recsys.content_analyzer.embeddings.embedding_loader')
         # retrieves all implementations (meaning not abstract classes) inheriting from loader_class
-        possible_implementations = get_all_implemented_subclasses(loader_class)
-        # each implementation is tested and, when one of the implementations loads the model successfully, the loader
-        # instance is returned
+        possible_implementations = sorted(get_all_implemented_subclasses(loader_class),
+                                          key=lambda implementation: implementation.__name__)
+        # each implementation which accepts the reference is tested and, when one of the implementations loads the
+        # model successfully, the loader instance is returned
+        tried_implementations = []
         for implementation in possible_implementations:
+            if not implementation.accepts_reference(embedding_source_str):
+                continue
+            tried_implementations.append(implementation.__name__)
             embedding_source = implementation(embedding_source_str)
             if embedding_source.model is not None:
                 logger.info("The EmbeddingSource %s was found for the %s reference"
                             % (implementation.__name__, embedding_source_str))
                 return embedding_source
         # if no class was found to process the model an exception is raised
-        raise FileNotFoundError("The system couldn't process %s as a valid embedding reference"
-                                % embedding_source_str)
+        if len(tried_implementations) == 0:
+            raise FileNotFoundError("The system couldn't process %s as a valid embedding reference: no embedding "
+                                    "source accepts it (if it's the path of a local model, check that it exists)"
+                                    % embedding_source_str)
+        raise FileNotFoundError("The system couldn't process %s as a valid embedding reference (tried: %s)"
+                                % (embedding_source_str, ', '.join(tried_implementations)))
 
     @property
     def embedding_source(self):
@@ -82,8 +96,6 @@ class EmbeddingTechnique(SingleContentTechnique):
 
     def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
                         source: RawInformationSource) -> List[FieldRepresentation]:
-        representation_list: List[FieldRepresentation] = []
-
         # if the embedding source is an EmbeddingLearner (meaning it can be trained) and the source has no model
         # the source is trained
         if isinstance(self.__embedding_source, EmbeddingLearner) and self.__embedding_source.model is None:
@@ -96,11 +108,9 @@ class EmbeddingTechnique(SingleContentTechnique):
         # it iterates over all contents contained in the source in order to retrieve the raw data
         # the data contained in the field_name is processed using each information processor in the processor_list
         # the data is passed to the method that will create the single representation
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
-            representation_list.append(self.produce_single_repr(processed_data))
-
-        return representation_list
+        # the representations are produced together, so that the embeddings can be extracted in batches
+        return self.produce_representations([content_data[field_name] for content_data in source],
+                                            preprocessor_list, self.produce_single_repr, self.produce_batch_repr)
 
     @abstractmethod
     def produce_single_repr(self, field_data: Union[List[str], str]) -> EmbeddingField:
@@ -118,6 +128,20 @@ class EmbeddingTechnique(SingleContentTechnique):
         """
         raise NotImplementedError
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        """
+        Method that builds the semantic contents of many field data together, with the same result of calling
+        produce_single_repr on each one of them. The techniques which only need the embeddings of the data override
+        it to extract the embeddings of all the field data together (see EmbeddingSource.load_batch)
+
+        Args:
+            field_data_list (List[Union[List[str], str]]): data contained in the field of each content
+
+        Returns:
+            List[EmbeddingField]: complex representation created for each field data, in the same order
+        """
+        return [self.produce_single_repr(field_data) for field_data in field_data_list]
+
     @abstractmethod
     def __str__(self):
         raise NotImplementedError
@@ -144,6 +168,11 @@ class StandardEmbeddingTechnique(EmbeddingTechnique):
     def produce_single_repr(self, field_data: Union[List[str], str]) -> EmbeddingField:
         return EmbeddingField(self.embedding_source.load(self.process_data_granularity(field_data)))
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        embedding_matrix_list = self.embedding_source.load_batch(
+            [self.process_data_granularity(field_data) for field_data in field_data_list])
+        return [EmbeddingField(embedding_matrix) for embedding_matrix in embedding_matrix_list]
+
     @abstractmethod
     def process_data_granularity(self, field_data: Union[List[str], str]) -> List[str]:
         raise NotImplementedError
@@ -337,6 +366,11 @@ class CombiningDocumentEmbeddingTechnique(CombiningEmbeddingTechnique):
         doc_matrix = self.embedding_source.load(self.process_data_granularity(check_not_tokenized(field_data)))
         return EmbeddingField(self.combining_technique.combine(doc_matrix))
 
+    def produce_batch_repr(self, field_data_list: List[Union[List[str], str]]) -> List[EmbeddingField]:
+        doc_matrix_list = self.embedding_source.load_batch(
+            [self.process_data_granularity(check_not_tokenized(field_data)) for field_data in field_data_list])
+        return [EmbeddingField(self.combining_technique.combine(doc_matrix)) for doc_matrix in doc_matrix_list]
+
     @abstractmethod
     def process_data_granularity(self, data: Union[List[str], str]) -> List[str]:
         raise NotImplementedError
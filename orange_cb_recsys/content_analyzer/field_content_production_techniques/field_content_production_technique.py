@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Union, Callable
+from typing import List, Union, Callable, Iterator
 
 import numpy as np
 import json
@@ -7,7 +7,10 @@ import json
 from orange_cb_recsys.content_analyzer.content_representation.content import FieldRepresentation, FeaturesBagField, \
     EmbeddingField, SimpleField
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+from orange_cb_recsys.content_analyzer.preprocessing_pool import PreprocessingPool, SharedPreprocessing, \
+    apply_preprocessors
 from orange_cb_recsys.content_analyzer.raw_information_source import RawInformationSource
+from orange_cb_recsys.content_analyzer.representation_cache import RepresentationCache
 from orange_cb_recsys.utils.check_tokenization import check_not_tokenized
 
 
@@ -17,9 +20,22 @@ class FieldContentProductionTechnique(ABC):
     produce their complex semantic representations.
 
     The FieldContentProductionTechnique creates, for each given content's raw data, the field's representation for a
-    specific field
+    specific field.
+
+    If a RepresentationCache is assigned to the technique, the techniques that produce the representation of a
+    content only from its raw field value search the representation in the cache before producing it (except the
+    ones whose representations are just the processed values, see uses_representation_cache).
+    If a PreprocessingPool is assigned to the technique, the raw field values are processed by the preprocessors in
+    parallel, using the processes of the pool
     """
 
+    # the cache, the pool and the shared preprocessing are only set on the instance when they are assigned (and
+    # removed from it when None is assigned), so that they aren't considered as parameters of the technique when its
+    # fingerprint is computed
+    __representation_cache: RepresentationCache = None
+    __preprocessing_pool: PreprocessingPool = None
+    __shared_preprocessing: SharedPreprocessing = None
+
     def __init__(self):
         self.__lang = "EN"
 
@@ -31,6 +47,156 @@ class FieldContentProductionTechnique(ABC):
     def lang(self, lang: str):
         self.__lang = lang
 
+    @property
+    def representation_cache(self) -> RepresentationCache:
+        return self.__representation_cache
+
+    @representation_cache.setter
+    def representation_cache(self, representation_cache: RepresentationCache):
+        self.__set_option('_FieldContentProductionTechnique__representation_cache', representation_cache)
+
+    @property
+    def preprocessing_pool(self) -> PreprocessingPool:
+        return self.__preprocessing_pool
+
+    @preprocessing_pool.setter
+    def preprocessing_pool(self, preprocessing_pool: PreprocessingPool):
+        self.__set_option('_FieldContentProductionTechnique__preprocessing_pool', preprocessing_pool)
+
+    @property
+    def shared_preprocessing(self) -> SharedPreprocessing:
+        return self.__shared_preprocessing
+
+    @shared_preprocessing.setter
+    def shared_preprocessing(self, shared_preprocessing: SharedPreprocessing):
+        self.__set_option('_FieldContentProductionTechnique__shared_preprocessing', shared_preprocessing)
+
+    def __set_option(self, attribute: str, value: object):
+        if value is None:
+            self.__dict__.pop(attribute, None)
+        else:
+            setattr(self, attribute, value)
+
+    def process_data_list(self, data_list: List, preprocessor_list: List[InformationProcessor]) -> List:
+        """
+        Processes each raw data of the list passed as argument using the preprocessor list, with the same result of
+        calling process_data on each one of them. If the technique has a PreprocessingPool, the data is processed in
+        parallel. If the technique has a SharedPreprocessing, the data already processed by another technique with
+        equal preprocessors is reused
+
+        Args:
+            data_list (List): raw data to process
+            preprocessor_list (List[InformationProcessor]): list of preprocessors to apply to the data
+
+        Returns:
+            List: processed data, in the same order of the raw data
+        """
+        if self.__shared_preprocessing is not None:
+            return self.__shared_preprocessing.process(data_list, preprocessor_list, self.__process_data_list)
+        return self.__process_data_list(data_list, preprocessor_list)
+
+    def __process_data_list(self, data_list: List, preprocessor_list: List[InformationProcessor]) -> List:
+        if self.__preprocessing_pool is not None:
+            return self.__preprocessing_pool.process(data_list, preprocessor_list)
+        return apply_preprocessors(data_list, preprocessor_list)
+
+    def process_source(self, source: RawInformationSource, field_name: str,
+                       preprocessor_list: List[InformationProcessor], block_size: int = 10000) -> Iterator:
+        """
+        Yields the processed data in the field_name of each content of the source, in order. The source is read and
+        processed (using process_data_list) in blocks of block_size contents, so that only the processed data of a
+        block is kept in memory
+
+        Args:
+            source (RawInformationSource): source where the raw data of the contents is stored
+            field_name (str): name of the field to process
+            preprocessor_list (List[InformationProcessor]): list of preprocessors to apply to the data
+            block_size (int): number of contents processed together
+        """
+        block = []
+        for raw_content in source:
+            block.append(raw_content[field_name])
+            if len(block) == block_size:
+                yield from self.process_data_list(block, preprocessor_list)
+                block = []
+        if len(block) != 0:
+            yield from self.process_data_list(block, preprocessor_list)
+
+    def produce_representations(self, data_list: List, preprocessor_list: List[InformationProcessor],
+                                produce_function: Callable[[object], FieldRepresentation],
+                                produce_batch_function: Callable[[List], List[FieldRepresentation]] = None) \
+            -> List[FieldRepresentation]:
+        """
+        Produces the representation of each raw field value of the list passed as argument: the values are processed
+        with the preprocessor list (see process_data_list) and the processed data is passed to the produce function.
+        If the technique has a RepresentationCache, the representations are searched in the cache before being
+        produced (equal values are searched and produced only once) and the produced ones are stored in the cache.
+        If a produce batch function is passed, it's called once with the processed data of all the values to produce
+        instead of calling the produce function on each one of them
+
+        Args:
+            data_list (List): raw field values
+            preprocessor_list (List[InformationProcessor]): list of preprocessors to apply to the values
+            produce_function (Callable): function that creates the representation from the processed data
+            produce_batch_function (Callable): function that creates the representations of a list of processed data,
+                in the same order of the data
+
+        Returns:
+            List[FieldRepresentation]: representation of each value, in the same order of the values
+        """
+        representation_cache = self.__representation_cache if self.uses_representation_cache() else None
+        representation_list: List[FieldRepresentation] = [None] * len(data_list)
+
+        # positions of the values to produce, equal values share the same list of positions
+        missing_positions: List[List[int]] = []
+        if representation_cache is not None:
+            technique_key = representation_cache.technique_key(self, preprocessor_list)
+            positions_by_value = {}
+            for position, data in enumerate(data_list):
+                positions_by_value.setdefault(repr(data), []).append(position)
+
+            for positions in positions_by_value.values():
+                representation = representation_cache.get(technique_key, data_list[positions[0]])
+                if representation is None:
+                    missing_positions.append(positions)
+                else:
+                    for position in positions:
+                        representation_list[position] = representation
+        else:
+            missing_positions = [[position] for position in range(len(data_list))]
+
+        processed_data_list = self.process_data_list([data_list[positions[0]] for positions in missing_positions],
+                                                     preprocessor_list)
+        if produce_batch_function is not None:
+            produced_list = produce_batch_function(processed_data_list)
+        else:
+            produced_list = (produce_function(processed_data) for processed_data in processed_data_list)
+
+        for positions, representation in zip(missing_positions, produced_list):
+            if representation_cache is not None:
+                representation_cache.put(technique_key, data_list[positions[0]], representation)
+            for position in positions:
+                representation_list[position] = representation
+
+        return representation_list
+
+    def uses_representation_cache(self) -> bool:
+        """
+        Returns True if the representations produced by the technique are worth storing in its RepresentationCache.
+        The techniques whose representations are just the processed field values return False, since reading a
+        representation from the cache would cost more than producing it again
+        """
+        return True
+
+    def requires_refit(self) -> bool:
+        """
+        Returns True if the representation produced by the technique for a content depends on the other contents in
+        the collection, so that all the representations must be produced again when a content is added, changed or
+        removed. The incremental runs of the ContentAnalyzer rely on this method to decide if only the new and changed
+        contents can be processed
+        """
+        return False
+
     @staticmethod
     def process_data(data: str, preprocessor_list: List[InformationProcessor]) -> Union[List[str], str]:
         """
@@ -114,16 +280,11 @@ class SingleContentTechnique(FieldContentProductionTechnique):
         is done on the original data of the field (for each content) followed by the creation of the complex
         representation using the processed data. The complex representations are stored in a list and returned.
         """
-        representation_list: List[FieldRepresentation] = []
-
         # it iterates over all contents contained in the source in order to retrieve the raw data
         # the data contained in the field_name is processed using each information processor in the processor_list
         # the data is passed to the method that will create the single representation
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
-            representation_list.append(self.produce_single_repr(processed_data))
-
-        return representation_list
+        return self.produce_representations([content_data[field_name] for content_data in source],
+                                            preprocessor_list, self.produce_single_repr)
 
     @abstractmethod
     def produce_single_repr(self, field_data: Union[List[str], str]) -> FieldRepresentation:
@@ -150,6 +311,13 @@ class CollectionBasedTechnique(FieldContentProductionTechnique):
     def __init__(self):
         super().__init__()
 
+    def requires_refit(self) -> bool:
+        """
+        The representations depend on the entire collection (for example the idf of the terms in a tf-idf
+        representation), so they must all be produced again when the collection changes
+        """
+        return True
+
     def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
                         source: RawInformationSource) -> List[FieldRepresentation]:
         """
@@ -175,6 +343,49 @@ class CollectionBasedTechnique(FieldContentProductionTechnique):
 
         return representation_list
 
+    def fit(self, field_name: str, preprocessor_list: List[InformationProcessor], source: RawInformationSource):
+        """
+        First pass of the chunked content production: the technique is fitted on the entire collection, so that the
+        representations of the contents can later be produced one chunk at a time using the transform method.
+        By default the whole dataset is refactored, techniques that can keep a smaller state (for example only the
+        vocabulary and the idf values) should override this method and the transform method
+
+        Args:
+            field_name (str): name of the contents' field on which the technique will be applied
+            preprocessor_list (List[InformationProcessor]): list of information processors that will pre-process the
+                data contained in the field for each content
+            source (RawInformationSource): source where the raw data of the contents is stored
+        """
+        self.dataset_refactor(source, field_name, preprocessor_list)
+
+    def transform(self, field_name: str, preprocessor_list: List[InformationProcessor],
+                  chunk: RawInformationSource, first_position: int) -> List[FieldRepresentation]:
+        """
+        Second pass of the chunked content production: produces the representations for the contents in the chunk
+        passed as argument, using the state computed by the fit method. The position of the first content of the chunk
+        in the entire collection is passed as argument, so that the method doesn't need to keep track of the chunks
+        already processed (this also allows to transform the chunks in different processes)
+
+        Args:
+            field_name (str): name of the contents' field on which the technique will be applied
+            preprocessor_list (List[InformationProcessor]): list of information processors that will pre-process the
+                data contained in the field for each content
+            chunk (RawInformationSource): source containing the raw data of the contents in the chunk
+            first_position (int): position of the first content of the chunk in the entire collection
+
+        Returns:
+            representation_list(List[FieldRepresentation]): list containing the representations generated by the
+                technique for each content in the chunk
+        """
+        chunk_len = sum(1 for _ in chunk)
+        return [self.produce_single_repr(position) for position in range(first_position, first_position + chunk_len)]
+
+    def delete_fitted(self):
+        """
+        Deletes the state computed by the fit method once all the chunks have been transformed
+        """
+        self.delete_refactored()
+
     @abstractmethod
     def produce_single_repr(self, content_position: int) -> FieldRepresentation:
         """
@@ -236,13 +447,12 @@ class OriginalData(FieldContentProductionTechnique):
         Because of that the preprocessor_list is ignored and not used by this technique
         """
 
-        representation_list: List[SimpleField] = []
+        return self.produce_representations([content_data[field_name] for content_data in source], preprocessor_list,
+                                            lambda processed_data: SimpleField(
+                                                self.__dtype(check_not_tokenized(processed_data))))
 
-        for content_data in source:
-            processed_data = self.process_data(content_data[field_name], preprocessor_list)
-            representation_list.append(SimpleField(self.__dtype(check_not_tokenized(processed_data))))
-
-        return representation_list
+    def uses_representation_cache(self) -> bool:
+        return False
 
 
 class DefaultTechnique(FieldContentProductionTechnique):
@@ -259,24 +469,24 @@ class DefaultTechnique(FieldContentProductionTechnique):
         The content's raw data is decoded using the appropriate method (in case the data is not a string).
         Each decoded representation is added to a list which is then returned
         """
+        # if a preprocessor is specified, then surely we must import the field data as a string,
+        # there's no other option
+        if len(preprocessor_list) != 0:
+            return self.produce_representations([str(content_data[field_name]) for content_data in source],
+                                                preprocessor_list,
+                                                lambda processed_data: SimpleField(check_not_tokenized(processed_data)))
+
+        # If a preprocessor isn't specified, well maybe it is a complex representation:
+        # let's decode what kind of complex representation it is and import it accordingly.
         representation_list: List[FieldRepresentation] = []
-
         for content_data in source:
-            # if a preprocessor is specified, then surely we must import the field data as a string,
-            # there's no other option
-            if len(preprocessor_list) != 0:
-                representation = SimpleField(check_not_tokenized(self.process_data(str(content_data[field_name]),
-                                                                                   preprocessor_list)))
-
-            # If a preprocessor isn't specified, well maybe it is a complex representation:
-            # let's decode what kind of complex representation it is and import it accordingly.
-            else:
-                representation = self.__decode_field_data(str(content_data[field_name]))
-
-            representation_list.append(representation)
+            representation_list.append(self.__decode_field_data(str(content_data[field_name])))
 
         return representation_list
 
+    def uses_representation_cache(self) -> bool:
+        return False
+
     def __decode_field_data(self, field_data: str):
         # Decode string into dict or list
         try:
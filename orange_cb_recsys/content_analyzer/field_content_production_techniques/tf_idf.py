@@ -1,7 +1,13 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
-from typing import List
+from collections import Counter
 
-from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer, CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+from typing import List, Iterator
+
+from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField, SparseFeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import FeaturesVocabulary
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.\
     field_content_production_technique import TfIdfTechnique
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
@@ -10,29 +16,87 @@ from orange_cb_recsys.content_analyzer.raw_information_source import RawInformat
 from orange_cb_recsys.utils.check_tokenization import check_tokenized, check_not_tokenized
 
 
+def vectorizer_feature_names(vectorizer: CountVectorizer) -> List[str]:
+    """
+    Returns the terms of the columns of the fitted sklearn vectorizer passed as argument, using get_feature_names_out
+    (get_feature_names was removed in scikit-learn 1.2) and falling back to get_feature_names on older versions
+    """
+    if hasattr(vectorizer, 'get_feature_names_out'):
+        return vectorizer.get_feature_names_out().tolist()
+    return vectorizer.get_feature_names()
+
+
+def csr_row_to_features_bag(tfidf_matrix, row: int, feature_names: List[str] = None,
+                            vocabulary: FeaturesVocabulary = None) -> FeaturesBagField:
+    """
+    Creates the FeaturesBagField for the document in the row of the CSR term-document tf-idf matrix passed as argument.
+    The terms and the values of the row are read directly from the arrays of the CSR matrix, instead of accessing
+    each element of the matrix
+
+    Args:
+        tfidf_matrix (sparse.csr_matrix): term-document tf-idf matrix
+        row (int): row of the document in the matrix
+        feature_names (List[str]): term of each column of the matrix, if None the features are the column indices
+        vocabulary (FeaturesVocabulary): if not None, a SparseFeaturesBagField referring to this vocabulary (which must
+            have the terms of the columns of the matrix) is created instead of a FeaturesBagField
+
+    Returns:
+        FeaturesBagField: features bag of the document
+    """
+    start, end = tfidf_matrix.indptr[row], tfidf_matrix.indptr[row + 1]
+    indices = tfidf_matrix.indices[start:end]
+    values = tfidf_matrix.data[start:end]
+
+    if vocabulary is not None:
+        return SparseFeaturesBagField(indices, values, vocabulary)
+    if feature_names is None:
+        return FeaturesBagField(dict(zip(indices.tolist(), values.tolist())))
+    return FeaturesBagField(dict(zip([feature_names[i] for i in indices.tolist()], values.tolist())))
+
+
 class SkLearnTfIdf(TfIdfTechnique):
     """
     Tf-idf computed using the sklearn library
+
+    Args:
+        sparse_features (bool): if True, the representations produced are SparseFeaturesBagField, which store the
+            indices of the terms in a vocabulary shared by all the contents (saved once in the output directory) and
+            the tf-idf values as arrays, instead of a dictionary <term, tf-idf value> for each content
     """
-    def __init__(self):
+    def __init__(self, sparse_features: bool = False):
         super().__init__()
+        self.__sparse_features = sparse_features
         self.__corpus = []
         self.__tfidf_matrix = None
         self.__feature_names = None
+        self.__vectorizer = None
+        self.__vocabulary = None
+
+    @property
+    def sparse_features(self) -> bool:
+        return self.__sparse_features
 
     def produce_single_repr(self, content_position: int) -> FeaturesBagField:
         """
         Retrieves the tf-idf values, for terms in document in the defined content_position,
         from the pre-computed word - document matrix.
         """
-        feature_index = self.__tfidf_matrix[content_position, :].nonzero()[1]
-        tfidf_scores = zip(feature_index, [self.__tfidf_matrix[content_position, x] for x in feature_index])
+        return self.__matrix_row_to_repr(self.__tfidf_matrix, content_position)
 
-        features = {}
-        for word, score in [(self.__feature_names[i], score) for (i, score) in tfidf_scores]:
-            features[word] = score
+    def __matrix_row_to_repr(self, tfidf_matrix, row: int) -> FeaturesBagField:
+        """
+        Creates the FeaturesBagField for the document in the row of the term-document tf-idf matrix passed as argument
+        """
+        return csr_row_to_features_bag(tfidf_matrix, row, self.__feature_names,
+                                       self.__vocabulary if self.__sparse_features else None)
 
-        return FeaturesBagField(features)
+    def __process_corpus(self, information_source: RawInformationSource, field_name: str,
+                         preprocessor_list: List[InformationProcessor]):
+        """
+        Yields the processed data in the field_name of each content in the source, one document at a time
+        """
+        for processed_field_data in self.process_source(information_source, field_name, preprocessor_list):
+            yield check_not_tokenized(processed_field_data)
 
     def dataset_refactor(self, information_source: RawInformationSource, field_name: str,
                          preprocessor_list: List[InformationProcessor]) -> int:
@@ -40,26 +104,48 @@ class SkLearnTfIdf(TfIdfTechnique):
         Creates a corpus structure, a list of string where each string is a document.
         Then calls TfIdfVectorizer on this collection, obtaining term-document tf-idf matrix, the corpus is then deleted
         """
-        self.__corpus = []
-
-        for raw_content in information_source:
-            processed_field_data = self.process_data(raw_content[field_name], preprocessor_list)
-
-            processed_field_data = check_not_tokenized(processed_field_data)
-            self.__corpus.append(processed_field_data)
+        self.__corpus = list(self.__process_corpus(information_source, field_name, preprocessor_list))
 
         tf_vectorizer = TfidfVectorizer(sublinear_tf=True)
         self.__tfidf_matrix = tf_vectorizer.fit_transform(self.__corpus)
 
         del self.__corpus
 
-        self.__feature_names = tf_vectorizer.get_feature_names()
+        self.__feature_names = vectorizer_feature_names(tf_vectorizer)
+        if self.__sparse_features:
+            self.__vocabulary = FeaturesVocabulary(self.__feature_names)
 
         return self.__tfidf_matrix.shape[0]
 
+    def fit(self, field_name: str, preprocessor_list: List[InformationProcessor], source: RawInformationSource):
+        """
+        Fits the TfIdfVectorizer on the documents of the source, which are processed one at a time. Only the vocabulary
+        and the idf values are kept, the term-document matrix is computed chunk by chunk in the transform method
+        """
+        self.__vectorizer = TfidfVectorizer(sublinear_tf=True)
+        self.__vectorizer.fit(self.__process_corpus(source, field_name, preprocessor_list))
+        self.__feature_names = vectorizer_feature_names(self.__vectorizer)
+        if self.__sparse_features:
+            self.__vocabulary = FeaturesVocabulary(self.__feature_names)
+
+    def transform(self, field_name: str, preprocessor_list: List[InformationProcessor],
+                  chunk: RawInformationSource, first_position: int) -> List[FeaturesBagField]:
+        """
+        Computes the tf-idf matrix only for the documents in the chunk, using the vectorizer fitted on the entire
+        collection
+        """
+        chunk_matrix = self.__vectorizer.transform(self.__process_corpus(chunk, field_name, preprocessor_list))
+        return [self.__matrix_row_to_repr(chunk_matrix, row) for row in range(chunk_matrix.shape[0])]
+
+    def delete_fitted(self):
+        self.__vectorizer = None
+        self.__feature_names = None
+        self.__vocabulary = None
+
     def delete_refactored(self):
         del self.__tfidf_matrix
         del self.__feature_names
+        self.__vocabulary = None
 
     def __str__(self):
         return "SkLearnTfIdf"
@@ -68,6 +154,189 @@ class SkLearnTfIdf(TfIdfTechnique):
         return "< SkLearnTfIdf >"
 
 
+class StreamingTfIdf(TfIdfTechnique):
+    """
+    Tf-idf computed out-of-core, for the fields too big to be kept in memory: the documents are read from the source
+    and processed one block at a time, in two passes. The first pass (fit) counts the document frequency of each term,
+    the second pass (transform) computes the tf-idf rows of the documents, block by block. So the memory used by the
+    technique doesn't depend on the size of the corpus, but only on the size of the vocabulary (or on the number of
+    features, when the terms are hashed) and on the block size. produce_content goes through the same two passes, so
+    the tf-idf matrix of the whole corpus is never built; note however that, if the chunk_size of the
+    ContentAnalyzerConfig isn't set, the ContentsProducer keeps the representations of all the contents until they
+    are serialized, so the config should also define a chunk_size for the memory of the whole process to be bounded.
+
+    The tf-idf values are the same computed by SkLearnTfIdf (same tokenization, sublinear tf, smoothed idf and l2
+    normalization). If n_features is defined, the terms are not stored at all: each term is hashed into one of
+    n_features columns (see the HashingVectorizer of sklearn) and the document frequency is counted for each column,
+    so that the memory used is fixed. In this case, the features of the produced FeaturesBagField are the column
+    indices instead of the terms (the terms which collide in the same column are counted as the same feature)
+
+    EXAMPLE:
+        FieldConfig(StreamingTfIdf(n_features=2 ** 20), NLTK())
+
+    Args:
+        n_features (int): number of columns the terms are hashed into, if None the vocabulary of the terms is kept
+        sparse_features (bool): if True, the representations produced are SparseFeaturesBagField (see SkLearnTfIdf).
+            It can't be used along with n_features, since the terms are not known
+        block_size (int): number of documents read and processed together
+    """
+
+    def __init__(self, n_features: int = None, sparse_features: bool = False, block_size: int = 10000):
+        super().__init__()
+        if n_features is not None and sparse_features:
+            raise ValueError("The sparse features need the vocabulary of the terms, which isn't kept when they are "
+                             "hashed (n_features)")
+        self.__n_features = n_features
+        self.__sparse_features = sparse_features
+        self.__block_size = block_size
+        self.__vectorizer = None
+        self.__idf = None
+        self.__feature_names = None
+        self.__vocabulary = None
+        self.__tfidf_matrix = None
+
+    @property
+    def n_features(self) -> int:
+        return self.__n_features
+
+    @property
+    def sparse_features(self) -> bool:
+        return self.__sparse_features
+
+    @property
+    def block_size(self) -> int:
+        return self.__block_size
+
+    def __process_blocks(self, information_source: RawInformationSource, field_name: str,
+                         preprocessor_list: List[InformationProcessor]) -> Iterator[List[str]]:
+        """
+        Yields the processed data in the field_name of the contents in the source, a block of documents at a time
+        """
+        block = []
+        for processed_field_data in self.process_source(information_source, field_name, preprocessor_list,
+                                                        self.__block_size):
+            block.append(check_not_tokenized(processed_field_data))
+            if len(block) == self.__block_size:
+                yield block
+                block = []
+        if len(block) != 0:
+            yield block
+
+    def fit(self, field_name: str, preprocessor_list: List[InformationProcessor], source: RawInformationSource):
+        """
+        First pass over the source: counts the number of documents containing each term (or each column, if the terms
+        are hashed) and computes the idf values. The documents are not kept
+        """
+        n_documents = 0
+        if self.__n_features is not None:
+            self.__vectorizer = HashingVectorizer(n_features=self.__n_features, alternate_sign=False, norm=None)
+            document_frequency = np.zeros(self.__n_features, dtype=np.int64)
+            for block in self.__process_blocks(source, field_name, preprocessor_list):
+                # the indices of each row of the matrix are unique, so each column is counted once for each document
+                document_frequency += np.bincount(self.__vectorizer.transform(block).indices,
+                                                  minlength=self.__n_features)
+                n_documents += len(block)
+        else:
+            analyzer = CountVectorizer().build_analyzer()
+            document_frequency_counter = Counter()
+            for block in self.__process_blocks(source, field_name, preprocessor_list):
+                for document in block:
+                    document_frequency_counter.update(set(analyzer(document)))
+                n_documents += len(block)
+            if len(document_frequency_counter) == 0:
+                raise ValueError("The documents of the field {} don't contain any term".format(field_name))
+
+            # the terms are sorted, like the ones of the TfidfVectorizer of sklearn
+            self.__feature_names = sorted(document_frequency_counter)
+            document_frequency = np.array([document_frequency_counter[term] for term in self.__feature_names],
+                                          dtype=np.int64)
+            del document_frequency_counter
+            self.__vectorizer = CountVectorizer(
+                vocabulary={term: index for index, term in enumerate(self.__feature_names)})
+            if self.__sparse_features:
+                self.__vocabulary = FeaturesVocabulary(self.__feature_names)
+
+        # smoothed idf, as computed by sklearn
+        self.__idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+
+    def __tfidf_block(self, block: List[str]):
+        """
+        Computes the tf-idf matrix of the documents in the block passed as argument, using the fitted idf values
+        """
+        matrix = self.__vectorizer.transform(block).astype(np.float64)
+        # sublinear tf
+        np.log(matrix.data, out=matrix.data)
+        matrix.data += 1
+        matrix.data *= self.__idf[matrix.indices]
+        return normalize(matrix, norm='l2', copy=False)
+
+    def transform(self, field_name: str, preprocessor_list: List[InformationProcessor],
+                  chunk: RawInformationSource, first_position: int) -> List[FeaturesBagField]:
+        """
+        Second pass over the source: computes the tf-idf rows of the documents in the chunk, a block at a time
+        """
+        representation_list = []
+        for block in self.__process_blocks(chunk, field_name, preprocessor_list):
+            block_matrix = self.__tfidf_block(block)
+            representation_list.extend(self.__matrix_row_to_repr(block_matrix, row)
+                                       for row in range(block_matrix.shape[0]))
+        return representation_list
+
+    def __matrix_row_to_repr(self, tfidf_matrix, row: int) -> FeaturesBagField:
+        return csr_row_to_features_bag(tfidf_matrix, row, self.__feature_names,
+                                       self.__vocabulary if self.__sparse_features else None)
+
+    def produce_content(self, field_name: str, preprocessor_list: List[InformationProcessor],
+                        source: RawInformationSource) -> List[FeaturesBagField]:
+        """
+        Fits the technique on the source and then produces the representations of its contents a block at a time
+        with transform, so that neither the documents nor the tf-idf matrix of the whole source are kept in memory
+        """
+        self.fit(field_name, preprocessor_list, source)
+        representation_list = self.transform(field_name, preprocessor_list, source, 0)
+        self.delete_fitted()
+        return representation_list
+
+    def produce_single_repr(self, content_position: int) -> FeaturesBagField:
+        """
+        Retrieves the tf-idf values of the document in the content_position from the matrix computed by
+        dataset_refactor
+        """
+        return self.__matrix_row_to_repr(self.__tfidf_matrix, content_position)
+
+    def dataset_refactor(self, information_source: RawInformationSource, field_name: str,
+                         preprocessor_list: List[InformationProcessor]) -> int:
+        """
+        Fits the technique on the source and then computes the tf-idf matrix of the whole source, a block at a time,
+        so that only the sparse tf-idf matrix is kept in memory (not the documents). It's only needed to access the
+        rows by position with produce_single_repr, since produce_content and transform never build the whole matrix
+        """
+        self.fit(field_name, preprocessor_list, information_source)
+        block_matrices = [self.__tfidf_block(block)
+                          for block in self.__process_blocks(information_source, field_name, preprocessor_list)]
+        if len(block_matrices) == 0:
+            return 0
+        self.__tfidf_matrix = sparse.vstack(block_matrices, format='csr')
+        return self.__tfidf_matrix.shape[0]
+
+    def delete_fitted(self):
+        self.__vectorizer = None
+        self.__idf = None
+        self.__feature_names = None
+        self.__vocabulary = None
+
+    def delete_refactored(self):
+        self.__tfidf_matrix = None
+        self.delete_fitted()
+
+    def __str__(self):
+        return "StreamingTfIdf"
+
+    def __repr__(self):
+        return "< StreamingTfIdf: n_features = {}; sparse_features = {}; block_size = {} >".format(
+            self.__n_features, self.__sparse_features, self.__block_size)
+
+
 class WhooshTfIdf(TfIdfTechnique):
     """
     Class that produces a Bag of words with tf-idf metric using Whoosh
@@ -91,12 +360,10 @@ class WhooshTfIdf(TfIdfTechnique):
         """
         self.__field_name = field_name
         self.__index = KeywordIndex('./' + field_name)
-        self.__index.init_writing(True)
+        self.__index.init_writing(True, [field_name])
         dataset_len = 0
-        for raw_content in information_source:
+        for processed_field_data in self.process_source(information_source, field_name, preprocessor_list):
             self.__index.new_content()
-            processed_field_data = self.process_data(raw_content[field_name], preprocessor_list)
-
             processed_field_data = check_tokenized(processed_field_data)
             self.__index.new_field(field_name, processed_field_data)
             self.__index.serialize_content()
@@ -21,6 +21,13 @@ class InformationProcessor(ABC):
     def process(self, field_data):
         raise NotImplementedError
 
+    def process_batch(self, field_data_list: List) -> List:
+        """
+        Processes each data of the list passed as argument, with the same result of calling process on each one of
+        them. The processors which can process many data together more efficiently override this method
+        """
+        return [self.process(field_data) for field_data in field_data_list]
+
 
 class ImageProcessor(InformationProcessor):
     """
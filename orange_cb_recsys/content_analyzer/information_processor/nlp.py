@@ -1,4 +1,6 @@
-from typing import List
+import functools
+from collections import OrderedDict
+from typing import List, Dict, Tuple, Union
 
 import nltk
 
@@ -7,36 +9,205 @@ from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from nltk.corpus import wordnet
 from nltk.stem.snowball import SnowballStemmer
+from nltk.tag.perceptron import PerceptronTagger
 
 from orange_cb_recsys.content_analyzer.information_processor.information_processor import NLP
 from orange_cb_recsys.utils.check_tokenization import check_not_tokenized
+from orange_cb_recsys.utils.nltk_resources import ensure_nltk_resource
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of the results of the NLTK operations applied to single tokens (stemming and lemmatization).
+    Since the tokens of natural language texts follow a Zipf distribution, a small number of distinct tokens makes
+    up most of the occurrences, so most of the operations can be avoided. The results are stored with the key
+    (token, operation, language) and, when the cache is full, the least recently used result is discarded.
+
+    The stored results aren't copied when the cache is pickled (for example when the NLTK instance is sent to another
+    process), only its capacity
+
+    Args:
+        capacity (int): maximum number of results stored, if 0 nothing is stored
+    """
+
+    def __init__(self, capacity: int = 100000):
+        self.__capacity = capacity
+        self.__results: OrderedDict = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.__hits + self.__misses
+        return self.__hits / requests if requests != 0 else 0.0
+
+    def get(self, key: Tuple[str, str, str]) -> Union[str, None]:
+        """
+        Returns the result stored for the key (token, operation, language), None if it's not in the cache
+        """
+        result = self.__results.get(key)
+        if result is None:
+            self.__misses += 1
+            return None
+
+        self.__results.move_to_end(key)
+        self.__hits += 1
+        return result
+
+    def put(self, key: Tuple[str, str, str], result: str):
+        """
+        Stores the result for the key (token, operation, language), discarding the least recently used result if the
+        cache is full
+        """
+        if self.__capacity <= 0:
+            return
+        self.__results[key] = result
+        self.__results.move_to_end(key)
+        if len(self.__results) > self.__capacity:
+            self.__results.popitem(last=False)
+
+    def clear(self):
+        self.__results.clear()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__results)
+
+    def __getstate__(self):
+        return {'_TokenCache__capacity': self.__capacity, '_TokenCache__results': OrderedDict(),
+                '_TokenCache__hits': 0, '_TokenCache__misses': 0}
+
+    def fingerprint_description(self) -> None:
+        """
+        The cache doesn't change the processed tokens, so it is not considered in the fingerprint of the NLTK instance
+        """
+        return None
+
+    def __str__(self):
+        return "TokenCache"
+
+    def __repr__(self):
+        return "< TokenCache: capacity = {}; size = {}; hits = {}; misses = {} >".format(
+            self.__capacity, len(self.__results), self.__hits, self.__misses)
+
+
+class NLTKPipeline:
+    """
+    Compiled version of the NLTK operations which need external resources (stopwords removal, stemming and
+    lemmatization): the stopwords set, the stemmer, the lemmatizer and the POS tagger are created only once, when the
+    pipeline is compiled, instead of every time a text is processed. The pipelines are shared by all the NLTK
+    instances with the same configuration (see compile_pipeline). The NLTK resources needed by the pipeline are
+    downloaded, if missing, when it's compiled
+
+    Args:
+        lang (str): language of the texts (for example 'english')
+        stopwords_removal (bool): if True, the resources for the stopwords removal are loaded
+        stemming (bool): if True, the resources for the stemming are loaded
+        lemmatization (bool): if True, the resources for the lemmatization are loaded
+    """
+
+    def __init__(self, lang: str, stopwords_removal: bool, stemming: bool, lemmatization: bool):
+        ensure_nltk_resource('tokenizers/punkt', 'punkt')
+        if stopwords_removal:
+            ensure_nltk_resource('corpora/stopwords')
+        if lemmatization:
+            ensure_nltk_resource('taggers/averaged_perceptron_tagger')
+            ensure_nltk_resource('corpora/wordnet')
+
+        self.__lang = lang
+        self.__stop_words = frozenset(stopwords.words(lang)) if stopwords_removal else None
+        self.__stemmer = SnowballStemmer(language=lang) if stemming else None
+        self.__lemmatizer = WordNetLemmatizer() if lemmatization else None
+        self.__tagger = PerceptronTagger() if lemmatization else None
+        # map from the first character of a POS tag to the POS accepted by the lemmatizer
+        self.__tag_dict = {"J": wordnet.ADJ,
+                           "N": wordnet.NOUN,
+                           "V": wordnet.VERB,
+                           "R": wordnet.ADV} if lemmatization else None
+
+    def remove_stopwords(self, text: List[str]) -> List[str]:
+        """
+        Removes the stopwords from the list of tokens passed as argument
+        """
+        stop_words = self.__stop_words
+        return [word_token for word_token in text if word_token.lower() not in stop_words]
+
+    def stem(self, text: List[str], token_cache: TokenCache = None) -> List[str]:
+        """
+        Reduces each token of the list passed as argument to its stem. If a token cache is passed, the stems are
+        searched in the cache before being computed
+        """
+        stem = self.__stemmer.stem
+        if token_cache is None:
+            return [stem(word) for word in text]
+
+        stemmed_text = []
+        for word in text:
+            key = (word, 'stem', self.__lang)
+            stemmed_word = token_cache.get(key)
+            if stemmed_word is None:
+                stemmed_word = stem(word)
+                token_cache.put(key, stemmed_word)
+            stemmed_text.append(stemmed_word)
+        return stemmed_text
+
+    def lemmatize_batch(self, text_list: List[List[str]], token_cache: TokenCache = None) -> List[List[str]]:
+        """
+        Reduces each token of each list of tokens passed as argument to its lemma. The POS tagger is called only once
+        for all the lists: each distinct token is tagged on its own, as a single word sentence, so that its POS (and so
+        its lemma) doesn't depend on the tokens around it. If a token cache is passed, the lemmas are searched in the
+        cache and only the tokens which are not in the cache are tagged and lemmatized
+
+        Args:
+            text_list (List[List[str]]): lists of tokens to lemmatize
+            token_cache (TokenCache): cache of the lemmas
+
+        Returns:
+            List[List[str]]: lists of lemmatized tokens
+        """
+        lemmas: Dict[str, str] = {}
+        distinct_words = []
+        for word in dict.fromkeys(word for text in text_list for word in text):
+            lemma = token_cache.get((word, 'lemma', self.__lang)) if token_cache is not None else None
+            if lemma is None:
+                distinct_words.append(word)
+            else:
+                lemmas[word] = lemma
+
+        tagged_words = self.__tagger.tag_sents([[word] for word in distinct_words]) if distinct_words else []
+        lemmatize = self.__lemmatizer.lemmatize
+        for word, tagged in zip(distinct_words, tagged_words):
+            lemma = lemmatize(word, self.__tag_dict.get(tagged[0][1][0].upper(), wordnet.NOUN))
+            lemmas[word] = lemma
+            if token_cache is not None:
+                token_cache.put((word, 'lemma', self.__lang), lemma)
+
+        return [[lemmas[word] for word in text] for text in text_list]
+
+
+@functools.lru_cache(maxsize=None)
+def compile_pipeline(lang: str, stopwords_removal: bool, stemming: bool, lemmatization: bool) -> NLTKPipeline:
+    """
+    Returns the NLTKPipeline for the configuration passed as argument, which is compiled only the first time it's
+    requested in the process
+    """
+    return NLTKPipeline(lang, stopwords_removal, stemming, lemmatization)
 
 
 class NLTK(NLP):
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords')
-    try:
-        nltk.data.find('punkt')
-    except LookupError:
-        nltk.download('punkt')
-    try:
-        nltk.data.find('averaged_perceptron_tagger')
-    except LookupError:
-        nltk.download('averaged_perceptron_tagger')
-    try:
-        nltk.data.find('wordnet')
-    except LookupError:
-        nltk.download('wordnet')
-    try:
-        nltk.data.find('maxent_ne_chunker')
-    except LookupError:
-        nltk.download('maxent_ne_chunker')
-    try:
-        nltk.data.find('words')
-    except LookupError:
-        nltk.download('words')
     """
     Interface to the NLTK library for natural language processing features
 
@@ -46,13 +217,16 @@ class NLTK(NLP):
         lemmatization (bool): Whether you want to perform lemmatization
         strip_multiple_whitespaces (bool): Whether you want to remove multiple whitespaces
         url_tagging (bool): Whether you want to tag the urls in the text and to replace with "<URL>"
+        token_cache_size (int): capacity of the LRU cache of the stems and lemmas of the tokens (see TokenCache),
+            if 0 the results aren't cached
     """
     def __init__(self, stopwords_removal: bool = False,
                  stemming: bool = False,
                  lemmatization: bool = False,
                  strip_multiple_whitespaces: bool = True,
                  url_tagging: bool = False,
-                 lang='english'):
+                 lang='english',
+                 token_cache_size: int = 100000):
 
         if isinstance(stopwords_removal, str):
             stopwords_removal = stopwords_removal.lower() == 'true'
@@ -73,7 +247,15 @@ class NLTK(NLP):
                          stemming, lemmatization,
                          strip_multiple_whitespaces, url_tagging)
 
+        if isinstance(token_cache_size, str):
+            token_cache_size = int(token_cache_size)
+
         self.__full_lang_code = lang
+        self.__token_cache = TokenCache(token_cache_size)
+
+    @property
+    def token_cache(self) -> TokenCache:
+        return self.__token_cache
 
     def __str__(self):
         return "NLTK"
@@ -108,72 +290,6 @@ class NLTK(NLP):
         """
         return [word for sent in nltk.sent_tokenize(text) for word in word_tokenize(sent)]
 
-    def __stopwords_removal_operation(self, text) -> List[str]:
-        """
-        Execute stopwords removal on input text
-
-        Args:
-            text (List<str>):
-
-        Returns:
-            filtered_sentence (List<str>): list of words from the text, without the stopwords
-        """
-        stop_words = set(stopwords.words(self.__full_lang_code))
-
-        filtered_sentence = []
-        for word_token in text:
-            if word_token.lower() not in stop_words:
-                filtered_sentence.append(word_token)
-
-        return filtered_sentence
-
-    def __stemming_operation(self, text) -> List[str]:
-        """
-        Execute stemming on input text
-
-        Args:
-            text (List<str>):
-
-        Returns:
-            stemmed_text (List<str>): List of the fords from the text, reduced to their stem version
-        """
-        stemmer = SnowballStemmer(language=self.__full_lang_code)
-
-        stemmed_text = []
-        for word in text:
-            stemmed_text.append(stemmer.stem(word))
-
-        return stemmed_text
-
-    @staticmethod
-    def __lemmatization_operation(text) -> List[str]:
-        """
-        Execute lemmatization on input text
-
-        Args:
-            text (List<str>):
-
-        Returns:
-            lemmatized_text (List<str>): List of the fords from the text, reduced to their lemmatized version
-        """
-        def get_wordnet_pos(word):
-            """
-            Map POS tag to first character lemmatize() accepts
-            """
-            tag = nltk.pos_tag([word])[0][1][0].upper()
-            tag_dict = {"J": wordnet.ADJ,
-                        "N": wordnet.NOUN,
-                        "V": wordnet.VERB,
-                        "R": wordnet.ADV}
-
-            return tag_dict.get(tag, wordnet.NOUN)
-
-        lemmatizer = WordNetLemmatizer()
-        lemmatized_text = []
-        for word in text:
-            lemmatized_text.append(lemmatizer.lemmatize(word, get_wordnet_pos(word)))
-        return lemmatized_text
-
     def __named_entity_recognition_operation(self, text) -> nltk.tree.Tree:
         """
         Execute NER on input text
@@ -184,6 +300,9 @@ class NLTK(NLP):
         Returns:
             namedEnt (nltk.tree.Tree): A tree containing the bonds between the entities
         """
+        ensure_nltk_resource('taggers/averaged_perceptron_tagger')
+        ensure_nltk_resource('chunkers/maxent_ne_chunker')
+        ensure_nltk_resource('corpora/words')
         if type(text) == 'str':
             text = self.__tokenization_operation(text)
         text = nltk.pos_tag(text)
@@ -247,19 +366,46 @@ class NLTK(NLP):
                 del text[j]
         return text
 
+    def __pipeline(self) -> NLTKPipeline:
+        """
+        Returns the compiled pipeline for the current configuration of the NLTK instance
+        """
+        return compile_pipeline(self.__full_lang_code, bool(self.stopwords_removal), bool(self.stemming),
+                                bool(self.lemmatization))
+
     def process(self, field_data) -> List[str]:
-        field_data = check_not_tokenized(field_data)
-        if self.strip_multiple_whitespaces:
-            field_data = self.__strip_multiple_whitespaces_operation(field_data)
-        if self.url_tagging:
-            field_data = self.__url_tagging_operation(field_data)
-        field_data = self.__tokenization_operation(field_data)
-        if self.stopwords_removal:
-            field_data = self.__stopwords_removal_operation(field_data)
+        return self.process_batch([field_data])[0]
+
+    def process_batch(self, field_data_list: List[str]) -> List[List[str]]:
+        """
+        Processes each text of the list passed as argument, with the same result of calling process on each one of
+        them. The operations are applied to all the texts together, so that the POS tagging needed by the
+        lemmatization is done with a single call for the whole list
+
+        Args:
+            field_data_list (List[str]): texts to process
+
+        Returns:
+            List[List[str]]: list of tokens of each text
+        """
+        pipeline = self.__pipeline()
+        text_list = []
+        for field_data in field_data_list:
+            field_data = check_not_tokenized(field_data)
+            if self.strip_multiple_whitespaces:
+                field_data = self.__strip_multiple_whitespaces_operation(field_data)
+            if self.url_tagging:
+                field_data = self.__url_tagging_operation(field_data)
+            field_data = self.__tokenization_operation(field_data)
+            if self.stopwords_removal:
+                field_data = pipeline.remove_stopwords(field_data)
+            text_list.append(field_data)
+
+        token_cache = self.__token_cache if self.__token_cache.capacity > 0 else None
         if self.lemmatization:
-            field_data = self.__lemmatization_operation(field_data)
+            text_list = pipeline.lemmatize_batch(text_list, token_cache)
         if self.stemming:
-            field_data = self.__stemming_operation(field_data)
+            text_list = [pipeline.stem(text, token_cache) for text in text_list]
         if self.named_entity_recognition:
-            field_data = self.__named_entity_recognition_operation(field_data)
-        return self.__compact_tokens(field_data)
+            text_list = [self.__named_entity_recognition_operation(text) for text in text_list]
+        return [self.__compact_tokens(text) for text in text_list]
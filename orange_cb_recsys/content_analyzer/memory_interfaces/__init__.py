@@ -1 +1,8 @@
-from .text_interface import KeywordIndex, SearchIndex
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'KeywordIndex': '.text_interface',
+    'SearchIndex': '.text_interface',
+    'IndexSearcherPool': '.searcher_pool',
+    'index_searcher_pool': '.searcher_pool'
+})
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Union, List, Tuple
 import shutil
 
 
@@ -48,7 +48,18 @@ class InformationInterface(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def init_writing(self, delete_old: bool = False):
+    def delete_content(self, content_position: int):
+        """
+        Deletes the content in the position passed as argument. The positions of the other contents don't change.
+        It must be called while in writing mode
+
+        Args:
+            content_position (int): position of the content to delete
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def init_writing(self, delete_old: bool = False, field_names: List[str] = None):
         """
         Set the interface in writing mode,
         tf the specified directory does not exit a new one will be created.
@@ -58,6 +69,8 @@ class InformationInterface(ABC):
         Args:
             delete_old (bool): if True, the object handled by the information interface that was in the same directory
                 is destroyed and replaced; if False, the object is simply opened
+            field_names (List[str]): names of all the fields of the contents that will be serialized, if they are
+                known in advance (so that the interface can prepare the structure storing them only once)
         """
         raise NotImplementedError
 
@@ -68,6 +81,19 @@ class InformationInterface(ABC):
         """
         raise NotImplementedError
 
+    def resolve_positions(self, positions: List[int]) -> List[int]:
+        """
+        Returns the final positions of the contents serialized while in the last writing mode, given the positions
+        returned by serialize_content (by default they are the same). It must be called after stop_writing
+
+        Args:
+            positions (List[int]): positions returned by serialize_content
+
+        Returns:
+            List[int]: final positions of the contents
+        """
+        return list(positions)
+
     @abstractmethod
     def get_field(self, field_name: str, content_id: Union[str, int]):
         """
@@ -79,6 +105,27 @@ class InformationInterface(ABC):
         """
         raise NotImplementedError
 
+    def get_fields(self, field_requests: List[Tuple[str, Union[str, int]]]) -> list:
+        """
+        Allows to retrieve the content stored in many fields of many contents at once. By default the fields are
+        retrieved one at a time by get_field, the interfaces which can read them together should override this method
+
+        Args:
+            field_requests (List[Tuple[str, Union[str, int]]]): list of (field name, position or Id of the content)
+                pairs
+
+        Returns:
+            list: data contained in each requested field, in the same order as the requests
+        """
+        return [self.get_field(field_name, content_id) for field_name, content_id in field_requests]
+
+    def fingerprint_description(self) -> str:
+        """
+        Describes the memory interface in the fingerprint of a config (see the content_fingerprints module): only the
+        class and the directory are considered, since the other attributes change while writing
+        """
+        return "{}.{}({})".format(type(self).__module__, type(self).__qualname__, repr(self.__directory))
+
     def __hash__(self):
         return hash(str(self.__directory))
 
@@ -105,7 +152,11 @@ class ImageInterface(InformationInterface):
         raise NotImplementedError
 
     @abstractmethod
-    def init_writing(self, delete_old: bool = False):
+    def delete_content(self, content_position: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def init_writing(self, delete_old: bool = False, field_names: List[str] = None):
         raise NotImplementedError
 
     @abstractmethod
@@ -135,7 +186,11 @@ class AudioInterface(InformationInterface):
         raise NotImplementedError
 
     @abstractmethod
-    def init_writing(self, delete_old: bool = False):
+    def delete_content(self, content_position: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def init_writing(self, delete_old: bool = False, field_names: List[str] = None):
         raise NotImplementedError
 
     @abstractmethod
@@ -164,7 +219,11 @@ class TextInterface(InformationInterface):
         raise NotImplementedError
 
     @abstractmethod
-    def init_writing(self, delete_old: bool = False):
+    def delete_content(self, content_position: int):
+        raise NotImplementedError
+
+    @abstractmethod
+    def init_writing(self, delete_old: bool = False, field_names: List[str] = None):
         raise NotImplementedError
 
     @abstractmethod
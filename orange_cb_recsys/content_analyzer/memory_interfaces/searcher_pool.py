@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Tuple, Type
+
+
+class _PoolEntry:
+    """
+    Reader of an index opened by a thread, with the searchers (one for each weighting) using it
+    """
+
+    def __init__(self, ix):
+        self.ix = ix
+        self.reader = ix.reader()
+        self.searchers = {}
+        self.checked_at = time.monotonic()
+        self.stale = False
+
+    def close(self):
+        self.searchers.clear()
+        self.reader.close()
+
+
+class IndexSearcherPool:
+    """
+    Keeps the searchers of the Whoosh indexes open, so that reading from an index (for example the value of an
+    IndexField) doesn't open the index from disk each time. The searchers are opened the first time an index is read
+    and are shared by all the IndexInterfaces with the same directory (also the copies of the IndexInterfaces in the
+    IndexFields of the contents).
+
+    The pool is thread-safe: each thread uses its own searchers, since the Whoosh readers can't be used by many threads
+    at the same time (the searchers of the threads which have ended are closed when a new reader is opened). A process
+    forked from the one using the pool (for example a worker of a ProcessPoolExecutor) starts with an empty pool, so it
+    never shares the readers (and their file descriptors) of the parent process.
+
+    The searchers are refreshed when the index changes: an IndexInterface invalidates the searchers of its directory
+    when it stops writing, while the changes made by other processes are checked at most once every refresh_interval
+    seconds (so that checking the generation of the index on disk doesn't slow down each read).
+
+    The searchers of a directory are closed by the close method (see also the close method and the context manager of
+    the IndexInterface), the ones of all the directories by the clear method. Keep in mind that they must not be
+    closed while other threads are reading the index.
+
+    The framework uses the index_searcher_pool instance of this module
+
+    Args:
+        refresh_interval (float): minimum number of seconds between two checks of the generation of an index on disk
+    """
+
+    def __init__(self, refresh_interval: float = 1.0):
+        self.__refresh_interval = refresh_interval
+        self.__entries: Dict[Tuple[str, int], _PoolEntry] = {}
+        self.__lock = threading.Lock()
+
+        if hasattr(os, 'register_at_fork'):
+            pool_reference = weakref.ref(self)
+
+            def after_fork_in_child():
+                pool = pool_reference()
+                if pool is not None:
+                    pool.__forget_parent_entries()
+
+            os.register_at_fork(after_in_child=after_fork_in_child)
+
+    def __forget_parent_entries(self):
+        """
+        Called in a forked process: the readers inherited from the parent process are dropped without closing them,
+        since they still belong to the parent process (the lock is created again, since it may have been held by
+        another thread of the parent while forking)
+        """
+        self.__entries = {}
+        self.__lock = threading.Lock()
+
+    @property
+    def refresh_interval(self) -> float:
+        return self.__refresh_interval
+
+    def searcher(self, directory: str, weighting: Type = None):
+        """
+        Returns the searcher of the calling thread for the index in the directory passed as argument, opening the
+        index the first time and refreshing the searcher if the index has changed. The searcher must not be closed
+
+        Args:
+            directory (str): directory of the index
+            weighting (Type): weighting model class used by the searcher to score the results (for example TF_IDF), if
+                None the default weighting of Whoosh (BM25F) is used
+
+        Returns:
+            Searcher: open searcher over the latest generation of the index
+        """
+        from whoosh.index import open_dir
+        from whoosh.searching import Searcher
+
+        key = (directory, threading.get_ident())
+        entry = self.__entries.get(key)
+        if entry is not None and (entry.stale or time.monotonic() - entry.checked_at > self.__refresh_interval):
+            entry.stale = False
+            entry.checked_at = time.monotonic()
+            if entry.ix.latest_generation() != entry.reader.generation():
+                entry.close()
+                entry = None
+        if entry is None:
+            entry = _PoolEntry(open_dir(directory))
+            with self.__lock:
+                self.__entries[key] = entry
+                # the readers of the threads which have ended are closed
+                alive_threads = {thread.ident for thread in threading.enumerate()}
+                dead_keys = [entry_key for entry_key in self.__entries if entry_key[1] not in alive_threads]
+                dead_entries = [self.__entries.pop(entry_key) for entry_key in dead_keys]
+            for dead_entry in dead_entries:
+                dead_entry.close()
+
+        searcher = entry.searchers.get(weighting)
+        if searcher is None:
+            if weighting is None:
+                searcher = Searcher(entry.reader, fromindex=entry.ix, closereader=False)
+            else:
+                searcher = Searcher(entry.reader, weighting=weighting, fromindex=entry.ix, closereader=False)
+            entry.searchers[weighting] = searcher
+        return searcher
+
+    def invalidate(self, directory: str):
+        """
+        Marks the searchers of the directory passed as argument (of all the threads) so that they check if the index
+        has changed the next time they are used
+
+        Args:
+            directory (str): directory of the index
+        """
+        with self.__lock:
+            for (entry_directory, _), entry in self.__entries.items():
+                if entry_directory == directory:
+                    entry.stale = True
+
+    def close(self, directory: str):
+        """
+        Closes the searchers of the directory passed as argument (of all the threads)
+
+        Args:
+            directory (str): directory of the index
+        """
+        with self.__lock:
+            keys = [key for key in self.__entries if key[0] == directory]
+            entries = [self.__entries.pop(key) for key in keys]
+        for entry in entries:
+            entry.close()
+
+    def clear(self):
+        """
+        Closes all the searchers of the pool
+        """
+        with self.__lock:
+            entries = list(self.__entries.values())
+            self.__entries.clear()
+        for entry in entries:
+            entry.close()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __str__(self):
+        return "IndexSearcherPool"
+
+    def __repr__(self):
+        return "< IndexSearcherPool: refresh_interval = {}; open readers = {} >".format(self.__refresh_interval,
+                                                                                       len(self.__entries))
+
+
+"""
+Pool of the searchers used by the IndexInterfaces
+"""
+index_searcher_pool = IndexSearcherPool()
@@ -1,34 +1,84 @@
 import os
 
 from whoosh.analysis import SimpleAnalyzer
-from whoosh.fields import Schema, TEXT, KEYWORD
+from whoosh.fields import Schema, TEXT, KEYWORD, STORED
 from whoosh.index import create_in, open_dir
 from whoosh.formats import Frequency
 from whoosh.qparser import QueryParser, OrGroup, FieldsPlugin
 from whoosh.query import Term, Or
 from whoosh.scoring import TF_IDF, BM25F
-from typing import Union
+from typing import Union, List, Tuple
 
 from orange_cb_recsys.content_analyzer.memory_interfaces.memory_interfaces import TextInterface
+from orange_cb_recsys.content_analyzer.memory_interfaces.searcher_pool import index_searcher_pool
 import math
 import abc
 
+"""
+Stored field where the bulk writer with many processes keeps the order in which the documents have been added, since
+the processes store the documents in the index in a different order (see IndexInterface)
+"""
+POSITION_FIELD = 'content_position'
+
 
 class IndexInterface(TextInterface):
     """
     Abstract class that takes care of serializing and deserializing text in an indexed structure
     using the Whoosh library
 
+    The index can be written in two ways:
+
+    - if the names of the fields are not passed to init_writing, the schema of the index is generated dynamically:
+        when a document has a field which is not in the schema, the field is added to the schema and the writer is
+        committed and opened again
+    - if the names of all the fields are passed to init_writing (bulk writing, used by the ContentAnalyzer), the whole
+        schema is declared before writing the documents and the writer is committed only once, by stop_writing.
+        In this case the writer can use many processes (procs argument), each one writing its own segment of the
+        index (which are merged at the end, unless multisegment is True). Since the processes don't keep the order of
+        the documents, their final positions are only known after the commit and are returned by the
+        resolve_positions method
+
+    The searchers used to read the index are kept open by the index_searcher_pool (see IndexSearcherPool) and shared by
+    all the IndexInterfaces with the same directory, so that each read doesn't open the index. They are closed by the
+    close method or when the IndexInterface is used as a context manager:
+
+        with SearchIndex('index_dir') as index:
+            index.get_field('Plot#0', 'tt0114709')
+
     Args:
         directory (str): Path of the directory where the content will be serialized
+        procs (int): number of processes used by the bulk writer
+        limitmb (int): maximum memory (in megabytes) used by the writer (by each process of the bulk writer) to buffer
+            the documents before writing them on disk
+        multisegment (bool): if True, the segments written by the processes of the bulk writer are not merged, which
+            makes the commit faster but the searches slower
     """
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, procs: int = 1, limitmb: int = 128, multisegment: bool = False):
         super().__init__(directory)
+        self.__procs = procs
+        self.__limitmb = limitmb
+        self.__multisegment = multisegment
         self.__doc = None  # document that is currently being created and will be added to the index
         self.__writer = None  # index writer
         self.__doc_index = 0  # current position the document will have in the index once it is serialized
         self.__schema_changed = False  # true if the schema has been changed, false otherwise
+        self.__schema_names = set()  # names of the fields in the schema of the index, kept while writing
+        self.__bulk = False  # true if the whole schema has been declared in init_writing, false otherwise
+        self.__first_position = 0  # position of the first document added by the current (or last) writer
+        self.__positions = None  # final positions of the documents added by the last bulk writer, if they changed
+
+    @property
+    def procs(self) -> int:
+        return self.__procs
+
+    @property
+    def limitmb(self) -> int:
+        return self.__limitmb
+
+    @property
+    def multisegment(self) -> bool:
+        return self.__multisegment
 
     @property
     @abc.abstractmethod
@@ -40,7 +90,7 @@ class IndexInterface(TextInterface):
         """
         raise NotImplementedError
 
-    def init_writing(self, delete_old: bool = False):
+    def init_writing(self, delete_old: bool = False, field_names: List[str] = None):
         """
         Creates the index locally (in the directory passed in the constructor) and initializes the index writer.
         If an index already exists in the directory, what happens depend on the attribute delete_old passed as argument
@@ -48,21 +98,42 @@ class IndexInterface(TextInterface):
         Args:
             delete_old (bool): if True, the index that was in the same directory is destroyed and replaced;
                 if False, the index is simply opened
+            field_names (List[str]): names of all the fields of the documents that will be written, if they are
+                passed the whole schema is declared before writing (see the bulk writing in the class description)
         """
-        if os.path.exists(self.directory):
-            if delete_old:
-                self.delete()
-                os.mkdir(self.directory)
-                ix = create_in(self.directory, Schema())
-                self.__writer = ix.writer()
-            else:
+        self.__bulk = field_names is not None
+        self.__positions = None
+        field_types = {}
+        if self.__bulk:
+            field_types = {field_name: self.schema_type for field_name in field_names}
+            if self.__procs > 1:
+                field_types[POSITION_FIELD] = STORED()
+
+        if os.path.exists(self.directory) and delete_old:
+            self.delete()
+        if not os.path.exists(self.directory):
+            os.mkdir(self.directory)
+            ix = create_in(self.directory, Schema(**field_types))
+        else:
+            ix = open_dir(self.directory)
+            missing_field_names = [field_name for field_name in field_types if field_name not in ix.schema]
+            if len(missing_field_names) != 0:
+                # the schema of an existing index can only be changed by a writer which is then committed
+                writer = ix.writer()
+                for field_name in missing_field_names:
+                    writer.add_field(field_name, field_types[field_name])
+                writer.commit(merge=False)
                 ix = open_dir(self.directory)
-                self.__writer = ix.writer()
-                self.__doc_index = self.__writer.reader().doc_count()
+
+        if self.__bulk and self.__procs > 1:
+            self.__writer = ix.writer(procs=self.__procs, limitmb=self.__limitmb, multisegment=self.__multisegment)
         else:
-            os.mkdir(self.directory)
-            ix = create_in(self.directory, Schema())
-            self.__writer = ix.writer()
+            self.__writer = ix.writer(limitmb=self.__limitmb)
+
+        self.__schema_names = set(ix.schema.names())
+        # the deleted documents keep their position, so they are counted too
+        self.__doc_index = ix.doc_count_all()
+        self.__first_position = self.__doc_index
 
     def new_content(self):
         """
@@ -73,15 +144,19 @@ class IndexInterface(TextInterface):
 
     def new_field(self, field_name: str, field_data):
         """
-        Adds a new field to the document that is being created. Since the index Schema is generated dynamically, if
-        the field name is not in the Schema already it is added to it
+        Adds a new field to the document that is being created. If the index Schema is generated dynamically and the
+        field name is not in the Schema already, it is added to it. When bulk writing, the field must have been
+        declared in init_writing
 
         Args:
             field_name (str): Name of the new field
             field_data: Data to put into the field
         """
-        if field_name not in open_dir(self.directory).schema.names():
+        if field_name not in self.__schema_names:
+            if self.__bulk:
+                raise ValueError("The field {} hasn't been declared in init_writing".format(field_name))
             self.__writer.add_field(field_name, self.schema_type)
+            self.__schema_names.add(field_name)
             self.__schema_changed = True
         self.__doc[field_name] = field_data
 
@@ -92,20 +167,85 @@ class IndexInterface(TextInterface):
         and the document position in the index is returned
         """
         if self.__schema_changed:
-            self.__writer.commit()
-            self.__writer = open_dir(self.directory).writer()
+            self.__writer.commit(merge=False)
+            self.__writer = open_dir(self.directory).writer(limitmb=self.__limitmb)
             self.__schema_changed = False
+        if self.__bulk and self.__procs > 1:
+            self.__doc[POSITION_FIELD] = self.__doc_index
         self.__writer.add_document(**self.__doc)
         del self.__doc
         self.__doc_index += 1
         return self.__doc_index - 1
 
+    def delete_content(self, content_position: int):
+        """
+        Marks the document in the position passed as argument as deleted. The document keeps its position, so the
+        positions of the other documents don't change
+
+        Args:
+            content_position (int): position of the document in the index
+        """
+        self.__writer.delete_document(content_position)
+
     def stop_writing(self):
         """
-        Stops the index writer and commits the operations
+        Stops the index writer and commits the operations. The segments of the index are never merged, since merging
+        them would change the positions of the documents (which are referenced by the IndexField representations)
         """
-        self.__writer.commit()
+        self.__writer.commit(merge=False)
         del self.__writer
+        index_searcher_pool.invalidate(self.directory)
+
+        if self.__bulk and self.__procs > 1:
+            # the documents stored by the processes of the writer are found by the position they were added in
+            # (they are stored after the documents which were already in the index)
+            positions = {}
+            with open_dir(self.directory).reader() as reader:
+                for doc_num in range(self.__first_position, reader.doc_count_all()):
+                    positions[reader.stored_fields(doc_num)[POSITION_FIELD]] = doc_num
+            self.__positions = positions
+        self.__schema_names = set()
+
+    def resolve_positions(self, positions: List[int]) -> List[int]:
+        """
+        Returns the final positions in the index of the documents added by the last writer, given the positions
+        returned by serialize_content (they are different only if the documents have been stored by a bulk writer
+        with many processes). It must be called after stop_writing
+
+        Args:
+            positions (List[int]): positions returned by serialize_content
+
+        Returns:
+            List[int]: positions of the documents in the index
+        """
+        if self.__positions is None:
+            return list(positions)
+        return [self.__positions[position] for position in positions]
+
+    def close(self):
+        """
+        Closes the searchers kept open to read the index (they are opened again by the next read)
+        """
+        index_searcher_pool.close(self.directory)
+
+    def delete(self):
+        self.close()
+        super().delete()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self):
+        # the state of the writing isn't copied with the index (for example in the IndexFields of the contents)
+        state = self.__dict__.copy()
+        state['_IndexInterface__writer'] = None
+        state['_IndexInterface__doc'] = None
+        state['_IndexInterface__schema_names'] = set()
+        state['_IndexInterface__positions'] = None
+        return state
 
     def get_field(self, field_name: str, content_id: Union[str, int]) -> str:
         """
@@ -119,15 +259,46 @@ class IndexInterface(TextInterface):
         Returns:
             result: data contained in the field of the content
         """
-        ix = open_dir(self.directory)
-        with ix.searcher() as searcher:
+        searcher = index_searcher_pool.searcher(self.directory)
+        if isinstance(content_id, str):
+            query = Term("content_id", content_id)
+            result = searcher.search(query)
+            result = result[0][field_name]
+        elif isinstance(content_id, int):
+            result = searcher.reader().stored_fields(content_id)[field_name]
+        return result
+
+    def get_fields(self, field_requests: List[Tuple[str, Union[str, int]]]) -> list:
+        """
+        Retrieves the data of many fields of many contents using a single searcher: the contents requested by their
+        content_id are found first, then the stored fields of each content are read only once, in the order of the
+        contents in the index (so that the reads are sequential on disk).
+
+        EXAMPLE:
+            index.get_fields([('Plot#0', 'tt0114709'), ('Plot#0', 3), ('Genre#0', 'tt0114709')])
+
+        Args:
+            field_requests (List[Tuple[str, Union[str, int]]]): list of (field name, content) pairs, where each content
+                is identified by either its position in the index (if it is an integer) or its content_id (if it is a
+                string)
+
+        Returns:
+            list: data contained in each requested field, in the same order as the requests
+        """
+        searcher = index_searcher_pool.searcher(self.directory)
+        doc_nums = []
+        for field_name, content_id in field_requests:
             if isinstance(content_id, str):
-                query = Term("content_id", content_id)
-                result = searcher.search(query)
-                result = result[0][field_name]
-            elif isinstance(content_id, int):
-                result = searcher.reader().stored_fields(content_id)[field_name]
-            return result
+                doc_num = searcher.document_number(content_id=content_id)
+                if doc_num is None:
+                    raise IndexError("The content {} isn't in the index {}".format(content_id, self.directory))
+                doc_nums.append(doc_num)
+            else:
+                doc_nums.append(content_id)
+
+        reader = searcher.reader()
+        stored_fields = {doc_num: reader.stored_fields(doc_num) for doc_num in sorted(set(doc_nums))}
+        return [stored_fields[doc_num][field_name] for (field_name, _), doc_num in zip(field_requests, doc_nums)]
 
     def query(self, string_query: str, results_number: int, mask_list: list = None,
               candidate_list: list = None, classic_similarity: bool = True) -> dict:
@@ -156,48 +327,48 @@ class IndexInterface(TextInterface):
                 external dictionary
                 items_score is the score given to the item for the query by the index searcher
         """
-        ix = open_dir(self.directory)
-        with ix.searcher(weighting=TF_IDF if classic_similarity else BM25F) as searcher:
-            candidate_query_list = None
-            mask_query_list = None
-
-            # the mask list contains the content_id for the items to ignore in the searching process
-            # from the mask list a mask query is created and it will be used by the searcher
-            if mask_list is not None:
-                mask_query_list = []
-                for document in mask_list:
-                    mask_query_list.append(Term("content_id", document))
-                mask_query_list = Or(mask_query_list)
-
-            # the candidate list contains the content_id for the items to consider in the searching process
-            # from the candidate list a candidate query is created and it will be used by the searcher
-            if candidate_list is not None:
-                candidate_query_list = []
-                for candidate in candidate_list:
-                    candidate_query_list.append(Term("content_id", candidate))
-                candidate_query_list = Or(candidate_query_list)
-
-            schema = ix.schema
-            parser = QueryParser("content_id", schema=schema, group=OrGroup)
-            # regular expression to match the possible field styles
-            # examples: "content_id" or "Genre#2" or "Genre#2#custom_id"
-            parser.add_plugin(FieldsPlugin(r'(?P<text>[\w-]+(\#[\w-]+(\#[\w-]+)?)?|[*]):'))
-            query = parser.parse(string_query)
-            score_docs = \
-                searcher.search(query, limit=results_number, filter=candidate_query_list, mask=mask_query_list)
-
-            # creation of the results dictionary, This phase is necessary because the Hit objects returned by the
-            # searcher as results need the reader inside the search index in order to return information
-            # so it would be impossible to access a field or the score of the item from outside this method
-            # because of that this dictionary containing the most important infos is created
-            results = {}
-            for hit in score_docs:
-                hit_dict = dict(hit)
-                content_id = hit_dict.pop("content_id")
-                results[content_id] = {}
-                results[content_id]["item"] = hit_dict
-                results[content_id]["score"] = hit.score
-            return results
+        searcher = index_searcher_pool.searcher(self.directory, TF_IDF if classic_similarity else BM25F)
+        candidate_query_list = None
+        mask_query_list = None
+
+        # the mask list contains the content_id for the items to ignore in the searching process
+        # from the mask list a mask query is created and it will be used by the searcher
+        if mask_list is not None:
+            mask_query_list = []
+            for document in mask_list:
+                mask_query_list.append(Term("content_id", document))
+            mask_query_list = Or(mask_query_list)
+
+        # the candidate list contains the content_id for the items to consider in the searching process
+        # from the candidate list a candidate query is created and it will be used by the searcher
+        if candidate_list is not None:
+            candidate_query_list = []
+            for candidate in candidate_list:
+                candidate_query_list.append(Term("content_id", candidate))
+            candidate_query_list = Or(candidate_query_list)
+
+        schema = searcher.schema
+        parser = QueryParser("content_id", schema=schema, group=OrGroup)
+        # regular expression to match the possible field styles
+        # examples: "content_id" or "Genre#2" or "Genre#2#custom_id"
+        parser.add_plugin(FieldsPlugin(r'(?P<text>[\w-]+(\#[\w-]+(\#[\w-]+)?)?|[*]):'))
+        query = parser.parse(string_query)
+        score_docs = \
+            searcher.search(query, limit=results_number, filter=candidate_query_list, mask=mask_query_list)
+
+        # creation of the results dictionary, This phase is necessary because the Hit objects returned by the
+        # searcher as results need the reader inside the search index in order to return information
+        # so it would be impossible to access a field or the score of the item from outside this method
+        # because of that this dictionary containing the most important infos is created
+        results = {}
+        for hit in score_docs:
+            hit_dict = dict(hit)
+            content_id = hit_dict.pop("content_id")
+            hit_dict.pop(POSITION_FIELD, None)
+            results[content_id] = {}
+            results[content_id]["item"] = hit_dict
+            results[content_id]["score"] = hit.score
+        return results
 
     def get_tf_idf(self, field_name: str, content_id: Union[str, int]):
         """
@@ -213,24 +384,23 @@ class IndexInterface(TextInterface):
              words_bag (Dict <str, float>): Dictionary whose keys are the words contained in the field,
                 and the corresponding values are the tf-idf values
         """
-        ix = open_dir(self.directory)
+        searcher = index_searcher_pool.searcher(self.directory)
         words_bag = {}
-        with ix.searcher() as searcher:
-            if isinstance(content_id, str):
-                query = Term("content_id", content_id)
-                doc_num = searcher.search(query).docnum(0)
-            elif isinstance(content_id, int):
-                doc_num = content_id
-
-            # if the document has the field == "" (length == 0) then the bag of word is empty
-            if len(searcher.ixreader.stored_fields(doc_num)[field_name]) > 0:
-                # retrieves the frequency vector (used for tf)
-                list_with_freq = [term_with_freq for term_with_freq
-                                  in searcher.vector(doc_num, field_name).items_as("frequency")]
-                for term, freq in list_with_freq:
-                    tf = 1 + math.log10(freq)
-                    idf = math.log10(searcher.doc_count()/searcher.doc_frequency(field_name, term))
-                    words_bag[term] = tf*idf
+        if isinstance(content_id, str):
+            query = Term("content_id", content_id)
+            doc_num = searcher.search(query).docnum(0)
+        elif isinstance(content_id, int):
+            doc_num = content_id
+
+        # if the document has the field == "" (length == 0) then the bag of word is empty
+        if len(searcher.ixreader.stored_fields(doc_num)[field_name]) > 0:
+            # retrieves the frequency vector (used for tf)
+            list_with_freq = [term_with_freq for term_with_freq
+                              in searcher.vector(doc_num, field_name).items_as("frequency")]
+            for term, freq in list_with_freq:
+                tf = 1 + math.log10(freq)
+                idf = math.log10(searcher.doc_count()/searcher.doc_frequency(field_name, term))
+                words_bag[term] = tf*idf
         return words_bag
 
 
@@ -241,8 +411,8 @@ class KeywordIndex(IndexInterface):
     "content_id" field data containing white spaces
     """
 
-    def __init__(self, directory: str):
-        super().__init__(directory)
+    def __init__(self, directory: str, procs: int = 1, limitmb: int = 128, multisegment: bool = False):
+        super().__init__(directory, procs, limitmb, multisegment)
 
     @property
     def schema_type(self):
@@ -261,8 +431,8 @@ class SearchIndex(IndexInterface):
     much as the original as possible
     """
 
-    def __init__(self, directory: str):
-        super().__init__(directory)
+    def __init__(self, directory: str, procs: int = 1, limitmb: int = 128, multisegment: bool = False):
+        super().__init__(directory, procs, limitmb, multisegment)
 
     @property
     def schema_type(self):
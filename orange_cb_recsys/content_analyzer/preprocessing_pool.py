@@ -0,0 +1,231 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Callable, Set, Dict, Tuple
+
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_fingerprint
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+
+# preprocessors of the worker process, unpickled only once when the worker is started
+_worker_preprocessor_list: List[InformationProcessor] = []
+
+
+def _init_worker(preprocessor_list: List[InformationProcessor]):
+    global _worker_preprocessor_list
+    _worker_preprocessor_list = preprocessor_list
+
+
+def _process_chunk(data_list: List) -> List:
+    return apply_preprocessors(data_list, _worker_preprocessor_list)
+
+
+def apply_preprocessors(data_list: List, preprocessor_list: List[InformationProcessor]) -> List:
+    """
+    Applies each preprocessor of the list to all the data passed as argument (with the same result of applying the
+    preprocessors to each data on its own), so that the preprocessors can process many data together
+
+    Args:
+        data_list (List): raw data to process
+        preprocessor_list (List[InformationProcessor]): preprocessors to apply, in order
+
+    Returns:
+        List: the processed data, in the same order of the raw data
+    """
+    processed_data_list = list(data_list)
+    for preprocessor in preprocessor_list:
+        processed_data_list = preprocessor.process_batch(processed_data_list)
+    return processed_data_list
+
+
+class PreprocessingPool:
+    """
+    Pool of processes used by the techniques to apply the preprocessors to the raw data of the contents in parallel.
+    The raw data is split in chunks, which are processed by the worker processes, and the processed data is returned
+    in the same order of the raw data, so the result doesn't depend on the number of processes.
+
+    The preprocessors are copied in each worker process only once, when the pool is started: the pool is kept alive
+    as long as it is used with equal preprocessors, and it's restarted when different preprocessors are used.
+    The ContentAnalyzer closes the pool once all the contents are produced, otherwise the close method should be
+    called (or the pool should be used as a context manager).
+
+    Keep in mind that the preprocessors must be picklable and that, if the ContentAnalyzer already processes the field
+    configs in different processes (n_jobs of the config), each one of them will start its own pool
+
+    EXAMPLE:
+        pool = PreprocessingPool(n_jobs=4)
+        ItemAnalyzerConfig(source, 'imdbID', 'output_dir', preprocessing_pool=pool)
+
+    Args:
+        n_jobs (int): number of worker processes, if -1 all the cpus will be used
+        chunk_size (int): number of raw data sent to a worker process at a time. If None, the data is split in 4
+            chunks for each worker process
+    """
+
+    def __init__(self, n_jobs: int = -1, chunk_size: int = None):
+        self.__n_jobs = n_jobs
+        self.__chunk_size = chunk_size
+        self.__executor = None
+        self.__executor_key = None
+
+    @property
+    def n_jobs(self) -> int:
+        return self.__n_jobs
+
+    @property
+    def chunk_size(self) -> int:
+        return self.__chunk_size
+
+    @property
+    def max_workers(self) -> int:
+        return os.cpu_count() if self.__n_jobs == -1 else self.__n_jobs
+
+    def process(self, data_list: List, preprocessor_list: List[InformationProcessor]) -> List:
+        """
+        Applies the preprocessors to each raw data passed as argument using the worker processes
+
+        Args:
+            data_list (List): raw data to process
+            preprocessor_list (List[InformationProcessor]): preprocessors to apply, in order
+
+        Returns:
+            List: the processed data, in the same order of the raw data
+        """
+        data_list = list(data_list)
+        if self.max_workers <= 1 or len(data_list) <= 1 or len(preprocessor_list) == 0:
+            return apply_preprocessors(data_list, preprocessor_list)
+
+        chunk_size = self.__chunk_size
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(data_list) // (self.max_workers * 4)))
+        chunks = [data_list[start:start + chunk_size] for start in range(0, len(data_list), chunk_size)]
+
+        processed_data_list = []
+        for processed_chunk in self.__get_executor(preprocessor_list).map(_process_chunk, chunks):
+            processed_data_list.extend(processed_chunk)
+        return processed_data_list
+
+    def __get_executor(self, preprocessor_list: List[InformationProcessor]) -> ProcessPoolExecutor:
+        """
+        Returns the executor whose workers have been initialized with preprocessors equal to the ones passed as
+        argument, starting a new one if needed
+        """
+        executor_key = object_fingerprint(preprocessor_list)
+        if self.__executor is None or self.__executor_key != executor_key:
+            self.close()
+            self.__executor = ProcessPoolExecutor(self.max_workers, initializer=_init_worker,
+                                                  initargs=(preprocessor_list,))
+            self.__executor_key = executor_key
+        return self.__executor
+
+    def close(self):
+        """
+        Stops the worker processes (the pool can still be used, new workers will be started)
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+            self.__executor_key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getstate__(self):
+        # the worker processes aren't copied with the pool
+        state = self.__dict__.copy()
+        state['_PreprocessingPool__executor'] = None
+        state['_PreprocessingPool__executor_key'] = None
+        return state
+
+    def fingerprint_description(self) -> None:
+        """
+        The pool doesn't change the processed data, so it is not considered in the fingerprint of the techniques
+        """
+        return None
+
+    def __str__(self):
+        return "PreprocessingPool"
+
+    def __repr__(self):
+        return "< PreprocessingPool: n_jobs = {}; chunk_size = {} >".format(self.__n_jobs, self.__chunk_size)
+
+
+class SharedPreprocessing:
+    """
+    Keeps the processed data computed by a technique so that it can be reused by the other techniques that process
+    the same raw data with equal preprocessors (for example the field configs of the same field with the same
+    preprocessor list). Only the preprocessor lists whose fingerprint is in the shared keys are considered, and for
+    each one of them only the last processed data lists are kept (as many as the number of fields where the
+    preprocessor list is shared), so the techniques which share the preprocessing should be used one after the other.
+
+    It's used by the ContentsProducer, which clears it after each chunk of contents
+
+    Args:
+        shared_keys (Dict[str, int]): fingerprints (see object_fingerprint) of the preprocessor lists to share, each
+            one associated to the number of fields where it is shared
+    """
+
+    def __init__(self, shared_keys: Dict[str, int]):
+        self.__shared_keys = shared_keys
+        self.__results: Dict[str, List[Tuple[List, List]]] = {}
+        self.__hits = 0
+
+    @property
+    def shared_keys(self) -> Dict[str, int]:
+        return self.__shared_keys
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    def process(self, data_list: List, preprocessor_list: List[InformationProcessor],
+                process_function: Callable[[List, List[InformationProcessor]], List]) -> List:
+        """
+        Returns the processed data for the raw data and the preprocessors passed as argument: if the same raw data
+        has already been processed with equal preprocessors, the stored result is returned, otherwise the data is
+        processed with the process function passed as argument
+
+        Args:
+            data_list (List): raw data to process
+            preprocessor_list (List[InformationProcessor]): preprocessors to apply, in order
+            process_function (Callable): function that processes the raw data with the preprocessors
+
+        Returns:
+            List: the processed data, in the same order of the raw data
+        """
+        key = object_fingerprint(preprocessor_list)
+        if key not in self.__shared_keys:
+            return process_function(data_list, preprocessor_list)
+
+        data_list = list(data_list)
+        results = self.__results.setdefault(key, [])
+        for stored_data_list, processed_data_list in results:
+            if stored_data_list == data_list:
+                self.__hits += 1
+                return list(processed_data_list)
+
+        processed_data_list = process_function(data_list, preprocessor_list)
+        results.append((data_list, processed_data_list))
+        if len(results) > self.__shared_keys[key]:
+            del results[0]
+        return list(processed_data_list)
+
+    def clear(self):
+        """
+        Deletes the stored processed data
+        """
+        self.__results.clear()
+
+    def fingerprint_description(self) -> None:
+        """
+        The shared preprocessing doesn't change the processed data, so it is not considered in the fingerprint of the
+        techniques
+        """
+        return None
+
+    def __str__(self):
+        return "SharedPreprocessing"
+
+    def __repr__(self):
+        return "< SharedPreprocessing: shared_keys = {}; hits = {} >".format(self.__shared_keys, self.__hits)
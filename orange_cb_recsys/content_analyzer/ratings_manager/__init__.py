@@ -1,3 +1,7 @@
-from .rating_processor import NumberNormalizer
-from .ratings_importer import RatingsImporter
-from .sentiment_analysis import TextBlobSentimentAnalysis
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'NumberNormalizer': '.rating_processor',
+    'RatingsImporter': '.ratings_importer',
+    'TextBlobSentimentAnalysis': '.sentiment_analysis'
+})
@@ -2,9 +2,8 @@ import csv
 from abc import ABC, abstractmethod
 
 import json
-from typing import Dict, Iterator
-
-import mysql.connector
+from itertools import islice
+from typing import Dict, Iterator, List, Iterable, Set
 
 
 class RawInformationSource(ABC):
@@ -126,6 +125,8 @@ class SQLDatabase(RawInformationSource):
         self.__database_name: str = database_name
         self.__table_name: str = table_name
 
+        import mysql.connector
+
         conn = mysql.connector.connect(host=self.__host,
                                        user=self.__username,
                                        password=self.__password,
@@ -190,3 +191,85 @@ class SQLDatabase(RawInformationSource):
         cursor.execute(query)
         for result in cursor:
             yield result
+
+
+class ColumnarSource(RawInformationSource):
+    """
+    Class that reads the raw contents of another source (or any iterable of raw contents) only once and keeps them in
+    memory column by column, storing only the fields in the field list passed as argument. It is used by the content
+    analyzer so that the original source is parsed a single time, while the techniques can iterate over the
+    buffer in the same way they iterate over the original source, as many times as they need.
+
+    If a raw content doesn't have one of the fields, the field won't be in the dictionary returned for said content
+    (as in the original source)
+
+    Args:
+        raw_contents (Iterable[Dict[str, str]]): raw contents to store, for example another RawInformationSource
+        field_list (List[str]): fields of the raw contents that will be stored. If None, all the fields are stored
+        encoding (str): encoding of the original source
+    """
+
+    def __init__(self, raw_contents: Iterable[Dict[str, str]], field_list: List[str] = None,
+                 encoding: str = "utf-8"):
+        super().__init__(encoding)
+        self.__columns: Dict[str, list] = {}
+        # positions of the raw contents that don't have the field, for each field
+        self.__missing: Dict[str, Set[int]] = {}
+        self.__length = 0
+
+        for position, raw_content in enumerate(raw_contents):
+            if field_list is None:
+                fields = raw_content.keys()
+            else:
+                fields = [field for field in field_list if field in raw_content]
+
+            for field in fields:
+                if field not in self.__columns:
+                    # the field was missing in all the raw contents read until now
+                    self.__columns[field] = [None] * position
+                    self.__missing[field] = set(range(position))
+                self.__columns[field].append(raw_content[field])
+
+            for field, column in self.__columns.items():
+                if len(column) == position:
+                    column.append(None)
+                    self.__missing[field].add(position)
+
+            self.__length = position + 1
+
+    @property
+    def field_list(self) -> List[str]:
+        return list(self.__columns.keys())
+
+    def __len__(self):
+        return self.__length
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        columns = self.__columns.items()
+        for position in range(self.__length):
+            yield {field: column[position] for field, column in columns if position not in self.__missing[field]}
+
+
+def split_in_chunks(source: RawInformationSource, chunk_size: int,
+                    field_list: List[str] = None) -> Iterator[ColumnarSource]:
+    """
+    Reads the source passed as argument and yields its contents in chunks of chunk_size contents (the last chunk can
+    be smaller). Only the chunk that is yielded is kept in memory
+
+    Args:
+        source (RawInformationSource): source that will be split in chunks
+        chunk_size (int): maximum number of contents in each chunk
+        field_list (List[str]): fields of the raw contents that will be kept in the chunks. If None, all the fields are
+            kept
+
+    Returns:
+        Iterator[ColumnarSource]: iterator over the chunks of the source
+    """
+    if chunk_size < 1:
+        raise ValueError("The chunk size must be a positive number")
+
+    iterator = iter(source)
+    chunk = ColumnarSource(islice(iterator, chunk_size), field_list, source.encoding)
+    while len(chunk) != 0:
+        yield chunk
+        chunk = ColumnarSource(islice(iterator, chunk_size), field_list, source.encoding)
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import pickle
+import uuid
+from typing import Callable, List, Union
+
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_fingerprint
+from orange_cb_recsys.content_analyzer.content_representation.content import FieldRepresentation
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import InformationProcessor
+
+CACHE_ENTRY_EXTENSION = '.pkl'
+
+
+class RepresentationCache:
+    """
+    Persistent cache of the field representations produced by the techniques, shared between different runs of the
+    content analyzer. The cache is content-addressed: the key of a representation is the hash of the raw value of the
+    field, of the technique (with all its parameters) and of the list of preprocessors used, so a representation is
+    reused every time the same value is processed by an equal technique with equal preprocessors, even by a different
+    config or for a different content.
+
+    Each representation is pickled in its own file in the directory of the cache (so different processes can use the
+    same cache at the same time). When the size of the cache exceeds max_size, the least recently used entries are
+    evicted until the size goes below 90% of max_size (an entry is used when it's written or read).
+
+    The counters of the hits and of the misses only refer to the current process.
+
+    The models used by the techniques are identified by their reference and, if stored locally, by the size and the
+    last modification time of their files (see EmbeddingSource.fingerprint_description), so the representations
+    produced with a model are not reused once the model is retrained or replaced at the same reference
+
+    EXAMPLE:
+        cache = RepresentationCache('cache_dir', max_size=10 * 2 ** 30)
+        ItemAnalyzerConfig(source, 'imdbID', 'output_dir', representation_cache=cache)
+
+    Args:
+        directory (str): directory where the representations are stored
+        max_size (int): maximum size (in bytes) of the cache
+    """
+
+    def __init__(self, directory: str, max_size: int = 2 ** 30):
+        self.__directory = directory
+        self.__max_size = max_size
+        # size of the entries stored in the directory, computed when the first entry is stored
+        self.__size = None
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def directory(self) -> str:
+        return self.__directory
+
+    @property
+    def max_size(self) -> int:
+        return self.__max_size
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @property
+    def hit_rate(self) -> float:
+        requests = self.__hits + self.__misses
+        return self.__hits / requests if requests != 0 else 0.0
+
+    def technique_key(self, technique: object, preprocessor_list: List[InformationProcessor]) -> str:
+        """
+        Computes the part of the key shared by all the representations produced by the technique with the list of
+        preprocessors passed as argument (it should be computed once and then passed to the get and put methods)
+        """
+        return object_fingerprint([technique, preprocessor_list])
+
+    def __path(self, technique_key: str, field_data: object) -> str:
+        key = hashlib.sha1((technique_key + '\0' + repr(field_data)).encode('utf-8')).hexdigest()
+        return os.path.join(self.__directory, key[:2], key + CACHE_ENTRY_EXTENSION)
+
+    def get(self, technique_key: str, field_data: object) -> Union[FieldRepresentation, None]:
+        """
+        Returns the representation produced for the raw field data passed as argument by the technique identified by
+        the technique key, or None if the representation is not in the cache
+
+        Args:
+            technique_key (str): key returned by the technique_key method
+            field_data (object): raw value of the field
+        """
+        path = self.__path(technique_key, field_data)
+        try:
+            with open(path, 'rb') as entry_file:
+                representation = pickle.load(entry_file)
+            # the modification time is used to find the least recently used entries
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # the entry may also have been evicted by another process while it was being read
+            self.__misses += 1
+            return None
+
+        self.__hits += 1
+        return representation
+
+    def put(self, technique_key: str, field_data: object, representation: FieldRepresentation):
+        """
+        Stores the representation produced for the raw field data passed as argument by the technique identified by
+        the technique key. The least recently used entries are evicted if the cache exceeds its maximum size
+
+        Args:
+            technique_key (str): key returned by the technique_key method
+            field_data (object): raw value of the field
+            representation (FieldRepresentation): representation produced by the technique
+        """
+        if self.__size is None:
+            self.__size = sum(size for _, _, size in self.__entries())
+
+        path = self.__path(technique_key, field_data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # the entry is written in a temporary file which then replaces the old one, so that other processes never
+        # read a partially written entry
+        tmp_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+        with open(tmp_path, 'wb') as entry_file:
+            pickle.dump(representation, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__size += os.path.getsize(tmp_path)
+        # the size of the entry which is overwritten (if any) is no longer part of the cache
+        try:
+            self.__size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp_path, path)
+
+        if self.__size > self.__max_size:
+            self.__evict()
+
+    def __entries(self):
+        """
+        Iterates over the entries of the cache, yielding the path, the last access time and the size of each one
+        """
+        if not os.path.isdir(self.__directory):
+            return
+        for sub_directory in os.scandir(self.__directory):
+            if sub_directory.is_dir():
+                for entry in os.scandir(sub_directory.path):
+                    if entry.name.endswith(CACHE_ENTRY_EXTENSION):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield entry.path, stat.st_mtime, stat.st_size
+
+    def __evict(self):
+        """
+        Removes the least recently used entries until the size of the cache goes below 90% of the maximum size
+        """
+        entries = sorted(self.__entries(), key=lambda entry: entry[1])
+        self.__size = sum(size for _, _, size in entries)
+        target_size = self.__max_size * 0.9
+        for path, _, size in entries:
+            if self.__size <= target_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.__size -= size
+
+    def cached(self, technique: object, preprocessor_list: List[InformationProcessor],
+               produce_function: Callable[[object], FieldRepresentation]) -> Callable[[object], FieldRepresentation]:
+        """
+        Wraps the function passed as argument, which produces the representation of a raw field value using the
+        technique and the preprocessors passed as argument, so that the representation is first searched in the cache
+        and is stored in the cache once produced
+
+        Args:
+            technique (object): technique that produces the representations
+            preprocessor_list (List[InformationProcessor]): preprocessors applied to the raw field values
+            produce_function (Callable): function that produces the representation of a raw field value
+
+        Returns:
+            Callable: function with the same behaviour of produce_function which uses the cache
+        """
+        technique_key = self.technique_key(technique, preprocessor_list)
+
+        def produce(field_data: object) -> FieldRepresentation:
+            representation = self.get(technique_key, field_data)
+            if representation is None:
+                representation = produce_function(field_data)
+                self.put(technique_key, field_data, representation)
+            return representation
+
+        return produce
+
+    def clear(self):
+        """
+        Removes all the entries of the cache
+        """
+        for path, _, _ in list(self.__entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.__size = 0
+
+    def fingerprint_description(self) -> None:
+        """
+        The cache doesn't change the representations, so it is not considered in the fingerprint of the techniques
+        """
+        return None
+
+    def __str__(self):
+        return "RepresentationCache"
+
+    def __repr__(self):
+        return "< RepresentationCache: directory = {}; max_size = {}; hits = {}; misses = {} >".format(
+            self.__directory, self.__max_size, self.__hits, self.__misses)
@@ -1,8 +1,48 @@
-from . import eval_pipeline_modules
-from . import metrics
-from . import partitioning_techniques
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
 
-from .eval_pipeline_modules import *
-from .metrics import *
-from .partitioning_techniques import *
-from .eval_model import EvalModel
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'TestRatingsMethodology': '.eval_pipeline_modules',
+    'TestItemsMethodology': '.eval_pipeline_modules',
+    'TrainingItemsMethodology': '.eval_pipeline_modules',
+    'AllItemsMethodology': '.eval_pipeline_modules',
+    'PartitionModule': '.eval_pipeline_modules',
+    'Split': '.eval_pipeline_modules',
+    'PredictionCalculator': '.eval_pipeline_modules',
+    'MetricCalculator': '.eval_pipeline_modules',
+    'Precision': '.metrics',
+    'PrecisionAtK': '.metrics',
+    'RPrecision': '.metrics',
+    'Recall': '.metrics',
+    'RecallAtK': '.metrics',
+    'FMeasure': '.metrics',
+    'FMeasureAtK': '.metrics',
+    'MAE': '.metrics',
+    'MSE': '.metrics',
+    'RMSE': '.metrics',
+    'GiniIndex': '.metrics',
+    'DeltaGap': '.metrics',
+    'PredictionCoverage': '.metrics',
+    'CatalogCoverage': '.metrics',
+    'PopProfileVsRecs': '.metrics',
+    'PopRecsCorrelation': '.metrics',
+    'LongTailDistr': '.metrics',
+    'NDCG': '.metrics',
+    'NDCGAtK': '.metrics',
+    'MRR': '.metrics',
+    'MRRAtK': '.metrics',
+    'Correlation': '.metrics',
+    'KFoldPartitioning': '.partitioning_techniques',
+    'HoldOutPartitioning': '.partitioning_techniques',
+    'EvalModel': '.eval_model'
+}, {
+    'classification_metrics': '.metrics.classification_metrics',
+    'error_metrics': '.metrics.error_metrics',
+    'fairness_metrics': '.metrics.fairness_metrics',
+    'methodology': '.eval_pipeline_modules.methodology',
+    'metric_evaluator': '.eval_pipeline_modules.metric_evaluator',
+    'partition_module': '.eval_pipeline_modules.partition_module',
+    'partitioning': '.partitioning_techniques.partitioning',
+    'plot_metrics': '.metrics.plot_metrics',
+    'prediction_calculator': '.eval_pipeline_modules.prediction_calculator',
+    'ranking_metrics': '.metrics.ranking_metrics'
+})
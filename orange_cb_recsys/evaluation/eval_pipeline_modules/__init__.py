@@ -1,5 +1,12 @@
-from .methodology import TestRatingsMethodology, TestItemsMethodology, TrainingItemsMethodology,\
-    AllItemsMethodology
-from .partition_module import PartitionModule, Split
-from .prediction_calculator import PredictionCalculator
-from .metric_evaluator import MetricCalculator
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'TestRatingsMethodology': '.methodology',
+    'TestItemsMethodology': '.methodology',
+    'TrainingItemsMethodology': '.methodology',
+    'AllItemsMethodology': '.methodology',
+    'PartitionModule': '.partition_module',
+    'Split': '.partition_module',
+    'PredictionCalculator': '.prediction_calculator',
+    'MetricCalculator': '.metric_evaluator'
+})
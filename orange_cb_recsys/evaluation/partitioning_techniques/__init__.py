@@ -1 +1,6 @@
-from .partitioning import KFoldPartitioning, HoldOutPartitioning
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'KFoldPartitioning': '.partitioning',
+    'HoldOutPartitioning': '.partitioning'
+})
@@ -1,8 +1,54 @@
-from . import content_based_algorithm
-from . import graph_based_algorithm
-from . import graphs
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
 
-from .content_based_algorithm import *
-from .graph_based_algorithm import *
-from .graphs import *
-from .recsys import ContentBasedRS, GraphBasedRS
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'CentroidVector': '.content_based_algorithm',
+    'CosineSimilarity': '.content_based_algorithm',
+    'ClassifierRecommender': '.content_based_algorithm',
+    'SkSVC': '.content_based_algorithm',
+    'SkKNN': '.content_based_algorithm',
+    'SkRandomForest': '.content_based_algorithm',
+    'SkLogisticRegression': '.content_based_algorithm',
+    'SkDecisionTree': '.content_based_algorithm',
+    'SkGaussianProcess': '.content_based_algorithm',
+    'IndexQuery': '.content_based_algorithm',
+    'LinearPredictor': '.content_based_algorithm',
+    'SkLinearRegression': '.content_based_algorithm',
+    'SkRidge': '.content_based_algorithm',
+    'SkBayesianRidge': '.content_based_algorithm',
+    'SkSGDRegressor': '.content_based_algorithm',
+    'SkARDRegression': '.content_based_algorithm',
+    'SkHuberRegressor': '.content_based_algorithm',
+    'SkPassiveAggressiveRegressor': '.content_based_algorithm',
+    'NXPageRank': '.graph_based_algorithm',
+    'NXTopKPageRank': '.graph_based_algorithm',
+    'NXTopKDegreeCentrality': '.graph_based_algorithm',
+    'NXTopKEigenVectorCentrality': '.graph_based_algorithm',
+    'NXBipartiteGraph': '.graphs',
+    'NXTripartiteGraph': '.graphs',
+    'NXFullGraph': '.graphs',
+    'UserNode': '.graphs',
+    'ItemNode': '.graphs',
+    'PropertyNode': '.graphs',
+    'ContentBasedRS': '.recsys',
+    'GraphBasedRS': '.recsys'
+}, {
+    'centroid_vector': '.content_based_algorithm.centroid_vector.centroid_vector',
+    'classifier': '.content_based_algorithm.classifier',
+    'classifier_recommender': '.content_based_algorithm.classifier.classifier_recommender',
+    'classifiers': '.content_based_algorithm.classifier.classifiers',
+    'exceptions': '.graph_based_algorithm.feature_selection.exceptions',
+    'feature_selection': '.graph_based_algorithm.feature_selection.feature_selection',
+    'feature_selection_handler': '.graph_based_algorithm.feature_selection.feature_selection_handler',
+    'graph': '.graphs.graph',
+    'graph_metrics': '.graphs.graph_metrics',
+    'index_query': '.content_based_algorithm.index_query.index_query',
+    'linear_predictor': '.content_based_algorithm.regressor.linear_predictor',
+    'nx_bipartite_graphs': '.graphs.nx_bipartite_graphs',
+    'nx_full_graphs': '.graphs.nx_full_graphs',
+    'nx_page_rank': '.graph_based_algorithm.page_rank.nx_page_rank',
+    'nx_tripartite_graphs': '.graphs.nx_tripartite_graphs',
+    'page_rank': '.graph_based_algorithm.page_rank.page_rank',
+    'regressor': '.content_based_algorithm.regressor',
+    'regressors': '.content_based_algorithm.regressor.regressors',
+    'similarities': '.content_based_algorithm.centroid_vector.similarities'
+})
@@ -1,9 +1,28 @@
-from . import centroid_vector
-from . import classifier
-from . import index_query
-from . import regressor
-
-from .centroid_vector import *
-from .classifier import *
-from .index_query import *
-from .regressor import *
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'CentroidVector': '.centroid_vector',
+    'CosineSimilarity': '.centroid_vector',
+    'ClassifierRecommender': '.classifier',
+    'SkSVC': '.classifier',
+    'SkKNN': '.classifier',
+    'SkRandomForest': '.classifier',
+    'SkLogisticRegression': '.classifier',
+    'SkDecisionTree': '.classifier',
+    'SkGaussianProcess': '.classifier',
+    'IndexQuery': '.index_query',
+    'LinearPredictor': '.regressor',
+    'SkLinearRegression': '.regressor',
+    'SkRidge': '.regressor',
+    'SkBayesianRidge': '.regressor',
+    'SkSGDRegressor': '.regressor',
+    'SkARDRegression': '.regressor',
+    'SkHuberRegressor': '.regressor',
+    'SkPassiveAggressiveRegressor': '.regressor'
+}, {
+    'classifier_recommender': '.classifier.classifier_recommender',
+    'classifiers': '.classifier.classifiers',
+    'linear_predictor': '.regressor.linear_predictor',
+    'regressors': '.regressor.regressors',
+    'similarities': '.centroid_vector.similarities'
+})
@@ -1,2 +1,6 @@
-from .centroid_vector import CentroidVector
-from .similarities import CosineSimilarity
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'CentroidVector': '.centroid_vector',
+    'CosineSimilarity': '.similarities'
+})
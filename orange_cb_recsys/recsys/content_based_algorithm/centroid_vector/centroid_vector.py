@@ -81,12 +81,13 @@ class CentroidVector(ContentBasedAlgorithm):
             threshold = self._calc_mean_user_threshold(user_ratings)
 
         # Calculates labels and extract features from the positive rated items
-        positive_rated_dict = {}
+        positive_rated_items = []
         for item in rated_items:
             score_assigned = float(user_ratings[user_ratings['to_id'] == item.content_id].score)
             if item is not None and score_assigned >= threshold:
 
-                positive_rated_dict[item] = self.extract_features_item(item)
+                positive_rated_items.append(item)
+        positive_rated_dict = dict(zip(positive_rated_items, self.extract_features_items(positive_rated_items)))
 
         if user_ratings.empty:
             raise EmptyUserRatings("The user selected doesn't have any ratings!")
@@ -155,12 +156,9 @@ class CentroidVector(ContentBasedAlgorithm):
             items_to_predict = get_chosen_items(items_directory, filter_list)
 
         # Extract features of the items to predict
-        id_items_to_predict = []
-        features_items_to_predict = []
-        for item in items_to_predict:
-            if item is not None:
-                id_items_to_predict.append(item.content_id)
-                features_items_to_predict.append(self.extract_features_item(item))
+        items_to_predict = [item for item in items_to_predict if item is not None]
+        id_items_to_predict = [item.content_id for item in items_to_predict]
+        features_items_to_predict = self.extract_features_items(items_to_predict)
 
         recsys_logger.info("Calculating rank")
         if len(id_items_to_predict) > 0:
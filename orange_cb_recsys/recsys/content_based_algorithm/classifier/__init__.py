@@ -1,2 +1,11 @@
-from .classifier_recommender import ClassifierRecommender
-from .classifiers import SkSVC, SkKNN, SkRandomForest, SkLogisticRegression, SkDecisionTree, SkGaussianProcess
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'ClassifierRecommender': '.classifier_recommender',
+    'SkSVC': '.classifiers',
+    'SkKNN': '.classifiers',
+    'SkRandomForest': '.classifiers',
+    'SkLogisticRegression': '.classifiers',
+    'SkDecisionTree': '.classifiers',
+    'SkGaussianProcess': '.classifiers'
+})
@@ -92,12 +92,12 @@ class ClassifierRecommender(ContentBasedAlgorithm):
 
         # Assign label and extract features from the rated items
         labels = []
-        rated_dict = {}
+        labeled_items = []
 
         recsys_logger.info("Processing rated items")
         for item in rated_items:
             if item is not None:
-                rated_dict[item] = self.extract_features_item(item)
+                labeled_items.append(item)
 
                 # This conversion raises Exception when there are multiple same to_id for the user
                 score_assigned = float(user_ratings[user_ratings['to_id'] == item.content_id].score)
@@ -105,6 +105,7 @@ class ClassifierRecommender(ContentBasedAlgorithm):
                     labels.append(1)
                 else:
                     labels.append(0)
+        rated_dict = dict(zip(labeled_items, self.extract_features_items(labeled_items)))
 
         if user_ratings.empty:
             raise EmptyUserRatings("The user selected doesn't have any ratings!")
@@ -176,12 +177,9 @@ class ClassifierRecommender(ContentBasedAlgorithm):
             items_to_predict = get_chosen_items(items_directory, filter_list)
 
         # Extract features of the items to predict
-        id_items_to_predict = []
-        features_items_to_predict = []
-        for item in items_to_predict:
-            if item is not None:
-                id_items_to_predict.append(item.content_id)
-                features_items_to_predict.append(self.extract_features_item(item))
+        items_to_predict = [item for item in items_to_predict if item is not None]
+        id_items_to_predict = [item.content_id for item in items_to_predict]
+        features_items_to_predict = self.extract_features_items(items_to_predict)
 
         recsys_logger.info("Calculating rank")
         if len(id_items_to_predict) > 0:
@@ -11,7 +11,7 @@ from orange_cb_recsys.content_analyzer.field_content_production_techniques.embed
     CombiningTechnique
 from orange_cb_recsys.recsys.algorithm import Algorithm
 
-from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField
 
 
 class ContentBasedAlgorithm(Algorithm):
@@ -104,6 +104,35 @@ class ContentBasedAlgorithm(Algorithm):
 
         return item_bag_list
 
+    def extract_features_items(self, items: List[Content]) -> List[list]:
+        """
+        Function that extracts the features of many loaded items, like extract_features_item does for a single item.
+        The representations serialized in an index (IndexField) are read together for all the items (see the values
+        method of the IndexField), instead of reading the index for each representation of each item
+
+        Args:
+            items (List[Content]): items loaded of which we need to extract their features
+
+        Returns:
+            A list containing, for each item, the list of all representations extracted for the item
+        """
+        items_representations = []
+        for item in items:
+            item_representations = []
+            if item is not None:
+                for field in self.item_field:
+                    for representation in self.item_field[field]:
+                        item_representations.append(item.get_field_representation(field, representation))
+            items_representations.append(item_representations)
+
+        index_fields = [representation for item_representations in items_representations
+                        for representation in item_representations if isinstance(representation, IndexField)]
+        index_values = iter(IndexField.values(index_fields))
+
+        return [[next(index_values) if isinstance(representation, IndexField) else representation.value
+                 for representation in item_representations]
+                for item_representations in items_representations]
+
     def fuse_representations(self, X: list, embedding_combiner: CombiningTechnique):
         """
         Method which transforms the X passed vectorizing if X contains dicts and merging
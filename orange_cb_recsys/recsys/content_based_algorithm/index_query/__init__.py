@@ -1 +1,5 @@
-from .index_query import IndexQuery
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'IndexQuery': '.index_query'
+})
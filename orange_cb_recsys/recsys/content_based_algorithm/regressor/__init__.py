@@ -1,3 +1,12 @@
-from .linear_predictor import LinearPredictor
-from .regressors import SkLinearRegression, SkRidge, SkBayesianRidge, SkSGDRegressor, SkARDRegression,\
-    SkHuberRegressor, SkPassiveAggressiveRegressor
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'LinearPredictor': '.linear_predictor',
+    'SkLinearRegression': '.regressors',
+    'SkRidge': '.regressors',
+    'SkBayesianRidge': '.regressors',
+    'SkSGDRegressor': '.regressors',
+    'SkARDRegression': '.regressors',
+    'SkHuberRegressor': '.regressors',
+    'SkPassiveAggressiveRegressor': '.regressors'
+})
@@ -83,7 +83,7 @@ class LinearPredictor(ContentBasedAlgorithm):
 
         # Assign label and extract features from the rated items
         labels = []
-        rated_dict = {}
+        labeled_items = []
 
         recsys_logger.info("Processing rated items")
         for item in rated_items:
@@ -92,11 +92,12 @@ class LinearPredictor(ContentBasedAlgorithm):
                 score_assigned = float(user_ratings[user_ratings['to_id'] == item.content_id].score)
 
                 if self.threshold is None:
-                    rated_dict[item] = self.extract_features_item(item)
+                    labeled_items.append(item)
                     labels.append(score_assigned)
                 elif score_assigned >= self.threshold:
-                    rated_dict[item] = self.extract_features_item(item)
+                    labeled_items.append(item)
                     labels.append(score_assigned)
+        rated_dict = dict(zip(labeled_items, self.extract_features_items(labeled_items)))
 
         if user_ratings.empty:
             raise EmptyUserRatings("The user selected doesn't have any ratings!")
@@ -151,13 +152,9 @@ class LinearPredictor(ContentBasedAlgorithm):
             items_to_predict = get_chosen_items(items_directory, filter_list)
 
         # Extract features of the items to predict
-        id_items_to_predict = []
-        features_items_to_predict = []
-        for item in items_to_predict:
-            if item is not None:
-                # raises AttributeError if items are not present locally
-                id_items_to_predict.append(item.content_id)
-                features_items_to_predict.append(self.extract_features_item(item))
+        items_to_predict = [item for item in items_to_predict if item is not None]
+        id_items_to_predict = [item.content_id for item in items_to_predict]
+        features_items_to_predict = self.extract_features_items(items_to_predict)
 
         recsys_logger.info("Calculating score predictions")
         if len(id_items_to_predict) > 0:
@@ -1,5 +1,12 @@
-from . import page_rank
-
-from .page_rank import *
-from .feature_selection import *
-
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'NXPageRank': '.page_rank',
+    'NXTopKPageRank': '.feature_selection',
+    'NXTopKDegreeCentrality': '.feature_selection',
+    'NXTopKEigenVectorCentrality': '.feature_selection'
+}, {
+    'exceptions': '.feature_selection.exceptions',
+    'feature_selection_handler': '.feature_selection.feature_selection_handler',
+    'nx_page_rank': '.page_rank.nx_page_rank'
+})
@@ -1 +1,7 @@
-from .feature_selection import NXTopKPageRank, NXTopKDegreeCentrality, NXTopKEigenVectorCentrality
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'NXTopKPageRank': '.feature_selection',
+    'NXTopKDegreeCentrality': '.feature_selection',
+    'NXTopKEigenVectorCentrality': '.feature_selection'
+})
@@ -1,10 +1,13 @@
-import networkx as nx
 from abc import ABC, abstractmethod
-from typing import List, Union
+from typing import List, Union, TYPE_CHECKING
 
 from orange_cb_recsys.recsys.graph_based_algorithm.feature_selection.exceptions import FeatureSelectionException
 from orange_cb_recsys.recsys.graphs.graph import FullGraph, PropertyNode, Node, UserNode, ItemNode
 
+if TYPE_CHECKING:
+    # networkx is only imported when the feature selection is performed
+    import networkx as nx
+
 
 class FeatureSelectionAlgorithm(ABC):
     """
@@ -162,7 +165,7 @@ class NXFeatureSelectionAlgorithm(FeatureSelectionAlgorithm):
         raise NotImplementedError
 
     @staticmethod
-    def create_new_graph_nx(graph: FullGraph, target_nodes: Union[List[UserNode], List[ItemNode]]) -> nx.DiGraph:
+    def create_new_graph_nx(graph: FullGraph, target_nodes: Union[List[UserNode], List[ItemNode]]) -> 'nx.DiGraph':
         """
         Creates a NetworkX directed graph from the original graph and the target nodes list passed as argument
 
@@ -176,6 +179,8 @@ class NXFeatureSelectionAlgorithm(FeatureSelectionAlgorithm):
             mew_graph (DiGraph): new graph that will be created from the original graph and the list of its nodes to
                 consider
         """
+        import networkx as nx
+
         new_graph = nx.DiGraph()
 
         # for each node in the target list, if it has any property node in the original graph, the target node will
@@ -204,7 +209,7 @@ class NXTopKFeatureSelection(NXFeatureSelectionAlgorithm):
         self.__k = k
 
     @abstractmethod
-    def create_rank(self, graph: nx.DiGraph) -> dict:
+    def create_rank(self, graph: 'nx.DiGraph') -> dict:
         """
         Method that calculates the rank used for feature selection. The method will return a dictionary where the keys
         will be the nodes in the graph passed as argument and the values will be the 'importance' score for each
@@ -225,6 +230,8 @@ class NXTopKFeatureSelection(NXFeatureSelectionAlgorithm):
         if self.__k <= 0:
             return {}
 
+        import networkx as nx
+
         new_graph = self.create_new_graph_nx(graph, target_nodes)
 
         # if the algorithm is not able to converge, a FeatureSelectionException is thrown
@@ -265,7 +272,9 @@ class NXTopKPageRank(NXTopKFeatureSelection):
     def __init__(self, k: int = 10, **kwargs):
         super().__init__(k, kwargs)
 
-    def create_rank(self, graph: nx.DiGraph) -> dict:
+    def create_rank(self, graph: 'nx.DiGraph') -> dict:
+        import networkx as nx
+
         return nx.pagerank(graph.to_undirected(), **self.additional_arguments)
 
 
@@ -278,7 +287,9 @@ class NXTopKEigenVectorCentrality(NXTopKFeatureSelection):
     def __init__(self, k: int = 10, **kwargs):
         super().__init__(k, kwargs)
 
-    def create_rank(self, graph: nx.DiGraph) -> dict:
+    def create_rank(self, graph: 'nx.DiGraph') -> dict:
+        import networkx as nx
+
         return nx.eigenvector_centrality(graph.to_undirected(), **self.additional_arguments)
 
 
@@ -290,6 +301,8 @@ class NXTopKDegreeCentrality(NXTopKFeatureSelection):
     def __init__(self, k: int = 10):
         super().__init__(k)
 
-    def create_rank(self, graph: nx.DiGraph) -> dict:
+    def create_rank(self, graph: 'nx.DiGraph') -> dict:
+        import networkx as nx
+
         return nx.degree_centrality(graph.to_undirected())
 
@@ -1 +1,5 @@
-from .nx_page_rank import NXPageRank
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'NXPageRank': '.nx_page_rank'
+})
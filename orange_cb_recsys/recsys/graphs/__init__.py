@@ -1,4 +1,10 @@
-from .nx_bipartite_graphs import NXBipartiteGraph
-from .nx_tripartite_graphs import NXTripartiteGraph
-from .nx_full_graphs import NXFullGraph
-from .graph import UserNode, ItemNode, PropertyNode
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'NXBipartiteGraph': '.nx_bipartite_graphs',
+    'NXTripartiteGraph': '.nx_tripartite_graphs',
+    'NXFullGraph': '.nx_full_graphs',
+    'UserNode': '.graph',
+    'ItemNode': '.graph',
+    'PropertyNode': '.graph'
+})
@@ -1 +1,5 @@
-from .script_handling import script_run
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'script_run': '.script_handling'
+})
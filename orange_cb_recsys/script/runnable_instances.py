@@ -34,6 +34,7 @@ from orange_cb_recsys.evaluation.eval_pipeline_modules.metric_evaluator import M
 from orange_cb_recsys.evaluation.eval_pipeline_modules.partition_module import Split, PartitionModule
 
 from orange_cb_recsys.utils.class_utils import get_all_implemented_classes
+from orange_cb_recsys.utils.lazy_import import import_framework_classes
 
 """
 List containing all the base classes in the framework
@@ -73,6 +74,8 @@ def get_classes():
     """
     classes_dict = {}
 
+    # the classes are imported lazily by the packages of the framework
+    import_framework_classes()
     for base_cls in base_classes:
         classes = get_all_implemented_classes(base_cls)
         for cls in classes:
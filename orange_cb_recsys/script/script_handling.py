@@ -21,6 +21,7 @@ from orange_cb_recsys.script.exceptions import ScriptConfigurationError, NoOutpu
 from orange_cb_recsys.recsys.recsys import RecSys, FullGraph
 from orange_cb_recsys.recsys.graphs.graph import Graph
 from orange_cb_recsys.utils.class_utils import get_all_implemented_classes, get_all_implemented_subclasses
+from orange_cb_recsys.utils.lazy_import import import_framework_classes
 
 
 class Run(ABC):
@@ -918,6 +919,9 @@ def __setup_implemented_modules_dictionary():
     """
     implemented_modules: Dict[str, Type[Run]] = dict()
 
+    # the classes are imported lazily by the packages of the framework
+    import_framework_classes()
+
     for run in get_all_implemented_subclasses(Run):
         implemented_classes = get_all_implemented_classes(run.get_associated_class())
         for cls in implemented_classes:
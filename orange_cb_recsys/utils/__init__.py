@@ -1 +1,5 @@
-from .load_content import load_content_instance
+from orange_cb_recsys.utils.lazy_import import lazy_attributes
+
+__getattr__, __dir__, __all__ = lazy_attributes(__name__, {
+    'load_content_instance': '.load_content'
+})
@@ -1,10 +1,6 @@
 from typing import Union, List
-from nltk import RegexpTokenizer, data, download, sent_tokenize
 
-try:
-    data.find('punkt')
-except LookupError:
-    download('punkt')
+from orange_cb_recsys.utils.nltk_resources import ensure_nltk_resource
 
 
 def check_tokenized(text):
@@ -12,6 +8,8 @@ def check_tokenized(text):
     Tokenizes a text
     """
     if type(text) is str:
+        from nltk import RegexpTokenizer
+
         tokenizer = RegexpTokenizer('[\w<>$€]+')
         text = tokenizer.tokenize(text)
 
@@ -32,5 +30,7 @@ def tokenize_in_sentences(text: Union[List[str], str]):
     """
     Tokenizes a text into sentences
     """
+    from nltk import sent_tokenize
 
+    ensure_nltk_resource('tokenizers/punkt', 'punkt')
     return sent_tokenize(check_not_tokenized(text))
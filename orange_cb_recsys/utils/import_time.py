@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+"""
+Heavy libraries used only by some of the techniques of the framework, which must not be imported with the core API
+"""
+HEAVY_MODULES: List[str] = ['gensim', 'sentence_transformers', 'torch', 'wikipedia2vec', 'whoosh', 'networkx',
+                            'sklearn', 'mysql', 'SPARQLWrapper', 'babelpy', 'matplotlib', 'nltk', 'pandas']
+
+"""
+Import statements of the core API of the framework, whose import time is measured by the benchmark
+"""
+CORE_IMPORTS: List[str] = [
+    'import orange_cb_recsys',
+    'from orange_cb_recsys.content_analyzer import ContentAnalyzer, ItemAnalyzerConfig, UserAnalyzerConfig, '
+    'FieldConfig, JSONFile, CSVFile',
+]
+
+_MEASURE_CODE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'modules': sorted(name for name in sys.modules
+                                                        if name.split('.')[0] in {heavy_modules!r})}}))
+"""
+
+
+def measure_import_time(import_statement: str) -> Dict:
+    """
+    Measures the time needed to execute the import statement passed as argument in a new interpreter (so that the
+    modules already imported by the current process aren't considered)
+
+    EXAMPLE:
+        measure_import_time('from orange_cb_recsys.content_analyzer import ContentAnalyzer')
+
+    Args:
+        import_statement (str): import statement to execute
+
+    Returns:
+        dict in the form {'seconds': time needed by the import, 'modules': heavy modules imported by the statement},
+        where the heavy modules are the ones (and their submodules) in HEAVY_MODULES
+    """
+    code = _MEASURE_CODE.format(statement=import_statement, heavy_modules=set(HEAVY_MODULES))
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE,
+                            universal_newlines=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    # python -m orange_cb_recsys.utils.import_time
+    for statement in CORE_IMPORTS:
+        result = measure_import_time(statement)
+        print('{:.3f}s  {}'.format(result['seconds'], statement))
+        if len(result['modules']) != 0:
+            print('        heavy modules imported: {}'.format(', '.join(result['modules'])))
@@ -0,0 +1,77 @@
+import importlib
+import sys
+from typing import Dict, Callable, List, Tuple
+
+
+def lazy_attributes(package_name: str, attribute_modules: Dict[str, str],
+                    module_aliases: Dict[str, str] = None) -> Tuple[Callable, Callable, List[str]]:
+    """
+    Creates the module level __getattr__ and __dir__ functions (PEP 562) of a package whose classes are imported only
+    when they are first accessed, so that importing the package doesn't import the libraries needed by all of its
+    modules (gensim, sentence_transformers, sklearn, ...). Once imported, a class is stored in the package like a
+    normally imported one. The submodules of the package can be accessed as attributes too.
+
+    EXAMPLE:
+        __getattr__, __dir__, __all__ = lazy_attributes(__name__, {'NLTK': '.nlp'})
+
+    Args:
+        package_name (str): name of the package (__name__ in the __init__ of the package)
+        attribute_modules (Dict[str, str]): dictionary in the form {attribute name: module defining the attribute},
+            where the modules can be relative to the package
+        module_aliases (Dict[str, str]): dictionary in the form {attribute name: module}, for the modules of the
+            subpackages which can be accessed as attributes of the package (where the modules can be relative to the
+            package)
+
+    Returns:
+        the __getattr__ and __dir__ functions of the package and its __all__ list (the names of the attributes)
+    """
+
+    if module_aliases is None:
+        module_aliases = {}
+
+    def __getattr__(name: str):
+        package = sys.modules[package_name]
+        if name in module_aliases:
+            return importlib.import_module(module_aliases[name], package_name)
+
+        module_name = attribute_modules.get(name)
+        if module_name is None:
+            try:
+                return importlib.import_module('{}.{}'.format(package_name, name))
+            except ModuleNotFoundError as e:
+                if e.name != '{}.{}'.format(package_name, name):
+                    raise
+                raise AttributeError("module '{}' has no attribute '{}'".format(package_name, name)) from None
+
+        value = getattr(importlib.import_module(module_name, package_name), name)
+        setattr(package, name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package_name])) | set(attribute_modules) | set(module_aliases))
+
+    return __getattr__, __dir__, list(attribute_modules)
+
+
+def import_lazy_attributes(package_name: str):
+    """
+    Imports all the lazy attributes of the package passed as argument. It's needed when all the classes of the
+    framework must be defined, for example to find all the subclasses of a class
+
+    Args:
+        package_name (str): name of the package whose attributes will be imported
+    """
+    package = importlib.import_module(package_name)
+    for name in getattr(package, '__all__', []):
+        getattr(package, name)
+
+
+def import_framework_classes():
+    """
+    Imports all the classes of the content analyzer, recsys and evaluation packages (for example before searching
+    all the implemented subclasses of a class of the framework). The embedding loaders aren't exported by the
+    content analyzer package, so the embeddings package is imported too
+    """
+    for package_name in ['orange_cb_recsys.content_analyzer', 'orange_cb_recsys.content_analyzer.embeddings',
+                         'orange_cb_recsys.recsys', 'orange_cb_recsys.evaluation']:
+        import_lazy_attributes(package_name)
@@ -2,16 +2,70 @@ import lzma
 import os
 import pickle
 import re
-from typing import List
+from typing import List, Union
 import pandas as pd
 
+from orange_cb_recsys.content_analyzer.content_archive import ContentArchiveReader, ARCHIVE_INDEX_FILE
+from orange_cb_recsys.content_analyzer.content_fingerprints import FINGERPRINTS_FILE
 from orange_cb_recsys.content_analyzer.content_representation.content import Content
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import \
+    register_embedding_directory, EMBEDDING_MATRIX_INDEX_FILE, is_embedding_matrix_file
+from orange_cb_recsys.content_analyzer.content_representation.features_matrix import FEATURES_MATRIX_INDEX_FILE, \
+    is_features_matrix_file
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import \
+    register_vocabulary_directory, is_vocabulary_file
 from orange_cb_recsys.utils.const import utils_logger
 
+# readers of the packed archives already opened, in the form {directory: (index modification time, reader)}
+# so that the index of an archive is loaded only once and its segment files are kept open between loads
+_archive_readers = {}
+
+
+def get_archive_reader(directory: str) -> Union[ContentArchiveReader, None]:
+    """
+    Returns the reader for the packed archive stored in the directory passed as argument, or None if the directory
+    doesn't contain an archive. The reader is created only once for each directory and is created again only if
+    the index of the archive changed since the last time it was loaded
+
+    Args:
+        directory (str): Path to the directory in which the contents are stored
+    """
+    try:
+        index_mtime = os.path.getmtime(os.path.join(directory, ARCHIVE_INDEX_FILE))
+    except OSError:
+        return None
+
+    cached = _archive_readers.get(directory)
+    if cached is None or cached[0] != index_mtime:
+        if cached is not None:
+            cached[1].close()
+        cached = (index_mtime, ContentArchiveReader(directory))
+        _archive_readers[directory] = cached
+
+    return cached[1]
+
+
+def _stored_content_names(directory: str) -> List[str]:
+    """
+    Returns the names of the contents serialized in the directory, reading them from the index of the packed
+    archive (if the directory contains one) or from the names of the serialized files otherwise
+    """
+    archive_reader = get_archive_reader(directory)
+    if archive_reader is not None:
+        return archive_reader.content_names()
+
+    return [os.path.splitext(filename)[0]
+            for filename in os.listdir(directory)
+            if filename not in ['search_index', EMBEDDING_MATRIX_INDEX_FILE, FEATURES_MATRIX_INDEX_FILE,
+                                FINGERPRINTS_FILE]
+            and not is_vocabulary_file(filename) and not is_embedding_matrix_file(filename)
+            and not is_features_matrix_file(filename)]
+
 
 def load_content_instance(directory: str, content_id: str) -> Content:
     """
-    Loads a serialized content
+    Loads a serialized content. If the directory contains a packed archive, the content is read from it, otherwise
+    the content is loaded from its own '.xz' file
     Args:
         directory (str): Path to the directory in which the content is stored
         content_id (str): Id of the content to load
@@ -19,6 +73,13 @@ def load_content_instance(directory: str, content_id: str) -> Content:
     Returns:
         content (Content)
     """
+    register_vocabulary_directory(directory)
+    register_embedding_directory(directory)
+
+    archive_reader = get_archive_reader(directory)
+    if archive_reader is not None:
+        return archive_reader.load(content_id)
+
     try:
         content_filename = os.path.join(directory, '{}.xz'.format(content_id))
         with lzma.open(content_filename, "rb") as content_file:
@@ -41,9 +102,7 @@ def get_unrated_items(items_directory: str, ratings: pd.DataFrame) -> List[Conte
         unrated_items (List<Content>): List of items that the user has not rated
     """
 
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
+    directory_filename_list = _stored_content_names(items_directory)
 
     # logger.info("Getting filenames from IDs")
     # list of id of item without rating
@@ -53,7 +112,8 @@ def get_unrated_items(items_directory: str, ratings: pd.DataFrame) -> List[Conte
     filename_list = [item_id for item_id in directory_filename_list if
                      item_id not in rated_items_filename_list]
 
-    intersection = [x for x in filename_list if x in directory_filename_list]
+    directory_filename_set = set(directory_filename_list)
+    intersection = [x for x in filename_list if x in directory_filename_set]
     filename_list = intersection
 
     utils_logger.info("Loading {} unrated items".format(len(filename_list)))
@@ -76,9 +136,7 @@ def get_rated_items(items_directory: str, ratings: pd.DataFrame) -> List[Content
         unrated_items (List<Content>): List of items that the user has rated
     """
 
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
+    directory_filename_list = _stored_content_names(items_directory)
 
     # logger.info("Getting filenames from IDs")
     # list of id of item without rating
@@ -88,7 +146,8 @@ def get_rated_items(items_directory: str, ratings: pd.DataFrame) -> List[Content
     filename_list = [item_id for item_id in directory_filename_list if
                      item_id in rated_items_filename_list]
 
-    intersection = [x for x in filename_list if x in directory_filename_list]
+    directory_filename_set = set(directory_filename_list)
+    intersection = [x for x in filename_list if x in directory_filename_set]
     filename_list = intersection
 
     filename_list.sort()
@@ -116,13 +175,12 @@ def remove_not_existent_items(ratings, items_directory: str):
         ratings (pd.DataFrame): Ratings of the user
         items_directory (str): Path to the directory in which the items are stored
     """
-    directory_filename_list = [os.path.splitext(filename)[0]
-                               for filename in os.listdir(items_directory)
-                               if filename != 'search_index']
+    directory_filename_list = _stored_content_names(items_directory)
 
     rated_items_filename_list = set([re.sub(r'[^\w\s]', '', item_id) for item_id in ratings.to_id])
 
-    intersection = [x for x in rated_items_filename_list if x in directory_filename_list]
+    directory_filename_set = set(directory_filename_list)
+    intersection = [x for x in rated_items_filename_list if x in directory_filename_set]
     ratings = ratings[ratings["to_id"].isin(intersection)]
 
     return ratings
@@ -0,0 +1,24 @@
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_nltk_resource(resource_path: str, package: str = None):
+    """
+    Checks that the NLTK resource passed as argument is installed, downloading it if it's missing. The check is done
+    only the first time a resource is needed in the process (and not when the modules are imported), so that the
+    framework can be imported without network access and without the NLTK data
+
+    EXAMPLE:
+        ensure_nltk_resource('corpora/stopwords')
+
+    Args:
+        resource_path (str): path of the resource searched by nltk.data.find (for example 'corpora/stopwords')
+        package (str): name of the package to download if the resource is missing, if None the last part of the
+            resource path is used
+    """
+    import nltk
+
+    try:
+        nltk.data.find(resource_path)
+    except LookupError:
+        nltk.download(package if package is not None else resource_path.split('/')[-1])
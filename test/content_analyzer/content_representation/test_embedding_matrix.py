@@ -0,0 +1,138 @@
+import os
+import pickle
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation.content import MatrixEmbeddingField
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import EmbeddingMatrixWriter, \
+    load_embedding_matrix, release_embedding_matrices, EMBEDDING_MATRIX_INDEX_FILE
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestEmbeddingMatrix(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, "embedding_matrix_test")
+        os.mkdir(self.directory)
+
+    def test_write_load(self):
+        embeddings = {"tt001": np.array([1., 2., 3.]), "tt002": np.array([4., 5., 6.]),
+                      "tt003": np.array([7., 8., 9.])}
+
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            references = {content_id: writer.add(content_id, "Plot", 0, "embedding", embedding)
+                          for content_id, embedding in embeddings.items()}
+            writer.add("tt001", "Title", 1, None, np.array([0.5, 0.5], dtype=np.float32))
+
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, EMBEDDING_MATRIX_INDEX_FILE)))
+        self.assertFalse(any(file_name.endswith('.tmp') for file_name in os.listdir(self.directory)))
+
+        matrix, rows = load_embedding_matrix(self.directory, "Plot", "embedding")
+        self.assertIsInstance(matrix, np.memmap)
+        self.assertEqual((3, 3), matrix.shape)
+        self.assertEqual({"tt001": 0, "tt002": 1, "tt003": 2}, rows)
+        np.testing.assert_array_equal(np.vstack(list(embeddings.values())), matrix)
+
+        # the representation can be referenced by its internal id too
+        same_matrix, _ = load_embedding_matrix(self.directory, "Plot", 0)
+        self.assertIs(matrix, same_matrix)
+
+        title_matrix, title_rows = load_embedding_matrix(self.directory, "Title", 1)
+        self.assertEqual(np.float32, title_matrix.dtype)
+        self.assertEqual({"tt001": 0}, title_rows)
+
+        with self.assertRaises(KeyError):
+            load_embedding_matrix(self.directory, "Plot", 1)
+
+        # each reference returned by the writer points to the row of the content
+        for content_id, (matrix_file, row) in references.items():
+            field = MatrixEmbeddingField(matrix_file, row)
+            np.testing.assert_array_equal(embeddings[content_id], field.value)
+
+            unpickled = pickle.loads(pickle.dumps(field))
+            self.assertEqual(matrix_file, unpickled.matrix_file)
+            self.assertEqual(row, unpickled.row)
+            np.testing.assert_array_equal(field.value, unpickled.value)
+
+    def test_append(self):
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            for i in range(3):
+                writer.add("tt00{}".format(i), "Plot", 0, None, np.full(2, float(i)))
+
+        matrix = np.array(load_embedding_matrix(self.directory, "Plot", 0)[0])
+
+        # the writer opens the existing matrices in append mode, the rows of the removed and of the changed contents
+        # are reused before appending new rows
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            writer.remove("tt001")
+            matrix_file, row = writer.add("tt002", "Plot", 0, None, np.full(2, 20.))
+            writer.add("tt003", "Plot", 0, None, np.full(2, 3.))
+            writer.add("tt004", "Plot", 0, None, np.full(2, 4.))
+
+        # the changed content takes its own row again
+        self.assertEqual(2, row)
+        new_matrix, new_rows = load_embedding_matrix(self.directory, "Plot", 0)
+        self.assertEqual({"tt000": 0, "tt002": 2, "tt003": 1, "tt004": 3}, new_rows)
+        self.assertEqual((4, 2), new_matrix.shape)
+        # the rows already stored keep their position
+        np.testing.assert_array_equal(matrix[0], new_matrix[0])
+        np.testing.assert_array_equal(np.full(2, 20.), MatrixEmbeddingField(matrix_file, row).value)
+        np.testing.assert_array_equal(np.full(2, 3.), new_matrix[1])
+
+    def test_bounded_size(self):
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            for i in range(10):
+                writer.add("tt{}".format(i), "Plot", 0, None, np.full(4, float(i)))
+        size = os.path.getsize(load_embedding_matrix(self.directory, "Plot", 0)[0].filename)
+
+        # each update changes three contents and replaces one with a new content
+        for run in range(1, 6):
+            with EmbeddingMatrixWriter(self.directory) as writer:
+                writer.remove("tt{}".format(run - 1))
+                for i in range(run, run + 3):
+                    writer.remove("tt{}".format(i))
+                    writer.add("tt{}".format(i), "Plot", 0, None, np.full(4, float(i * 10 + run)))
+                writer.add("tt{}".format(run + 9), "Plot", 0, None, np.full(4, float(run + 9)))
+            release_embedding_matrices()
+
+            matrix, rows = load_embedding_matrix(self.directory, "Plot", 0)
+            self.assertEqual((10, 4), matrix.shape)
+            self.assertEqual(size, os.path.getsize(matrix.filename))
+            self.assertCountEqual(["tt{}".format(i) for i in range(run, run + 10)], rows.keys())
+            for i in range(run, run + 3):
+                np.testing.assert_array_equal(np.full(4, float(i * 10 + run)), matrix[rows["tt{}".format(i)]])
+            np.testing.assert_array_equal(np.full(4, float(run + 9)), matrix[rows["tt{}".format(run + 9)]])
+
+    def test_release(self):
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            writer.add("tt001", "Plot", 0, None, np.array([1., 2.]))
+
+        matrix, _ = load_embedding_matrix(self.directory, "Plot", 0)
+        self.assertIs(matrix, load_embedding_matrix(self.directory, "Plot", 0)[0])
+
+        # matrices stored in other directories are kept
+        release_embedding_matrices(os.path.join(THIS_DIR, "other_directory"))
+        self.assertIs(matrix, load_embedding_matrix(self.directory, "Plot", 0)[0])
+
+        release_embedding_matrices(self.directory)
+        reloaded, _ = load_embedding_matrix(self.directory, "Plot", 0)
+        self.assertIsNot(matrix, reloaded)
+        np.testing.assert_array_equal(matrix, reloaded)
+
+    def test_different_shape(self):
+        with EmbeddingMatrixWriter(self.directory) as writer:
+            writer.add("tt001", "Plot", 0, None, np.array([1., 2., 3.]))
+            with self.assertRaises(ValueError):
+                writer.add("tt002", "Plot", 0, None, np.array([1., 2.]))
+
+    def test_no_embeddings(self):
+        with EmbeddingMatrixWriter(self.directory):
+            pass
+
+        self.assertEqual([], os.listdir(self.directory))
+
+    def tearDown(self) -> None:
+        release_embedding_matrices()
+        shutil.rmtree(self.directory)
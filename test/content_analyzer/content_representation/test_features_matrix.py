@@ -0,0 +1,130 @@
+import os
+import shutil
+from unittest import TestCase
+
+import numpy as np
+from scipy import sparse
+
+from orange_cb_recsys.content_analyzer.content_representation.content import SparseFeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.features_matrix import FeaturesMatrixWriter, \
+    load_features_matrix, FEATURES_MATRIX_INDEX_FILE, is_features_matrix_file
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import FeaturesVocabulary
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestFeaturesMatrix(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, "features_matrix_test")
+        os.mkdir(self.directory)
+        self.vocabulary = FeaturesVocabulary(['first', 'second', 'third', 'fourth'])
+        self.vocabulary.save(self.directory)
+
+    def test_write_load(self):
+        features_bags = {"tt001": SparseFeaturesBagField([2, 0], [0.5, 0.25], self.vocabulary),
+                         "tt002": SparseFeaturesBagField([], [], self.vocabulary),
+                         "tt003": SparseFeaturesBagField([3], [1.], self.vocabulary)}
+
+        with FeaturesMatrixWriter(self.directory) as writer:
+            for content_id, features_bag in features_bags.items():
+                writer.add(content_id, "Plot", 0, "tfidf", features_bag)
+
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, FEATURES_MATRIX_INDEX_FILE)))
+        self.assertFalse(any(file_name.endswith('.tmp') for file_name in os.listdir(self.directory)))
+        self.assertEqual(1, len([file_name for file_name in os.listdir(self.directory)
+                                 if is_features_matrix_file(file_name)]))
+
+        matrix, matrix_rows, vocabulary = load_features_matrix(self.directory, "Plot", "tfidf")
+        self.assertIsInstance(matrix, sparse.csr_matrix)
+        self.assertEqual((3, 4), matrix.shape)
+        self.assertEqual(np.float32, matrix.dtype)
+        self.assertEqual({"tt001": 0, "tt002": 1, "tt003": 2}, matrix_rows)
+        self.assertEqual(self.vocabulary, vocabulary)
+
+        # each row is the features bag of the content
+        for content_id, features_bag in features_bags.items():
+            row = matrix[matrix_rows[content_id]]
+            self.assertEqual(features_bag.value, {vocabulary.get_term(index): value
+                                                  for index, value in zip(row.indices, row.data)})
+
+        # the representation can be referenced by its internal id too
+        same_matrix, _, _ = load_features_matrix(self.directory, "Plot", 0)
+        self.assertEqual(0, (same_matrix != matrix).nnz)
+
+        with self.assertRaises(KeyError):
+            load_features_matrix(self.directory, "Plot", 1)
+
+    def test_append(self):
+        with FeaturesMatrixWriter(self.directory) as writer:
+            for i in range(3):
+                features_bag = SparseFeaturesBagField([i], [float(i)], self.vocabulary)
+                writer.add("tt00{}".format(i), "Plot", 0, None, features_bag)
+
+        # the writer opens the existing matrices in append mode, the rows of the removed and of the changed contents
+        # are dropped
+        with FeaturesMatrixWriter(self.directory) as writer:
+            writer.remove("tt001")
+            writer.add("tt002", "Plot", 0, None, SparseFeaturesBagField([3], [20.], self.vocabulary))
+            writer.add("tt003", "Plot", 0, None, SparseFeaturesBagField([1], [3.], self.vocabulary))
+
+        matrix, rows, _ = load_features_matrix(self.directory, "Plot", 0)
+        self.assertEqual({"tt000": 0, "tt002": 1, "tt003": 2}, rows)
+        self.assertEqual((3, 4), matrix.shape)
+        self.assertEqual(20., matrix[1, 3])
+        self.assertEqual(3., matrix[2, 1])
+
+        # the matrix is written again when contents are only removed too
+        with FeaturesMatrixWriter(self.directory) as writer:
+            writer.remove("tt000")
+
+        matrix, rows, _ = load_features_matrix(self.directory, "Plot", 0)
+        self.assertEqual({"tt002": 0, "tt003": 1}, rows)
+        self.assertEqual((2, 4), matrix.shape)
+        self.assertEqual(20., matrix[0, 3])
+
+        # the features bags produced by a technique fitted again (with a new vocabulary) replace the matrix
+        new_vocabulary = FeaturesVocabulary(['new'])
+        new_vocabulary.save(self.directory)
+        with FeaturesMatrixWriter(self.directory) as writer:
+            writer.add("tt004", "Plot", 0, None, SparseFeaturesBagField([0], [1.], new_vocabulary))
+            with self.assertRaises(ValueError):
+                writer.add("tt005", "Plot", 0, None, SparseFeaturesBagField([0], [1.], self.vocabulary))
+
+        matrix, rows, vocabulary = load_features_matrix(self.directory, "Plot", 0)
+        self.assertEqual({"tt004": 0}, rows)
+        self.assertEqual((1, 1), matrix.shape)
+        self.assertEqual(new_vocabulary, vocabulary)
+        self.assertEqual(1, len([file_name for file_name in os.listdir(self.directory)
+                                 if is_features_matrix_file(file_name)]))
+
+    def test_bounded_size(self):
+        with FeaturesMatrixWriter(self.directory) as writer:
+            for i in range(10):
+                writer.add("tt{}".format(i), "Plot", 0, None, SparseFeaturesBagField([i % 4], [1.], self.vocabulary))
+
+        # each update changes three contents and replaces one with a new content
+        for run in range(1, 6):
+            with FeaturesMatrixWriter(self.directory) as writer:
+                writer.remove("tt{}".format(run - 1))
+                for i in range(run, run + 3):
+                    writer.remove("tt{}".format(i))
+                    writer.add("tt{}".format(i), "Plot", 0, None,
+                               SparseFeaturesBagField([i % 4], [float(run)], self.vocabulary))
+                writer.add("tt{}".format(run + 9), "Plot", 0, None,
+                           SparseFeaturesBagField([(run + 9) % 4], [1.], self.vocabulary))
+
+            matrix, rows, _ = load_features_matrix(self.directory, "Plot", 0)
+            self.assertEqual((10, 4), matrix.shape)
+            self.assertEqual(10, matrix.nnz)
+            self.assertCountEqual(["tt{}".format(i) for i in range(run, run + 10)], rows.keys())
+            for i in range(run, run + 3):
+                self.assertEqual(float(run), matrix[rows["tt{}".format(i)], i % 4])
+
+    def test_no_features(self):
+        with FeaturesMatrixWriter(self.directory):
+            pass
+
+        self.assertFalse(os.path.isfile(os.path.join(self.directory, FEATURES_MATRIX_INDEX_FILE)))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
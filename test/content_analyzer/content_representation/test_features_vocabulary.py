@@ -0,0 +1,97 @@
+import gc
+import os
+import pickle
+import shutil
+from unittest import TestCase
+
+import numpy as np
+
+from orange_cb_recsys.content_analyzer.content_representation import features_vocabulary
+from orange_cb_recsys.content_analyzer.content_representation.content import SparseFeaturesBagField, \
+    FeaturesBagField, SimpleField
+from orange_cb_recsys.content_analyzer.content_representation.features_vocabulary import FeaturesVocabulary, \
+    register_vocabulary_directory, is_vocabulary_file
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestFeaturesVocabulary(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, "vocabulary_test")
+        os.mkdir(self.directory)
+
+    def test_sparse_features_bag(self):
+        vocabulary = FeaturesVocabulary(['first', 'second', 'third'])
+        features_bag = SparseFeaturesBagField([0, 2], [0.5, 0.25], vocabulary)
+
+        self.assertEqual({'first': 0.5, 'third': 0.25}, features_bag.value)
+        self.assertEqual(FeaturesBagField({'first': 0.5, 'third': 0.25}), features_bag)
+        self.assertEqual(np.int32, features_bag.indices.dtype)
+        self.assertEqual(np.float32, features_bag.values.dtype)
+        self.assertEqual(2, len(features_bag))
+        self.assertEqual(3, vocabulary.get_index('new term'))
+
+        with self.assertRaises(ValueError):
+            SparseFeaturesBagField([0, 1], [0.5], vocabulary)
+
+    def test_save_load(self):
+        vocabulary = FeaturesVocabulary(['first', 'second', 'third'])
+        features_bag = SparseFeaturesBagField([1], [0.75], vocabulary)
+
+        # before being saved, the vocabulary is pickled along with its terms
+        self.assertIn(b'second', pickle.dumps(features_bag))
+
+        vocabulary.save(self.directory)
+        self.assertTrue(vocabulary.saved)
+        vocabulary_files = os.listdir(self.directory)
+        self.assertEqual(1, len(vocabulary_files))
+        self.assertTrue(is_vocabulary_file(vocabulary_files[0]))
+
+        # once saved, only the reference to the vocabulary is pickled
+        pickled = pickle.dumps(features_bag)
+        self.assertNotIn(b'second', pickled)
+
+        with self.assertRaises(ValueError):
+            vocabulary.get_index('new term')
+
+        # simulates a new process where the vocabulary is not known yet
+        del features_vocabulary._vocabularies[vocabulary.id]
+        del features_vocabulary._vocabulary_paths[vocabulary.id]
+
+        unpickled = pickle.loads(pickled)
+        with self.assertRaises(KeyError):
+            unpickled.value
+
+        register_vocabulary_directory(self.directory)
+        self.assertEqual({'second': 0.75}, unpickled.value)
+
+    def test_release(self):
+        vocabulary = FeaturesVocabulary(['first', 'second'])
+        features_bag = SparseFeaturesBagField([0], [0.5], vocabulary)
+        vocabulary_id = vocabulary.id
+        vocabulary.save(self.directory)
+
+        # the vocabulary is kept while a features bag refers to it
+        del vocabulary
+        gc.collect()
+        self.assertIn(vocabulary_id, features_vocabulary._vocabularies)
+
+        del features_bag
+        gc.collect()
+        self.assertNotIn(vocabulary_id, features_vocabulary._vocabularies)
+
+        # a released vocabulary is loaded again from the saved file
+        self.assertEqual(['first', 'second'], FeaturesVocabulary.from_id(vocabulary_id).terms)
+        self.assertTrue(FeaturesVocabulary.from_id(vocabulary_id, ['first', 'second']).saved)
+
+    def test_pickle_legacy_representations(self):
+        # representations pickled before the classes used __slots__ have their attributes in a dict
+        field = SimpleField.__new__(SimpleField)
+        field.__setstate__({'_SimpleField__value': 'legacy'})
+        self.assertEqual('legacy', field.value)
+
+        features_bag = pickle.loads(pickle.dumps(FeaturesBagField({'first': 0.5})))
+        self.assertEqual({'first': 0.5}, features_bag.value)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
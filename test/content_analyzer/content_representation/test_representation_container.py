@@ -1,5 +1,7 @@
+import pickle
 from unittest import TestCase
 import numpy as np
+import pandas as pd
 
 from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
 
@@ -60,3 +62,33 @@ class TestRepresentationContainer(TestCase):
         # Check that the iterator gives an error since there aren't any items left
         with self.assertRaises(StopIteration):
             next(it)
+
+    def test_pop_internal_id(self):
+        rep_container = RepresentationContainer(['rep1', 'rep2', 'rep3'], ['test1', None, 'test3'])
+
+        self.assertEqual('rep1', rep_container.pop(0))
+        self.assertEqual([1, 2], rep_container.get_internal_index())
+        self.assertEqual([np.nan, 'test3'], rep_container.get_external_index())
+        # the external ids still refer to the right representations after the removal
+        self.assertEqual('rep3', rep_container['test3'])
+
+        rep_container.append('rep4', None)
+        self.assertEqual([1, 2, 3], rep_container.get_internal_index())
+
+    def test_pickle(self):
+        rep_container = RepresentationContainer(['rep1', 'rep2', 'rep3'], ['test1', None, 'test3'])
+
+        unpickled = pickle.loads(pickle.dumps(rep_container))
+        self.assertEqual(rep_container, unpickled)
+        self.assertEqual('rep3', unpickled['test3'])
+
+        # containers pickled by the dataframe based implementation can still be loaded
+        dataframe = pd.DataFrame({'external_id': ['test1', None, 'test3'], 'representation': ['rep1', 'rep2', 'rep3']})
+        dataframe['internal_id'] = dataframe.index
+        dataframe.set_index(['internal_id', 'external_id'], inplace=True)
+        legacy_container = RepresentationContainer.__new__(RepresentationContainer)
+        legacy_container.__setstate__({'_RepresentationContainer__dataframe': dataframe})
+
+        self.assertEqual(rep_container, legacy_container)
+        self.assertEqual([0, 1, 2], legacy_container.get_internal_index())
+        self.assertEqual('rep1', legacy_container['test1'])
@@ -1,6 +1,11 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 
 import os
+import shutil
+import tempfile
+
+import numpy as np
+from gensim import matutils
 
 from orange_cb_recsys.content_analyzer.information_processor.nlp import NLTK
 from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
@@ -113,3 +118,34 @@ class TestWordEmbeddingSourceGensimLearner(TestEmbeddingSource):
         self.assertWordEmbeddingMatches(source, result[0], "first")
         self.assertWordEmbeddingMatches(source, result[1], "exile")
 
+    def test_projection_matrix(self):
+        for source in [GensimLatentSemanticAnalysis(lsa_file_path), GensimRandomIndexing(ri_file_path)]:
+            vocabulary = list(source.model.id2word.token2id)
+            projection_matrix = source.projection_matrix
+            self.assertEqual((len(vocabulary), source.get_vector_size()), projection_matrix.shape)
+            self.assertEqual(np.float32, projection_matrix.dtype)
+
+            # the rows of the matrix are the projections of the bows of the words computed by the model
+            expected = np.array([matutils.sparse2full(source.model[[(source.model.id2word.token2id[word], 1)]],
+                                                      source.get_vector_size()) for word in vocabulary])
+            np.testing.assert_allclose(expected, source.get_embedding_batch(vocabulary), atol=1e-6)
+            np.testing.assert_allclose(expected[1], source.get_embedding(vocabulary[1]), atol=1e-6)
+            self.assertFalse(source.get_embedding_batch(["random_word"]).any())
+            with self.assertRaises(KeyError):
+                source.get_embedding("random_word")
+
+    def test_projection_matrix_save(self):
+        directory = tempfile.mkdtemp()
+        try:
+            source = GensimRandomIndexing(os.path.join(directory, "ri_model"), auto_save=False)
+            source.model = GensimRandomIndexing(ri_file_path).model
+            source.save()
+            self.assertTrue(os.path.isfile(source.reference + GensimRandomIndexing.PROJECTION_MATRIX_EXTENSION))
+
+            # the saved matrix is loaded with the model instead of being computed again
+            with mock.patch.object(GensimRandomIndexing, 'compute_projection_matrix') as mocked_compute:
+                loaded_source = GensimRandomIndexing(source.reference)
+                np.testing.assert_array_equal(source.projection_matrix, loaded_source.projection_matrix)
+            mocked_compute.assert_not_called()
+        finally:
+            shutil.rmtree(directory)
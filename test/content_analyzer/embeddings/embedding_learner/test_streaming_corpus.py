@@ -0,0 +1,146 @@
+import os
+import shutil
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.doc2vec import GensimDoc2Vec
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.streaming_corpus import StreamingCorpus, \
+    MappedCorpus
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.word2vec import GensimWord2Vec
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.utils.check_tokenization import check_tokenized, check_not_tokenized
+from test import dir_test_files
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+file_path = os.path.join(dir_test_files, 'movies_info_reduced.json')
+
+
+class CountingSource(JSONFile):
+    """
+    JSONFile which counts how many times it has been iterated
+    """
+
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        yield from super().__iter__()
+
+
+class CountingProcessor(TextProcessor):
+    """
+    Processor which counts the data it processes
+    """
+    processed = 0
+
+    def process(self, field_data):
+        CountingProcessor.processed += 1
+        return field_data
+
+
+class TestStreamingCorpus(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, 'streaming_corpus_test')
+        self.cache_path = os.path.join(self.directory, 'corpus.cor')
+        self.expected = [check_tokenized(" " + content['Title'].lower() + " " + content['Plot'].lower())
+                         for content in JSONFile(file_path)]
+
+    def test_iter(self):
+        corpus = StreamingCorpus(JSONFile(file_path), ['Title', 'Plot'], [], check_tokenized, chunk_size=3)
+
+        # the corpus is restartable and the result doesn't depend on the chunks
+        self.assertEqual(self.expected, list(corpus))
+        self.assertEqual(self.expected, list(corpus))
+        self.assertFalse(corpus.is_cached)
+
+        learner = GensimWord2Vec()
+        self.assertEqual(self.expected, learner.extract_corpus(JSONFile(file_path), ['Title', 'Plot'], []))
+
+    def test_temporary_file(self):
+        source = CountingSource(file_path)
+        corpus = StreamingCorpus(source, ['Title', 'Plot'], [], check_tokenized, chunk_size=3)
+
+        # an interrupted pass doesn't store the documents
+        next(iter(corpus))
+        self.assertEqual(self.expected, list(corpus))
+
+        # the following passes read the documents stored by the first complete pass
+        self.assertEqual(self.expected, list(corpus))
+        self.assertEqual(self.expected, list(corpus))
+        self.assertEqual(2, source.iterations)
+        self.assertFalse(corpus.is_cached)
+
+        # once closed, the source is processed again
+        corpus.close()
+        self.assertEqual(self.expected, list(corpus))
+        self.assertEqual(3, source.iterations)
+
+        # the documents which are not tokenized are stored too
+        source = CountingSource(file_path)
+        with StreamingCorpus(source, ['Title'], [], check_not_tokenized) as corpus:
+            expected = list(corpus)
+            self.assertEqual(expected, list(corpus))
+        self.assertEqual(1, source.iterations)
+
+    def test_fit_processes_once(self):
+        CountingProcessor.processed = 0
+        learner = GensimWord2Vec(auto_save=False, min_count=1, epochs=5)
+        learner.fit(JSONFile(file_path), ['Title', 'Plot'], CountingProcessor())
+
+        # the vocabulary pass and the epochs of the training process each document only once
+        self.assertEqual(len(self.expected), CountingProcessor.processed)
+
+    def test_cache(self):
+        source = CountingSource(file_path)
+        corpus = StreamingCorpus(source, ['Title', 'Plot'], [], check_tokenized, self.cache_path)
+
+        # an interrupted pass doesn't write the cache
+        next(iter(corpus))
+        self.assertFalse(corpus.is_cached)
+        self.assertEqual([], os.listdir(self.directory))
+
+        self.assertEqual(self.expected, list(corpus))
+        self.assertTrue(corpus.is_cached)
+        with open(self.cache_path, encoding='utf-8') as cache_file:
+            self.assertEqual(' '.join(self.expected[0]) + '\n', cache_file.readline())
+
+        # the following passes read the cache
+        self.assertEqual(self.expected, list(corpus))
+        self.assertEqual(self.cache_path, corpus.build_cache())
+        self.assertEqual(2, source.iterations)
+
+    def test_cache_not_tokenized(self):
+        corpus = StreamingCorpus(JSONFile(file_path), ['Title'], [], check_not_tokenized, self.cache_path)
+        with self.assertRaises(ValueError):
+            corpus.build_cache()
+        self.assertFalse(corpus.is_cached)
+
+        with self.assertRaises(ValueError):
+            StreamingCorpus(JSONFile(file_path), ['Title'], [], check_tokenized).build_cache()
+
+    def test_mapped_corpus(self):
+        corpus = StreamingCorpus(JSONFile(file_path), ['Title', 'Plot'], [], check_tokenized)
+        mapped_corpus = MappedCorpus(corpus, lambda i, doc: (i, len(doc)))
+
+        expected = [(i, len(doc)) for i, doc in enumerate(self.expected)]
+        self.assertEqual(expected, list(mapped_corpus))
+        self.assertEqual(expected, list(mapped_corpus))
+
+    def test_fit_from_cache(self):
+        learner = GensimWord2Vec(auto_save=False, corpus_cache=self.cache_path, min_count=1, workers=2)
+        learner.fit(JSONFile(file_path), ['Title', 'Plot'])
+
+        self.assertTrue(os.path.isfile(self.cache_path))
+        self.assertEqual({token for doc in self.expected for token in doc}, set(learner.model.key_to_index))
+
+        learner = GensimDoc2Vec(auto_save=False, corpus_cache=self.cache_path, min_count=1)
+        learner.fit(JSONFile(file_path), ['Title', 'Plot'])
+
+        # each document is tagged with its position in the corpus
+        self.assertEqual(len(self.expected), len(learner.model.dv))
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
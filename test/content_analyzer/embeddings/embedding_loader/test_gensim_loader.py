@@ -5,10 +5,11 @@ import numpy as np
 
 from test.content_analyzer.embeddings.test_embedding_source import TestEmbeddingSource
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.gensim import Gensim
+from orange_cb_recsys.content_analyzer.embeddings.model_registry import embedding_model_registry
 
 result_matrix = {
-    'title': np.array([random() for _ in range(25)]),
-    'plot': np.array([random() for _ in range(25)])
+    'title': np.array([random() for _ in range(25)], dtype=np.float32),
+    'plot': np.array([random() for _ in range(25)], dtype=np.float32)
 }
 
 
@@ -24,6 +25,8 @@ def similar_by_vector(vector, n_to_find):
 
 mocked_model = MagicMock()
 mocked_model.__getitem__.side_effect = get_item
+mocked_model.key_to_index = {key: i for i, key in enumerate(result_matrix.keys())}
+mocked_model.vectors = np.array(list(result_matrix.values()))
 mocked_model.wv = MagicMock()
 mocked_model.wv.similar_by_vector.side_effect = similar_by_vector
 mocked_model.vector_size = 25
@@ -47,3 +50,7 @@ class TestGensimDownloader(TestEmbeddingSource):
 
         self.assertWordEmbeddingMatches(source, result[0], "title")
         self.assertWordEmbeddingMatches(source, result[1], "plot")
+
+    def tearDown(self) -> None:
+        # the mocked model must not be shared with the other tests
+        embedding_model_registry.clear()
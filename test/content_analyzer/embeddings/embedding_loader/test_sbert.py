@@ -3,6 +3,7 @@ from unittest import TestCase, mock
 import numpy as np
 
 from orange_cb_recsys.content_analyzer.embeddings import Sbert
+from orange_cb_recsys.content_analyzer.embeddings.model_registry import embedding_model_registry
 
 result_matrix = {
     'this is a phrase': np.array([random() for _ in range(768)]),
@@ -10,8 +11,10 @@ result_matrix = {
 }
 
 
-def encode(sentence, show_progress_bar):
-    return result_matrix[sentence]
+def encode(sentences, show_progress_bar, batch_size=32):
+    if isinstance(sentences, str):
+        return result_matrix[sentences]
+    return np.array([result_matrix[sentence] for sentence in sentences])
 
 
 class TestSbert(TestCase):
@@ -31,3 +34,25 @@ class TestSbert(TestCase):
         self.assertEqual(len(result), 2)
         self.assertEqual(len(result[0]), vector_size)
         self.assertEqual(len(result[1]), vector_size)
+
+    @mock.patch('orange_cb_recsys.content_analyzer.embeddings.sbert.SentenceTransformer')
+    def test_load_batch(self, mocked_model):
+        instance = mocked_model.return_value
+        instance.get_sentence_embedding_dimension.return_value = 768
+        instance.encode.side_effect = encode
+
+        source = Sbert(batch_size=64)
+        text_list = [["this is a phrase", "this is another phrase"], [], ["This is a phrase"]]
+        result = source.load_batch(text_list)
+
+        # the distinct sentences of all the texts are encoded with a single call
+        instance.encode.assert_called_once_with(["this is a phrase", "this is another phrase"], batch_size=64,
+                                                show_progress_bar=False)
+
+        self.assertEqual(len(text_list), len(result))
+        for text, embedding_matrix in zip(text_list, result):
+            np.testing.assert_array_equal(source.load(text), embedding_matrix)
+
+    def tearDown(self) -> None:
+        # the mocked models must not be shared between the tests
+        embedding_model_registry.clear()
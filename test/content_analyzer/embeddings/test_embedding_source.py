@@ -2,8 +2,11 @@ import numpy as np
 from unittest import TestCase
 from math import isclose
 
+from gensim.models import KeyedVectors
+from gensim.models.fasttext import FastText
 
-from orange_cb_recsys.content_analyzer.embeddings.embedding_source import EmbeddingSource
+from orange_cb_recsys.content_analyzer.embeddings.embedding_source import EmbeddingSource, \
+    keyed_vectors_embedding_batch
 
 
 class TestEmbeddingSource(TestCase):
@@ -31,3 +34,26 @@ class TestEmbeddingSource(TestCase):
         # I'm assuming it's exactly that word
         if not isclose(like, 1, abs_tol=1e-6):
             raise AssertionError("Word %s and result word %s do not match" % (embedding_word, word))
+
+
+class TestKeyedVectorsEmbeddingBatch(TestCase):
+    def test_keyed_vectors_embedding_batch(self):
+        keyed_vectors = KeyedVectors(vector_size=3)
+        keyed_vectors.add_vectors(['first', 'second'], np.array([[1, 2, 3], [4, 5, 6]]))
+
+        result = keyed_vectors_embedding_batch(keyed_vectors, ['second', 'random_word', 'first', 'second'])
+        expected = np.array([[4, 5, 6], [0, 0, 0], [1, 2, 3], [4, 5, 6]], dtype=np.float32)
+
+        self.assertEqual(np.float32, result.dtype)
+        np.testing.assert_array_equal(expected, result)
+
+    def test_keyed_vectors_embedding_batch_oov(self):
+        # the vectors of the words out of the vocabulary are computed from their n-grams
+        keyed_vectors = FastText(sentences=[['first', 'second']], min_count=1, vector_size=10).wv
+        word_list = ['first', 'firsts', 'second']
+
+        result = keyed_vectors_embedding_batch(keyed_vectors, word_list, keyed_vectors.get_vector)
+        expected = np.array([keyed_vectors[word] for word in word_list])
+
+        np.testing.assert_array_almost_equal(expected, result)
+        self.assertFalse(keyed_vectors_embedding_batch(keyed_vectors, word_list)[1].any())
@@ -0,0 +1,122 @@
+import gc
+import os
+import pickle
+import shutil
+from unittest import TestCase, mock
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner.word2vec import GensimWord2Vec
+from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.embedding_loader import WordEmbeddingLoader
+from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.gensim import Gensim
+from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.sbert import Sbert
+from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.wiki2vec_loader import Wikipedia2VecLoader
+from orange_cb_recsys.content_analyzer.embeddings.model_registry import EmbeddingModelRegistry, \
+    embedding_model_registry
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique import \
+    WordEmbeddingTechnique
+from test import dir_test_files
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+word2vec_file_path = os.path.join(dir_test_files, "test_embedding_models/word2vec_model.bin")
+
+
+class TestEmbeddingModelRegistry(TestCase):
+    def setUp(self) -> None:
+        self.mmap_directory = os.path.join(THIS_DIR, 'mmap_models_test')
+        embedding_model_registry.clear()
+
+    def test_get_model(self):
+        registry = EmbeddingModelRegistry()
+        load_function = mock.Mock(side_effect=lambda: object())
+
+        model = registry.get_model(Gensim, 'model', load_function)
+        self.assertIs(model, registry.get_model(Gensim, 'model', load_function))
+        self.assertEqual(1, load_function.call_count)
+
+        # the models are identified by the class of the source too
+        self.assertIsNot(model, registry.get_model(Wikipedia2VecLoader, 'model', load_function))
+        self.assertEqual(2, load_function.call_count)
+        self.assertTrue(registry.contains_model(model))
+
+        registry.clear()
+        self.assertFalse(registry.contains_model(model))
+
+    def test_release(self):
+        class Model:
+            pass
+
+        registry = EmbeddingModelRegistry()
+        load_function = mock.Mock(side_effect=Model)
+
+        # the model is released once no source uses it anymore
+        model = registry.get_model(Gensim, 'model', load_function)
+        self.assertIs(model, registry.get_model(Gensim, 'model', load_function))
+        del model
+        gc.collect()
+        self.assertEqual(0, len(registry))
+        registry.get_model(Gensim, 'model', load_function)
+        self.assertEqual(2, load_function.call_count)
+
+        # the models which can't be referenced weakly are kept until they are released
+        model = registry.get_model(Gensim, 'strong_model', lambda: object())
+        other_model = registry.get_model(Wikipedia2VecLoader, 'strong_model', lambda: object())
+        self.assertEqual(2, len(registry))
+        registry.release(Gensim, 'strong_model')
+        self.assertFalse(registry.contains_model(model))
+        self.assertTrue(registry.contains_model(other_model))
+
+    def test_get_model_not_found(self):
+        registry = EmbeddingModelRegistry()
+        with self.assertRaises(FileNotFoundError):
+            registry.get_model(Gensim, 'model', mock.Mock(side_effect=FileNotFoundError))
+        self.assertEqual(0, len(registry))
+
+    def test_sources_share_model(self):
+        first_source = GensimWord2Vec(word2vec_file_path)
+        second_source = GensimWord2Vec(word2vec_file_path)
+        self.assertIs(first_source.model, second_source.model)
+
+        # the model of the registry isn't copied with the source
+        self.assertLess(len(pickle.dumps(first_source)), 1000)
+        self.assertIs(first_source.model, pickle.loads(pickle.dumps(first_source)).model)
+
+    def test_mmap(self):
+        registry = EmbeddingModelRegistry(self.mmap_directory)
+        load_function = lambda: KeyedVectors.load_word2vec_format(word2vec_file_path, binary=True)
+
+        model = registry.get_model(GensimWord2Vec, word2vec_file_path, load_function)
+        self.assertIsInstance(model.vectors, np.memmap)
+
+        # another process opens the stored model without loading it again
+        other_registry = EmbeddingModelRegistry(self.mmap_directory)
+        other_model = other_registry.get_model(GensimWord2Vec, word2vec_file_path, mock.Mock())
+        self.assertIsInstance(other_model.vectors, np.memmap)
+        np.testing.assert_array_equal(load_function().vectors, other_model.vectors)
+
+    def test_from_str_to_embedding_source(self):
+        # only the loader which accepts the reference loads the model
+        with mock.patch.object(Gensim, 'load_model') as gensim_load, \
+                mock.patch.object(Gensim, 'accepts_reference', return_value=False), \
+                mock.patch.object(Wikipedia2VecLoader, 'load_model', return_value=mock.Mock()) as wiki_load:
+            source = WordEmbeddingTechnique.from_str_to_embedding_source(word2vec_file_path, WordEmbeddingLoader)
+
+        self.assertIsInstance(source, Wikipedia2VecLoader)
+        gensim_load.assert_not_called()
+        wiki_load.assert_called_once()
+
+    def test_sbert_accepts_reference(self):
+        self.assertTrue(Sbert.accepts_reference('paraphrase-distilroberta-base-v1'))
+        self.assertTrue(Sbert.accepts_reference('sentence-transformers/all-MiniLM-L6-v2'))
+        self.assertTrue(Sbert.accepts_reference(THIS_DIR))
+
+        # a wrong path of a local model isn't the name of a sbert model to download
+        self.assertFalse(Sbert.accepts_reference(word2vec_file_path))
+        self.assertFalse(Sbert.accepts_reference(os.path.join(THIS_DIR, 'missing_model.bin')))
+        self.assertFalse(Sbert.accepts_reference(os.path.join(THIS_DIR, 'missing_directory', 'model')))
+
+    def tearDown(self) -> None:
+        embedding_model_registry.clear()
+        if os.path.isdir(self.mmap_directory):
+            shutil.rmtree(self.mmap_directory)
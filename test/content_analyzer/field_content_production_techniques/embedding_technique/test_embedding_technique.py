@@ -1,8 +1,10 @@
 from unittest import TestCase
 import os
 
+import numpy as np
+
 from orange_cb_recsys.content_analyzer.content_representation.content import EmbeddingField
-from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import GensimFastText
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import GensimFastText, GensimWord2Vec
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique import \
     SentenceEmbeddingTechnique, FromWordsSentenceEmbeddingTechnique, FromWordsDocumentEmbeddingTechnique, \
     FromSentencesDocumentEmbeddingTechnique, WordEmbeddingTechnique, DocumentEmbeddingTechnique
@@ -56,6 +58,17 @@ class TestEmbeddingTechnique(TestCase):
         self.assertEqual(len(embedding_list), 20)
         self.assertIsInstance(embedding_list[0], EmbeddingField)
 
+    def test_produce_batch_repr(self):
+        source = GensimWord2Vec(os.path.join(dir_test_files, "test_embedding_models/word2vec_model.bin"))
+        field_data_list = ["first exile", "", "random_word first", "first exile"]
+
+        # the representations produced together are equal to the ones produced one at a time
+        for technique in [WordEmbeddingTechnique(source), FromWordsDocumentEmbeddingTechnique(source, Centroid())]:
+            batch_representations = technique.produce_batch_repr(field_data_list)
+            self.assertEqual(len(field_data_list), len(batch_representations))
+            for field_data, representation in zip(field_data_list, batch_representations):
+                np.testing.assert_array_equal(technique.produce_single_repr(field_data).value, representation.value)
+
     def test_load_not_existing_source(self):
         self.skipTest("Test requires internet but is too complex to be mocked")
         with self.assertRaises(FileNotFoundError):
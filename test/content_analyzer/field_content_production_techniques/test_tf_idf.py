@@ -1,9 +1,12 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 import os
 
-from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField
-from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import WhooshTfIdf, SkLearnTfIdf
-from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from orange_cb_recsys.content_analyzer.content_representation.content import FeaturesBagField, SparseFeaturesBagField
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import WhooshTfIdf, SkLearnTfIdf, \
+    StreamingTfIdf
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile, split_in_chunks
 from test import dir_test_files
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -29,3 +32,91 @@ class TestSkLearnTfIdf(TestCase):
 
         self.assertEqual(len(features_bag_list), 20)
         self.assertIsInstance(features_bag_list[0], FeaturesBagField)
+
+    def test_fit_transform(self):
+        technique = SkLearnTfIdf()
+        expected = technique.produce_content("Title", [], JSONFile(file_path))
+
+        # the representations produced chunk by chunk are the same produced on the whole collection
+        technique.fit("Title", [], JSONFile(file_path))
+        features_bag_list = []
+        first_position = 0
+        for chunk in split_in_chunks(JSONFile(file_path), 6):
+            features_bag_list.extend(technique.transform("Title", [], chunk, first_position))
+            first_position += len(chunk)
+        technique.delete_fitted()
+
+        self.assertEqual(len(expected), len(features_bag_list))
+        for expected_repr, features_bag in zip(expected, features_bag_list):
+            self.assertEqual(expected_repr.value.keys(), features_bag.value.keys())
+            for word in expected_repr.value:
+                self.assertAlmostEqual(expected_repr.value[word], features_bag.value[word])
+
+
+class TestStreamingTfIdf(TestCase):
+    def setUp(self) -> None:
+        # the tf-idf values computed in memory by sklearn
+        vectorizer = TfidfVectorizer(sublinear_tf=True)
+        matrix = vectorizer.fit_transform([content["Plot"] for content in JSONFile(file_path)])
+        terms = {index: term for term, index in vectorizer.vocabulary_.items()}
+        self.expected = [{terms[index]: matrix[row, index] for index in matrix[row].indices}
+                         for row in range(matrix.shape[0])]
+
+    def assertFeaturesEqual(self, expected: dict, features: dict, places: int = 7):
+        self.assertEqual(expected.keys(), features.keys())
+        for feature in expected:
+            self.assertAlmostEqual(expected[feature], features[feature], places=places)
+
+    def test_produce_content(self):
+        technique = StreamingTfIdf(block_size=3)
+
+        # the representations are produced a block at a time, without the tf-idf matrix of the whole source
+        with mock.patch.object(technique, 'dataset_refactor', side_effect=AssertionError):
+            features_bag_list = technique.produce_content("Plot", [], JSONFile(file_path))
+
+        self.assertEqual(len(self.expected), len(features_bag_list))
+        for expected, features_bag in zip(self.expected, features_bag_list):
+            self.assertIsInstance(features_bag, FeaturesBagField)
+            self.assertFeaturesEqual(expected, features_bag.value)
+
+    def test_dataset_refactor(self):
+        technique = StreamingTfIdf(block_size=3)
+
+        self.assertEqual(len(self.expected), technique.dataset_refactor(JSONFile(file_path), "Plot", []))
+        for position, expected in enumerate(self.expected):
+            self.assertFeaturesEqual(expected, technique.produce_single_repr(position).value)
+        technique.delete_refactored()
+
+    def test_fit_transform(self):
+        technique = StreamingTfIdf(sparse_features=True, block_size=4)
+
+        technique.fit("Plot", [], JSONFile(file_path))
+        features_bag_list = []
+        first_position = 0
+        for chunk in split_in_chunks(JSONFile(file_path), 6):
+            features_bag_list.extend(technique.transform("Plot", [], chunk, first_position))
+            first_position += len(chunk)
+        technique.delete_fitted()
+
+        self.assertEqual(len(self.expected), len(features_bag_list))
+        self.assertEqual(1, len({features_bag.vocabulary for features_bag in features_bag_list}))
+        for expected, features_bag in zip(self.expected, features_bag_list):
+            self.assertIsInstance(features_bag, SparseFeaturesBagField)
+            self.assertFeaturesEqual(expected, features_bag.value, places=6)
+
+    def test_hashing(self):
+        technique = StreamingTfIdf(n_features=2 ** 20, block_size=5)
+
+        features_bag_list = technique.produce_content("Plot", [], JSONFile(file_path))
+
+        # each term is hashed in its own column (there are no collisions for these terms), so the values don't change
+        self.assertEqual(len(self.expected), len(features_bag_list))
+        for expected, features_bag in zip(self.expected, features_bag_list):
+            self.assertTrue(all(isinstance(feature, int) for feature in features_bag.value))
+            self.assertEqual(len(expected), len(features_bag.value))
+            self.assertAlmostEqual(1., sum(value ** 2 for value in features_bag.value.values()))
+            for expected_value, value in zip(sorted(expected.values()), sorted(features_bag.value.values())):
+                self.assertAlmostEqual(expected_value, value)
+
+        with self.assertRaises(ValueError):
+            StreamingTfIdf(n_features=2 ** 16, sparse_features=True)
@@ -2,7 +2,10 @@ from unittest import TestCase
 
 from nltk import Tree
 
-from orange_cb_recsys.content_analyzer.information_processor.nlp import NLTK
+import pickle
+
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_fingerprint
+from orange_cb_recsys.content_analyzer.information_processor.nlp import NLTK, TokenCache
 
 
 class TestNLTK(TestCase):
@@ -68,3 +71,49 @@ class TestNLTK(TestCase):
 
         self.assertEqual(result,
                          Tree('S', [Tree('PERSON', [('Facebook', 'NNP')]), ('was', 'VBD'), ('fined', 'VBN'), ('by', 'IN'), Tree('PERSON', [('Hewlett', 'NNP'), ('Packard', 'NNP')]), ('for', 'IN'), ('spending', 'VBG'), ('100€', 'CD'), ('to', 'TO'), ('buy', 'VB'), Tree('PERSON', [('Cristiano', 'NNP'), ('Ronaldo', 'NNP')]), ('from', 'IN'), Tree('GPE', [('Juventus', 'NNP')])]))
+
+    def test_process_batch(self):
+        nltka = NLTK(stopwords_removal=True, stemming=True, lemmatization=True, url_tagging=True)
+        texts = ["The striped bats are hanging on their feet for the best",
+                 "The   striped http://facebook.com bats https://github.com   are hanging",
+                 "My name is Francesco and I am a student at the University of the city of Bari"]
+
+        # the batch gives the same result of processing each text on its own
+        self.assertEqual([nltka.process(text) for text in texts], nltka.process_batch(texts))
+        self.assertEqual([], nltka.process_batch([]))
+
+
+class TestTokenCache(TestCase):
+    def test_get_put(self):
+        cache = TokenCache(capacity=2)
+        self.assertIsNone(cache.get(('bats', 'lemma', 'english')))
+        cache.put(('bats', 'lemma', 'english'), 'bat')
+        cache.put(('hanging', 'stem', 'english'), 'hang')
+
+        # the key considers the operation and the language
+        self.assertEqual('bat', cache.get(('bats', 'lemma', 'english')))
+        self.assertIsNone(cache.get(('bats', 'stem', 'english')))
+        self.assertIsNone(cache.get(('bats', 'lemma', 'italian')))
+
+        # the least recently used result is discarded
+        cache.put(('feet', 'lemma', 'english'), 'foot')
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get(('hanging', 'stem', 'english')))
+        self.assertEqual('bat', cache.get(('bats', 'lemma', 'english')))
+
+        self.assertEqual(2, cache.hits)
+        self.assertEqual(4, cache.misses)
+        self.assertAlmostEqual(2 / 6, cache.hit_rate)
+
+        # the results aren't pickled
+        self.assertEqual(0, len(pickle.loads(pickle.dumps(cache))))
+
+    def test_disabled(self):
+        cache = TokenCache(capacity=0)
+        cache.put(('bats', 'lemma', 'english'), 'bat')
+        self.assertIsNone(cache.get(('bats', 'lemma', 'english')))
+
+    def test_fingerprint(self):
+        # the capacity of the cache doesn't change the processed data
+        self.assertEqual(object_fingerprint(NLTK(lemmatization=True)),
+                         object_fingerprint(NLTK(lemmatization=True, token_cache_size=10)))
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import threading
+from unittest import TestCase, skipUnless
+
+from orange_cb_recsys.content_analyzer.memory_interfaces import SearchIndex
+from orange_cb_recsys.content_analyzer.memory_interfaces.searcher_pool import IndexSearcherPool, \
+    index_searcher_pool
+
+
+def write_contents(index: SearchIndex, values: list, delete_old: bool = True):
+    index.init_writing(delete_old, ["content_id", "test1"])
+    for value in values:
+        index.new_content()
+        index.new_field("content_id", value)
+        index.new_field("test1", "test" + value)
+        index.serialize_content()
+    index.stop_writing()
+
+
+class TestIndexSearcherPool(TestCase):
+    def setUp(self) -> None:
+        self.index = SearchIndex("./searcher_pool")
+        write_contents(self.index, ["0", "1"])
+
+    def test_searcher(self):
+        pool = IndexSearcherPool(refresh_interval=3600)
+        searcher = pool.searcher(self.index.directory)
+        self.assertIs(searcher, pool.searcher(self.index.directory))
+        self.assertEqual(1, len(pool))
+
+        # the searchers with different weightings share the reader
+        from whoosh.scoring import TF_IDF
+        tf_idf_searcher = pool.searcher(self.index.directory, TF_IDF)
+        self.assertIsInstance(tf_idf_searcher.weighting, TF_IDF)
+        self.assertIs(searcher.reader(), tf_idf_searcher.reader())
+
+        # the changes are only seen once the searchers are invalidated (or after the refresh interval)
+        write_contents(self.index, ["2"], delete_old=False)
+        self.assertEqual(2, pool.searcher(self.index.directory).doc_count_all())
+        pool.invalidate(self.index.directory)
+        self.assertEqual(3, pool.searcher(self.index.directory).doc_count_all())
+
+        pool.close(self.index.directory)
+        self.assertEqual(0, len(pool))
+
+    def test_threads(self):
+        pool = IndexSearcherPool()
+        searchers = []
+        thread = threading.Thread(target=lambda: searchers.append(pool.searcher(self.index.directory)))
+        thread.start()
+        thread.join()
+
+        # each thread has its own searcher, and the ones of the ended threads are closed
+        self.assertIsNot(searchers[0], pool.searcher(self.index.directory))
+        self.assertEqual(1, len(pool))
+        pool.clear()
+        self.assertEqual(0, len(pool))
+
+    @skipUnless(hasattr(os, 'fork'), "fork is not available")
+    def test_fork(self):
+        pool = IndexSearcherPool(refresh_interval=3600)
+        searcher = pool.searcher(self.index.directory)
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        def child():
+            # the forked process doesn't inherit the readers of the parent
+            inherited = len(pool)
+            child_searcher = pool.searcher(self.index.directory)
+            results.put((inherited, child_searcher is searcher, child_searcher.doc_count_all()))
+
+        process = context.Process(target=child)
+        process.start()
+        process.join()
+
+        self.assertEqual((0, False, 2), results.get(timeout=10))
+        # the readers of the parent are still open
+        self.assertIs(searcher, pool.searcher(self.index.directory))
+        self.assertEqual(2, searcher.doc_count_all())
+        pool.clear()
+
+    def test_index_interface(self):
+        self.assertEqual("test1", self.index.get_field("test1", 1))
+        self.assertEqual("test0", self.index.get_field("test1", "0"))
+        searcher = index_searcher_pool.searcher(self.index.directory)
+
+        # the searcher is kept open between the reads and refreshed when the index interface writes
+        self.index.query("test1:test1", 10)
+        self.assertIs(searcher, index_searcher_pool.searcher(self.index.directory))
+        write_contents(self.index, ["2"], delete_old=False)
+        self.assertEqual("test2", self.index.get_field("test1", 2))
+        self.assertIsNot(searcher, index_searcher_pool.searcher(self.index.directory))
+
+        with SearchIndex(self.index.directory) as index:
+            self.assertEqual("test2", index.get_field("test1", "2"))
+            open_readers = len(index_searcher_pool)
+        self.assertEqual(open_readers - 1, len(index_searcher_pool))
+
+    def tearDown(self) -> None:
+        self.index.delete()
@@ -1,6 +1,7 @@
 from unittest import TestCase
 
 from orange_cb_recsys.content_analyzer.memory_interfaces import KeywordIndex, SearchIndex
+from orange_cb_recsys.content_analyzer.content_representation.content import IndexField
 
 
 class TestIndexInterface(TestCase):
@@ -71,6 +72,34 @@ class TestIndexInterface(TestCase):
             index2.delete()
             index3.delete()
 
+    def test_delete_content(self):
+        index = SearchIndex("./delete_content")
+        try:
+            index.init_writing(True)
+            for content_id in ["0", "1", "2"]:
+                index.new_content()
+                index.new_field("content_id", content_id)
+                index.new_field("test1", "test" + content_id)
+                index.serialize_content()
+            index.stop_writing()
+
+            index.init_writing(False)
+            index.delete_content(1)
+            index.new_content()
+            index.new_field("content_id", "3")
+            index.new_field("test1", "test3")
+            # the deleted document keeps its position
+            self.assertEqual(3, index.serialize_content())
+            index.stop_writing()
+
+            # the positions of the other documents don't change
+            self.assertEqual(index.get_field("test1", 0), "test0")
+            self.assertEqual(index.get_field("test1", 2), "test2")
+            self.assertEqual(index.get_field("test1", 3), "test3")
+            self.assertEqual(0, len(index.query("test1:test1", 10)))
+        finally:
+            index.delete()
+
     def test_get_field(self):
         index = KeywordIndex("/keyword")
 
@@ -144,3 +173,77 @@ class TestIndexInterface(TestCase):
         finally:
             index.delete()
 
+
+    def test_bulk_writing(self):
+        for procs in [1, 2]:
+            index = SearchIndex("./bulk_writing", procs=procs)
+            try:
+                index.init_writing(True, ["content_id", "test1"])
+                positions = []
+                for content_id in range(250):
+                    index.new_content()
+                    index.new_field("content_id", str(content_id))
+                    index.new_field("test1", "test" + str(content_id))
+                    positions.append(index.serialize_content())
+                # the fields must be declared when bulk writing
+                index.new_content()
+                with self.assertRaises(ValueError):
+                    index.new_field("test2", "test")
+                index.stop_writing()
+
+                positions = index.resolve_positions(positions)
+                self.assertEqual(list(range(250)), sorted(positions))
+                for content_id, position in enumerate(positions):
+                    self.assertEqual(str(content_id), index.get_field("content_id", position))
+
+                # new fields can be declared when the index is opened again
+                index.init_writing(False, ["content_id", "test1", "test2"])
+                index.delete_content(positions[0])
+                index.new_content()
+                index.new_field("content_id", "250")
+                index.new_field("test2", "test250")
+                position = index.serialize_content()
+                index.stop_writing()
+                position = index.resolve_positions([position])[0]
+                self.assertEqual("test250", index.get_field("test2", position))
+
+                result = index.query("test1:test1", 10)
+                self.assertEqual({"test1"}, set(result["1"]["item"].keys()))
+                self.assertEqual(0, len(index.query("test1:test0", 10)))
+            finally:
+                index.delete()
+
+    def test_get_fields(self):
+        index = SearchIndex("./get_fields")
+        index2 = KeywordIndex("./get_fields2")
+        try:
+            index.init_writing(True, ["content_id", "test1", "test2"])
+            index2.init_writing(True, ["content_id", "test1"])
+            for content_id in range(5):
+                index.new_content()
+                index.new_field("content_id", str(content_id))
+                index.new_field("test1", "first" + str(content_id))
+                index.new_field("test2", "second" + str(content_id))
+                index.serialize_content()
+                index2.new_content()
+                index2.new_field("content_id", str(content_id))
+                index2.new_field("test1", ["keyword", str(content_id)])
+                index2.serialize_content()
+            index.stop_writing()
+            index2.stop_writing()
+
+            # the contents can be requested by position or content_id, in any order and many times
+            field_requests = [("test2", 4), ("test1", "1"), ("test1", 4), ("test2", "0"), ("test2", 4)]
+            self.assertEqual(["second4", "first1", "first4", "second0", "second4"], index.get_fields(field_requests))
+            self.assertEqual([index.get_field(field_name, content_id) for field_name, content_id in field_requests],
+                             index.get_fields(field_requests))
+            self.assertEqual([], index.get_fields([]))
+            with self.assertRaises(IndexError):
+                index.get_fields([("test1", "5")])
+
+            index_fields = [IndexField("test1", 3, index), IndexField("test1", 3, index2),
+                            IndexField("test2", 0, index), IndexField("test1", 1, index2)]
+            self.assertEqual([index_field.value for index_field in index_fields], IndexField.values(index_fields))
+        finally:
+            index.delete()
+            index2.delete()
@@ -1,23 +1,34 @@
+import json
 import os
 import shutil
-from unittest import TestCase
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase, mock
 import lzma
 import pickle
 import numpy as np
+from gensim.models import KeyedVectors, Word2Vec
 
 from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import DBPediaMappingTechnique, \
-    BabelPyEntityLinking
+    BabelPyEntityLinking, PropertiesFromDataset
 from orange_cb_recsys.content_analyzer import ContentAnalyzer, FieldConfig, ExogenousConfig, ItemAnalyzerConfig
+from orange_cb_recsys.content_analyzer.content_analyzer_main import ContentsProducer
+from orange_cb_recsys.content_analyzer.content_fingerprints import config_fingerprint, load_fingerprints
 from orange_cb_recsys.content_analyzer.content_representation.content import SimpleField, FeaturesBagField, \
-    EmbeddingField, IndexField, EntitiesProp
-from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData
+    EmbeddingField, IndexField, EntitiesProp, SparseFeaturesBagField, MatrixEmbeddingField
+from orange_cb_recsys.content_analyzer.content_representation.embedding_matrix import load_embedding_matrix
+from orange_cb_recsys.content_analyzer.content_representation.features_matrix import load_features_matrix
+from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData, DefaultTechnique
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import GensimWord2Vec
 from orange_cb_recsys.content_analyzer.embeddings.embedding_loader.gensim import Gensim
 from orange_cb_recsys.content_analyzer.field_content_production_techniques.embedding_technique.embedding_technique \
     import WordEmbeddingTechnique
-from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import SkLearnTfIdf
+from orange_cb_recsys.content_analyzer.field_content_production_techniques.tf_idf import SkLearnTfIdf, StreamingTfIdf
 from orange_cb_recsys.content_analyzer.information_processor import NLTK
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
 from orange_cb_recsys.content_analyzer.memory_interfaces import SearchIndex, KeywordIndex
 from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.content_analyzer.representation_cache import RepresentationCache
+from orange_cb_recsys.utils.load_content import load_content_instance
 from test import dir_test_files
 
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +41,59 @@ decode_embedding = os.path.join(decode_path, "movies_title_embedding.json")
 
 
 
+class CountingJSONFile(JSONFile):
+    """
+    JSONFile that counts how many times it is iterated
+    """
+    def __init__(self, file_path: str):
+        super().__init__(file_path)
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        yield from super().__iter__()
+
+
+class RecordingOriginalData(OriginalData):
+    """
+    OriginalData technique that records the number of raw contents it processes each time it is used
+    """
+    processed = []
+
+    def produce_content(self, field_name, preprocessor_list, source):
+        representations = super().produce_content(field_name, preprocessor_list, source)
+        RecordingOriginalData.processed.append(len(representations))
+        return representations
+
+
+class RefitOriginalData(RecordingOriginalData):
+    def requires_refit(self) -> bool:
+        return True
+
+
+class CachedOriginalData(OriginalData):
+    """
+    OriginalData technique which stores its representations in the representation cache
+    """
+    def uses_representation_cache(self) -> bool:
+        return True
+
+
+class CountingProcessor(TextProcessor):
+    """
+    Processor that counts the data it processes and adds to it the id of the process where it has been processed
+    """
+    processed = 0
+
+    def __init__(self, suffix: str = ''):
+        super().__init__()
+        self.__suffix = suffix
+
+    def process(self, field_data):
+        CountingProcessor.processed += 1
+        return '{}{}:{}'.format(field_data, self.__suffix, os.getpid())
+
+
 class TestContentsProducer(TestCase):
     def test_create_content(self):
         exogenous_config = ExogenousConfig(DBPediaMappingTechnique('dbo:Film', 'Title'))
@@ -151,6 +215,41 @@ class TestContentsProducer(TestCase):
                     self.assertIsInstance(content.get_field("Title")[0].value, np.ndarray)
                     break
 
+    def test_create_contents_shared_preprocessing(self):
+        def create_contents(n_jobs, chunk_size=None):
+            CountingProcessor.processed = 0
+            config = ItemAnalyzerConfig(JSONFile(movies_info_reduced), ["imdbID"], "movielens_test_shared",
+                                        n_jobs=n_jobs, chunk_size=chunk_size)
+            config.add_multiple_config('Title', [FieldConfig(OriginalData(), CountingProcessor()),
+                                                 FieldConfig(DefaultTechnique(), CountingProcessor()),
+                                                 FieldConfig(OriginalData(), CountingProcessor('different'))])
+            config.add_multiple_config('Plot', [FieldConfig(OriginalData(), CountingProcessor()),
+                                                FieldConfig(OriginalData(), CountingProcessor())])
+            contents_producer = ContentsProducer.get_instance()
+            contents_producer.set_config(config)
+            return contents_producer.create_contents()
+
+        contents = create_contents(1)
+        # the Title and the Plot are processed only once by the shared preprocessor list,
+        # the Title is processed again by the other preprocessor list
+        self.assertEqual(20 * 3, CountingProcessor.processed)
+        for content in contents:
+            title = content.get_field('Title')
+            self.assertEqual(title[0].value, title[1].value)
+            self.assertNotEqual(title[0].value, title[2].value)
+            self.assertEqual(content.get_field('Plot')[0].value, content.get_field('Plot')[1].value)
+
+        self.assertEqual(20 * 3, len(create_contents(1, chunk_size=7)) * 3)
+        self.assertEqual(20 * 3, CountingProcessor.processed)
+
+        # when the field configs are processed by different processes, the shared data is processed in the main process
+        contents = create_contents(2)
+        for content in contents:
+            title = content.get_field('Title')
+            self.assertEqual(title[0].value, title[1].value)
+            self.assertTrue(title[0].value.endswith(':{}'.format(os.getpid())))
+            self.assertFalse(title[2].value.endswith(':{}'.format(os.getpid())))
+
     def test_create_contents_in_index(self):
         output_dir = os.path.join(THIS_DIR, "movielens_test_original_index")
         movies_ca_config = ItemAnalyzerConfig(
@@ -188,6 +287,27 @@ class TestContentsProducer(TestCase):
                     self.assertIsInstance(content.get_field("Title")[1].value, str)
                     break
 
+    def test_source_read_once(self):
+        source = CountingJSONFile(movies_info_reduced)
+        movies_ca_config = ItemAnalyzerConfig(
+            source=source,
+            id=['imdbID'],
+            output_directory="read_once_test",
+        )
+
+        movies_ca_config.add_multiple_config('Title', [FieldConfig(OriginalData()), FieldConfig(OriginalData())])
+        movies_ca_config.add_single_config('imdbRating', FieldConfig())
+        movies_ca_config.add_single_exogenous(ExogenousConfig(PropertiesFromDataset(field_name_list=['Director'])))
+
+        contents_producer = ContentsProducer.get_instance()
+        contents_producer.set_config(movies_ca_config)
+        contents = contents_producer.create_contents()
+
+        self.assertEqual(1, source.iterations)
+        self.assertEqual(20, len(contents))
+        self.assertEqual("Sudden Death", contents[15].get_field("Title")[1].value)
+        self.assertEqual({'Director': 'Peter Hyams'}, contents[15].get_exogenous_representation(0).value)
+
     def test_decode_field_data_string(self):
         movies_ca_config = ItemAnalyzerConfig(
             source=JSONFile(decode_string),
@@ -287,6 +407,375 @@ class TestContentAnalyzer(TestCase):
             self.assertIn('Plot#1', processed_content)
             self.assertIn('imdbRating#0', processed_content)
 
+    def test_fit_n_jobs(self):
+        # the contents produced and serialized in parallel must be equal to the ones produced sequentially
+        for content_archive in [False, True]:
+            output_contents = []
+            for n_jobs in [1, 2]:
+                output_directory = os.path.join(THIS_DIR, 'n_jobs_test_{}'.format(n_jobs))
+                movies_ca_config = ItemAnalyzerConfig(
+                    source=JSONFile(movies_info_reduced),
+                    id=['imdbID'],
+                    output_directory=output_directory,
+                    content_archive=content_archive,
+                    n_jobs=n_jobs
+                )
+
+                movies_ca_config.add_single_config('Title', FieldConfig(OriginalData()))
+                movies_ca_config.add_single_config('imdbRating', FieldConfig())
+                movies_ca_config.add_single_config('Year', FieldConfig(OriginalData(dtype=int)))
+
+                ContentAnalyzer(movies_ca_config).fit()
+
+                contents = {}
+                for content_id in ['tt0112281', 'tt0113497', 'tt0113228']:
+                    contents[content_id] = load_content_instance(output_directory, content_id)
+                    self.assertIsNotNone(contents[content_id])
+                output_contents.append(contents)
+
+                shutil.rmtree(output_directory)
+
+            self.assertEqual(output_contents[0], output_contents[1])
+
+    def test_fit_n_jobs_single_pool(self):
+        # the contents are produced and serialized by the same pool of n_jobs processes
+        output_directory = os.path.join(THIS_DIR, 'n_jobs_pool_test')
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(movies_info_reduced),
+            id=['imdbID'],
+            output_directory=output_directory,
+            n_jobs=2
+        )
+        movies_ca_config.add_single_config('Title', FieldConfig(OriginalData()))
+
+        with mock.patch('orange_cb_recsys.content_analyzer.content_analyzer_main.ProcessPoolExecutor',
+                        wraps=ProcessPoolExecutor) as executor_class:
+            ContentAnalyzer(movies_ca_config).fit()
+
+        self.assertEqual(1, executor_class.call_count)
+        self.assertIsNotNone(load_content_instance(output_directory, 'tt0112281'))
+        shutil.rmtree(output_directory)
+
+    def test_fit_chunk_size(self):
+        # the contents produced chunk by chunk must be equal to the ones produced on the whole source
+        output_contents = []
+        output_json = []
+        for chunk_size in [None, 7]:
+            output_directory = os.path.join(THIS_DIR, 'chunk_size_test')
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(movies_info_reduced),
+                id=['imdbID'],
+                output_directory=output_directory,
+                export_json=True,
+                chunk_size=chunk_size
+            )
+
+            movies_ca_config.add_single_config(
+                'Title', FieldConfig(OriginalData(), memory_interface=SearchIndex(os.path.join(THIS_DIR, "chunk_index"))))
+            movies_ca_config.add_single_config('imdbRating', FieldConfig())
+            movies_ca_config.add_single_exogenous(ExogenousConfig(PropertiesFromDataset(field_name_list=['Director'])))
+
+            ContentAnalyzer(movies_ca_config).fit()
+
+            contents = {}
+            for content_id in ['tt0112281', 'tt0113497', 'tt0114576']:
+                content = load_content_instance(output_directory, content_id)
+                # the position of the content in the index must be the one in the whole source
+                contents[content_id] = (content.get_field("Title")[0].value,
+                                        content.get_field("imdbRating")[0].value,
+                                        content.get_exogenous_representation(0).value)
+            output_contents.append(contents)
+
+            with open(os.path.join(output_directory, 'contents.json')) as file:
+                output_json.append(file.read())
+
+            shutil.rmtree(output_directory)
+            shutil.rmtree(os.path.join(THIS_DIR, "chunk_index"))
+
+        self.assertEqual(output_contents[0], output_contents[1])
+        self.assertEqual("Sudden Death", output_contents[1]['tt0114576'][0])
+        self.assertEqual(output_json[0], output_json[1])
+
+    def test_fit_sparse_features(self):
+        output_directory = os.path.join(THIS_DIR, 'sparse_features_test')
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(movies_info_reduced),
+            id=['imdbID'],
+            output_directory=output_directory,
+            features_matrix=True
+        )
+
+        movies_ca_config.add_single_config('Plot', FieldConfig(SkLearnTfIdf(), id='dict'))
+        movies_ca_config.add_single_config('Plot', FieldConfig(SkLearnTfIdf(sparse_features=True), id='sparse'))
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        # the vocabulary is saved only once in the output directory
+        vocabulary_files = [file_name for file_name in os.listdir(output_directory)
+                            if file_name.startswith('features_vocabulary_')]
+        self.assertEqual(1, len(vocabulary_files))
+
+        content = load_content_instance(output_directory, 'tt0113497')
+        dict_features = content.get_field_representation('Plot', 'dict').value
+        sparse_features = content.get_field_representation('Plot', 'sparse')
+
+        self.assertIsInstance(sparse_features, SparseFeaturesBagField)
+        self.assertEqual(dict_features.keys(), sparse_features.value.keys())
+        for term in dict_features:
+            self.assertAlmostEqual(dict_features[term], sparse_features.value[term], places=6)
+
+        # the whole tf-idf matrix of the catalog is stored too
+        matrix, rows, vocabulary = load_features_matrix(output_directory, 'Plot', 'sparse')
+        self.assertEqual(len(list(JSONFile(movies_info_reduced))), matrix.shape[0])
+        self.assertEqual(len(vocabulary), matrix.shape[1])
+        row = matrix[rows['tt0113497']]
+        self.assertEqual(sparse_features.value, {vocabulary.get_term(index): value
+                                                 for index, value in zip(row.indices, row.data)})
+        with self.assertRaises(KeyError):
+            load_features_matrix(output_directory, 'Plot', 'dict')
+
+        shutil.rmtree(output_directory)
+
+    def test_fit_embedding_matrix(self):
+        output_directory = os.path.join(THIS_DIR, 'embedding_matrix_test')
+        movies_ca_config = ItemAnalyzerConfig(
+            source=JSONFile(decode_embedding),
+            id=['imdbID'],
+            output_directory=output_directory,
+            embedding_matrix=True
+        )
+
+        movies_ca_config.add_multiple_config('Title', [FieldConfig(id='embedding'), FieldConfig(OriginalData())])
+
+        ContentAnalyzer(movies_ca_config).fit()
+
+        matrix, rows = load_embedding_matrix(output_directory, 'Title', 'embedding')
+        self.assertIsInstance(matrix, np.memmap)
+        self.assertEqual(1, matrix.shape[0])
+        self.assertEqual({'tt0113497': 0}, rows)
+
+        content = load_content_instance(output_directory, 'tt0113497')
+        embedding = content.get_field_representation('Title', 'embedding')
+        self.assertIsInstance(embedding, MatrixEmbeddingField)
+        self.assertEqual(rows['tt0113497'], embedding.row)
+        np.testing.assert_array_equal(matrix[rows['tt0113497']], embedding.value)
+        # the other representations are serialized as usual
+        self.assertIsInstance(content.get_field_representation('Title', 1), SimpleField)
+
+        # the embeddings are the same that would be produced without the matrix
+        raw_content = next(raw for raw in JSONFile(decode_embedding) if raw['imdbID'] == 'tt0113497')
+        np.testing.assert_array_almost_equal(np.array(json.loads(raw_content['Title'])), embedding.value)
+
+        shutil.rmtree(output_directory)
+
+    def test_fit_incremental(self):
+        output_directory = os.path.join(THIS_DIR, 'incremental_test')
+        index_directory = os.path.join(THIS_DIR, 'incremental_index')
+        source_path = os.path.join(THIS_DIR, 'incremental_source.json')
+
+        def run(raw_contents, technique=RecordingOriginalData):
+            with open(source_path, 'w') as source_file:
+                json.dump(raw_contents, source_file)
+
+            RecordingOriginalData.processed = []
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(source_path),
+                id=['imdbID'],
+                output_directory=output_directory,
+                export_json=True,
+                embedding_matrix=True,
+                incremental=True
+            )
+            movies_ca_config.add_single_config('Title', FieldConfig(technique()))
+            movies_ca_config.add_single_config('Plot', FieldConfig(OriginalData(),
+                                                                   memory_interface=SearchIndex(index_directory)))
+            movies_ca_config.add_single_config('Embedding', FieldConfig())
+            ContentAnalyzer(movies_ca_config).fit()
+            return RecordingOriginalData.processed
+
+        def raw_content(content_id, title, embedding):
+            return {'imdbID': content_id, 'Title': title, 'Plot': 'plot of ' + title,
+                    'Embedding': json.dumps(embedding), 'Unused': 'not used by the config'}
+
+        def check_contents(raw_contents):
+            with open(os.path.join(output_directory, 'contents.json')) as json_file:
+                exported = {content['content_id']: content for content in json.load(json_file)}
+            self.assertCountEqual([raw['imdbID'] for raw in raw_contents], exported.keys())
+
+            stored_files = [file_name for file_name in os.listdir(output_directory) if file_name.startswith('tt')]
+            self.assertCountEqual([raw['imdbID'] + '.xz' for raw in raw_contents], stored_files)
+
+            for raw in raw_contents:
+                content = load_content_instance(output_directory, raw['imdbID'])
+                self.assertEqual(raw['Title'], content.get_field_representation('Title', 0).value)
+                self.assertEqual(raw['Plot'], content.get_field_representation('Plot', 0).value)
+                np.testing.assert_array_equal(json.loads(raw['Embedding']),
+                                              content.get_field_representation('Embedding', 0).value)
+                self.assertEqual(raw['Title'], exported[raw['imdbID']]['Title#0'])
+
+        try:
+            raw_contents = [raw_content('tt001', 'first', [1., 1.]), raw_content('tt002', 'second', [2., 2.]),
+                            raw_content('tt003', 'third', [3., 3.])]
+            self.assertEqual([3], run(raw_contents))
+            check_contents(raw_contents)
+
+            # nothing changed, so nothing is produced (the fields not used by the config are not considered)
+            unchanged_mtime = os.path.getmtime(os.path.join(output_directory, 'tt001.xz'))
+            raw_contents[0]['Unused'] = 'changed'
+            self.assertEqual([], run(raw_contents))
+
+            # one content changed, one was removed and one was added
+            raw_contents = [raw_contents[0], raw_content('tt002', 'second changed', [4., 4.]),
+                            raw_content('tt004', 'fourth', [5., 5.])]
+            self.assertEqual([2], run(raw_contents))
+            check_contents(raw_contents)
+            self.assertEqual(unchanged_mtime, os.path.getmtime(os.path.join(output_directory, 'tt001.xz')))
+
+            matrix, rows = load_embedding_matrix(output_directory, 'Embedding', 0)
+            self.assertCountEqual(['tt001', 'tt002', 'tt004'], rows.keys())
+            # the rows of the unchanged contents keep their position
+            self.assertEqual(0, rows['tt001'])
+
+            # a different config produces all the contents again
+            self.assertEqual([3], run(raw_contents, RefitOriginalData))
+            check_contents(raw_contents)
+            self.assertEqual([], run(raw_contents, RefitOriginalData))
+
+            # the technique requires a refit, so all the contents are produced again when the collection changes
+            raw_contents = raw_contents + [raw_content('tt005', 'fifth', [6., 6.])]
+            self.assertEqual([4], run(raw_contents, RefitOriginalData))
+            check_contents(raw_contents)
+        finally:
+            for path in [output_directory, index_directory]:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+            if os.path.isfile(source_path):
+                os.remove(source_path)
+
+    def test_fit_incremental_fitted_technique(self):
+        output_directory = os.path.join(THIS_DIR, 'incremental_tfidf_test')
+        source_path = os.path.join(THIS_DIR, 'incremental_tfidf_source.json')
+
+        def create_config(technique):
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(source_path),
+                id=['imdbID'],
+                output_directory=output_directory,
+                incremental=True
+            )
+            movies_ca_config.add_single_config('Plot', FieldConfig(technique))
+            return movies_ca_config
+
+        raw_contents = [{'imdbID': 'tt001', 'Plot': 'first plot'}, {'imdbID': 'tt002', 'Plot': 'second plot'}]
+        with open(source_path, 'w') as source_file:
+            json.dump(raw_contents, source_file)
+
+        try:
+            for technique_class in [SkLearnTfIdf, StreamingTfIdf]:
+                ContentAnalyzer(create_config(technique_class())).fit()
+                # the state left in the technique by the run is not part of the fingerprint of the config
+                self.assertEqual(config_fingerprint(create_config(technique_class())),
+                                 load_fingerprints(output_directory)['config'])
+
+                # the source didn't change, so nothing is produced again
+                unchanged_mtime = os.stat(os.path.join(output_directory, 'tt001.xz')).st_mtime_ns
+                ContentAnalyzer(create_config(technique_class())).fit()
+                self.assertEqual(unchanged_mtime, os.stat(os.path.join(output_directory, 'tt001.xz')).st_mtime_ns)
+        finally:
+            if os.path.isdir(output_directory):
+                shutil.rmtree(output_directory)
+            if os.path.isfile(source_path):
+                os.remove(source_path)
+
+    def test_fit_incremental_retrained_model(self):
+        output_directory = os.path.join(THIS_DIR, 'incremental_model_test')
+        source_path = os.path.join(THIS_DIR, 'incremental_model_source.json')
+        model_path = os.path.join(THIS_DIR, 'incremental_model_word2vec.bin')
+
+        def run(raw_contents):
+            with open(source_path, 'w') as source_file:
+                json.dump(raw_contents, source_file)
+
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(source_path),
+                id=['imdbID'],
+                output_directory=output_directory,
+                incremental=True
+            )
+            learner = GensimWord2Vec(model_path, vector_size=5, min_count=1, seed=0, workers=1)
+            movies_ca_config.add_single_config('Plot', FieldConfig(WordEmbeddingTechnique(learner)))
+            ContentAnalyzer(movies_ca_config).fit()
+
+        def check_contents(raw_contents):
+            model = KeyedVectors.load_word2vec_format(model_path, binary=True)
+            for raw in raw_contents:
+                content = load_content_instance(output_directory, raw['imdbID'])
+                np.testing.assert_array_equal(model[raw['Plot'].split()],
+                                              content.get_field_representation('Plot', 0).value)
+
+        try:
+            raw_contents = [{'imdbID': 'tt001', 'Plot': 'first plot'}, {'imdbID': 'tt002', 'Plot': 'second plot'}]
+            # the model is trained and saved by the first run
+            run(raw_contents)
+            self.assertTrue(os.path.isfile(model_path))
+            check_contents(raw_contents)
+
+            # the model saved by the first run is part of its config, so nothing is produced again
+            unchanged_mtime = os.path.getmtime(os.path.join(output_directory, 'tt001.xz'))
+            run(raw_contents)
+            self.assertEqual(unchanged_mtime, os.path.getmtime(os.path.join(output_directory, 'tt001.xz')))
+
+            # the model is retrained in place, so the unchanged contents are produced again with the new model too
+            Word2Vec([['first', 'plot'], ['third', 'plot']], vector_size=5, min_count=1, seed=1,
+                     workers=1).wv.save_word2vec_format(model_path, binary=True)
+            raw_contents[1]['Plot'] = 'third plot'
+            run(raw_contents)
+            check_contents(raw_contents)
+        finally:
+            if os.path.isdir(output_directory):
+                shutil.rmtree(output_directory)
+            for path in [source_path, model_path]:
+                if os.path.isfile(path):
+                    os.remove(path)
+
+    def test_fit_representation_cache(self):
+        output_directory = os.path.join(THIS_DIR, 'representation_cache_output')
+        cache = RepresentationCache(os.path.join(THIS_DIR, 'representation_cache_fit'))
+
+        def run():
+            movies_ca_config = ItemAnalyzerConfig(
+                source=JSONFile(movies_info_reduced),
+                id=['imdbID'],
+                output_directory=output_directory,
+                representation_cache=cache
+            )
+            movies_ca_config.add_single_config('Title', FieldConfig(CachedOriginalData()))
+            movies_ca_config.add_single_config('Year', FieldConfig(CachedOriginalData(int)))
+            ContentAnalyzer(movies_ca_config).fit()
+            return {content_id: load_content_instance(output_directory, content_id)
+                    for content_id in ['tt0112281', 'tt0113497']}
+
+        try:
+            # equal values (for example the same year) are searched and produced only once
+            contents = run()
+            n_produced = cache.misses
+            self.assertEqual(0, cache.hits)
+            self.assertLess(n_produced, 40)
+
+            # the second run takes all the representations from the cache
+            cached_contents = run()
+            self.assertEqual(n_produced, cache.hits)
+            self.assertEqual(n_produced, cache.misses)
+            for content_id, content in contents.items():
+                for field_name in ['Title', 'Year']:
+                    self.assertEqual(content.get_field_representation(field_name, 0).value,
+                                     cached_contents[content_id].get_field_representation(field_name, 0).value)
+        finally:
+            cache.clear()
+            for path in [output_directory, cache.directory]:
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+
     # def doCleanups(self) -> None:
     #     if os.path.isdir(self.out_dir):
     #         shutil.rmtree(self.out_dir)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import lzma
+import os
+import pickle
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.content_archive import ContentArchiveWriter, ContentArchiveReader, \
+    migrate_to_archive, ARCHIVE_SEGMENT_FILE, LazyContent
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, SimpleField, \
+    FeaturesBagField, PropertiesDict
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_content(content_id: str, value: str) -> Content:
+    content = Content(content_id)
+    content.append_field_representation("Title", SimpleField(value), "original")
+    return content
+
+
+class TestContentArchive(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, "archive_test")
+        os.mkdir(self.directory)
+
+    def test_write_load(self):
+        with ContentArchiveWriter(self.directory) as writer:
+            writer.write(create_content("tt001", "first"))
+            writer.write(create_content("tt:002", "second"))
+
+        self.assertTrue(ContentArchiveReader.is_archive(self.directory))
+
+        with ContentArchiveReader(self.directory) as reader:
+            self.assertEqual(2, len(reader))
+            self.assertCountEqual(["tt001", "tt002"], reader.content_names())
+            self.assertIn("tt:002", reader)
+
+            content = reader.load("tt001")
+            self.assertEqual("tt001", content.content_id)
+            self.assertEqual("first", content.get_field_representation("Title", "original").value)
+
+            # the content id is stripped of punctuation like in the per file serialization
+            self.assertEqual("tt:002", reader.load("tt002").content_id)
+
+            self.assertIsNone(reader.load("not_existent"))
+
+    def test_segments(self):
+        with ContentArchiveWriter(self.directory, segment_size=1, compress=False) as writer:
+            for i in range(3):
+                writer.write(create_content("tt00{}".format(i), "value {}".format(i)))
+
+        for i in range(3):
+            self.assertTrue(os.path.isfile(os.path.join(self.directory, ARCHIVE_SEGMENT_FILE.format(i))))
+
+        with ContentArchiveReader(self.directory) as reader:
+            for i in range(3):
+                self.assertEqual("value {}".format(i),
+                                 reader.load("tt00{}".format(i)).get_field_representation("Title", 0).value)
+
+    def test_concurrent_reads(self):
+        with ContentArchiveWriter(self.directory, compress=False) as writer:
+            for i in range(100):
+                writer.write(create_content("tt{}".format(i), "value {}".format(i) * (i + 1)))
+
+        def load_all(reader: ContentArchiveReader):
+            return [reader.load("tt{}".format(i)).get_field_representation("Title", 0).value for i in range(100)]
+
+        with ContentArchiveReader(self.directory) as reader:
+            with ThreadPoolExecutor(8) as executor:
+                results = list(executor.map(load_all, [reader] * 32))
+
+        expected = ["value {}".format(i) * (i + 1) for i in range(100)]
+        for result in results:
+            self.assertEqual(expected, result)
+
+    def test_append_remove(self):
+        with ContentArchiveWriter(self.directory) as writer:
+            writer.write(create_content("tt001", "first"))
+            writer.write(create_content("tt002", "second"))
+
+        with ContentArchiveWriter(self.directory) as writer:
+            writer.write(create_content("tt001", "first updated"))
+            writer.write(create_content("tt003", "third"))
+            writer.remove("tt002")
+
+        with ContentArchiveReader(self.directory) as reader:
+            self.assertCountEqual(["tt001", "tt003"], reader.content_names())
+            self.assertEqual("first updated", reader.load("tt001").get_field_representation("Title", 0).value)
+            self.assertIsNone(reader.load("tt002"))
+
+    def test_migrate_to_archive(self):
+        for content_id in ["tt001", "tt002"]:
+            with lzma.open(os.path.join(self.directory, content_id + '.xz'), 'wb') as f:
+                pickle.dump(create_content(content_id, content_id), f)
+
+        # files that don't contain a content are not migrated
+        with lzma.open(os.path.join(self.directory, 'other.xz'), 'wb') as f:
+            pickle.dump({'not': 'a content'}, f)
+
+        self.assertEqual(2, migrate_to_archive(self.directory))
+
+        self.assertFalse(os.path.isfile(os.path.join(self.directory, 'tt001.xz')))
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, 'other.xz')))
+
+        with ContentArchiveReader(self.directory) as reader:
+            self.assertCountEqual(["tt001", "tt002"], reader.content_names())
+            self.assertEqual("tt002", reader.load("tt002").get_field_representation("Title", 0).value)
+
+    def test_field_projection(self):
+        content = create_content("tt001", "first")
+        content.append_field_representation("Title", FeaturesBagField({'first': 0.5}), "tfidf")
+        content.append_field_representation("Plot", [SimpleField("plot"), SimpleField("plot 2")])
+        content.append_exogenous_representation(PropertiesDict({'director': 'someone'}), "dbpedia")
+
+        with ContentArchiveWriter(self.directory, field_projection=True) as writer:
+            writer.write(content)
+            writer.write(create_content("tt002", "second"))
+
+        with ContentArchiveReader(self.directory) as reader:
+            self.assertTrue(reader.field_projection)
+
+            lazy_content = reader.load("tt001")
+            self.assertIsInstance(lazy_content, LazyContent)
+            self.assertEqual("tt001", lazy_content.content_id)
+
+            # only the requested representations are deserialized
+            self.assertEqual({'first': 0.5}, lazy_content.get_field_representation("Title", "tfidf").value)
+            self.assertEqual("plot 2", lazy_content.get_field_representation("Plot", 1).value)
+            self.assertEqual(2, len(lazy_content._LazyContent__representations))
+            self.assertEqual({}, lazy_content._Content__field_dict)
+
+            with self.assertRaises(KeyError):
+                lazy_content.get_field_representation("Title", "not_existent")
+
+            self.assertEqual({'director': 'someone'}, lazy_content.get_exogenous_representation("dbpedia").value)
+
+            # the whole content is loaded when needed
+            self.assertEqual(["original", "tfidf"], lazy_content.get_field("Title").get_external_index())
+            self.assertEqual(content, lazy_content)
+            self.assertCountEqual(["Title", "Plot"], lazy_content.field_dict.keys())
+
+            # a lazy content is pickled as a regular content
+            unpickled = pickle.loads(pickle.dumps(lazy_content))
+            self.assertIs(Content, type(unpickled))
+            self.assertEqual(content, unpickled)
+
+            self.assertEqual("second", reader.load("tt002").get_field_representation("Title", "original").value)
+
+        # appending to an existing archive keeps the field projection
+        with ContentArchiveWriter(self.directory) as writer:
+            writer.write(create_content("tt003", "third"))
+
+        with ContentArchiveReader(self.directory) as reader:
+            self.assertIsInstance(reader.load("tt003"), LazyContent)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
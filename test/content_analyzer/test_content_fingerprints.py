@@ -0,0 +1,65 @@
+import os
+import shutil
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer import ItemAnalyzerConfig, FieldConfig, ExogenousConfig
+from orange_cb_recsys.content_analyzer.content_fingerprints import config_fingerprint, content_fingerprint, \
+    load_fingerprints, save_fingerprints
+from orange_cb_recsys.content_analyzer.exogenous_properties_retrieval import PropertiesFromDataset
+from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData
+from orange_cb_recsys.content_analyzer.memory_interfaces import SearchIndex
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def create_config(dtype=str, output_directory='first_dir', n_jobs=1):
+    config = ItemAnalyzerConfig(JSONFile('source.json'), ['imdbID'], output_directory, n_jobs=n_jobs)
+    config.add_single_config('Title', FieldConfig(OriginalData(dtype), id='title'))
+    config.add_single_config('Plot', FieldConfig(OriginalData(), memory_interface=SearchIndex('index_dir')))
+    config.add_single_exogenous(ExogenousConfig(PropertiesFromDataset(field_name_list=['Director'])))
+    return config
+
+
+class TestContentFingerprints(TestCase):
+    def test_config_fingerprint(self):
+        fingerprint = config_fingerprint(create_config())
+
+        # the output directory and the options that don't change the contents are not considered
+        self.assertEqual(fingerprint, config_fingerprint(create_config(output_directory='other_dir', n_jobs=2)))
+        # the parameters of the techniques are considered
+        self.assertNotEqual(fingerprint, config_fingerprint(create_config(dtype=int)))
+
+        # the state of the memory interfaces is not considered
+        config = create_config()
+        memory_interface = next(config.get_configs_list('Plot')).memory_interface
+        try:
+            memory_interface.init_writing(True)
+            memory_interface.new_content()
+            memory_interface.new_field('content_id', 'tt001')
+            memory_interface.serialize_content()
+            memory_interface.stop_writing()
+            self.assertEqual(fingerprint, config_fingerprint(config))
+        finally:
+            memory_interface.delete()
+
+    def test_content_fingerprint(self):
+        raw_content = {'imdbID': 'tt001', 'Title': 'title', 'Plot': 'plot'}
+        fingerprint = content_fingerprint(raw_content, ['imdbID', 'Title'])
+
+        self.assertEqual(fingerprint, content_fingerprint(dict(raw_content, Plot='changed'), ['imdbID', 'Title']))
+        self.assertNotEqual(fingerprint, content_fingerprint(dict(raw_content, Title='changed'), ['imdbID', 'Title']))
+        # all the fields are considered if the field list is None
+        self.assertNotEqual(content_fingerprint(raw_content), content_fingerprint(dict(raw_content, Plot='changed')))
+
+    def test_save_load(self):
+        directory = os.path.join(THIS_DIR, 'fingerprints_test')
+        os.mkdir(directory)
+        try:
+            self.assertIsNone(load_fingerprints(directory))
+
+            fingerprints = {'config': 'config', 'contents': {'tt001': 'content'}, 'index_positions': {}}
+            save_fingerprints(directory, fingerprints)
+            self.assertEqual(fingerprints, load_fingerprints(directory))
+        finally:
+            shutil.rmtree(directory)
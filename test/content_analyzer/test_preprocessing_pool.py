@@ -0,0 +1,71 @@
+import os
+import pickle
+from unittest import TestCase
+
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_fingerprint
+from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData
+from orange_cb_recsys.content_analyzer.information_processor.information_processor import TextProcessor
+from orange_cb_recsys.content_analyzer.preprocessing_pool import PreprocessingPool
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from test import dir_test_files
+
+
+class UpperProcessor(TextProcessor):
+    """
+    Processor which converts the text to uppercase and records the process where it has been applied
+    """
+    def process(self, field_data):
+        return '{}:{}'.format(field_data.upper(), os.getpid())
+
+
+class TestPreprocessingPool(TestCase):
+    def test_process(self):
+        data_list = ['text {}'.format(i) for i in range(50)]
+
+        with PreprocessingPool(n_jobs=2, chunk_size=3) as pool:
+            processed = pool.process(data_list, [UpperProcessor()])
+
+            # the order of the data is kept
+            self.assertEqual([data.upper() for data in data_list],
+                             [processed_data.split(':')[0] for processed_data in processed])
+            # the data has been processed in the worker processes
+            pids = {processed_data.split(':')[1] for processed_data in processed}
+            self.assertNotIn(str(os.getpid()), pids)
+
+            # the workers are kept alive while the same preprocessors are used (the executor may start its second
+            # worker only when the data is processed again, so no more than 2 workers are used in total)
+            processed_again = pool.process(data_list, [UpperProcessor()])
+            pids.update(processed_data.split(':')[1] for processed_data in processed_again)
+            self.assertLessEqual(len(pids), 2)
+
+        # without preprocessors the data isn't sent to the workers
+        self.assertEqual(data_list, PreprocessingPool(n_jobs=2).process(data_list, []))
+
+    def test_pickle_fingerprint(self):
+        pool = PreprocessingPool(n_jobs=2)
+        try:
+            pool.process(['a', 'b'], [UpperProcessor()])
+            # the worker processes aren't copied
+            unpickled = pickle.loads(pickle.dumps(pool))
+            self.assertEqual(2, unpickled.n_jobs)
+        finally:
+            pool.close()
+
+        # the pool isn't considered as a parameter of the technique
+        technique = OriginalData()
+        fingerprint = object_fingerprint(technique)
+        technique.preprocessing_pool = pool
+        self.assertEqual(fingerprint, object_fingerprint(technique))
+
+    def test_technique_with_pool(self):
+        source = JSONFile(os.path.join(dir_test_files, 'movies_info_reduced.json'))
+        technique = OriginalData()
+        expected = [representation.value.split(':')[0]
+                    for representation in technique.produce_content('Title', [UpperProcessor()], source)]
+
+        with PreprocessingPool(n_jobs=2) as pool:
+            technique.preprocessing_pool = pool
+            result = [representation.value.split(':')[0]
+                      for representation in technique.produce_content('Title', [UpperProcessor()], source)]
+
+        self.assertEqual(expected, result)
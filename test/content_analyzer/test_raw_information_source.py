@@ -1,7 +1,8 @@
 import os
 from unittest import TestCase
 
-from orange_cb_recsys.content_analyzer.raw_information_source import SQLDatabase, CSVFile, JSONFile, DATFile
+from orange_cb_recsys.content_analyzer.raw_information_source import SQLDatabase, CSVFile, JSONFile, DATFile, \
+    ColumnarSource, split_in_chunks
 from test import dir_test_files
 
 json_file = os.path.join(dir_test_files, "movies_info_reduced.json")
@@ -168,3 +169,46 @@ class TestDATFile(TestCase):
         for line in expected:
             dat1 = next(my_iter)
             self.assertEqual(line, dat1)
+
+
+class TestSplitInChunks(TestCase):
+    def test_split_in_chunks(self):
+        source = JSONFile(json_file)
+
+        chunks = list(split_in_chunks(source, 7))
+
+        self.assertEqual([7, 7, 6], [len(chunk) for chunk in chunks])
+        for chunk in chunks:
+            self.assertIsInstance(chunk, ColumnarSource)
+
+        # the chunks contain all the contents of the source in the original order
+        self.assertEqual(list(source), [raw_content for chunk in chunks for raw_content in chunk])
+
+        with self.assertRaises(ValueError):
+            list(split_in_chunks(source, 0))
+
+        # only the fields in the field list are kept
+        chunk = next(split_in_chunks(source, 7, ['imdbID', 'Title']))
+        self.assertEqual(['imdbID', 'Title'], chunk.field_list)
+
+
+class TestColumnarSource(TestCase):
+    def test_iter(self):
+        raw_contents = [
+            {'id': '1', 'Title': 'first', 'Plot': 'plot 1'},
+            {'id': '2', 'Plot': 'plot 2'},
+            {'id': '3', 'Title': 'third', 'Year': '1995'}
+        ]
+
+        source = ColumnarSource(raw_contents)
+        self.assertEqual(3, len(source))
+        self.assertEqual(raw_contents, list(source))
+        # the source can be iterated multiple times
+        self.assertEqual(raw_contents, list(source))
+
+        source = ColumnarSource(raw_contents, ['id', 'Title'])
+        self.assertEqual(['id', 'Title'], source.field_list)
+        self.assertEqual([{'id': '1', 'Title': 'first'}, {'id': '2'}, {'id': '3', 'Title': 'third'}], list(source))
+
+        source = ColumnarSource(JSONFile(json_file), ['imdbID'])
+        self.assertEqual([{'imdbID': raw_content['imdbID']} for raw_content in JSONFile(json_file)], list(source))
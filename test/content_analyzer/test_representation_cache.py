@@ -0,0 +1,169 @@
+import os
+import shutil
+import time
+from unittest import TestCase
+
+import numpy as np
+from gensim.models import Word2Vec
+
+from orange_cb_recsys.content_analyzer.content_fingerprints import object_fingerprint
+from orange_cb_recsys.content_analyzer.content_representation.content import SimpleField
+from orange_cb_recsys.content_analyzer.embeddings.embedding_learner import GensimWord2Vec
+from orange_cb_recsys.content_analyzer.field_content_production_techniques import OriginalData, \
+    WordEmbeddingTechnique
+from orange_cb_recsys.content_analyzer.information_processor import NLTK
+from orange_cb_recsys.content_analyzer.raw_information_source import JSONFile
+from orange_cb_recsys.content_analyzer.representation_cache import RepresentationCache
+from test import dir_test_files
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CachedOriginalData(OriginalData):
+    """
+    OriginalData technique which stores its representations in the cache
+    """
+    def uses_representation_cache(self) -> bool:
+        return True
+
+
+class TestRepresentationCache(TestCase):
+    def setUp(self) -> None:
+        self.directory = os.path.join(THIS_DIR, 'representation_cache_test')
+        self.cache = RepresentationCache(self.directory)
+
+    def test_get_put(self):
+        key = self.cache.technique_key(OriginalData(), [])
+
+        self.assertIsNone(self.cache.get(key, 'title'))
+        self.cache.put(key, 'title', SimpleField('title'))
+        self.assertEqual('title', self.cache.get(key, 'title').value)
+
+        # the key depends on the parameters of the technique and on the preprocessors
+        self.assertEqual(key, self.cache.technique_key(OriginalData(), []))
+        self.assertIsNone(self.cache.get(self.cache.technique_key(OriginalData(int), []), 'title'))
+        self.assertIsNone(self.cache.get(self.cache.technique_key(OriginalData(), [NLTK()]), 'title'))
+
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(3, self.cache.misses)
+        self.assertEqual(0.25, self.cache.hit_rate)
+
+    def test_cached(self):
+        produced = []
+
+        def produce(field_data):
+            produced.append(field_data)
+            return SimpleField(field_data.upper())
+
+        cached_produce = self.cache.cached(OriginalData(), [], produce)
+        self.assertEqual('A', cached_produce('a').value)
+        self.assertEqual('B', cached_produce('b').value)
+        self.assertEqual('A', cached_produce('a').value)
+        self.assertEqual(['a', 'b'], produced)
+
+        # the cache is persistent
+        other_cache = RepresentationCache(self.directory)
+        self.assertEqual('B', other_cache.cached(OriginalData(), [], produce)('b').value)
+        self.assertEqual(['a', 'b'], produced)
+
+        self.cache.clear()
+        self.assertEqual('A', cached_produce('a').value)
+        self.assertEqual(['a', 'b', 'a'], produced)
+
+    def test_eviction(self):
+        key = self.cache.technique_key(OriginalData(), [])
+        self.cache.put(key, 'first', SimpleField('first'))
+        entry_size = sum(os.path.getsize(os.path.join(root, file_name))
+                         for root, _, files in os.walk(self.directory) for file_name in files)
+
+        cache = RepresentationCache(self.directory, max_size=int(entry_size * 3.5))
+        for value in ['second', 'third']:
+            time.sleep(0.01)
+            cache.put(key, value, SimpleField(value))
+        # the first entry is the most recently used one
+        time.sleep(0.01)
+        cache.get(key, 'first')
+        time.sleep(0.01)
+        cache.put(key, 'fourth', SimpleField('fourth'))
+
+        self.assertIsNotNone(cache.get(key, 'first'))
+        self.assertIsNone(cache.get(key, 'second'))
+        self.assertIsNotNone(cache.get(key, 'fourth'))
+
+    def test_overwrite(self):
+        key = self.cache.technique_key(OriginalData(), [])
+        self.cache.put(key, 'first', SimpleField('first'))
+        self.cache.put(key, 'second', SimpleField('second'))
+        for _ in range(5):
+            self.cache.put(key, 'first', SimpleField('first'))
+
+        # an entry written again replaces the old one, so the size of the cache doesn't grow
+        stored_size = sum(os.path.getsize(os.path.join(root, file_name))
+                          for root, _, files in os.walk(self.directory) for file_name in files)
+        self.assertEqual(stored_size, self.cache._RepresentationCache__size)
+
+    def test_technique_without_cache(self):
+        # the representations of OriginalData are just the processed values, so they aren't stored in the cache
+        technique = OriginalData()
+        technique.representation_cache = self.cache
+        source = JSONFile(os.path.join(dir_test_files, 'movies_info_reduced.json'))
+        technique.produce_content('Title', [], source)
+        technique.produce_content('Title', [], source)
+
+        self.assertEqual(0, self.cache.hits + self.cache.misses)
+        self.assertFalse(os.path.isdir(self.directory))
+
+    def test_technique_with_cache(self):
+        technique = CachedOriginalData()
+        fingerprint = object_fingerprint(technique)
+
+        # the cache isn't considered as a parameter of the technique
+        technique.representation_cache = self.cache
+        self.assertEqual(fingerprint, object_fingerprint(technique))
+
+        source = JSONFile(os.path.join(dir_test_files, 'movies_info_reduced.json'))
+        representations = technique.produce_content('Title', [], source)
+        self.assertEqual(0, self.cache.hits)
+
+        cached_representations = technique.produce_content('Title', [], source)
+        self.assertEqual(len(representations), self.cache.hits)
+        self.assertEqual([representation.value for representation in representations],
+                         [representation.value for representation in cached_representations])
+
+    def test_retrained_model(self):
+        model_path = os.path.join(THIS_DIR, 'retrained_word2vec.bin')
+        sentences = [['first', 'plot'], ['second', 'plot']]
+
+        def train_model(vector_size, seed):
+            Word2Vec(sentences, vector_size=vector_size, min_count=1, seed=seed, workers=1).wv.save_word2vec_format(
+                model_path, binary=True)
+            technique = WordEmbeddingTechnique(GensimWord2Vec(model_path))
+            technique.representation_cache = self.cache
+            return technique
+
+        try:
+            technique = train_model(10, 0)
+            key = self.cache.technique_key(technique, [])
+            first_representation = technique.produce_representations(['first plot'], [],
+                                                                     technique.produce_single_repr)[0]
+            self.assertEqual(1, self.cache.misses)
+
+            # the same model at the same reference is found in the cache
+            self.assertEqual(key, self.cache.technique_key(WordEmbeddingTechnique(GensimWord2Vec(model_path)), []))
+            technique.produce_representations(['first plot'], [], technique.produce_single_repr)
+            self.assertEqual(1, self.cache.hits)
+
+            # the model retrained in place is a different model, even if the reference is the same
+            technique = train_model(5, 1)
+            self.assertNotEqual(key, self.cache.technique_key(technique, []))
+            representation = technique.produce_representations(['first plot'], [], technique.produce_single_repr)[0]
+            self.assertEqual(2, self.cache.misses)
+            self.assertEqual((2, 5), representation.value.shape)
+            self.assertFalse(np.array_equal(first_representation.value[:, :5], representation.value))
+        finally:
+            if os.path.isfile(model_path):
+                os.remove(model_path)
+
+    def tearDown(self) -> None:
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
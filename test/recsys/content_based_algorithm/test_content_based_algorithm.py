@@ -1,12 +1,17 @@
 import os
 from unittest import TestCase
 
+from orange_cb_recsys.content_analyzer.content_representation.content import Content, IndexField, FeaturesBagField
+from orange_cb_recsys.content_analyzer.content_representation.representation_container import RepresentationContainer
+from orange_cb_recsys.content_analyzer.memory_interfaces import SearchIndex
 from orange_cb_recsys.utils.load_content import load_content_instance
 
 from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.centroid_vector import CentroidVector
 from orange_cb_recsys.recsys.content_based_algorithm.centroid_vector.similarities import CosineSimilarity
 from test import dir_test_files
 
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 class TestContentBasedAlgorithm(TestCase):
 
@@ -42,3 +47,40 @@ class TestContentBasedAlgorithm(TestCase):
 
         self.assertEqual(1, len(result))
         self.assertIsInstance(result[0], dict)
+
+    def test_extract_features_items(self):
+        movies_dir = os.path.join(dir_test_files, 'complex_contents', 'movies_codified/')
+
+        contents = [load_content_instance(movies_dir, 'tt0112281'), None,
+                    load_content_instance(movies_dir, 'tt0112302')]
+
+        result = self.alg.extract_features_items(contents)
+
+        self.assertEqual([self.alg.extract_features_item(content) for content in contents], result)
+
+        # the representations serialized in an index are read together
+        index = SearchIndex(os.path.join(THIS_DIR, 'extract_features_index'))
+        try:
+            index.init_writing(True, ['content_id', 'Plot#0', 'Plot#1'])
+            items = []
+            for content_id in ['0', '1', '2']:
+                index.new_content()
+                index.new_field('content_id', content_id)
+                index.new_field('Plot#0', 'plot ' + content_id)
+                index.new_field('Plot#1', 'other plot ' + content_id)
+                position = index.serialize_content()
+
+                plot = RepresentationContainer()
+                plot.append(IndexField('Plot#0', position, index), 'index')
+                plot.append(FeaturesBagField({'plot': 1}), 'bag')
+                plot.append(IndexField('Plot#1', position, index), 'other_index')
+                item = Content(content_id)
+                item.append_field('Plot', plot)
+                items.append(item)
+            index.stop_writing()
+
+            alg = CentroidVector({'Plot': ['other_index', 'bag', 'index']}, CosineSimilarity(), 0)
+            expected = [['other plot {}'.format(i), {'plot': 1}, 'plot {}'.format(i)] for i in range(3)]
+            self.assertEqual(expected, alg.extract_features_items(items))
+        finally:
+            index.delete()
@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+from orange_cb_recsys.utils.import_time import measure_import_time, CORE_IMPORTS
+
+
+class TestImportTime(TestCase):
+    def test_core_imports(self):
+        for statement in CORE_IMPORTS:
+            result = measure_import_time(statement)
+            self.assertEqual([], result['modules'])
+
+    def test_recsys_and_evaluation_imports(self):
+        # pandas and sklearn are used by the recsys and the evaluation, while the other libraries are only used by
+        # some of their classes
+        for statement in ['from orange_cb_recsys.recsys import ContentBasedRS, GraphBasedRS, CentroidVector',
+                          'from orange_cb_recsys.evaluation import EvalModel, Precision']:
+            result = measure_import_time(statement)
+            imported_libraries = {module.split('.')[0] for module in result['modules']}
+            self.assertEqual(set(), imported_libraries - {'pandas', 'sklearn'})
+
+    def test_no_resources_download_on_import(self):
+        # a call to nltk.download would make the import fail
+        result = measure_import_time('import nltk; nltk.download = None; '
+                                     'from orange_cb_recsys.content_analyzer import NLTK')
+        self.assertIn('nltk', result['modules'])
@@ -1,6 +1,10 @@
 import os
+import shutil
 from unittest import TestCase
-from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items, get_rated_items
+
+from orange_cb_recsys.content_analyzer.content_archive import ContentArchiveWriter
+from orange_cb_recsys.utils.load_content import load_content_instance, remove_not_existent_items, get_rated_items, \
+    get_unrated_items
 import pandas as pd
 from test import dir_test_files
 
@@ -25,3 +29,26 @@ class Test(TestCase):
 
         self.assertIn('tt0112281', result_loaded_ids)
         self.assertIn('tt0113497', result_loaded_ids)
+
+    def test_load_from_archive(self):
+        archive_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive_test')
+        os.mkdir(archive_dir)
+
+        try:
+            with ContentArchiveWriter(archive_dir) as writer:
+                for item_id in ['tt0112281', 'tt0113497', 'tt0113228']:
+                    writer.write(load_content_instance(movies_dir, item_id))
+
+            self.assertEqual('tt0113497', load_content_instance(archive_dir, 'tt0113497').content_id)
+            self.assertIsNone(load_content_instance(archive_dir, 'invalid_item'))
+
+            ratings = pd.DataFrame({'to_id': ['tt0112281', 'tt0113497', 'aaaa']})
+            rated_ids = [item.content_id for item in get_rated_items(archive_dir, ratings)]
+            self.assertEqual(['tt0112281', 'tt0113497'], rated_ids)
+
+            unrated_ids = [item.content_id for item in get_unrated_items(archive_dir, ratings)]
+            self.assertEqual(['tt0113228'], unrated_ids)
+
+            self.assertEqual(['tt0112281', 'tt0113497'], list(remove_not_existent_items(ratings, archive_dir).to_id))
+        finally:
+            shutil.rmtree(archive_dir)